@@ -50,6 +50,8 @@ class PythonSingleAstProvider(iast_provider.IPythonSingleAstProvider):
             file_version=file_version,
             key=self.CACHE_KEY,
             value=ast_instance,
+            # parsing is about as fast as loading a stored tree
+            persistent=False,
         )
         return ast_instance
 
@@ -2,8 +2,10 @@ from .format_python_file_handler import (
     BlackFormatFileHandler,
     BlackFormatFileHandlerConfig,
 )
+from .format_python_files_handler import BlackFormatFilesHandler
 
 __all__ = [
     "BlackFormatFileHandler",
     "BlackFormatFileHandlerConfig",
+    "BlackFormatFilesHandler",
 ]
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import sys
+from typing import cast
+
+if sys.version_info < (3, 12):
+    from typing_extensions import override
+else:
+    from typing import override
+
+from finecode_extension_api import code_action
+from fine_format import format_file_action, format_files_action
+from fine_python_lang.format_python_files_action import (
+    FormatPythonFilesAction,
+)
+from finecode_extension_api.interfaces import ilogger, iprocessexecutor
+
+from fine_python_black.format_python_file_handler import (
+    BlackFormatFileHandlerConfig,
+    format_one,
+    get_black_mode,
+)
+
+
+class BlackFormatFilesHandler(
+    code_action.ActionHandler[FormatPythonFilesAction, BlackFormatFileHandlerConfig]
+):
+    """Batch variant of BlackFormatFileHandler: formats files of a batch in worker
+    processes in chunks instead of with one process executor call per file."""
+
+    def __init__(
+        self,
+        config: BlackFormatFileHandlerConfig,
+        logger: ilogger.ILogger,
+        process_executor: iprocessexecutor.IProcessExecutor,
+    ) -> None:
+        self.config = config
+        self.logger = logger
+        self.process_executor = process_executor
+
+        self.black_mode = get_black_mode(self.config)
+
+    @override
+    async def run(
+        self,
+        payload: format_files_action.FormatFilesRunPayload,
+        run_context: format_files_action.FormatFilesBatchRunContext,
+    ) -> format_files_action.FormatFilesRunResult:
+        file_uris = list(run_context.file_info_by_path.keys())
+        file_contents = [
+            run_context.file_info_by_path[file_uri].file_content
+            for file_uri in file_uris
+        ]
+
+        # Avoid outputting low-level logs of black. We trace extension flow here.
+        self.logger.disable("fine_python_black")
+        process_result = cast(
+            list[tuple[str, bool]],
+            await self.process_executor.map(format_one, file_contents, self.black_mode),
+        )
+        self.logger.enable("fine_python_black")
+
+        result_by_file_path: dict[str, format_files_action.FormatRunFileResult] = {}
+        for file_uri, (new_file_content, file_changed) in zip(
+            file_uris, process_result
+        ):
+            # Update for next handlers in the formatting pipeline.
+            run_context.file_info_by_path[file_uri] = format_file_action.FileInfo(
+                new_file_content,
+                run_context.file_info_by_path[file_uri].file_version,
+            )
+            result_by_file_path[file_uri] = format_files_action.FormatRunFileResult(
+                changed=file_changed, code=new_file_content
+            )
+
+        return format_files_action.FormatFilesRunResult(
+            result_by_file_path=result_by_file_path
+        )
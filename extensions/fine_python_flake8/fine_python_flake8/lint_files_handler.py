@@ -3,6 +3,8 @@ from __future__ import annotations
 import argparse
 import ast
 import dataclasses
+import functools
+import importlib.metadata
 import operator
 from pathlib import Path
 
@@ -54,6 +56,33 @@ def map_flake8_check_result_to_lint_message(result: tuple) -> Diagnostic:
     )
 
 
+@functools.lru_cache(maxsize=8)
+def _get_style_guide(
+    max_line_length: int,
+    select: tuple[str, ...] | None,
+    extend_select: tuple[str, ...] | None,
+    extend_ignore: tuple[str, ...] | None,
+) -> tuple[flake8.StyleGuide, style_guide.DecisionEngine]:
+    # style guide loads flake8 plugins, it is created once per config in each worker
+    # process. It cannot be created in handler, because it is not picklable and
+    # cannot be passed to function executed in process executor.
+    guide = flake8.get_style_guide(
+        max_line_length=max_line_length,
+        extend_select=_as_list(extend_select),
+        extend_ignore=_as_list(extend_ignore),
+        select=_as_list(select),
+    )
+    return guide, style_guide.DecisionEngine(guide.options)
+
+
+def _as_tuple(values: list[str] | None) -> tuple[str, ...] | None:
+    return tuple(values) if values is not None else None
+
+
+def _as_list(values: tuple[str, ...] | None) -> list[str] | None:
+    return list(values) if values is not None else None
+
+
 def run_flake8_on_single_file(
     file_path: Path,
     file_content: str,
@@ -63,16 +92,12 @@ def run_flake8_on_single_file(
     lint_messages: list[Diagnostic] = []
     # flake8 expects lines with newline at the end
     file_lines = [line + "\n" for line in file_content.split("\n")]
-    # TODO: investigate whether guide and decider can be reused. They cannot be
-    # instantiated in handler, because guide is not pickable and cannot be passed to
-    # function executed in process executor.
-    guide = flake8.get_style_guide(
-        max_line_length=config.max_line_length,
-        extend_select=config.extend_select,
-        extend_ignore=config.extend_ignore,
-        select=config.select
+    guide, decider = _get_style_guide(
+        config.max_line_length,
+        _as_tuple(config.select),
+        _as_tuple(config.extend_select),
+        _as_tuple(config.extend_ignore),
     )
-    decider = style_guide.DecisionEngine(guide.options)
 
     file_checker = CustomFlake8FileChecker(
         filename=str(file_path),
@@ -151,6 +176,12 @@ class Flake8LintFilesHandler(
         self.file_editor = file_editor
         self.ast_provider = ast_provider
         self.process_executor = process_executor
+        self.cache_key = icache.make_cache_key(
+            self.CACHE_KEY,
+            self.config,
+            importlib.metadata.version("flake8"),
+            handler_type=type(self),
+        )
 
         self.logger.disable("flake8.options.manager")
 
@@ -165,7 +196,7 @@ class Flake8LintFilesHandler(
         messages: dict[ResourceUri, list[Diagnostic]] = {}
         try:
             cached_lint_messages = await self.cache.get_file_cache(
-                file_path, self.CACHE_KEY
+                file_path, self.cache_key
             )
             messages[file_uri] = cached_lint_messages
             return DiagnosticFilesRunResult(messages=messages)
@@ -193,7 +224,7 @@ class Flake8LintFilesHandler(
         )
         messages[file_uri] = lint_messages
         await self.cache.save_file_cache(
-            file_path, file_version, self.CACHE_KEY, lint_messages
+            file_path, file_version, self.cache_key, lint_messages
         )
 
         return DiagnosticFilesRunResult(messages=messages)
@@ -1,6 +1,8 @@
 from .format_python_file_handler import IsortFormatFileHandler, IsortFormatFileHandlerConfig
+from .format_python_files_handler import IsortFormatFilesHandler
 
 __all__ = [
     "IsortFormatFileHandler",
     "IsortFormatFileHandlerConfig",
+    "IsortFormatFilesHandler",
 ]
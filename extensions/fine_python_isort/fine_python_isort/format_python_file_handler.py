@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import dataclasses
+import functools
+import json
 from io import StringIO
 
 import isort.api as isort_api
@@ -58,12 +60,22 @@ class IsortFormatFileHandler(
         )
 
 
+@functools.lru_cache(maxsize=8)
+def _get_isort_config(isort_config_overrides_json: str) -> isort_settings.Config:
+    # isort config is expensive to create, it is created once per config in each
+    # worker process
+    return isort_settings.Config(**json.loads(isort_config_overrides_json))
+
+
 def format_one(
     file_content: str, handler_config: dict[str, object]
 ) -> tuple[str, bool]:
     isort_config_overrides = {
         k: v for k, v in handler_config.items() if v is not None
     }
+    isort_config = _get_isort_config(
+        json.dumps(isort_config_overrides, sort_keys=True)
+    )
 
     input_stream = StringIO(file_content)
     output_stream_context = isort_api._in_memory_output_stream_context()
@@ -71,7 +83,7 @@ def format_one(
         changed = isort_api.sort_stream(
             input_stream=input_stream,
             output_stream=output_stream,
-            config=isort_settings.Config(**isort_config_overrides),
+            config=isort_config,
             file_path=None,
             disregard_skip=True,
             extension=".py",
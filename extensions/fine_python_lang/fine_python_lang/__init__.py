@@ -6,6 +6,7 @@ from fine_python_lang.call_hierarchy_outgoing_calls_python_action import (
     CallHierarchyOutgoingCallsPythonAction,
 )
 from fine_python_lang.format_python_file_action import FormatPythonFileAction
+from fine_python_lang.format_python_files_action import FormatPythonFilesAction
 from fine_python_lang.get_lint_fixes_python_files_action import GetLintFixesPythonFilesAction
 from fine_python_lang.get_src_artifact_language_python_handler import (
     GetSrcArtifactLanguagePythonHandler,
@@ -75,6 +76,7 @@ __all__ = [
     "CallHierarchyOutgoingCallsPythonAction",
     "CheckPythonImportsAction",
     "FormatPythonFileAction",
+    "FormatPythonFilesAction",
     "GetLintFixesPythonFilesAction",
     "GetSrcArtifactLanguagePythonHandler",
     "GroupSrcArtifactFilesByLangPythonHandler",
@@ -0,0 +1,24 @@
+from finecode_extension_api import code_action
+from fine_format.format_files_action import (
+    FormatFilesAction,
+    FormatFilesBatchRunContext,
+    FormatFilesRunPayload,
+    FormatFilesRunResult,
+)
+
+
+class FormatPythonFilesAction(
+    code_action.Action[
+        FormatFilesRunPayload,
+        FormatFilesBatchRunContext,
+        FormatFilesRunResult,
+    ]
+):
+    """Format a batch of Python files. Handlers run sequentially (pipeline) and each of them processes all files of the batch in one call."""
+
+    DESCRIPTION = "Format a batch of Python files. Handlers run sequentially (pipeline mode)."
+    PAYLOAD_TYPE = FormatFilesRunPayload
+    RUN_CONTEXT_TYPE = FormatFilesBatchRunContext
+    RESULT_TYPE = FormatFilesRunResult
+    LANGUAGE = "python"
+    PARENT_ACTION = FormatFilesAction
@@ -89,6 +89,9 @@ class MypySingleAstProvider(iast_provider.IMypySingleAstProvider):
             file_version=file_version,
             key=self.CACHE_KEY,
             value=mypy_single_ast,
+            # the tree references other modules and is cheaper to rebuild than to
+            # store
+            persistent=False,
         )
         return mypy_single_ast
 
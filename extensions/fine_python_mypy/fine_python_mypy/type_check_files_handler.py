@@ -122,15 +122,22 @@ class MypyTypeCheckFilesHandler(
             self._projects_being_checked_done_events[project_path] = (
                 project_checked_event
             )
-            files_versions: dict[Path, str] = {}
             # can we exclude cached files here? Using the right cache(one that handles
             # dependencies as well) should be possible
             async with self.file_editor.session(
                 author=self.FILE_OPERATION_AUTHOR
             ) as session:
-                for file_path in all_project_files:
-                    file_version = await session.read_file_version(file_path)
-                    files_versions[file_path] = file_version
+                # versions of unchanged files are cheap, changed files are hashed
+                # concurrently
+                all_files_versions = await asyncio.gather(
+                    *(
+                        session.read_file_version(file_path)
+                        for file_path in all_project_files
+                    )
+                )
+            files_versions: dict[Path, str] = dict(
+                zip(all_project_files, all_files_versions)
+            )
 
             try:
                 all_processed_files_with_messages = await self._run_dmypy_on_project(
@@ -160,8 +167,14 @@ class MypyTypeCheckFilesHandler(
                                 file_path
                             )
 
+                        # results depend on imported modules as well, which the
+                        # file version doesn't cover
                         await self.cache.save_file_cache(
-                            file_path, file_version, self.CACHE_KEY, lint_messages
+                            file_path,
+                            file_version,
+                            self.CACHE_KEY,
+                            lint_messages,
+                            persistent=False,
                         )
             finally:
                 project_checked_event.set()
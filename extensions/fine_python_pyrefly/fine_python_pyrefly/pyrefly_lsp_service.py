@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import collections.abc
 import sys
 from pathlib import Path
 from typing import Any, override
@@ -150,6 +151,34 @@ class PyreflyLspService(service.DisposableService):
             raw_diagnostics, default_source="pyrefly"
         )
 
+    async def check_files(
+        self,
+        file_paths: list[Path],
+        timeout: float = 30.0,
+    ) -> dict[Path, list[Diagnostic]]:
+        raw_diagnostics_by_file = await self._lsp_service.check_files(
+            file_paths, timeout
+        )
+        return {
+            file_path: map_lsp_diagnostics(raw_diagnostics, default_source="pyrefly")
+            for file_path, raw_diagnostics in raw_diagnostics_by_file.items()
+        }
+
+    async def check_files_iter(
+        self,
+        file_paths: list[Path],
+        timeout: float = 30.0,
+    ) -> collections.abc.AsyncIterator[tuple[Path, list[Diagnostic] | Exception]]:
+        async for file_path, check_result in self._lsp_service.check_files_iter(
+            file_paths, timeout
+        ):
+            if isinstance(check_result, Exception):
+                yield file_path, check_result
+            else:
+                yield file_path, map_lsp_diagnostics(
+                    check_result, default_source="pyrefly"
+                )
+
     @property
     def server_capabilities(self) -> dict[str, Any]:
         return self._lsp_service.server_capabilities
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
+import asyncio
 import dataclasses
 import json
 import sys
 from pathlib import Path
 
 from finecode_extension_api import code_action
+from finecode_extension_api.contrib.lsp_service import LspCheckBatch
 from fine_type_check.diagnostic_types import (
     Diagnostic,
     DiagnosticFilesRunPayload,
@@ -87,7 +89,9 @@ class PyreflyTypeCheckFilesHandler(
             })
 
     async def run_on_single_file(
-        self, file_uri: ResourceUri
+        self,
+        file_uri: ResourceUri,
+        lsp_batch: LspCheckBatch[list[Diagnostic]] | None = None,
     ) -> DiagnosticFilesRunResult:
         file_path = resource_uri_to_path(file_uri)
         messages: dict[ResourceUri, list[Diagnostic]] = {}
@@ -107,6 +111,8 @@ class PyreflyTypeCheckFilesHandler(
 
         if self.config.use_cli:
             type_check_messages = await self.run_pyrefly_type_check_on_single_file(file_path)
+        elif lsp_batch is not None and file_path in lsp_batch:
+            type_check_messages = await lsp_batch.get(file_path)
         else:
             root_uri = self.project_info_provider.get_current_project_dir_path().as_uri()
             await self.lsp_service.ensure_started(root_uri)
@@ -114,8 +120,14 @@ class PyreflyTypeCheckFilesHandler(
             type_check_messages = await self.lsp_service.check_file(file_path)
 
         messages[file_uri] = type_check_messages
+        # results depend on imported modules as well, which the file version doesn't
+        # cover
         await self.cache.save_file_cache(
-            file_path, file_version, self.CACHE_KEY, type_check_messages
+            file_path,
+            file_version,
+            self.CACHE_KEY,
+            type_check_messages,
+            persistent=False,
         )
 
         return DiagnosticFilesRunResult(messages=messages)
@@ -127,12 +139,44 @@ class PyreflyTypeCheckFilesHandler(
     ) -> None:
         file_uris = [file_uri async for file_uri in payload]
 
+        lsp_batch: LspCheckBatch[list[Diagnostic]] | None = None
+        if not self.config.use_cli and len(file_uris) > 1:
+            # check all files not found in cache with one batched call instead of
+            # opening, checking and closing them one by one
+            uncached_file_paths = await self._get_uncached_file_paths(file_uris)
+            if uncached_file_paths:
+                root_uri = (
+                    self.project_info_provider.get_current_project_dir_path().as_uri()
+                )
+                await self.lsp_service.ensure_started(root_uri)
+                lsp_batch = LspCheckBatch(
+                    self.lsp_service.check_files_iter, uncached_file_paths
+                )
+
         for file_uri in file_uris:
             run_context.partial_result_scheduler.schedule(
                 file_uri,
-                self.run_on_single_file(file_uri),
+                self.run_on_single_file(file_uri, lsp_batch),
             )
 
+    async def _get_uncached_file_paths(
+        self, file_uris: list[ResourceUri]
+    ) -> list[Path]:
+        async def is_cached(file_path: Path) -> bool:
+            try:
+                await self.cache.get_file_cache(file_path, self.CACHE_KEY)
+            except icache.CacheMissException:
+                return False
+            return True
+
+        file_paths = [resource_uri_to_path(file_uri) for file_uri in file_uris]
+        cached = await asyncio.gather(*(is_cached(path) for path in file_paths))
+        return [
+            file_path
+            for file_path, is_file_cached in zip(file_paths, cached)
+            if not is_file_cached
+        ]
+
     async def run_pyrefly_type_check_on_single_file(
         self,
         file_path: Path,
@@ -1,10 +1,12 @@
 from .format_python_file_handler import RuffFormatFileHandler, RuffFormatFileHandlerConfig
+from .format_python_files_handler import RuffFormatFilesHandler
 from .get_lint_fixes_handler import RuffGetLintFixesHandler, RuffGetLintFixesHandlerConfig
 from .lint_files_handler import RuffLintFilesHandler, RuffLintFilesHandlerConfig
 
 __all__ = [
     "RuffFormatFileHandler",
     "RuffFormatFileHandlerConfig",
+    "RuffFormatFilesHandler",
     "RuffGetLintFixesHandler",
     "RuffGetLintFixesHandlerConfig",
     "RuffLintFilesHandler",
@@ -47,19 +47,22 @@ class RuffFormatFileHandler(
         self.project_info_provider = project_info_provider
         self.lsp_service = lsp_service
 
+        self.lsp_service.update_settings(self.get_lsp_settings(self.config))
+
+    @staticmethod
+    def get_lsp_settings(config: RuffFormatFileHandlerConfig) -> dict[str, object]:
         # reference: https://docs.astral.sh/ruff/editors/settings/
         format_settings: dict[str, object] = {
-            "indentWidth": self.config.indent_width,
-            "quoteStyle": self.config.quote_style,
+            "indentWidth": config.indent_width,
+            "quoteStyle": config.quote_style,
         }
-        if self.config.preview:
+        if config.preview:
             format_settings["preview"] = True
-        settings: dict[str, object] = {
-            "lineLength": self.config.line_length,
-            "targetVersion": self.config.target_version,
+        return {
+            "lineLength": config.line_length,
+            "targetVersion": config.target_version,
             "format": format_settings,
         }
-        self.lsp_service.update_settings(settings)
 
     @override
     async def run(
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+
+if sys.version_info < (3, 12):
+    from typing_extensions import override
+else:
+    from typing import override
+
+from finecode_extension_api import code_action
+from fine_format import format_file_action, format_files_action
+from fine_python_lang.format_python_files_action import (
+    FormatPythonFilesAction,
+)
+from finecode_extension_api.interfaces import (
+    ilogger,
+    iprojectinfoprovider,
+)
+from finecode_extension_api.resource_uri import resource_uri_to_path
+from fine_python_ruff.format_python_file_handler import (
+    RuffFormatFileHandler,
+    RuffFormatFileHandlerConfig,
+)
+from fine_python_ruff.ruff_lsp_service import RuffLspService
+
+
+class RuffFormatFilesHandler(
+    code_action.ActionHandler[FormatPythonFilesAction, RuffFormatFileHandlerConfig]
+):
+    """Batch variant of RuffFormatFileHandler: sends formatting requests for all
+    files of a batch at once instead of running a pipeline per file."""
+
+    def __init__(
+        self,
+        config: RuffFormatFileHandlerConfig,
+        logger: ilogger.ILogger,
+        project_info_provider: iprojectinfoprovider.IProjectInfoProvider,
+        lsp_service: RuffLspService,
+    ) -> None:
+        self.config = config
+        self.logger = logger
+        self.project_info_provider = project_info_provider
+        self.lsp_service = lsp_service
+
+        self.lsp_service.update_settings(
+            RuffFormatFileHandler.get_lsp_settings(self.config)
+        )
+
+    @override
+    async def run(
+        self,
+        payload: format_files_action.FormatFilesRunPayload,
+        run_context: format_files_action.FormatFilesBatchRunContext,
+    ) -> format_files_action.FormatFilesRunResult:
+        root_uri = self.project_info_provider.get_current_project_dir_path().as_uri()
+        await self.lsp_service.ensure_started(root_uri)
+
+        file_uris = list(run_context.file_info_by_path.keys())
+        new_file_contents = await asyncio.gather(
+            *(
+                self.lsp_service.format_file(
+                    resource_uri_to_path(file_uri),
+                    run_context.file_info_by_path[file_uri].file_content,
+                )
+                for file_uri in file_uris
+            )
+        )
+
+        result_by_file_path: dict[str, format_files_action.FormatRunFileResult] = {}
+        for file_uri, new_file_content in zip(file_uris, new_file_contents):
+            file_info = run_context.file_info_by_path[file_uri]
+            # update for next handlers in the pipeline
+            run_context.file_info_by_path[file_uri] = format_file_action.FileInfo(
+                new_file_content, file_info.file_version
+            )
+            result_by_file_path[file_uri] = format_files_action.FormatRunFileResult(
+                changed=new_file_content != file_info.file_content,
+                code=new_file_content,
+            )
+
+        return format_files_action.FormatFilesRunResult(
+            result_by_file_path=result_by_file_path
+        )
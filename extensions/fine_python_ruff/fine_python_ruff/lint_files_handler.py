@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import asyncio
 import dataclasses
+import importlib.metadata
 import json
 import sys
 from pathlib import Path
 
 from finecode_extension_api import code_action
+from finecode_extension_api.contrib.lsp_service import LspCheckBatch
 from fine_lint.lint_files_action import LintFilesAction
 from fine_lint.diagnostic_types import (
     Diagnostic,
@@ -63,6 +66,12 @@ class RuffLintFilesHandler(
         self.command_runner = command_runner
         self.project_info_provider: iprojectinfoprovider.IProjectInfoProvider = project_info_provider
         self.lsp_service: RuffLspService = lsp_service
+        self.cache_key = icache.make_cache_key(
+            self.CACHE_KEY,
+            self.config,
+            importlib.metadata.version("ruff"),
+            handler_type=type(self),
+        )
 
         self.ruff_bin_path = Path(sys.executable).parent / "ruff"
 
@@ -85,13 +94,15 @@ class RuffLintFilesHandler(
             })
 
     async def run_on_single_file(
-        self, file_uri: ResourceUri
+        self,
+        file_uri: ResourceUri,
+        lsp_batch: LspCheckBatch[list[Diagnostic]] | None = None,
     ) -> DiagnosticFilesRunResult:
         file_path = resource_uri_to_path(file_uri)
         messages: dict[ResourceUri, list[Diagnostic]] = {}
         try:
             cached_lint_messages = await self.cache.get_file_cache(
-                file_path, self.CACHE_KEY
+                file_path, self.cache_key
             )
             messages[file_uri] = cached_lint_messages
             return DiagnosticFilesRunResult(messages=messages)
@@ -107,6 +118,8 @@ class RuffLintFilesHandler(
 
         if self.config.use_cli:
             lint_messages = await self.run_ruff_lint_on_single_file(file_path, file_content)
+        elif lsp_batch is not None and file_path in lsp_batch:
+            lint_messages = await lsp_batch.get(file_path)
         else:
             root_uri = self.project_info_provider.get_current_project_dir_path().as_uri()
             await self.lsp_service.ensure_started(root_uri)
@@ -114,7 +127,7 @@ class RuffLintFilesHandler(
             lint_messages = await self.lsp_service.check_file(file_path)
         messages[file_uri] = lint_messages
         await self.cache.save_file_cache(
-            file_path, file_version, self.CACHE_KEY, lint_messages
+            file_path, file_version, self.cache_key, lint_messages
         )
 
         return DiagnosticFilesRunResult(messages=messages)
@@ -126,12 +139,44 @@ class RuffLintFilesHandler(
     ) -> None:
         file_uris = [file_uri async for file_uri in payload]
 
+        lsp_batch: LspCheckBatch[list[Diagnostic]] | None = None
+        if not self.config.use_cli and len(file_uris) > 1:
+            # check all files not found in cache with one batched call instead of
+            # opening, checking and closing them one by one
+            uncached_file_paths = await self._get_uncached_file_paths(file_uris)
+            if uncached_file_paths:
+                root_uri = (
+                    self.project_info_provider.get_current_project_dir_path().as_uri()
+                )
+                await self.lsp_service.ensure_started(root_uri)
+                lsp_batch = LspCheckBatch(
+                    self.lsp_service.check_files_iter, uncached_file_paths
+                )
+
         for file_uri in file_uris:
             run_context.partial_result_scheduler.schedule(
                 file_uri,
-                self.run_on_single_file(file_uri),
+                self.run_on_single_file(file_uri, lsp_batch),
             )
 
+    async def _get_uncached_file_paths(
+        self, file_uris: list[ResourceUri]
+    ) -> list[Path]:
+        async def is_cached(file_path: Path) -> bool:
+            try:
+                await self.cache.get_file_cache(file_path, self.cache_key)
+            except icache.CacheMissException:
+                return False
+            return True
+
+        file_paths = [resource_uri_to_path(file_uri) for file_uri in file_uris]
+        cached = await asyncio.gather(*(is_cached(path) for path in file_paths))
+        return [
+            file_path
+            for file_path, is_file_cached in zip(file_paths, cached)
+            if not is_file_cached
+        ]
+
     async def run_ruff_lint_on_single_file(
         self,
         file_path: Path,
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import collections.abc
 import sys
 from pathlib import Path
 from typing import Any, override
@@ -20,6 +21,9 @@ _RUFF_CLIENT_CAPABILITIES: dict[str, Any] = {
         "completion": {"dynamicRegistration": False},
         "hover": {"dynamicRegistration": False},
         "publishDiagnostics": {"relatedInformation": True},
+        # pull diagnostics: a response per request instead of waiting for pushed
+        # diagnostics, which may never come if the file has no diagnostics
+        "diagnostic": {"dynamicRegistration": False},
     },
     "workspace": {
         "workspaceFolders": True,
@@ -81,6 +85,34 @@ class RuffLspService(service.DisposableService):
             raw_diagnostics, default_source="ruff"
         )
 
+    async def check_files(
+        self,
+        file_paths: list[Path],
+        timeout: float = 30.0,
+    ) -> dict[Path, list[Diagnostic]]:
+        raw_diagnostics_by_file = await self._lsp_service.check_files(
+            file_paths, timeout
+        )
+        return {
+            file_path: map_lsp_diagnostics(raw_diagnostics, default_source="ruff")
+            for file_path, raw_diagnostics in raw_diagnostics_by_file.items()
+        }
+
+    async def check_files_iter(
+        self,
+        file_paths: list[Path],
+        timeout: float = 30.0,
+    ) -> collections.abc.AsyncIterator[tuple[Path, list[Diagnostic] | Exception]]:
+        async for file_path, check_result in self._lsp_service.check_files_iter(
+            file_paths, timeout
+        ):
+            if isinstance(check_result, Exception):
+                yield file_path, check_result
+            else:
+                yield file_path, map_lsp_diagnostics(
+                    check_result, default_source="ruff"
+                )
+
     async def format_file(
         self,
         file_path: Path,
@@ -5,12 +5,16 @@ import datetime as dt
 import fnmatch
 import hashlib
 import json
+import os
 import pathlib
 import sys
+import tempfile
 import uuid
+from collections.abc import Iterable
 from typing import Any
 
 import duckdb
+from fine_wal_explorer import run_metrics, store_schema
 from finecode_extension_api import code_action
 from fine_wal_events.ingest_wal_to_store_action import (
     IngestWalToStoreAction,
@@ -27,6 +31,43 @@ from finecode_extension_api.resource_uri import (
 )
 
 SCHEMA_VERSION = 1
+# only the beginning of a file is compared to detect that it was replaced
+_HEAD_HASH_MAX_BYTES = 4096
+_WAL_EVENTS_COLUMNS: dict[str, str] = {
+    "event_hash": "VARCHAR",
+    "source_id": "VARCHAR",
+    "source_format": "VARCHAR",
+    "schema_version": "INTEGER",
+    "ts": "TIMESTAMP",
+    "event_type": "VARCHAR",
+    "run_id": "VARCHAR",
+    "action_name": "VARCHAR",
+    "project_path": "VARCHAR",
+    "trigger": "VARCHAR",
+    "dev_env": "VARCHAR",
+    "writer_id": "VARCHAR",
+    "payload_json": "VARCHAR",
+    "origin_file_path": "VARCHAR",
+    "origin_line_no": "BIGINT",
+    "ingested_at": "TIMESTAMP",
+}
+# timestamps are staged with their UTC offset and cast to TIMESTAMP when loaded, so
+# that they are stored in the session time zone like query parameters are
+_BATCH_COLUMN_TYPES: dict[str, str] = {
+    **_WAL_EVENTS_COLUMNS,
+    "ts": "TIMESTAMPTZ",
+    "ingested_at": "TIMESTAMPTZ",
+}
+
+
+@dataclasses.dataclass
+class _FileWatermark:
+    """Position up to which a source file was ingested."""
+
+    byte_offset: int = 0
+    line_no: int = 0
+    last_sequence: int | None = None
+    head_hash: str | None = None
 
 
 @dataclasses.dataclass
@@ -61,8 +102,6 @@ class IngestWalToStoreHandler(
                 "before ingest handler."
             )
 
-        self._validate_source_specs(source_specs)
-
         if len(source_specs) == 0:
             store_path = self._resolve_store_path(payload)
             return IngestWalToStoreRunResult(
@@ -95,11 +134,40 @@ class IngestWalToStoreHandler(
                 f"Failed to open WAL store at {store_path}: {msg}"
             ) from exc
         try:
-            self._ensure_schema(connection)
+            return self.ingest(
+                connection,
+                source_specs,
+                since_ts_iso=payload.since_ts_iso,
+                store_path=store_path,
+            )
+        finally:
+            connection.close()
+
+    def ingest(
+        self,
+        connection: duckdb.DuckDBPyConnection,
+        source_specs: list[WalSourceSpec],
+        since_ts_iso: str | None,
+        store_path: pathlib.Path,
+    ) -> IngestWalToStoreRunResult:
+        """Ingest events appended to the sources since the previous ingest into an
+        open store.
+
+        Used by `run` and by the live mode of the WAL explorer server, which keeps
+        the store open.
+        """
+        self._validate_source_specs(source_specs)
+        in_transaction = False
+        try:
+            store_schema.ensure_schema(connection)
             ingest_run_id = str(uuid.uuid4())
             now = dt.datetime.now(dt.timezone.utc)
-            since_dt = _parse_iso_ts(payload.since_ts_iso)
-            self._start_ingest_run(connection, ingest_run_id, now, payload, store_path)
+            since_dt = _parse_iso_ts(since_ts_iso)
+            # all sources are ingested in one transaction together with their
+            # watermarks, so that a failed ingest doesn't skip events next time
+            connection.begin()
+            in_transaction = True
+            self._start_ingest_run(connection, ingest_run_id, now, since_dt, store_path)
 
             warnings: list[str] = []
             summaries: list[SourceIngestSummary] = []
@@ -109,59 +177,28 @@ class IngestWalToStoreHandler(
             first_ts: dt.datetime | None = None
             last_ts: dt.datetime | None = None
 
-            for spec in source_specs:
-                summary = SourceIngestSummary(source_id=spec.source_id)
-                source_warnings: list[str] = []
-                files = self._discover_files(spec)
-                summary.files_scanned = len(files)
-
-                for file_path in files:
-                    with file_path.open("r", encoding="utf-8") as handle:
-                        for line_no, raw_line in enumerate(handle, start=1):
-                            line = raw_line.strip()
-                            if line == "":
-                                continue
-                            summary.events_read += 1
-
-                            try:
-                                record = json.loads(line)
-                                normalized = _normalize_record(record, spec, file_path, line_no)
-                            except Exception as exc:
-                                summary.events_failed_parse += 1
-                                source_warnings.append(
-                                    f"{spec.source_id}:{file_path}:{line_no} parse failed: {exc}"
-                                )
-                                continue
-
-                            event_ts = normalized["ts"]
-                            if since_dt is not None and event_ts is not None and event_ts < since_dt:
-                                continue
-
-                            try:
-                                inserted = self._insert_event(connection, normalized)
-                            except Exception as exc:
-                                raise code_action.ActionFailedException(
-                                    f"Failed to insert event for source {spec.source_id}: {exc}"
-                                ) from exc
-
-                            if inserted:
-                                summary.events_inserted += 1
-                                if event_ts is not None:
-                                    if first_ts is None or event_ts < first_ts:
-                                        first_ts = event_ts
-                                    if last_ts is None or event_ts > last_ts:
-                                        last_ts = event_ts
-                            else:
-                                summary.events_skipped_duplicate += 1
-
-                summaries.append(summary)
-                warnings.extend(source_warnings)
-
-                total_inserted += summary.events_inserted
-                total_duplicates += summary.events_skipped_duplicate
-                total_failed += summary.events_failed_parse
-
-                self._insert_ingest_source(connection, ingest_run_id, summary)
+            with tempfile.TemporaryDirectory(prefix="wal-ingest-") as batch_dir:
+                for spec in source_specs:
+                    summary, source_warnings, inserted_ts = self._ingest_source(
+                        connection,
+                        spec,
+                        since_dt=since_dt,
+                        batch_path=pathlib.Path(batch_dir) / "batch.jsonl",
+                    )
+                    if inserted_ts:
+                        if first_ts is None or inserted_ts[0] < first_ts:
+                            first_ts = inserted_ts[0]
+                        if last_ts is None or inserted_ts[1] > last_ts:
+                            last_ts = inserted_ts[1]
+
+                    summaries.append(summary)
+                    warnings.extend(source_warnings)
+
+                    total_inserted += summary.events_inserted
+                    total_duplicates += summary.events_skipped_duplicate
+                    total_failed += summary.events_failed_parse
+
+                    self._insert_ingest_source(connection, ingest_run_id, summary)
 
             self._finish_ingest_run(
                 connection,
@@ -170,6 +207,8 @@ class IngestWalToStoreHandler(
                 events_skipped_duplicate=total_duplicates,
                 events_failed_parse=total_failed,
             )
+            connection.commit()
+            in_transaction = False
 
             result = IngestWalToStoreRunResult(
                 schema_version=SCHEMA_VERSION,
@@ -183,8 +222,94 @@ class IngestWalToStoreHandler(
                 warnings=warnings,
             )
             return result
-        finally:
-            connection.close()
+        except BaseException:
+            if in_transaction:
+                connection.rollback()
+            raise
+
+    def _ingest_source(
+        self,
+        connection: duckdb.DuckDBPyConnection,
+        spec: WalSourceSpec,
+        since_dt: dt.datetime | None,
+        batch_path: pathlib.Path,
+    ) -> tuple[
+        SourceIngestSummary, list[str], tuple[dt.datetime, dt.datetime] | None
+    ]:
+        """Ingest events appended to files of the source since the last ingest.
+
+        Returns the summary, warnings and the range of timestamps of inserted
+        events.
+        """
+        summary = SourceIngestSummary(source_id=spec.source_id)
+        warnings: list[str] = []
+        files = self._discover_files(spec)
+        summary.files_scanned = len(files)
+        watermarks = self._read_watermarks(connection, spec.source_id)
+
+        events_by_hash: dict[str, dict[str, Any]] = {}
+        new_watermarks: dict[pathlib.Path, _FileWatermark] = {}
+        for file_path in files:
+            lines, start, watermark = _read_new_lines(
+                file_path, watermarks.get(str(file_path))
+            )
+            for line_no, raw_line in enumerate(lines, start=start.line_no + 1):
+                line = raw_line.strip()
+                if line == b"":
+                    continue
+                summary.events_read += 1
+
+                try:
+                    record = json.loads(line)
+                    normalized = _normalize_record(record, spec, file_path, line_no)
+                except Exception as exc:
+                    summary.events_failed_parse += 1
+                    warnings.append(
+                        f"{spec.source_id}:{file_path}:{line_no} parse failed: {exc}"
+                    )
+                    continue
+
+                sequence = record.get("sequence")
+                if isinstance(sequence, int) and not isinstance(sequence, bool):
+                    watermark.last_sequence = sequence
+
+                event_ts = normalized["ts"]
+                if (
+                    since_dt is not None
+                    and event_ts is not None
+                    and event_ts < since_dt
+                ):
+                    continue
+                events_by_hash[normalized["event_hash"]] = normalized
+            new_watermarks[file_path] = watermark
+
+        try:
+            duplicate_hashes = self._insert_events(
+                connection, list(events_by_hash.values()), batch_path
+            )
+        except Exception as exc:
+            raise code_action.ActionFailedException(
+                f"Failed to insert events for source {spec.source_id}: {exc}"
+            ) from exc
+
+        summary.events_skipped_duplicate = len(duplicate_hashes)
+        summary.events_inserted = len(events_by_hash) - len(duplicate_hashes)
+        inserted_ts = [
+            event["ts"]
+            for event_hash, event in events_by_hash.items()
+            if event["ts"] is not None and event_hash not in duplicate_hashes
+        ]
+
+        # events before `since_ts_iso` were not ingested, a later ingest without
+        # it has to read them again
+        if since_dt is None:
+            self._write_watermarks(
+                connection, spec.source_id, new_watermarks, removed=watermarks.keys()
+            )
+
+        if not inserted_ts:
+            return summary, warnings, None
+        return summary, warnings, (min(inserted_ts), max(inserted_ts))
 
     def _validate_source_specs(self, source_specs: list[WalSourceSpec]) -> None:
         source_ids = [spec.source_id for spec in source_specs]
@@ -222,72 +347,12 @@ class IngestWalToStoreHandler(
             filtered.append(path)
         return filtered
 
-    def _ensure_schema(self, connection: duckdb.DuckDBPyConnection) -> None:
-        connection.execute(
-            """
-            CREATE TABLE IF NOT EXISTS wal_events (
-                event_hash TEXT PRIMARY KEY,
-                source_id TEXT NOT NULL,
-                source_format TEXT NOT NULL,
-                schema_version INTEGER NOT NULL,
-                ts TIMESTAMP,
-                event_type TEXT NOT NULL,
-                run_id TEXT,
-                action_name TEXT,
-                project_path TEXT,
-                trigger TEXT,
-                dev_env TEXT,
-                writer_id TEXT,
-                payload_json JSON,
-                origin_file_path TEXT,
-                origin_line_no BIGINT,
-                ingested_at TIMESTAMP NOT NULL
-            )
-            """
-        )
-        connection.execute(
-            """
-            CREATE TABLE IF NOT EXISTS wal_ingest_runs (
-                ingest_run_id TEXT PRIMARY KEY,
-                started_at TIMESTAMP NOT NULL,
-                finished_at TIMESTAMP,
-                store_uri TEXT,
-                since_ts TIMESTAMP,
-                events_ingested BIGINT,
-                events_skipped_duplicate BIGINT,
-                events_failed_parse BIGINT
-            )
-            """
-        )
-        connection.execute(
-            """
-            CREATE TABLE IF NOT EXISTS wal_ingest_sources (
-                ingest_run_id TEXT NOT NULL,
-                source_id TEXT NOT NULL,
-                files_scanned BIGINT,
-                events_read BIGINT,
-                events_inserted BIGINT,
-                events_skipped_duplicate BIGINT,
-                events_failed_parse BIGINT
-            )
-            """
-        )
-        connection.execute(
-            "CREATE INDEX IF NOT EXISTS idx_wal_events_run_id_ts ON wal_events(run_id, ts)"
-        )
-        connection.execute(
-            "CREATE INDEX IF NOT EXISTS idx_wal_events_source_ts ON wal_events(source_id, ts)"
-        )
-        connection.execute(
-            "CREATE INDEX IF NOT EXISTS idx_wal_events_event_type ON wal_events(event_type)"
-        )
-
     def _start_ingest_run(
         self,
         connection: duckdb.DuckDBPyConnection,
         ingest_run_id: str,
         started_at: dt.datetime,
-        payload: IngestWalToStoreRunPayload,
+        since_dt: dt.datetime | None,
         store_path: pathlib.Path,
     ) -> None:
         connection.execute(
@@ -306,63 +371,140 @@ class IngestWalToStoreHandler(
                 ingest_run_id,
                 started_at,
                 str(path_to_resource_uri(store_path)),
-                _parse_iso_ts(payload.since_ts_iso),
+                since_dt,
             ],
         )
 
-    def _insert_event(
+    def _insert_events(
         self,
         connection: duckdb.DuckDBPyConnection,
-        event: dict[str, Any],
-    ) -> bool:
-        existing = connection.execute(
-            "SELECT 1 FROM wal_events WHERE event_hash = ?",
-            [event["event_hash"]],
-        ).fetchone()
-        if existing is not None:
-            return False
-
+        events: list[dict[str, Any]],
+        batch_path: pathlib.Path,
+    ) -> set[str]:
+        """Insert events in bulk, update run metrics and return hashes of events
+        that already were in the store and were skipped.
+
+        Events are staged in a JSONL file and loaded with DuckDB `read_json`,
+        inserting many rows with query parameters is much slower.
+        """
+        if len(events) == 0:
+            return set()
+
+        with batch_path.open("w", encoding="utf-8") as batch_file:
+            for event in events:
+                batch_file.write(_to_batch_line(event))
+
+        columns = ", ".join(
+            f"'{name}': '{column_type}'"
+            for name, column_type in _BATCH_COLUMN_TYPES.items()
+        )
+        casts = ", ".join(
+            f"{name}::{column_type} AS {name}"
+            for name, column_type in _WAL_EVENTS_COLUMNS.items()
+        )
         connection.execute(
-            """
-            INSERT INTO wal_events (
-                event_hash,
-                source_id,
-                source_format,
-                schema_version,
-                ts,
-                event_type,
-                run_id,
-                action_name,
-                project_path,
-                trigger,
-                dev_env,
-                writer_id,
-                payload_json,
-                origin_file_path,
-                origin_line_no,
-                ingested_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            f"""
+            CREATE OR REPLACE TEMP TABLE wal_ingest_batch AS
+            SELECT {casts} FROM read_json(
+                ?,
+                format = 'newline_delimited',
+                columns = {{{columns}}}
+            )
             """,
-            [
-                event["event_hash"],
-                event["source_id"],
-                event["source_format"],
-                event["schema_version"],
-                event["ts"],
-                event["event_type"],
-                event["run_id"],
-                event["action_name"],
-                event["project_path"],
-                event["trigger"],
-                event["dev_env"],
-                event["writer_id"],
-                event["payload_json"],
-                event["origin_file_path"],
-                event["origin_line_no"],
-                event["ingested_at"],
-            ],
+            [str(batch_path)],
         )
-        return True
+        try:
+            duplicate_hashes = {
+                row[0]
+                for row in connection.execute(
+                    """
+                    SELECT batch.event_hash
+                    FROM wal_ingest_batch AS batch
+                    SEMI JOIN wal_events USING (event_hash)
+                    """
+                ).fetchall()
+            }
+            if len(duplicate_hashes) > 0:
+                connection.execute(
+                    """
+                    DELETE FROM wal_ingest_batch
+                    WHERE event_hash IN (SELECT event_hash FROM wal_events)
+                    """
+                )
+            column_names = ", ".join(_WAL_EVENTS_COLUMNS)
+            connection.execute(
+                f"""
+                INSERT INTO wal_events ({column_names})
+                SELECT {column_names} FROM wal_ingest_batch
+                """
+            )
+            run_metrics.update_run_metrics(connection, "wal_ingest_batch")
+        finally:
+            connection.execute("DROP TABLE wal_ingest_batch")
+        return duplicate_hashes
+
+    def _read_watermarks(
+        self, connection: duckdb.DuckDBPyConnection, source_id: str
+    ) -> dict[str, _FileWatermark]:
+        rows = connection.execute(
+            """
+            SELECT file_path, byte_offset, line_no, last_sequence, head_hash
+            FROM wal_ingest_watermarks
+            WHERE source_id = ?
+            """,
+            [source_id],
+        ).fetchall()
+        return {
+            row[0]: _FileWatermark(
+                byte_offset=row[1],
+                line_no=row[2],
+                last_sequence=row[3],
+                head_hash=row[4],
+            )
+            for row in rows
+        }
+
+    def _write_watermarks(
+        self,
+        connection: duckdb.DuckDBPyConnection,
+        source_id: str,
+        watermarks: dict[pathlib.Path, _FileWatermark],
+        removed: Iterable[str],
+    ) -> None:
+        """Save watermarks of the source files and delete the ones of files that
+        don't exist anymore, e.g. WAL segments removed by retention."""
+        updated_at = dt.datetime.now(dt.timezone.utc)
+        for file_path in set(removed) - {str(path) for path in watermarks}:
+            connection.execute(
+                """
+                DELETE FROM wal_ingest_watermarks
+                WHERE source_id = ? AND file_path = ?
+                """,
+                [source_id, file_path],
+            )
+        for file_path, watermark in watermarks.items():
+            connection.execute(
+                """
+                INSERT OR REPLACE INTO wal_ingest_watermarks (
+                    source_id,
+                    file_path,
+                    byte_offset,
+                    line_no,
+                    last_sequence,
+                    head_hash,
+                    updated_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    source_id,
+                    str(file_path),
+                    watermark.byte_offset,
+                    watermark.line_no,
+                    watermark.last_sequence,
+                    watermark.head_hash,
+                    updated_at,
+                ],
+            )
 
     def _insert_ingest_source(
         self,
@@ -465,6 +607,52 @@ def _normalize_record(
     }
 
 
+def _read_new_lines(
+    file_path: pathlib.Path, watermark: _FileWatermark | None
+) -> tuple[list[bytes], _FileWatermark, _FileWatermark]:
+    """Read lines appended to the file after the watermark.
+
+    The file is read from the beginning if it was truncated or replaced. Only
+    lines terminated by a newline are read, the last line can still be written.
+
+    Returns the lines, the watermark reading started at and the watermark after
+    the read lines.
+    """
+    with file_path.open("rb") as handle:
+        head_hash = hashlib.sha256(
+            handle.readline(_HEAD_HASH_MAX_BYTES).rstrip(b"\r\n")
+        ).hexdigest()
+        file_size = os.fstat(handle.fileno()).st_size
+        if (
+            watermark is None
+            or watermark.head_hash != head_hash
+            or watermark.byte_offset > file_size
+        ):
+            start = _FileWatermark()
+        else:
+            start = watermark
+        handle.seek(start.byte_offset)
+        data = handle.read()
+
+    end = data.rfind(b"\n") + 1
+    lines = data[:end].split(b"\n")[:-1]
+    new_watermark = _FileWatermark(
+        byte_offset=start.byte_offset + end,
+        line_no=start.line_no + len(lines),
+        last_sequence=start.last_sequence,
+        head_hash=head_hash,
+    )
+    return lines, start, new_watermark
+
+
+def _to_batch_line(event: dict[str, Any]) -> str:
+    row = dict(event)
+    for key in ("ts", "ingested_at"):
+        if row[key] is not None:
+            row[key] = row[key].astimezone(dt.timezone.utc).isoformat()
+    return json.dumps(row, ensure_ascii=True) + "\n"
+
+
 def _mapped_field(spec: WalSourceSpec, canonical: str, default: str) -> str:
     if spec.field_mapping is None:
         return default
@@ -0,0 +1,245 @@
+"""Run metrics derived from WAL events, maintained by ingest.
+
+``wal_run_metrics`` has one row per run and source: lifecycle timestamps, queue
+latency (accepted -> dispatched), execution latency (dispatched -> completed or
+failed), env and outcome. Rows are merged with events of each ingest, so the
+table never has to be rebuilt from ``wal_events``.
+
+``wal_run_rollups`` aggregates runs by the minute and hour they started, per
+source, action and env. Buckets of runs changed by an ingest are recomputed
+from ``wal_run_metrics``.
+"""
+from __future__ import annotations
+
+import datetime as dt
+
+import duckdb
+
+RUN_METRICS_TABLE = "wal_run_metrics"
+RUN_ROLLUPS_TABLE = "wal_run_rollups"
+ROLLUP_BUCKETS = ("minute", "hour")
+_BUCKET_SIZES = {
+    "minute": dt.timedelta(minutes=1),
+    "hour": dt.timedelta(hours=1),
+}
+
+_OUTCOME_SQL = """
+    CASE
+        WHEN {has_failed} THEN 'failed'
+        WHEN {has_completed} THEN 'success'
+        ELSE 'incomplete'
+    END
+"""
+
+# `events_table` is formatted in by `update_run_metrics`
+_MERGE_RUNS_SQL = f"""
+    INSERT INTO {RUN_METRICS_TABLE}
+    SELECT
+        run_id,
+        source_id,
+        action_name,
+        project_path,
+        trigger,
+        dev_env,
+        env_name,
+        first_ts,
+        last_ts,
+        COALESCE(accepted_ts, first_ts) AS started_ts,
+        accepted_ts,
+        dispatched_ts,
+        finished_ts,
+        epoch_ms(dispatched_ts) - epoch_ms(accepted_ts) AS queue_latency_ms,
+        epoch_ms(finished_ts) - epoch_ms(dispatched_ts) AS execution_latency_ms,
+        epoch_ms(last_ts) - epoch_ms(first_ts) AS duration_ms,
+        event_count,
+        has_failed,
+        has_completed,
+        {_OUTCOME_SQL.format(has_failed="has_failed", has_completed="has_completed")}
+            AS outcome
+    FROM (
+        SELECT
+            run_id,
+            source_id,
+            ANY_VALUE(action_name) AS action_name,
+            ANY_VALUE(project_path) AS project_path,
+            ANY_VALUE(trigger) AS trigger,
+            ANY_VALUE(dev_env) AS dev_env,
+            ANY_VALUE(json_extract_string(payload_json, '$.env_name')) AS env_name,
+            MIN(ts) AS first_ts,
+            MAX(ts) AS last_ts,
+            MIN(ts) FILTER (WHERE event_type = 'run.accepted') AS accepted_ts,
+            MIN(ts) FILTER (WHERE event_type = 'run.dispatched') AS dispatched_ts,
+            MAX(ts) FILTER (
+                WHERE event_type IN ('run.completed', 'run.failed')
+            ) AS finished_ts,
+            COUNT(*) AS event_count,
+            BOOL_OR(event_type LIKE '%.failed' OR event_type LIKE '%.error')
+                AS has_failed,
+            BOOL_OR(event_type LIKE '%.completed') AS has_completed
+        FROM {{events_table}}
+        WHERE run_id IS NOT NULL
+        GROUP BY run_id, source_id
+    )
+    ON CONFLICT (run_id, source_id) DO UPDATE SET
+        action_name = COALESCE(action_name, EXCLUDED.action_name),
+        project_path = COALESCE(project_path, EXCLUDED.project_path),
+        trigger = COALESCE(trigger, EXCLUDED.trigger),
+        dev_env = COALESCE(dev_env, EXCLUDED.dev_env),
+        env_name = COALESCE(env_name, EXCLUDED.env_name),
+        first_ts = LEAST(first_ts, EXCLUDED.first_ts),
+        last_ts = GREATEST(last_ts, EXCLUDED.last_ts),
+        started_ts = COALESCE(
+            LEAST(accepted_ts, EXCLUDED.accepted_ts),
+            LEAST(first_ts, EXCLUDED.first_ts)
+        ),
+        accepted_ts = LEAST(accepted_ts, EXCLUDED.accepted_ts),
+        dispatched_ts = LEAST(dispatched_ts, EXCLUDED.dispatched_ts),
+        finished_ts = GREATEST(finished_ts, EXCLUDED.finished_ts),
+        queue_latency_ms = epoch_ms(LEAST(dispatched_ts, EXCLUDED.dispatched_ts))
+            - epoch_ms(LEAST(accepted_ts, EXCLUDED.accepted_ts)),
+        execution_latency_ms = epoch_ms(GREATEST(finished_ts, EXCLUDED.finished_ts))
+            - epoch_ms(LEAST(dispatched_ts, EXCLUDED.dispatched_ts)),
+        duration_ms = epoch_ms(GREATEST(last_ts, EXCLUDED.last_ts))
+            - epoch_ms(LEAST(first_ts, EXCLUDED.first_ts)),
+        event_count = event_count + EXCLUDED.event_count,
+        has_failed = has_failed OR EXCLUDED.has_failed,
+        has_completed = has_completed OR EXCLUDED.has_completed,
+        outcome = {_OUTCOME_SQL.format(
+            has_failed="has_failed OR EXCLUDED.has_failed",
+            has_completed="has_completed OR EXCLUDED.has_completed",
+        )}
+    RETURNING started_ts
+"""
+
+
+def create_tables(connection: duckdb.DuckDBPyConnection) -> None:
+    connection.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {RUN_METRICS_TABLE} (
+            run_id TEXT NOT NULL,
+            source_id TEXT NOT NULL,
+            action_name TEXT,
+            project_path TEXT,
+            trigger TEXT,
+            dev_env TEXT,
+            env_name TEXT,
+            first_ts TIMESTAMP,
+            last_ts TIMESTAMP,
+            started_ts TIMESTAMP,
+            accepted_ts TIMESTAMP,
+            dispatched_ts TIMESTAMP,
+            finished_ts TIMESTAMP,
+            queue_latency_ms BIGINT,
+            execution_latency_ms BIGINT,
+            duration_ms BIGINT,
+            event_count BIGINT NOT NULL,
+            has_failed BOOLEAN NOT NULL,
+            has_completed BOOLEAN NOT NULL,
+            outcome TEXT NOT NULL,
+            PRIMARY KEY (run_id, source_id)
+        )
+        """
+    )
+    connection.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {RUN_ROLLUPS_TABLE} (
+            bucket TEXT NOT NULL,
+            bucket_start TIMESTAMP NOT NULL,
+            source_id TEXT NOT NULL,
+            action_name TEXT,
+            env_name TEXT,
+            runs BIGINT NOT NULL,
+            completed_runs BIGINT NOT NULL,
+            failed_runs BIGINT NOT NULL,
+            queue_latency_runs BIGINT NOT NULL,
+            queue_latency_ms_sum BIGINT,
+            queue_latency_ms_max BIGINT,
+            execution_latency_runs BIGINT NOT NULL,
+            execution_latency_ms_sum BIGINT,
+            execution_latency_ms_p50 DOUBLE,
+            execution_latency_ms_p95 DOUBLE,
+            execution_latency_ms_max BIGINT
+        )
+        """
+    )
+
+
+def update_run_metrics(
+    connection: duckdb.DuckDBPyConnection, events_table: str
+) -> None:
+    """Merge runs of events in `events_table` into run metrics and recompute
+    rollups of the time range in which these runs started.
+
+    `events_table` has the columns of `wal_events` and contains only events that
+    are not in run metrics yet.
+    """
+    # a merged run can start earlier than before, the bucket it was counted in
+    # until now has to be recomputed as well
+    previous_started = connection.execute(
+        f"""
+        SELECT started_ts
+        FROM {RUN_METRICS_TABLE}
+        SEMI JOIN (
+            SELECT run_id, source_id FROM {events_table} WHERE run_id IS NOT NULL
+        ) AS merged_runs USING (run_id, source_id)
+        """
+    ).fetchall()
+    merged_started = connection.execute(
+        _MERGE_RUNS_SQL.format(events_table=events_table)
+    ).fetchall()
+    started = [
+        row[0] for row in previous_started + merged_started if row[0] is not None
+    ]
+    if len(started) > 0:
+        refresh_rollups(connection, min(started), max(started))
+
+
+def refresh_rollups(
+    connection: duckdb.DuckDBPyConnection,
+    from_ts: dt.datetime,
+    to_ts: dt.datetime,
+) -> None:
+    """Recompute rollup buckets which contain the range from `from_ts` to `to_ts`."""
+    for bucket in ROLLUP_BUCKETS:
+        range_start = _bucket_start(from_ts, bucket)
+        range_end = _bucket_start(to_ts, bucket) + _BUCKET_SIZES[bucket]
+        connection.execute(
+            f"""
+            DELETE FROM {RUN_ROLLUPS_TABLE}
+            WHERE bucket = ? AND bucket_start >= ? AND bucket_start < ?
+            """,
+            [bucket, range_start, range_end],
+        )
+        connection.execute(
+            f"""
+            INSERT INTO {RUN_ROLLUPS_TABLE}
+            SELECT
+                ? AS bucket,
+                date_trunc(?, started_ts) AS bucket_start,
+                source_id,
+                action_name,
+                env_name,
+                COUNT(*) AS runs,
+                COUNT(*) FILTER (WHERE outcome = 'success') AS completed_runs,
+                COUNT(*) FILTER (WHERE outcome = 'failed') AS failed_runs,
+                COUNT(queue_latency_ms) AS queue_latency_runs,
+                SUM(queue_latency_ms) AS queue_latency_ms_sum,
+                MAX(queue_latency_ms) AS queue_latency_ms_max,
+                COUNT(execution_latency_ms) AS execution_latency_runs,
+                SUM(execution_latency_ms) AS execution_latency_ms_sum,
+                QUANTILE_CONT(execution_latency_ms, 0.5) AS execution_latency_ms_p50,
+                QUANTILE_CONT(execution_latency_ms, 0.95)
+                    AS execution_latency_ms_p95,
+                MAX(execution_latency_ms) AS execution_latency_ms_max
+            FROM {RUN_METRICS_TABLE}
+            WHERE started_ts >= ? AND started_ts < ?
+            GROUP BY bucket_start, source_id, action_name, env_name
+            """,
+            [bucket, bucket, range_start, range_end],
+        )
+
+
+def _bucket_start(ts: dt.datetime, bucket: str) -> dt.datetime:
+    if bucket == "minute":
+        return ts.replace(second=0, microsecond=0)
+    return ts.replace(minute=0, second=0, microsecond=0)
@@ -1,24 +1,38 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
 import dataclasses
+import datetime as dt
 import functools
 import http.server
 import json
 import pathlib
+import queue
 import socket
 import sys
 import threading
 import urllib.parse
+from collections.abc import Iterator
 from typing import Any, Callable, cast
 
 import duckdb
-from fine_wal_explorer import store_queries
+from fine_wal_explorer import store_queries, store_schema
+from fine_wal_explorer.ingest_wal_to_store_handler import (
+    IngestWalToStoreHandler,
+    IngestWalToStoreHandlerConfig,
+)
 from finecode_extension_api import code_action
+from fine_wal_events.discover_wal_sources_action import (
+    DiscoverWalSourcesAction,
+    DiscoverWalSourcesRunPayload,
+    DiscoverWalSourcesRunResult,
+)
 from fine_wal_events.ingest_wal_to_store_action import (
     IngestWalToStoreAction,
     IngestWalToStoreRunPayload,
     IngestWalToStoreRunResult,
+    WalSourceSpec,
 )
 from fine_wal_events.serve_wal_explorer_from_store_action import (
     DEFAULT_WAL_EXPLORER_PORT,
@@ -29,6 +43,7 @@ from fine_wal_events.serve_wal_explorer_from_store_action import (
 from finecode_extension_api.interfaces import (
     ilogger,
     iprojectactionrunner,
+    iprojectinfoprovider,
     iworkspaceactionrunner,
 )
 from finecode_extension_api.interfaces.iprojectactionrunner import ActionRef
@@ -38,6 +53,11 @@ from finecode_extension_api.resource_uri import (
     resource_uri_to_path,
 )
 
+try:
+    from watchdog import observers as watchdog_observers
+except ImportError:  # optional `live` extra, WAL files are polled without it
+    watchdog_observers = None
+
 SCHEMA_VERSION = 1
 _REQUIRED_TABLES = frozenset({"wal_events"})
 
@@ -47,11 +67,32 @@ _STATIC_ASSETS: dict[str, str] = {
     "style.css": "text/css",
     "plotly.min.js": "application/javascript",
 }
+# how long a request waits for a free connection of the read pool
+_READ_POOL_TIMEOUT_SEC = 10.0
+# live mode: messages queued for a slow browser before new ones are dropped
+_LIVE_SUBSCRIBER_MAX_MESSAGES = 100
+# live mode: a comment is sent to idle browsers to detect closed connections
+_LIVE_KEEPALIVE_INTERVAL_SEC = 15.0
+# live mode with watchdog: files are also rechecked in case a notification was lost
+_LIVE_WATCHED_RESCAN_INTERVAL_SEC = 30.0
+# sources under which IngestWalToStoreHandler can be registered in the config
+_INGEST_HANDLER_SOURCES = frozenset(
+    {
+        "fine_wal_explorer.IngestWalToStoreHandler",
+        f"{IngestWalToStoreHandler.__module__}.{IngestWalToStoreHandler.__qualname__}",
+    }
+)
 
 
 @dataclasses.dataclass
 class ServeWalExplorerFromStoreHandlerConfig(code_action.ActionHandlerConfig):
-    pass
+    # connections for concurrent queries of HTTP requests
+    read_pool_size: int = 4
+    # live mode: how often WAL files are checked without watchdog. With watchdog
+    # it is the minimal time between two appends to the store
+    live_poll_interval_sec: float = 1.0
+    # live mode: max number of new events pushed to the browser per append
+    live_push_max_events: int = 500
 
 
 class _BadRequestError(Exception):
@@ -66,9 +107,220 @@ class _ServiceUnavailableError(Exception):
     pass
 
 
+class _ReadConnectionPool:
+    """Connections for concurrent queries of HTTP requests.
+
+    DuckDB doesn't open a database read-only in the process which has it open for
+    writing, so the pool consists of cursors of the store connection: they share
+    the database, but run queries independently and each of them reads a
+    consistent snapshot while the live mode appends events. The pool is used only
+    for queries.
+    """
+
+    def __init__(self, connection: duckdb.DuckDBPyConnection, size: int) -> None:
+        self._size = size
+        self._idle: queue.Queue[duckdb.DuckDBPyConnection] = queue.Queue()
+        for _ in range(size):
+            self._idle.put(connection.cursor())
+
+    @contextlib.contextmanager
+    def acquire(self) -> Iterator[duckdb.DuckDBPyConnection]:
+        try:
+            connection = self._idle.get(timeout=_READ_POOL_TIMEOUT_SEC)
+        except queue.Empty:
+            raise _ServiceUnavailableError(
+                "WAL Explorer database is busy; retry shortly"
+            ) from None
+        try:
+            yield connection
+        finally:
+            self._idle.put(connection)
+
+    def close(self) -> None:
+        """Wait for running queries and close the connections."""
+        for _ in range(self._size):
+            self._idle.get().close()
+
+
+class _LiveFeed:
+    """Server-sent event messages for browsers connected to `/live`."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._subscribers: set[queue.Queue[str | None]] = set()
+        self._closed = False
+
+    def subscribe(self) -> queue.Queue[str | None]:
+        subscriber: queue.Queue[str | None] = queue.Queue(
+            maxsize=_LIVE_SUBSCRIBER_MAX_MESSAGES
+        )
+        with self._lock:
+            if self._closed:
+                subscriber.put(None)
+            else:
+                self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: queue.Queue[str | None]) -> None:
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, event: str, data: Any) -> None:
+        message = f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+        with self._lock:
+            for subscriber in self._subscribers:
+                try:
+                    subscriber.put_nowait(message)
+                except queue.Full:
+                    # the browser reloads data on the next message it gets
+                    pass
+
+    def close(self) -> None:
+        """Stop streams of all subscribers."""
+        with self._lock:
+            self._closed = True
+            for subscriber in self._subscribers:
+                with contextlib.suppress(queue.Empty):
+                    while True:
+                        subscriber.get_nowait()
+                subscriber.put_nowait(None)
+            self._subscribers.clear()
+
+
+class _ChangeNotifier:
+    """watchdog event handler, wakes up the tailer on any change."""
+
+    def __init__(self, changed: threading.Event) -> None:
+        self._changed = changed
+
+    def dispatch(self, event: Any) -> None:
+        self._changed.set()
+
+
+class _WalTailer:
+    """Appends events of WAL sources to the store when their files change.
+
+    Changes are watched with watchdog if it is installed (`live` extra of
+    fine_wal_explorer), otherwise files are polled.
+    """
+
+    def __init__(
+        self,
+        source_groups: list[list[WalSourceSpec]],
+        ingest: Callable[[list[WalSourceSpec], str | None], IngestWalToStoreRunResult],
+        on_ingested: Callable[[IngestWalToStoreRunResult, dt.datetime], None],
+        poll_interval_sec: float,
+        logger: ilogger.ILogger,
+    ) -> None:
+        # each group is ingested separately, source ids are unique only in a group
+        self._source_groups = source_groups
+        self._ingest = ingest
+        self._on_ingested = on_ingested
+        self._poll_interval_sec = poll_interval_sec
+        self._logger = logger
+        self._ingest_lock = threading.Lock()
+        self._changed = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._observer: Any = None
+        self._files_state: dict[pathlib.Path, tuple[int, int]] | None = None
+
+    def start(self) -> None:
+        watched_dirs = self._watched_dirs()
+        if watchdog_observers is not None and len(watched_dirs) > 0:
+            observer = watchdog_observers.Observer()
+            for dir_path in watched_dirs:
+                observer.schedule(
+                    _ChangeNotifier(self._changed), str(dir_path), recursive=True
+                )
+            observer.start()
+            self._observer = observer
+        else:
+            self._logger.info(
+                "watchdog is not installed, WAL files are polled every "
+                f"{self._poll_interval_sec} s"
+            )
+        self._thread = threading.Thread(
+            target=self._run, daemon=True, name="wal-explorer-tailer"
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._changed.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+        if self._thread is not None:
+            self._thread.join()
+
+    def ingest_now(self, since_ts_iso: str | None) -> IngestWalToStoreRunResult:
+        with self._ingest_lock:
+            ingested_from = dt.datetime.now(dt.timezone.utc)
+            result = IngestWalToStoreRunResult()
+            for source_specs in self._source_groups:
+                result.update(self._ingest(source_specs, since_ts_iso))
+        if result.events_ingested > 0:
+            self._on_ingested(result, ingested_from)
+        return result
+
+    def _run(self) -> None:
+        if self._observer is None:
+            wait_timeout = self._poll_interval_sec
+        else:
+            wait_timeout = _LIVE_WATCHED_RESCAN_INTERVAL_SEC
+        while True:
+            files_state = self._read_files_state()
+            if files_state != self._files_state:
+                self._files_state = files_state
+                try:
+                    self.ingest_now(since_ts_iso=None)
+                except Exception as exc:
+                    self._logger.error(f"Live WAL ingest failed: {exc}")
+            if self._observer is not None:
+                # changes during the interval are appended together
+                self._stop.wait(self._poll_interval_sec)
+
+            self._changed.wait(wait_timeout)
+            self._changed.clear()
+            if self._stop.is_set():
+                return
+
+    def _source_paths(self) -> list[tuple[pathlib.Path, WalSourceSpec]]:
+        return [
+            (resource_uri_to_path(spec.location_uri), spec)
+            for source_specs in self._source_groups
+            for spec in source_specs
+        ]
+
+    def _watched_dirs(self) -> list[pathlib.Path]:
+        dirs: set[pathlib.Path] = set()
+        for source_path, _ in self._source_paths():
+            dir_path = source_path if source_path.is_dir() else source_path.parent
+            if dir_path.is_dir():
+                dirs.add(dir_path)
+        return sorted(dirs)
+
+    def _read_files_state(self) -> dict[pathlib.Path, tuple[int, int]]:
+        files_state: dict[pathlib.Path, tuple[int, int]] = {}
+        for source_path, spec in self._source_paths():
+            if source_path.is_dir():
+                file_paths = list(source_path.rglob(spec.include_glob or "*.jsonl"))
+            else:
+                file_paths = [source_path]
+            for file_path in file_paths:
+                try:
+                    stat_result = file_path.stat()
+                except OSError:
+                    continue
+                files_state[file_path] = (stat_result.st_size, stat_result.st_mtime_ns)
+        return files_state
+
+
 @dataclasses.dataclass
 class _ServeState:
     connection: duckdb.DuckDBPyConnection | None
+    read_pool: _ReadConnectionPool | None = None
     refreshing: bool = False
 
 
@@ -76,23 +328,23 @@ class _WalExplorerHTTPHandler(http.server.BaseHTTPRequestHandler):
     """Low-level HTTP handler. Created per request by HTTPServer."""
 
     _state: _ServeState
-    _db_lock: threading.Lock
     _logger: ilogger.ILogger
     _trigger_ingest: Callable[[dict[str, Any]], dict[str, Any]]
+    _live_feed: _LiveFeed | None
 
     def __init__(
         self,
         state: _ServeState,
-        db_lock: threading.Lock,
         logger: ilogger.ILogger,
         trigger_ingest: Callable[[dict[str, Any]], dict[str, Any]],
+        live_feed: _LiveFeed | None,
         *args: Any,
         **kwargs: Any,
     ) -> None:
         self._state = state
-        self._db_lock = db_lock
         self._logger = logger
         self._trigger_ingest = trigger_ingest
+        self._live_feed = live_feed
         super().__init__(*args, **kwargs)
 
     def _send_static(self, filename: str, content_type: str) -> None:
@@ -132,6 +384,10 @@ class _WalExplorerHTTPHandler(http.server.BaseHTTPRequestHandler):
                 self._send_json(404, {"error": "not found", "path": parsed.path})
             return
 
+        if parsed.path == "/live":
+            self._stream_live_events()
+            return
+
         try:
             if parsed.path == "/health":
                 body = self._handle_health()
@@ -143,10 +399,16 @@ class _WalExplorerHTTPHandler(http.server.BaseHTTPRequestHandler):
                 body = self._handle_metrics()
             elif parsed.path == "/events":
                 body = self._handle_events(params)
+            elif parsed.path == "/rollups":
+                body = self._handle_rollups(params)
+            elif parsed.path == "/slowest_actions":
+                body = self._handle_slowest_actions(params)
             else:
                 self._send_json(404, {"error": "not found", "path": parsed.path})
                 return
             self._send_json(200, body)
+        except ValueError as exc:
+            self._send_json(400, {"error": str(exc)})
         except _ServiceUnavailableError as exc:
             self._send_json(503, {"error": str(exc)})
         except Exception as exc:
@@ -206,21 +468,49 @@ class _WalExplorerHTTPHandler(http.server.BaseHTTPRequestHandler):
         self.end_headers()
         self.wfile.write(body)
 
+    def _stream_live_events(self) -> None:
+        if self._live_feed is None:
+            self._send_json(404, {"error": "live mode is not enabled"})
+            return
+
+        subscriber = self._live_feed.subscribe()
+        try:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            self.wfile.write(b"event: live\ndata: {}\n\n")
+            self.wfile.flush()
+            while True:
+                try:
+                    message = subscriber.get(timeout=_LIVE_KEEPALIVE_INTERVAL_SEC)
+                except queue.Empty:
+                    message = ": keepalive\n\n"
+                if message is None:
+                    break
+                self.wfile.write(message.encode())
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # browser closed the page
+            pass
+        finally:
+            self._live_feed.unsubscribe(subscriber)
+
     def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
         self._logger.debug("HTTP %s" % (format % args))
 
     def _handle_health(self) -> dict[str, Any]:
-        with self._db_lock:
-            return store_queries.get_health(self._require_connection())
+        with self._read_connection() as connection:
+            return store_queries.get_health(connection)
 
     def _handle_runs(self, params: dict[str, list[str]]) -> dict[str, Any]:
         source_id = _first(params, "source_id")
         from_ts = _first(params, "from_ts")
         to_ts = _first(params, "to_ts")
         limit = int(_first(params, "limit") or 1000)
-        with self._db_lock:
+        with self._read_connection() as connection:
             runs = store_queries.get_runs(
-                self._require_connection(),
+                connection,
                 source_id=source_id,
                 from_ts_iso=from_ts,
                 to_ts_iso=to_ts,
@@ -235,9 +525,9 @@ class _WalExplorerHTTPHandler(http.server.BaseHTTPRequestHandler):
         to_ts = _first(params, "to_ts")
         event_type = _first(params, "event_type")
         limit = int(_first(params, "limit") or 1000)
-        with self._db_lock:
+        with self._read_connection() as connection:
             events = store_queries.get_timeline(
-                self._require_connection(),
+                connection,
                 run_id=run_id,
                 source_id=source_id,
                 from_ts_iso=from_ts,
@@ -248,8 +538,8 @@ class _WalExplorerHTTPHandler(http.server.BaseHTTPRequestHandler):
         return {"events": events}
 
     def _handle_metrics(self) -> dict[str, Any]:
-        with self._db_lock:
-            return store_queries.get_metrics(self._require_connection())
+        with self._read_connection() as connection:
+            return store_queries.get_metrics(connection)
 
     def _handle_events(self, params: dict[str, list[str]]) -> dict[str, Any]:
         run_id = _first(params, "run_id")
@@ -257,9 +547,9 @@ class _WalExplorerHTTPHandler(http.server.BaseHTTPRequestHandler):
         from_ts = _first(params, "from_ts")
         to_ts = _first(params, "to_ts")
         limit = int(_first(params, "limit") or 200)
-        with self._db_lock:
+        with self._read_connection() as connection:
             events = store_queries.get_events(
-                self._require_connection(),
+                connection,
                 run_id=run_id,
                 source_id=source_id,
                 from_ts_iso=from_ts,
@@ -268,16 +558,53 @@ class _WalExplorerHTTPHandler(http.server.BaseHTTPRequestHandler):
             )
         return {"events": events}
 
-    def _require_connection(self) -> duckdb.DuckDBPyConnection:
+    def _handle_rollups(self, params: dict[str, list[str]]) -> dict[str, Any]:
+        bucket = _first(params, "bucket") or "hour"
+        source_id = _first(params, "source_id")
+        action_name = _first(params, "action_name")
+        env_name = _first(params, "env_name")
+        from_ts = _first(params, "from_ts")
+        to_ts = _first(params, "to_ts")
+        limit = int(_first(params, "limit") or 1000)
+        with self._read_connection() as connection:
+            rollups = store_queries.get_rollups(
+                connection,
+                bucket=bucket,
+                source_id=source_id,
+                action_name=action_name,
+                env_name=env_name,
+                from_ts_iso=from_ts,
+                to_ts_iso=to_ts,
+                limit=limit,
+            )
+        return {"bucket": bucket, "rollups": rollups}
+
+    def _handle_slowest_actions(self, params: dict[str, list[str]]) -> dict[str, Any]:
+        from_ts = _first(params, "from_ts")
+        to_ts = _first(params, "to_ts")
+        limit = int(_first(params, "limit") or 20)
+        with self._read_connection() as connection:
+            actions = store_queries.get_slowest_actions(
+                connection,
+                from_ts_iso=from_ts,
+                to_ts_iso=to_ts,
+                limit=limit,
+            )
+        return {"actions": actions}
+
+    def _read_connection(
+        self,
+    ) -> contextlib.AbstractContextManager[duckdb.DuckDBPyConnection]:
         if self._state.refreshing:
             raise _ServiceUnavailableError(
                 "WAL Explorer is refreshing data; retry shortly"
             )
-        if self._state.connection is None:
+        read_pool = self._state.read_pool
+        if read_pool is None:
             raise _ServiceUnavailableError(
                 "WAL Explorer database is temporarily unavailable"
             )
-        return self._state.connection
+        return read_pool.acquire()
 
 
 def _first(params: dict[str, list[str]], key: str) -> str | None:
@@ -291,18 +618,19 @@ def _build_http_server(
     host: str,
     port: int,
     state: _ServeState,
-    db_lock: threading.Lock,
     logger: ilogger.ILogger,
     trigger_ingest: Callable[[dict[str, Any]], dict[str, Any]],
+    live_feed: _LiveFeed | None,
 ) -> http.server.HTTPServer:
     handler_factory = functools.partial(
         _WalExplorerHTTPHandler,
         state,
-        db_lock,
         logger,
         trigger_ingest,
+        live_feed,
     )
-    return http.server.HTTPServer((host, port), handler_factory)
+    # a thread per request: queries run concurrently and `/live` streams stay open
+    return http.server.ThreadingHTTPServer((host, port), handler_factory)
 
 
 class ServeWalExplorerFromStoreHandler(
@@ -316,11 +644,13 @@ class ServeWalExplorerFromStoreHandler(
         config: ServeWalExplorerFromStoreHandlerConfig,
         action_runner: iprojectactionrunner.IProjectActionRunner,
         workspace_runner: iworkspaceactionrunner.IWorkspaceActionRunner,
+        project_info_provider: iprojectinfoprovider.IProjectInfoProvider,
         logger: ilogger.ILogger,
     ) -> None:
         self.config = config
         self.action_runner = action_runner
         self.workspace_runner = workspace_runner
+        self.project_info_provider = project_info_provider
         self.logger = logger
 
     async def run(
@@ -337,17 +667,38 @@ class ServeWalExplorerFromStoreHandler(
         ingest_lock = threading.Lock()
         server: http.server.HTTPServer | None = None
         server_thread: threading.Thread | None = None
+        live_feed: _LiveFeed | None = None
+        tailer: _WalTailer | None = None
         try:
-            self._ensure_schema(connection)
+            store_schema.ensure_schema(connection)
             warnings = self._validate_schema(connection)
+            state.read_pool = _ReadConnectionPool(
+                connection, self.config.read_pool_size
+            )
             requested_port = self._resolve_bind_port(payload.host, payload.port)
 
             loop = asyncio.get_running_loop()
 
+            if payload.live:
+                live_feed = _LiveFeed()
+                tailer = await self._create_tailer(
+                    state=state,
+                    store_path=store_path,
+                    live_feed=live_feed,
+                    meta=run_context.meta,
+                    warnings=warnings,
+                )
+
             def trigger_ingest(request_payload: dict[str, Any]) -> dict[str, Any]:
                 if not ingest_lock.acquire(blocking=False):
                     raise _ConflictError("Ingest already in progress")
                 try:
+                    if tailer is not None:
+                        # the store stays open in live mode, ingest in this process
+                        result = tailer.ingest_now(
+                            _read_since_ts_iso(request_payload)
+                        )
+                        return _ingest_result_to_response(result, warnings=[])
                     future = asyncio.run_coroutine_threadsafe(
                         self._run_ingest(
                             request_payload=request_payload,
@@ -366,9 +717,9 @@ class ServeWalExplorerFromStoreHandler(
                 payload.host,
                 requested_port,
                 state,
-                db_lock,
                 self.logger,
                 trigger_ingest,
+                live_feed,
             )
             server_thread = threading.Thread(
                 target=server.serve_forever,
@@ -376,6 +727,8 @@ class ServeWalExplorerFromStoreHandler(
                 name="wal-explorer-http",
             )
             server_thread.start()
+            if tailer is not None:
+                tailer.start()
 
             # Handle both IPv4 (2-tuple) and IPv6 (4-tuple) addresses
             addr_info = server.server_address
@@ -385,7 +738,8 @@ class ServeWalExplorerFromStoreHandler(
             store_uri = path_to_resource_uri(store_path)
 
             self.logger.info(
-                f"WAL Explorer serving at {base_url} (store: {store_path})"
+                f"WAL Explorer serving at {base_url} (store: {store_path}"
+                f"{', live' if tailer is not None else ''})"
             )
 
             # Yield immediately so callers receive address/port before the blocking loop.
@@ -406,16 +760,166 @@ class ServeWalExplorerFromStoreHandler(
                 except asyncio.CancelledError:
                     pass
         finally:
+            if tailer is not None:
+                tailer.stop()
+            if live_feed is not None:
+                live_feed.close()
             if server is not None:
                 server.shutdown()
                 server.server_close()
             if server_thread is not None:
                 server_thread.join()
             with db_lock:
+                if state.read_pool is not None:
+                    state.read_pool.close()
+                    state.read_pool = None
                 if state.connection is not None:
                     state.connection.close()
                     state.connection = None
 
+    async def _create_tailer(
+        self,
+        state: _ServeState,
+        store_path: pathlib.Path,
+        live_feed: _LiveFeed,
+        meta: code_action.RunActionMeta,
+        warnings: list[str],
+    ) -> _WalTailer:
+        connection = state.connection
+        assert connection is not None
+        ingester = IngestWalToStoreHandler(
+            config=await self._get_ingest_handler_config(warnings),
+            logger=self.logger,
+        )
+
+        def ingest(
+            source_specs: list[WalSourceSpec], since_ts_iso: str | None
+        ) -> IngestWalToStoreRunResult:
+            return ingester.ingest(
+                connection,
+                source_specs,
+                since_ts_iso=since_ts_iso,
+                store_path=store_path,
+            )
+
+        def push_events(
+            result: IngestWalToStoreRunResult, ingested_from: dt.datetime
+        ) -> None:
+            read_pool = state.read_pool
+            if read_pool is None:
+                return
+            with read_pool.acquire() as read_connection:
+                events = store_queries.get_events(
+                    read_connection,
+                    ingested_from=ingested_from,
+                    limit=self.config.live_push_max_events,
+                )
+            live_feed.publish(
+                "events",
+                {
+                    "events_ingested": result.events_ingested,
+                    "first_event_ts_iso": result.first_event_ts_iso,
+                    "last_event_ts_iso": result.last_event_ts_iso,
+                    "events": events,
+                },
+            )
+
+        source_groups = await self._discover_live_sources(meta, warnings)
+        self.logger.info(
+            "WAL Explorer live mode tails sources: "
+            f"{[spec.source_id for group in source_groups for spec in group]}"
+        )
+        return _WalTailer(
+            source_groups=source_groups,
+            ingest=ingest,
+            on_ingested=push_events,
+            poll_interval_sec=self.config.live_poll_interval_sec,
+            logger=self.logger,
+        )
+
+    async def _get_ingest_handler_config(
+        self, warnings: list[str]
+    ) -> IngestWalToStoreHandlerConfig:
+        """Config of IngestWalToStoreHandler in the current project, live mode
+        ingests with it in this process.
+
+        Resolved like the extension runner resolves handler config: config from
+        `[[tool.finecode.action_handler]]` updated with config of the handler in
+        the action.
+        """
+        try:
+            raw_config = (
+                await self.project_info_provider.get_current_project_raw_config()
+            )
+        except iprojectinfoprovider.ProjectInfoUnavailableError as exc:
+            self.logger.warning(f"Project config is not available: {exc}")
+            warnings.append(
+                "Project config is not available; live mode ingests with default"
+                " config of IngestWalToStoreHandler."
+            )
+            return IngestWalToStoreHandlerConfig()
+
+        finecode_config = raw_config.get("tool", {}).get("finecode", {})
+        handler_raw_config: dict[str, Any] = {}
+        for handler_def in finecode_config.get("action_handler", []):
+            if handler_def.get("source") in _INGEST_HANDLER_SOURCES:
+                handler_raw_config.update(handler_def.get("config") or {})
+        for action_def in finecode_config.get("action", {}).values():
+            for handler_def in action_def.get("handlers", []):
+                if handler_def.get("source") in _INGEST_HANDLER_SOURCES:
+                    handler_raw_config.update(handler_def.get("config") or {})
+
+        config_fields = {
+            field.name for field in dataclasses.fields(IngestWalToStoreHandlerConfig)
+        }
+        return IngestWalToStoreHandlerConfig(
+            **{
+                name: value
+                for name, value in handler_raw_config.items()
+                if name in config_fields
+            }
+        )
+
+    async def _discover_live_sources(
+        self, meta: code_action.RunActionMeta, warnings: list[str]
+    ) -> list[list[WalSourceSpec]]:
+        discovered: list[DiscoverWalSourcesRunResult]
+        try:
+            results_by_project = await self.workspace_runner.run_action_in_projects(
+                action_type=DiscoverWalSourcesAction,
+                payload=DiscoverWalSourcesRunPayload(),
+                meta=meta,
+            )
+            discovered = list(results_by_project.values())
+        except Exception as exc:
+            self.logger.warning(f"Workspace-wide WAL source discovery failed: {exc}")
+            warnings.append(
+                "Workspace-wide WAL source discovery failed; "
+                "live mode tails WAL sources of the current project only."
+            )
+            discovered = [
+                await self.action_runner.run_action(
+                    action_type=ActionRef.from_type(DiscoverWalSourcesAction),
+                    payload=DiscoverWalSourcesRunPayload(),
+                    meta=meta,
+                )
+            ]
+
+        # source ids are unique only within a project and the same WAL directory
+        # can be discovered in several projects
+        seen_locations: set[str] = set()
+        source_groups: list[list[WalSourceSpec]] = []
+        for discover_result in discovered:
+            source_specs = [
+                spec
+                for spec in discover_result.source_specs
+                if str(spec.location_uri) not in seen_locations
+            ]
+            seen_locations.update(str(spec.location_uri) for spec in source_specs)
+            if len(source_specs) > 0:
+                source_groups.append(source_specs)
+        return source_groups
+
     async def _run_ingest(
         self,
         request_payload: dict[str, Any],
@@ -424,15 +928,16 @@ class ServeWalExplorerFromStoreHandler(
         state: _ServeState,
         state_lock: threading.Lock,
     ) -> dict[str, Any]:
-        since_ts_iso = request_payload.get("since_ts_iso")
-        if since_ts_iso is not None and not isinstance(since_ts_iso, str):
-            raise _BadRequestError("since_ts_iso must be a string or null")
+        since_ts_iso = _read_since_ts_iso(request_payload)
 
         self.logger.info("WAL ingest requested from HTTP endpoint")
 
         warnings: list[str] = []
         with state_lock:
             state.refreshing = True
+            if state.read_pool is not None:
+                state.read_pool.close()
+                state.read_pool = None
             if state.connection is not None:
                 state.connection.close()
                 state.connection = None
@@ -497,6 +1002,9 @@ class ServeWalExplorerFromStoreHandler(
         finally:
             with state_lock:
                 state.connection = duckdb.connect(str(store_path), read_only=False)
+                state.read_pool = _ReadConnectionPool(
+                    state.connection, self.config.read_pool_size
+                )
                 state.refreshing = False
 
         self.logger.info(
@@ -506,27 +1014,7 @@ class ServeWalExplorerFromStoreHandler(
             f"failed={ingest_result.events_failed_parse}"
         )
 
-        return {
-            "schema_version": ingest_result.schema_version,
-            "store_uri": ingest_result.store_uri,
-            "events_ingested": ingest_result.events_ingested,
-            "events_skipped_duplicate": ingest_result.events_skipped_duplicate,
-            "events_failed_parse": ingest_result.events_failed_parse,
-            "first_event_ts_iso": ingest_result.first_event_ts_iso,
-            "last_event_ts_iso": ingest_result.last_event_ts_iso,
-            "source_summary": [
-                {
-                    "source_id": item.source_id,
-                    "files_scanned": item.files_scanned,
-                    "events_read": item.events_read,
-                    "events_inserted": item.events_inserted,
-                    "events_skipped_duplicate": item.events_skipped_duplicate,
-                    "events_failed_parse": item.events_failed_parse,
-                }
-                for item in ingest_result.source_summary
-            ],
-            "warnings": ingest_result.warnings + warnings,
-        }
+        return _ingest_result_to_response(ingest_result, warnings)
 
     def _resolve_store_path(
         self, payload: ServeWalExplorerFromStoreRunPayload
@@ -552,66 +1040,6 @@ class ServeWalExplorerFromStoreHandler(
             )
         return []
 
-    def _ensure_schema(self, connection: duckdb.DuckDBPyConnection) -> None:
-        connection.execute(
-            """
-            CREATE TABLE IF NOT EXISTS wal_events (
-                event_hash TEXT PRIMARY KEY,
-                source_id TEXT NOT NULL,
-                source_format TEXT NOT NULL,
-                schema_version INTEGER NOT NULL,
-                ts TIMESTAMP,
-                event_type TEXT NOT NULL,
-                run_id TEXT,
-                action_name TEXT,
-                project_path TEXT,
-                trigger TEXT,
-                dev_env TEXT,
-                writer_id TEXT,
-                payload_json JSON,
-                origin_file_path TEXT,
-                origin_line_no BIGINT,
-                ingested_at TIMESTAMP NOT NULL
-            )
-            """
-        )
-        connection.execute(
-            """
-            CREATE TABLE IF NOT EXISTS wal_ingest_runs (
-                ingest_run_id TEXT PRIMARY KEY,
-                started_at TIMESTAMP NOT NULL,
-                finished_at TIMESTAMP,
-                store_uri TEXT,
-                since_ts TIMESTAMP,
-                events_ingested BIGINT,
-                events_skipped_duplicate BIGINT,
-                events_failed_parse BIGINT
-            )
-            """
-        )
-        connection.execute(
-            """
-            CREATE TABLE IF NOT EXISTS wal_ingest_sources (
-                ingest_run_id TEXT NOT NULL,
-                source_id TEXT NOT NULL,
-                files_scanned BIGINT,
-                events_read BIGINT,
-                events_inserted BIGINT,
-                events_skipped_duplicate BIGINT,
-                events_failed_parse BIGINT
-            )
-            """
-        )
-        connection.execute(
-            "CREATE INDEX IF NOT EXISTS idx_wal_events_run_id_ts ON wal_events(run_id, ts)"
-        )
-        connection.execute(
-            "CREATE INDEX IF NOT EXISTS idx_wal_events_source_ts ON wal_events(source_id, ts)"
-        )
-        connection.execute(
-            "CREATE INDEX IF NOT EXISTS idx_wal_events_event_type ON wal_events(event_type)"
-        )
-
     def _resolve_bind_port(self, host: str, requested_port: int) -> int:
         # Only auto-select a free port when the action default port is requested.
         if requested_port != DEFAULT_WAL_EXPLORER_PORT:
@@ -621,6 +1049,39 @@ class ServeWalExplorerFromStoreHandler(
         return _find_free_port(host)
 
 
+def _ingest_result_to_response(
+    ingest_result: IngestWalToStoreRunResult, warnings: list[str]
+) -> dict[str, Any]:
+    return {
+        "schema_version": ingest_result.schema_version,
+        "store_uri": ingest_result.store_uri,
+        "events_ingested": ingest_result.events_ingested,
+        "events_skipped_duplicate": ingest_result.events_skipped_duplicate,
+        "events_failed_parse": ingest_result.events_failed_parse,
+        "first_event_ts_iso": ingest_result.first_event_ts_iso,
+        "last_event_ts_iso": ingest_result.last_event_ts_iso,
+        "source_summary": [
+            {
+                "source_id": item.source_id,
+                "files_scanned": item.files_scanned,
+                "events_read": item.events_read,
+                "events_inserted": item.events_inserted,
+                "events_skipped_duplicate": item.events_skipped_duplicate,
+                "events_failed_parse": item.events_failed_parse,
+            }
+            for item in ingest_result.source_summary
+        ],
+        "warnings": ingest_result.warnings + warnings,
+    }
+
+
+def _read_since_ts_iso(request_payload: dict[str, Any]) -> str | None:
+    since_ts_iso = request_payload.get("since_ts_iso")
+    if since_ts_iso is not None and not isinstance(since_ts_iso, str):
+        raise _BadRequestError("since_ts_iso must be a string or null")
+    return since_ts_iso
+
+
 def _is_port_available(host: str, port: int) -> bool:
     sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     try:
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import datetime as dt
 import json
 from typing import Any
 
 import duckdb
+from fine_wal_explorer import run_metrics
 
 SCHEMA_VERSION = 1
 
@@ -35,7 +37,7 @@ def _decode_payload_json(value: Any) -> dict[str, Any] | None:
 def get_health(conn: duckdb.DuckDBPyConnection) -> dict[str, Any]:
     total_events = conn.execute("SELECT COUNT(*) FROM wal_events").fetchone()[0]
     total_runs = conn.execute(
-        "SELECT COUNT(DISTINCT run_id) FROM wal_events WHERE run_id IS NOT NULL"
+        "SELECT COUNT(DISTINCT run_id) FROM wal_run_metrics"
     ).fetchone()[0]
     return {
         "schema_version": SCHEMA_VERSION,
@@ -53,16 +55,17 @@ def get_runs(
     to_ts_iso: str | None = None,
     limit: int = 1000,
 ) -> list[dict[str, Any]]:
-    conditions = ["run_id IS NOT NULL"]
+    """Runs which have events in the time range, with all their events counted."""
+    conditions = ["1=1"]
     params: list[Any] = []
     if source_id is not None:
         conditions.append("source_id = ?")
         params.append(source_id)
     if from_ts_iso is not None:
-        conditions.append("ts >= ?")
+        conditions.append("last_ts >= ?")
         params.append(from_ts_iso)
     if to_ts_iso is not None:
-        conditions.append("ts <= ?")
+        conditions.append("first_ts <= ?")
         params.append(to_ts_iso)
 
     params.append(limit)
@@ -70,16 +73,14 @@ def get_runs(
         SELECT
             run_id,
             source_id,
-            MIN(ts) AS first_ts,
-            MAX(ts) AS last_ts,
-            epoch_ms(MAX(ts)) - epoch_ms(MIN(ts)) AS duration_ms,
-            COUNT(*) AS event_count,
-            ANY_VALUE(action_name) AS action_name,
-            BOOL_OR(event_type LIKE '%.failed' OR event_type LIKE '%.error') AS has_failed,
-            BOOL_OR(event_type LIKE '%.completed') AS has_completed
-        FROM wal_events
+            first_ts,
+            last_ts,
+            duration_ms,
+            event_count,
+            action_name,
+            outcome
+        FROM wal_run_metrics
         WHERE {' AND '.join(conditions)}
-        GROUP BY run_id, source_id
         ORDER BY first_ts DESC NULLS LAST
         LIMIT ?
     """
@@ -87,14 +88,6 @@ def get_runs(
 
     result: list[dict[str, Any]] = []
     for row in rows:
-        has_failed = bool(row[7])
-        has_completed = bool(row[8])
-        status = "incomplete"
-        if has_failed:
-            status = "failed"
-        elif has_completed:
-            status = "success"
-
         result.append(
             {
                 "run_id": row[0],
@@ -104,7 +97,7 @@ def get_runs(
                 "last_ts_iso": _ts_to_iso(row[3]),
                 "duration_ms": row[4],
                 "event_count": int(row[5]),
-                "status": status,
+                "status": row[7],
             }
         )
     return result
@@ -119,6 +112,7 @@ def _query_events(
     to_ts_iso: str | None,
     event_type: str | None,
     limit: int,
+    ingested_from: dt.datetime | None = None,
 ) -> list[dict[str, Any]]:
     conditions = ["1=1"]
     params: list[Any] = []
@@ -137,6 +131,9 @@ def _query_events(
     if event_type is not None:
         conditions.append("event_type = ?")
         params.append(event_type)
+    if ingested_from is not None:
+        conditions.append("ingested_at >= ?")
+        params.append(ingested_from)
 
     params.append(limit)
     sql = f"""
@@ -200,10 +197,9 @@ def get_metrics(conn: duckdb.DuckDBPyConnection) -> dict[str, Any]:
         WITH run_durations AS (
             SELECT
                 run_id,
-                epoch_ms(MAX(ts)) - epoch_ms(MIN(ts)) AS duration_ms,
-                BOOL_OR(event_type LIKE '%.failed' OR event_type LIKE '%.error') AS has_failed
-            FROM wal_events
-            WHERE run_id IS NOT NULL
+                epoch_ms(MAX(last_ts)) - epoch_ms(MIN(first_ts)) AS duration_ms,
+                BOOL_OR(has_failed) AS has_failed
+            FROM wal_run_metrics
             GROUP BY run_id
         )
         SELECT
@@ -224,6 +220,130 @@ def get_metrics(conn: duckdb.DuckDBPyConnection) -> dict[str, Any]:
     }
 
 
+def get_rollups(
+    conn: duckdb.DuckDBPyConnection,
+    *,
+    bucket: str = "hour",
+    source_id: str | None = None,
+    action_name: str | None = None,
+    env_name: str | None = None,
+    from_ts_iso: str | None = None,
+    to_ts_iso: str | None = None,
+    limit: int = 1000,
+) -> list[dict[str, Any]]:
+    """Run rollups of runs started in the time range, newest buckets first."""
+    if bucket not in run_metrics.ROLLUP_BUCKETS:
+        raise ValueError(
+            f"Unknown bucket '{bucket}', expected one of: "
+            + ", ".join(run_metrics.ROLLUP_BUCKETS)
+        )
+    conditions = ["bucket = ?"]
+    params: list[Any] = [bucket]
+    if source_id is not None:
+        conditions.append("source_id = ?")
+        params.append(source_id)
+    if action_name is not None:
+        conditions.append("action_name = ?")
+        params.append(action_name)
+    if env_name is not None:
+        conditions.append("env_name = ?")
+        params.append(env_name)
+    if from_ts_iso is not None:
+        conditions.append("bucket_start >= date_trunc(?, ?::TIMESTAMP)")
+        params.extend([bucket, from_ts_iso])
+    if to_ts_iso is not None:
+        conditions.append("bucket_start <= ?")
+        params.append(to_ts_iso)
+
+    params.append(limit)
+    sql = f"""
+        SELECT
+            bucket_start, source_id, action_name, env_name,
+            runs, completed_runs, failed_runs,
+            queue_latency_runs, queue_latency_ms_sum, queue_latency_ms_max,
+            execution_latency_runs, execution_latency_ms_sum,
+            execution_latency_ms_p50, execution_latency_ms_p95,
+            execution_latency_ms_max
+        FROM wal_run_rollups
+        WHERE {' AND '.join(conditions)}
+        ORDER BY bucket_start DESC, source_id, action_name, env_name
+        LIMIT ?
+    """
+    rows = conn.execute(sql, params).fetchall()
+
+    result: list[dict[str, Any]] = []
+    for row in rows:
+        result.append(
+            {
+                "bucket_start_iso": _ts_to_iso(row[0]),
+                "source_id": row[1],
+                "action_name": row[2],
+                "env_name": row[3],
+                "runs": int(row[4]),
+                "completed_runs": int(row[5]),
+                "failed_runs": int(row[6]),
+                "avg_queue_latency_ms": _average(row[8], row[7]),
+                "max_queue_latency_ms": row[9],
+                "avg_execution_latency_ms": _average(row[11], row[10]),
+                "p50_execution_latency_ms": row[12],
+                "p95_execution_latency_ms": row[13],
+                "max_execution_latency_ms": row[14],
+            }
+        )
+    return result
+
+
+def get_slowest_actions(
+    conn: duckdb.DuckDBPyConnection,
+    *,
+    from_ts_iso: str | None = None,
+    to_ts_iso: str | None = None,
+    limit: int = 20,
+) -> list[dict[str, Any]]:
+    """Actions with the highest average execution latency, from hourly rollups."""
+    conditions = ["bucket = 'hour'", "execution_latency_runs > 0"]
+    params: list[Any] = []
+    if from_ts_iso is not None:
+        conditions.append("bucket_start >= date_trunc('hour', ?::TIMESTAMP)")
+        params.append(from_ts_iso)
+    if to_ts_iso is not None:
+        conditions.append("bucket_start <= ?")
+        params.append(to_ts_iso)
+
+    params.append(limit)
+    sql = f"""
+        SELECT
+            action_name,
+            SUM(runs) AS runs,
+            SUM(failed_runs) AS failed_runs,
+            SUM(execution_latency_ms_sum) / SUM(execution_latency_runs)
+                AS avg_execution_latency_ms,
+            MAX(execution_latency_ms_max) AS max_execution_latency_ms
+        FROM wal_run_rollups
+        WHERE {' AND '.join(conditions)}
+        GROUP BY action_name
+        ORDER BY avg_execution_latency_ms DESC, action_name
+        LIMIT ?
+    """
+    rows = conn.execute(sql, params).fetchall()
+    return [
+        {
+            "action_name": row[0],
+            "runs": int(row[1]),
+            "failed_runs": int(row[2]),
+            "avg_execution_latency_ms": row[3],
+            "max_execution_latency_ms": row[4],
+        }
+        for row in rows
+    ]
+
+
+def _average(total: Any, count: Any) -> float | None:
+    if total is None or not count:
+        return None
+    return total / count
+
+
 def get_events(
     conn: duckdb.DuckDBPyConnection,
     *,
@@ -232,7 +352,10 @@ def get_events(
     from_ts_iso: str | None = None,
     to_ts_iso: str | None = None,
     limit: int = 200,
+    ingested_from: dt.datetime | None = None,
 ) -> list[dict[str, Any]]:
+    """`ingested_from` is a time zone aware timestamp, DuckDB converts it to the
+    session time zone in which the store keeps timestamps."""
     return _query_events(
         conn,
         run_id=run_id,
@@ -241,4 +364,5 @@ def get_events(
         to_ts_iso=to_ts_iso,
         event_type=None,
         limit=limit,
+        ingested_from=ingested_from,
     )
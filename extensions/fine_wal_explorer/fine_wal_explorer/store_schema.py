@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import duckdb
+from fine_wal_explorer import run_metrics
+
+
+def ensure_schema(connection: duckdb.DuckDBPyConnection) -> None:
+    """Create tables of the WAL store that don't exist yet.
+
+    Run metrics tables added to an existing store are filled from its events.
+    """
+    existing_tables = {
+        row[0]
+        for row in connection.execute(
+            "SELECT table_name FROM information_schema.tables "
+            "WHERE table_schema = 'main'"
+        ).fetchall()
+    }
+
+    connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS wal_events (
+            event_hash TEXT PRIMARY KEY,
+            source_id TEXT NOT NULL,
+            source_format TEXT NOT NULL,
+            schema_version INTEGER NOT NULL,
+            ts TIMESTAMP,
+            event_type TEXT NOT NULL,
+            run_id TEXT,
+            action_name TEXT,
+            project_path TEXT,
+            trigger TEXT,
+            dev_env TEXT,
+            writer_id TEXT,
+            payload_json JSON,
+            origin_file_path TEXT,
+            origin_line_no BIGINT,
+            ingested_at TIMESTAMP NOT NULL
+        )
+        """
+    )
+    connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS wal_ingest_runs (
+            ingest_run_id TEXT PRIMARY KEY,
+            started_at TIMESTAMP NOT NULL,
+            finished_at TIMESTAMP,
+            store_uri TEXT,
+            since_ts TIMESTAMP,
+            events_ingested BIGINT,
+            events_skipped_duplicate BIGINT,
+            events_failed_parse BIGINT
+        )
+        """
+    )
+    connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS wal_ingest_sources (
+            ingest_run_id TEXT NOT NULL,
+            source_id TEXT NOT NULL,
+            files_scanned BIGINT,
+            events_read BIGINT,
+            events_inserted BIGINT,
+            events_skipped_duplicate BIGINT,
+            events_failed_parse BIGINT
+        )
+        """
+    )
+    # watermarks are kept per source file, not in `wal_ingest_sources`: that table
+    # is a history with one row per ingest run and source, a watermark is the
+    # current read position in one file and is replaced on each ingest
+    connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS wal_ingest_watermarks (
+            source_id TEXT NOT NULL,
+            file_path TEXT NOT NULL,
+            byte_offset BIGINT NOT NULL,
+            line_no BIGINT NOT NULL,
+            last_sequence BIGINT,
+            head_hash TEXT,
+            updated_at TIMESTAMP NOT NULL,
+            PRIMARY KEY (source_id, file_path)
+        )
+        """
+    )
+    run_metrics.create_tables(connection)
+    connection.execute(
+        "CREATE INDEX IF NOT EXISTS idx_wal_events_run_id_ts ON wal_events(run_id, ts)"
+    )
+    connection.execute(
+        "CREATE INDEX IF NOT EXISTS idx_wal_events_source_ts ON wal_events(source_id, ts)"
+    )
+    connection.execute(
+        "CREATE INDEX IF NOT EXISTS idx_wal_events_event_type ON wal_events(event_type)"
+    )
+
+    if (
+        "wal_events" in existing_tables
+        and run_metrics.RUN_METRICS_TABLE not in existing_tables
+    ):
+        run_metrics.update_run_metrics(connection, "wal_events")
@@ -0,0 +1,190 @@
+import asyncio
+import datetime as dt
+import json
+import pathlib
+
+import duckdb
+import pytest
+from fine_wal_events.ingest_wal_to_store_action import (
+    IngestWalToStoreRunPayload,
+    IngestWalToStoreRunResult,
+    WalSourceSpec,
+)
+from fine_wal_explorer.ingest_wal_to_store_handler import (
+    IngestWalToStoreHandler,
+    IngestWalToStoreHandlerConfig,
+)
+from finecode_extension_api.resource_uri import path_to_resource_uri
+
+
+class _FakeLogger:
+    def debug(self, message: str) -> None: ...
+
+    def info(self, message: str) -> None: ...
+
+    def warning(self, message: str) -> None: ...
+
+    def error(self, message: str) -> None: ...
+
+
+def _event_line(index: int, ts: str = "2026-10-01T12:00:00+00:00") -> str:
+    return (
+        json.dumps(
+            {
+                "schema_version": 2,
+                "sequence": index,
+                "ts": ts,
+                "event_type": "run.accepted",
+                "project_path": "/project",
+                "writer_id": "writer-1",
+                "wal_run_id": f"run-{index}",
+                "action_name": "lint",
+                "payload": {},
+            }
+        )
+        + "\n"
+    )
+
+
+@pytest.fixture
+def wal_file(tmp_path: pathlib.Path) -> pathlib.Path:
+    wal_dir = tmp_path / "wal"
+    wal_dir.mkdir()
+    return wal_dir / "wal-000001.jsonl"
+
+
+@pytest.fixture
+def connection(tmp_path: pathlib.Path):
+    connection = duckdb.connect(str(tmp_path / "store.duckdb"))
+    yield connection
+    connection.close()
+
+
+class _RunContext:
+    def __init__(self, source_specs: list[WalSourceSpec]) -> None:
+        self.source_specs = source_specs
+
+
+def _ingest(
+    connection: duckdb.DuckDBPyConnection,
+    wal_file: pathlib.Path,
+    since_ts_iso: str | None = None,
+) -> IngestWalToStoreRunResult:
+    # `connection` keeps the store open, so the handler opens the same database
+    # instance and the test reads its writes
+    handler = IngestWalToStoreHandler(IngestWalToStoreHandlerConfig(), _FakeLogger())
+    spec = WalSourceSpec(
+        source_id="wm",
+        format="jsonl",
+        location_uri=path_to_resource_uri(wal_file.parent),
+    )
+    payload = IngestWalToStoreRunPayload(
+        since_ts_iso=since_ts_iso,
+        store_uri=path_to_resource_uri(wal_file.parent.parent / "store.duckdb"),
+    )
+    return asyncio.run(handler.run(payload, _RunContext([spec])))
+
+
+def _stored_lines(connection: duckdb.DuckDBPyConnection) -> list[int]:
+    return [
+        row[0]
+        for row in connection.execute(
+            "SELECT origin_line_no FROM wal_events ORDER BY origin_line_no"
+        ).fetchall()
+    ]
+
+
+def test_appended_events_are_read_from_watermark(
+    connection: duckdb.DuckDBPyConnection, wal_file: pathlib.Path
+) -> None:
+    wal_file.write_text("".join(_event_line(index) for index in range(1, 4)))
+    first = _ingest(connection, wal_file)
+    with wal_file.open("a") as handle:
+        handle.write(_event_line(4) + _event_line(5))
+
+    second = _ingest(connection, wal_file)
+    unchanged = _ingest(connection, wal_file)
+
+    assert first.events_ingested == 3
+    # already ingested lines are not read again, so they are not duplicates
+    assert (second.events_ingested, second.events_skipped_duplicate) == (2, 0)
+    assert (unchanged.events_ingested, unchanged.events_skipped_duplicate) == (0, 0)
+    assert _stored_lines(connection) == [1, 2, 3, 4, 5]
+
+
+def test_partial_last_line_is_ingested_when_completed(
+    connection: duckdb.DuckDBPyConnection, wal_file: pathlib.Path
+) -> None:
+    second_line = _event_line(2)
+    wal_file.write_text(_event_line(1) + second_line[:20])
+    first = _ingest(connection, wal_file)
+    with wal_file.open("a") as handle:
+        handle.write(second_line[20:])
+
+    second = _ingest(connection, wal_file)
+
+    assert (first.events_ingested, first.events_failed_parse) == (1, 0)
+    assert (second.events_ingested, second.events_failed_parse) == (1, 0)
+    assert _stored_lines(connection) == [1, 2]
+
+
+def test_replaced_file_is_read_from_beginning(
+    connection: duckdb.DuckDBPyConnection, wal_file: pathlib.Path
+) -> None:
+    wal_file.write_text(_event_line(1) + _event_line(2))
+    _ingest(connection, wal_file)
+    wal_file.write_text(_event_line(10))
+
+    result = _ingest(connection, wal_file)
+
+    assert (result.events_ingested, result.events_skipped_duplicate) == (1, 0)
+    assert connection.execute(
+        "SELECT run_id FROM wal_events WHERE origin_line_no = 1 ORDER BY run_id"
+    ).fetchall() == [("run-1",), ("run-10",)]
+
+
+def test_truncated_file_is_read_from_beginning(
+    connection: duckdb.DuckDBPyConnection, wal_file: pathlib.Path
+) -> None:
+    wal_file.write_text("".join(_event_line(index) for index in range(1, 4)))
+    _ingest(connection, wal_file)
+    # the same first line, but shorter than the ingested part
+    wal_file.write_text(_event_line(1) + _event_line(4))
+
+    result = _ingest(connection, wal_file)
+
+    assert (result.events_ingested, result.events_skipped_duplicate) == (1, 1)
+
+
+def test_since_ts_skips_older_events_without_moving_watermark(
+    connection: duckdb.DuckDBPyConnection, wal_file: pathlib.Path
+) -> None:
+    wal_file.write_text(
+        _event_line(1, ts="2026-10-01T10:00:00+00:00")
+        + _event_line(2, ts="2026-10-01T11:00:00+00:00")
+        + _event_line(3, ts="2026-10-01T12:00:00+00:00")
+    )
+
+    since = _ingest(connection, wal_file, since_ts_iso="2026-10-01T11:00:00Z")
+    full = _ingest(connection, wal_file)
+
+    assert since.events_ingested == 2
+    assert since.first_event_ts_iso == "2026-10-01T11:00:00+00:00"
+    assert (full.events_ingested, full.events_skipped_duplicate) == (1, 2)
+
+
+def test_timestamps_are_stored_in_session_time_zone(
+    connection: duckdb.DuckDBPyConnection, wal_file: pathlib.Path
+) -> None:
+    connection.execute("SET GLOBAL TimeZone = 'America/New_York'")
+    wal_file.write_text(_event_line(1, ts="2026-10-01T12:00:00Z"))
+
+    _ingest(connection, wal_file)
+
+    stored_ts, matches_since_param = connection.execute(
+        "SELECT ts, ts >= ? FROM wal_events",
+        [dt.datetime(2026, 10, 1, 12, tzinfo=dt.timezone.utc)],
+    ).fetchone()
+    # the same as a time zone aware query parameter is stored
+    assert stored_ts == dt.datetime(2026, 10, 1, 8, 0)
+    assert matches_since_param is True
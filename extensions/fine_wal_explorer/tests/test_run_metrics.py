@@ -0,0 +1,157 @@
+import datetime as dt
+import json
+import pathlib
+import random
+
+import duckdb
+from fine_wal_events.ingest_wal_to_store_action import WalSourceSpec
+from fine_wal_explorer import run_metrics, store_schema
+from fine_wal_explorer.ingest_wal_to_store_handler import (
+    IngestWalToStoreHandler,
+    IngestWalToStoreHandlerConfig,
+)
+from finecode_extension_api.resource_uri import path_to_resource_uri
+
+_BASE_TS = dt.datetime(2026, 10, 1, 11, 58, tzinfo=dt.timezone.utc)
+
+
+class _FakeLogger:
+    def debug(self, message: str) -> None: ...
+
+    def info(self, message: str) -> None: ...
+
+
+def _event_line(
+    sequence: int, run_id: str, event_type: str, ts: dt.datetime, action: str = "lint"
+) -> str:
+    return (
+        json.dumps(
+            {
+                "schema_version": 2,
+                "sequence": sequence,
+                "ts": ts.isoformat(),
+                "event_type": event_type,
+                "project_path": "/project",
+                "writer_id": "writer-1",
+                "wal_run_id": run_id,
+                "action_name": action,
+                "payload": {"env_name": "dev"},
+            }
+        )
+        + "\n"
+    )
+
+
+def _random_run_lines(runs_count: int) -> list[str]:
+    rng = random.Random(4)
+    events: list[tuple[dt.datetime, str, str, str]] = []
+    for index in range(runs_count):
+        ts = _BASE_TS + dt.timedelta(seconds=rng.randint(0, 7200))
+        action = rng.choice(["lint", "format"])
+        event_types = ["run.accepted", "run.dispatched"]
+        event_types.append("run.failed" if index % 5 == 0 else "run.completed")
+        for event_type in event_types:
+            ts += dt.timedelta(milliseconds=rng.randint(1, 120_000))
+            events.append((ts, f"run-{index}", event_type, action))
+    # events of a run are interleaved with other runs and split between ingests
+    events.sort()
+    return [
+        _event_line(sequence, run_id, event_type, ts, action)
+        for sequence, (ts, run_id, event_type, action) in enumerate(events, start=1)
+    ]
+
+
+def _ingest(connection: duckdb.DuckDBPyConnection, wal_dir: pathlib.Path) -> None:
+    handler = IngestWalToStoreHandler(IngestWalToStoreHandlerConfig(), _FakeLogger())
+    spec = WalSourceSpec(
+        source_id="wm", format="jsonl", location_uri=path_to_resource_uri(wal_dir)
+    )
+    handler.ingest(
+        connection, [spec], since_ts_iso=None, store_path=wal_dir / "store.duckdb"
+    )
+
+
+def _run_metrics_rows(connection: duckdb.DuckDBPyConnection) -> list[tuple]:
+    return connection.execute(
+        f"SELECT * FROM {run_metrics.RUN_METRICS_TABLE} ORDER BY ALL"
+    ).fetchall()
+
+
+def _rollup_rows(connection: duckdb.DuckDBPyConnection) -> list[tuple]:
+    return connection.execute(
+        f"SELECT * FROM {run_metrics.RUN_ROLLUPS_TABLE} ORDER BY ALL"
+    ).fetchall()
+
+
+def _recomputed_rollup_rows(connection: duckdb.DuckDBPyConnection) -> list[tuple]:
+    connection.execute(f"DELETE FROM {run_metrics.RUN_ROLLUPS_TABLE}")
+    run_metrics.refresh_rollups(
+        connection, dt.datetime(2000, 1, 1), dt.datetime(2100, 1, 1)
+    )
+    return _rollup_rows(connection)
+
+
+def test_run_started_earlier_by_later_ingest_leaves_its_old_bucket(
+    tmp_path: pathlib.Path,
+) -> None:
+    wal_file = tmp_path / "wal-000001.jsonl"
+    connection = duckdb.connect()
+    connection.execute("SET TimeZone = 'UTC'")
+    wal_file.write_text(
+        _event_line(1, "run-1", "run.dispatched", _BASE_TS + dt.timedelta(minutes=7))
+    )
+    _ingest(connection, tmp_path)
+    with wal_file.open("a") as handle:
+        handle.write(
+            _event_line(2, "run-1", "run.accepted", _BASE_TS + dt.timedelta(minutes=5))
+        )
+
+    _ingest(connection, tmp_path)
+
+    minute_runs = connection.execute(
+        f"""
+        SELECT bucket_start, runs FROM {run_metrics.RUN_ROLLUPS_TABLE}
+        WHERE bucket = 'minute'
+        """
+    ).fetchall()
+    assert minute_runs == [(dt.datetime(2026, 10, 1, 12, 3), 1)]
+    assert connection.execute(
+        f"SELECT queue_latency_ms FROM {run_metrics.RUN_METRICS_TABLE}"
+    ).fetchall() == [(120_000,)]
+
+
+def test_ingest_split_in_batches_equals_single_ingest(tmp_path: pathlib.Path) -> None:
+    lines = _random_run_lines(120)
+    wal_file = tmp_path / "wal-000001.jsonl"
+    split_connection = duckdb.connect()
+    single_connection = duckdb.connect()
+    for start, end in ((0, 100), (100, 250), (250, len(lines))):
+        with wal_file.open("a") as handle:
+            handle.write("".join(lines[start:end]))
+        _ingest(split_connection, tmp_path)
+
+    _ingest(single_connection, tmp_path)
+
+    split_rollups = _rollup_rows(split_connection)
+    assert _run_metrics_rows(split_connection) == _run_metrics_rows(single_connection)
+    assert split_rollups == _rollup_rows(single_connection)
+    assert split_rollups == _recomputed_rollup_rows(split_connection)
+
+
+def test_run_metrics_of_existing_store_are_filled_on_schema_update(
+    tmp_path: pathlib.Path,
+) -> None:
+    (tmp_path / "wal-000001.jsonl").write_text("".join(_random_run_lines(30)))
+    connection = duckdb.connect()
+    _ingest(connection, tmp_path)
+    run_metrics_rows = _run_metrics_rows(connection)
+    rollup_rows = _rollup_rows(connection)
+    # a store created before run metrics were added
+    connection.execute(f"DROP TABLE {run_metrics.RUN_METRICS_TABLE}")
+    connection.execute(f"DROP TABLE {run_metrics.RUN_ROLLUPS_TABLE}")
+
+    store_schema.ensure_schema(connection)
+
+    assert len(run_metrics_rows) == 30
+    assert _run_metrics_rows(connection) == run_metrics_rows
+    assert _rollup_rows(connection) == rollup_rows
@@ -0,0 +1,253 @@
+import http.client
+import pathlib
+import queue
+import threading
+import time
+from typing import Any
+
+import duckdb
+import pytest
+from fine_wal_events.ingest_wal_to_store_action import (
+    IngestWalToStoreRunResult,
+    WalSourceSpec,
+)
+from fine_wal_explorer import serve_wal_explorer_from_store_handler as serve_handler
+from finecode_extension_api.interfaces import iprojectinfoprovider
+from finecode_extension_api.resource_uri import path_to_resource_uri
+
+
+class _FakeLogger:
+    def debug(self, message: str) -> None: ...
+
+    def info(self, message: str) -> None: ...
+
+    def warning(self, message: str) -> None: ...
+
+    def error(self, message: str) -> None: ...
+
+
+class _FakeProjectInfoProvider:
+    def __init__(self, raw_config: dict[str, Any] | None) -> None:
+        self._raw_config = raw_config
+
+    async def get_current_project_raw_config(self) -> dict[str, Any]:
+        if self._raw_config is None:
+            raise iprojectinfoprovider.ProjectInfoUnavailableError("no WM")
+        return self._raw_config
+
+
+def _wait_until(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise TimeoutError("condition was not met")
+        time.sleep(0.01)
+
+
+def test_read_pool_acquire_fails_when_all_connections_are_busy(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(serve_handler, "_READ_POOL_TIMEOUT_SEC", 0.05)
+    pool = serve_handler._ReadConnectionPool(duckdb.connect(), size=1)
+
+    with pool.acquire():
+        with pytest.raises(serve_handler._ServiceUnavailableError):
+            with pool.acquire():
+                pass
+
+    # the connection is returned to the pool after the failed attempt
+    with pool.acquire() as connection:
+        assert connection.execute("SELECT 1").fetchone() == (1,)
+
+
+def test_read_pool_close_waits_for_running_query() -> None:
+    pool = serve_handler._ReadConnectionPool(duckdb.connect(), size=2)
+    acquired = threading.Event()
+    release = threading.Event()
+    query_results: list[tuple] = []
+
+    def run_request() -> None:
+        with pool.acquire() as connection:
+            acquired.set()
+            release.wait()
+            query_results.append(connection.execute("SELECT 42").fetchone())
+
+    request_thread = threading.Thread(target=run_request)
+    request_thread.start()
+    acquired.wait()
+    close_thread = threading.Thread(target=pool.close)
+    close_thread.start()
+    close_thread.join(timeout=0.1)
+
+    assert close_thread.is_alive()
+    release.set()
+    request_thread.join()
+    close_thread.join(timeout=5)
+    assert not close_thread.is_alive()
+    assert query_results == [(42,)]
+
+
+def test_live_feed_drops_messages_of_full_subscriber() -> None:
+    live_feed = serve_handler._LiveFeed()
+    subscriber = live_feed.subscribe()
+
+    for index in range(serve_handler._LIVE_SUBSCRIBER_MAX_MESSAGES + 10):
+        live_feed.publish("events", {"index": index})
+
+    assert subscriber.qsize() == serve_handler._LIVE_SUBSCRIBER_MAX_MESSAGES
+    assert subscriber.get_nowait() == 'event: events\ndata: {"index": 0}\n\n'
+
+
+def test_live_feed_close_ends_current_and_new_subscriptions() -> None:
+    live_feed = serve_handler._LiveFeed()
+    subscriber = live_feed.subscribe()
+    for index in range(serve_handler._LIVE_SUBSCRIBER_MAX_MESSAGES):
+        live_feed.publish("events", {"index": index})
+
+    live_feed.close()
+    live_feed.publish("events", {"index": -1})
+
+    # pending messages of a full queue are dropped to deliver the end
+    assert subscriber.get_nowait() is None
+    with pytest.raises(queue.Empty):
+        subscriber.get_nowait()
+    assert live_feed.subscribe().get_nowait() is None
+
+
+def test_tailer_ingests_polled_file_changes(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(serve_handler, "watchdog_observers", None)
+    wal_file = tmp_path / "wal-000001.jsonl"
+    wal_file.write_text("{}\n")
+    ingested_sizes: list[int] = []
+    pushed: list[IngestWalToStoreRunResult] = []
+
+    def ingest(
+        source_specs: list[WalSourceSpec], since_ts_iso: str | None
+    ) -> IngestWalToStoreRunResult:
+        ingested_sizes.append(wal_file.stat().st_size)
+        return IngestWalToStoreRunResult(events_ingested=1)
+
+    tailer = serve_handler._WalTailer(
+        source_groups=[
+            [
+                WalSourceSpec(
+                    source_id="wm",
+                    format="jsonl",
+                    location_uri=path_to_resource_uri(tmp_path),
+                )
+            ]
+        ],
+        ingest=ingest,
+        on_ingested=lambda result, ingested_from: pushed.append(result),
+        poll_interval_sec=0.02,
+        logger=_FakeLogger(),
+    )
+    tailer.start()
+    try:
+        _wait_until(lambda: len(ingested_sizes) == 1)
+        time.sleep(0.1)
+        # unchanged files are not ingested again
+        assert len(ingested_sizes) == 1
+
+        with wal_file.open("a") as handle:
+            handle.write("{}\n")
+        _wait_until(lambda: len(ingested_sizes) == 2)
+    finally:
+        tailer.stop()
+
+    assert ingested_sizes == [3, 6]
+    assert len(pushed) == 2
+
+
+def test_live_stream_ends_when_server_stops() -> None:
+    live_feed = serve_handler._LiveFeed()
+    server = serve_handler._build_http_server(
+        "127.0.0.1",
+        0,
+        serve_handler._ServeState(connection=None),
+        _FakeLogger(),
+        trigger_ingest=lambda request_payload: {},
+        live_feed=live_feed,
+    )
+    server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+    server_thread.start()
+    http_connection = http.client.HTTPConnection(
+        "127.0.0.1", server.server_address[1], timeout=5
+    )
+    try:
+        http_connection.request("GET", "/live")
+        response = http_connection.getresponse()
+        assert response.getheader("Content-Type") == "text/event-stream"
+        assert response.read(len(b"event: live\ndata: {}\n\n")) == (
+            b"event: live\ndata: {}\n\n"
+        )
+        live_feed.publish("events", {"events_ingested": 1})
+        assert response.readline() == b"event: events\n"
+        assert response.readline() == b'data: {"events_ingested": 1}\n'
+
+        # the same order as at the end of the serve action
+        live_feed.close()
+        server.shutdown()
+        rest = response.read()
+    finally:
+        http_connection.close()
+        server.server_close()
+        server_thread.join(timeout=5)
+
+    assert rest == b"\n"
+    assert not server_thread.is_alive()
+
+
+def _make_handler(
+    raw_config: dict[str, Any] | None,
+) -> serve_handler.ServeWalExplorerFromStoreHandler:
+    return serve_handler.ServeWalExplorerFromStoreHandler(
+        config=serve_handler.ServeWalExplorerFromStoreHandlerConfig(),
+        action_runner=None,  # type: ignore[arg-type]
+        workspace_runner=None,  # type: ignore[arg-type]
+        project_info_provider=_FakeProjectInfoProvider(raw_config),  # type: ignore[arg-type]
+        logger=_FakeLogger(),  # type: ignore[arg-type]
+    )
+
+
+async def test_live_ingest_uses_config_of_ingest_handler() -> None:
+    raw_config = {
+        "tool": {
+            "finecode": {
+                "action": {
+                    "ingest_wal_to_store": {
+                        "handlers": [
+                            {
+                                "name": "ingest_wal_to_store",
+                                "source": "fine_wal_explorer.IngestWalToStoreHandler",
+                                "config": {"batch_size": 50},
+                            }
+                        ]
+                    }
+                },
+                "action_handler": [
+                    {
+                        "source": "fine_wal_explorer.IngestWalToStoreHandler",
+                        "config": {"batch_size": 200},
+                    }
+                ],
+            }
+        }
+    }
+    warnings: list[str] = []
+
+    config = await _make_handler(raw_config)._get_ingest_handler_config(warnings)
+
+    assert config.batch_size == 50
+    assert warnings == []
+
+
+async def test_live_ingest_uses_default_config_without_project_config() -> None:
+    warnings: list[str] = []
+
+    config = await _make_handler(None)._get_ingest_handler_config(warnings)
+
+    assert config == serve_handler.IngestWalToStoreHandlerConfig()
+    assert len(warnings) == 1
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 import asyncio
-import threading
+import collections.abc
+import typing
 from pathlib import Path
 from typing import Any, override
 
@@ -10,6 +11,10 @@ from finecode_extension_api.interfaces import ifileeditor, ilogger, ilspclient
 
 # JSON-RPC "RequestCancelled" code
 _REQUEST_CANCELLED_CODE = -32800
+# documents synced and checked at the same time by `check_files`
+_DEFAULT_MAX_CHECKS_IN_FLIGHT = 64
+
+CheckResultT = typing.TypeVar("CheckResultT")
 
 
 class LspService(service.DisposableService):
@@ -22,6 +27,11 @@ class LspService(service.DisposableService):
     compares the content version against what was last sent to LSP, and sends
     didOpen/didChange directly only when the content has changed.
 
+    Diagnostics are pulled (``textDocument/diagnostic``) if both the client
+    capabilities passed to the service and the server support it, otherwise they
+    are awaited from ``textDocument/publishDiagnostics``. ``check_files`` checks
+    many files at once, see its docstring.
+
     Settings management:
         Settings are managed via ``update_settings(settings)`` (sync) which merges
         into the internal ``_settings`` dict. Handlers call ``update_settings`` in
@@ -63,10 +73,14 @@ class LspService(service.DisposableService):
         self._session: ilspclient.ILspSession | None = None
         self._event_task: asyncio.Task[None] | None = None
         self._start_lock: asyncio.Lock = asyncio.Lock()
-        # pending diagnostics waiters: uri -> Event (threading for cross-thread safety)
-        self._diagnostics: dict[str, threading.Event] = {}
+        # pending waiters for pushed diagnostics: uri -> future. Notifications are
+        # handled in the IO thread of the LSP client, futures are resolved
+        # thread-safely in the loop they belong to.
+        self._diagnostics: dict[str, asyncio.Future[None]] = {}
         # last received diagnostics per uri (persistent cache)
         self._diagnostics_data: dict[str, list[dict[str, Any]]] = {}
+        # uri -> resultId of the last pulled diagnostic report
+        self._diagnostics_result_ids: dict[str, str] = {}
         # uri -> content version last sent to LSP (for change detection)
         self._file_versions: dict[str, str] = {}
         # uris currently open in the LSP server
@@ -108,6 +122,7 @@ class LspService(service.DisposableService):
 
         self._diagnostics.clear()
         self._diagnostics_data.clear()
+        self._diagnostics_result_ids.clear()
         self._file_versions.clear()
         self._open_documents.clear()
         self._document_version.clear()
@@ -270,11 +285,30 @@ class LspService(service.DisposableService):
         """
         assert self._session is not None, "LspService not started"
         if file_path not in self._file_editor.get_opened_files():
+            await self._close_document(uri)
+
+    async def _close_documents_not_editor_open(self, file_paths: list[Path]) -> None:
+        """Bulk version of `_close_if_not_editor_open`, the opened files are listed
+        once for all of them."""
+        opened_files = set(self._file_editor.get_opened_files())
+        for file_path in file_paths:
+            if file_path not in opened_files:
+                await self._close_document(file_path.as_uri())
+
+    async def _close_document(self, uri: str) -> None:
+        assert self._session is not None, "LspService not started"
+        async with self._get_uri_lock(uri):
+            if uri not in self._open_documents:
+                return
             await self._session.send_notification(
                 "textDocument/didClose",
                 {"textDocument": {"uri": uri}},
             )
             self._open_documents.discard(uri)
+            # the next sync must open the document again, even if content didn't
+            # change
+            self._file_versions.pop(uri, None)
+            self._diagnostics_result_ids.pop(uri, None)
 
     async def _send_cancellable_request(
         self,
@@ -314,36 +348,270 @@ class LspService(service.DisposableService):
         """Check a file and return raw LSP diagnostics."""
         assert self._session is not None, "LspService not started"
 
-        uri = file_path.as_uri()
+        async with self._file_editor.session(
+            author=self._file_operation_author
+        ) as fe_session:
+            diagnostics = await self._check_document(fe_session, file_path, timeout)
+
+        await self._close_if_not_editor_open(file_path, file_path.as_uri())
+
+        return diagnostics
+
+    async def check_files(
+        self,
+        file_paths: list[Path],
+        timeout: float = 30.0,
+        max_in_flight: int = _DEFAULT_MAX_CHECKS_IN_FLIGHT,
+    ) -> dict[Path, list[dict[str, Any]]]:
+        """Check many files and return raw LSP diagnostics per file.
+
+        Files are checked like in `check_files_iter`. If checking of a file fails,
+        the other files are still checked and the first error is raised afterwards.
+        """
+        diagnostics_by_file: dict[Path, list[dict[str, Any]]] = {}
+        first_error: Exception | None = None
+        async for file_path, check_result in self.check_files_iter(
+            file_paths, timeout, max_in_flight
+        ):
+            if isinstance(check_result, Exception):
+                if first_error is None:
+                    first_error = check_result
+            else:
+                diagnostics_by_file[file_path] = check_result
+
+        if first_error is not None:
+            raise first_error
+        return diagnostics_by_file
+
+    async def check_files_iter(
+        self,
+        file_paths: list[Path],
+        timeout: float = 30.0,
+        max_in_flight: int = _DEFAULT_MAX_CHECKS_IN_FLIGHT,
+    ) -> collections.abc.AsyncIterator[tuple[Path, list[dict[str, Any]] | Exception]]:
+        """Check many files and yield raw LSP diagnostics of each file as soon as
+        it is checked.
+
+        If the server supports workspace diagnostics, all files are checked with a
+        single ``workspace/diagnostic`` request, after the content of files open in
+        the file editor was synced. Files missing in its report or all files if the
+        request fails are checked one by one. Documents are synced
+        and checked for up to ``max_in_flight`` files at the same time, so that the
+        LSP round-trips overlap. Documents opened for the check are closed after
+        all files were checked.
+
+        If checking of a file fails, the exception is yielded as its result and
+        the other files are still checked.
+        """
+        assert self._session is not None, "LspService not started"
+
+        files_to_check = file_paths
+        if self._supports_workspace_diagnostics():
+            try:
+                await self._sync_editor_open_documents(file_paths)
+                diagnostics_by_uri = await self._pull_workspace_diagnostics(timeout)
+            except Exception as exception:
+                self._logger.warning(
+                    f"Workspace diagnostics request failed, check files one by"
+                    f" one: {exception}"
+                )
+            else:
+                files_to_check = []
+                for file_path in file_paths:
+                    file_diagnostics = diagnostics_by_uri.get(file_path.as_uri())
+                    if file_diagnostics is None:
+                        files_to_check.append(file_path)
+                    else:
+                        yield file_path, file_diagnostics
+
+        check_slots = asyncio.Semaphore(max_in_flight)
+
+        async def check(
+            fe_session: ifileeditor.IFileEditorSession, file_path: Path
+        ) -> tuple[Path, list[dict[str, Any]] | Exception]:
+            async with check_slots:
+                try:
+                    return file_path, await self._check_document(
+                        fe_session, file_path, timeout
+                    )
+                except Exception as exception:
+                    return file_path, exception
+
+        try:
+            async with self._file_editor.session(
+                author=self._file_operation_author
+            ) as fe_session:
+                checks = [
+                    asyncio.create_task(check(fe_session, file_path))
+                    for file_path in files_to_check
+                ]
+                try:
+                    for next_check in asyncio.as_completed(checks):
+                        yield await next_check
+                finally:
+                    # the caller stopped iterating
+                    for check_task in checks:
+                        check_task.cancel()
+                    await asyncio.gather(*checks, return_exceptions=True)
+        finally:
+            await self._close_documents_not_editor_open(files_to_check)
+
+    async def _sync_editor_open_documents(self, file_paths: list[Path]) -> None:
+        """Sync content of the files open in the file editor, so that the server
+        reports on unsaved changes like `_check_document` does."""
+        opened_files = set(self._file_editor.get_opened_files())
+        files_to_sync = [
+            file_path for file_path in file_paths if file_path in opened_files
+        ]
+        if len(files_to_sync) == 0:
+            return
 
         async with self._file_editor.session(
             author=self._file_operation_author
         ) as fe_session:
-            async with fe_session.read_file(file_path) as file_info:
-                content = file_info.content
+            for file_path in files_to_sync:
+                async with fe_session.read_file(file_path) as file_info:
+                    content = file_info.content
+                await self._sync_document(file_path.as_uri(), content)
 
-        event = threading.Event()
-        self._diagnostics[uri] = event
+    async def _check_document(
+        self,
+        fe_session: ifileeditor.IFileEditorSession,
+        file_path: Path,
+        timeout: float,
+    ) -> list[dict[str, Any]]:
+        uri = file_path.as_uri()
+        async with fe_session.read_file(file_path) as file_info:
+            content = file_info.content
 
-        if not await self._sync_document(uri, content):
-            # LSP already has the current content; return cached diagnostics
-            self._diagnostics.pop(uri, None)
+        if self._uses_pull_diagnostics():
+            await self._sync_document(uri, content)
+            return await self._pull_document_diagnostics(uri, timeout)
+
+        # register the waiter before syncing, the server can publish diagnostics
+        # right after didOpen/didChange
+        waiter = asyncio.get_running_loop().create_future()
+        self._diagnostics[uri] = waiter
+        try:
+            if not await self._sync_document(uri, content):
+                # LSP already has the current content; return cached diagnostics
+                return self._diagnostics_data.get(uri, [])
+
+            try:
+                await asyncio.wait_for(waiter, timeout)
+            except TimeoutError:
+                self._logger.warning(
+                    f"Timeout waiting for LSP diagnostics for {file_path}"
+                )
+            else:
+                if not self._diagnostics_data.get(uri):
+                    # Got empty initial diagnostics; some servers (e.g. pyrefly)
+                    # send an empty ack first, then the real diagnostics after
+                    # analysis. Wait a short settle time for follow-up
+                    # notifications.
+                    waiter = asyncio.get_running_loop().create_future()
+                    self._diagnostics[uri] = waiter
+                    try:
+                        await asyncio.wait_for(waiter, 1.0)
+                    except TimeoutError:
+                        pass
+        finally:
+            if self._diagnostics.get(uri) is waiter:
+                del self._diagnostics[uri]
+
+        return self._diagnostics_data.get(uri, [])
+
+    def _uses_pull_diagnostics(self) -> bool:
+        # servers push diagnostics to clients that don't declare pull support,
+        # even if they announce a diagnostic provider
+        client_text_document_capabilities = (self._client_capabilities or {}).get(
+            "textDocument", {}
+        )
+        return (
+            "diagnostic" in client_text_document_capabilities
+            and bool(self._server_capabilities.get("diagnosticProvider"))
+        )
+
+    def _supports_workspace_diagnostics(self) -> bool:
+        if not self._uses_pull_diagnostics():
+            return False
+        diagnostic_provider = self._server_capabilities["diagnosticProvider"]
+        return isinstance(diagnostic_provider, dict) and bool(
+            diagnostic_provider.get("workspaceDiagnostics")
+        )
+
+    def _get_diagnostic_identifier(self) -> str | None:
+        diagnostic_provider = self._server_capabilities.get("diagnosticProvider")
+        if isinstance(diagnostic_provider, dict):
+            return diagnostic_provider.get("identifier")
+        return None
+
+    async def _pull_document_diagnostics(
+        self, uri: str, timeout: float
+    ) -> list[dict[str, Any]]:
+        params: dict[str, Any] = {"textDocument": {"uri": uri}}
+        identifier = self._get_diagnostic_identifier()
+        if identifier is not None:
+            params["identifier"] = identifier
+        previous_result_id = self._diagnostics_result_ids.get(uri)
+        if previous_result_id is not None:
+            params["previousResultId"] = previous_result_id
+
+        try:
+            report = await self._send_cancellable_request(
+                "textDocument/diagnostic", params, timeout=timeout
+            )
+        except TimeoutError:
+            self._logger.warning(f"Timeout waiting for LSP diagnostics for {uri}")
             return self._diagnostics_data.get(uri, [])
 
-        was_set = await asyncio.to_thread(event.wait, timeout)
-        if not was_set:
-            self._logger.warning(f"Timeout waiting for LSP diagnostics for {file_path}")
-        elif not self._diagnostics_data.get(uri):
-            # Got empty initial diagnostics; some servers (e.g. pyrefly) send
-            # an empty ack first, then the real diagnostics after analysis.
-            # Wait a short settle time for follow-up notifications.
-            event.clear()
-            await asyncio.to_thread(event.wait, 1.0)
+        return self._save_diagnostic_report(uri, report)
+
+    async def _pull_workspace_diagnostics(
+        self, timeout: float
+    ) -> dict[str, list[dict[str, Any]]]:
+        params: dict[str, Any] = {
+            "previousResultIds": [
+                {"uri": uri, "value": result_id}
+                for uri, result_id in self._diagnostics_result_ids.items()
+            ]
+        }
+        identifier = self._get_diagnostic_identifier()
+        if identifier is not None:
+            params["identifier"] = identifier
 
-        self._diagnostics.pop(uri, None)
+        try:
+            report = await self._send_cancellable_request(
+                "workspace/diagnostic", params, timeout=timeout
+            )
+        except TimeoutError:
+            self._logger.warning("Timeout waiting for LSP workspace diagnostics")
+            return {}
+
+        diagnostics_by_uri: dict[str, list[dict[str, Any]]] = {}
+        for document_report in (report or {}).get("items", []):
+            uri = document_report.get("uri")
+            if uri:
+                diagnostics_by_uri[uri] = self._save_diagnostic_report(
+                    uri, document_report
+                )
+        return diagnostics_by_uri
 
-        await self._close_if_not_editor_open(file_path, uri)
+    def _save_diagnostic_report(
+        self, uri: str, report: dict[str, Any] | None
+    ) -> list[dict[str, Any]]:
+        """Remember a full or unchanged diagnostic report and return the current
+        diagnostics of the document."""
+        if report is None:
+            return self._diagnostics_data.get(uri, [])
 
+        if report.get("kind") == "full":
+            self._diagnostics_data[uri] = report.get("items", [])
+        result_id = report.get("resultId")
+        if result_id is not None:
+            self._diagnostics_result_ids[uri] = result_id
+        else:
+            self._diagnostics_result_ids.pop(uri, None)
         return self._diagnostics_data.get(uri, [])
 
     async def format_file(
@@ -856,9 +1124,89 @@ class LspService(service.DisposableService):
         diagnostics = params.get("diagnostics", [])
         self._diagnostics_data[uri] = diagnostics
 
-        event = self._diagnostics.get(uri)
-        if event is not None:
-            event.set()
+        waiter = self._diagnostics.get(uri)
+        if waiter is not None:
+            waiter.get_loop().call_soon_threadsafe(_resolve_waiter, waiter)
+
+
+class LspCheckBatch(typing.Generic[CheckResultT]):
+    """Checks files, whose results are scheduled as separate partial results, with
+    one batched call like `LspService.check_files_iter`.
+
+    The first `get` call starts checking of all files of the batch. Each call waits
+    only for the result of its file, which is available as soon as the file is
+    checked, and raises only if checking of its file failed. Checking is cancelled
+    when all calls are cancelled.
+    """
+
+    def __init__(
+        self,
+        check_files_iter: collections.abc.Callable[
+            [list[Path]],
+            collections.abc.AsyncIterator[tuple[Path, CheckResultT | Exception]],
+        ],
+        file_paths: list[Path],
+    ) -> None:
+        self._check_files_iter = check_files_iter
+        self.file_paths = file_paths
+        self._file_paths_set = set(file_paths)
+        self._results: dict[Path, asyncio.Future[CheckResultT]] = {}
+        self._check_task: asyncio.Task[None] | None = None
+
+    def __contains__(self, file_path: Path) -> bool:
+        return file_path in self._file_paths_set
+
+    async def get(self, file_path: Path) -> CheckResultT:
+        """Raises:
+        KeyError: ``file_path`` is not in the batch.
+        """
+        if file_path not in self._file_paths_set:
+            raise KeyError(file_path)
+        if self._check_task is None:
+            loop = asyncio.get_running_loop()
+            for batch_file_path in self._file_paths_set:
+                result = loop.create_future()
+                result.add_done_callback(self._on_result_done)
+                self._results[batch_file_path] = result
+            self._check_task = asyncio.create_task(self._check())
+        return await self._results[file_path]
+
+    async def _check(self) -> None:
+        try:
+            async for file_path, check_result in self._check_files_iter(
+                self.file_paths
+            ):
+                result = self._results.get(file_path)
+                if result is None or result.done():
+                    continue
+                if isinstance(check_result, Exception):
+                    result.set_exception(check_result)
+                else:
+                    result.set_result(check_result)
+        except Exception as exception:
+            for result in self._results.values():
+                if not result.done():
+                    result.set_exception(exception)
+            return
+
+        for file_path, result in self._results.items():
+            if not result.done():
+                result.set_exception(
+                    RuntimeError(f"No check result for {file_path}")
+                )
+
+    def _on_result_done(self, _result: asyncio.Future[CheckResultT]) -> None:
+        if (
+            self._check_task is not None
+            and not self._check_task.done()
+            and all(result.cancelled() for result in self._results.values())
+        ):
+            self._check_task.cancel()
+
+
+def _resolve_waiter(waiter: asyncio.Future[None]) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
 
 
 def apply_text_edits(content: str, edits: list[dict[str, Any]]) -> str:
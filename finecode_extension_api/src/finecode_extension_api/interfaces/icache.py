@@ -1,14 +1,124 @@
+import dataclasses
+import functools
+import hashlib
+import importlib.metadata
+import json
+import sys
 from pathlib import Path
 from typing import Any, Protocol
 
 
 class ICache(Protocol):
+    """File-versioned cache of values computed from file content.
+
+    A value is saved together with the version of the file it was computed from
+    and is returned only while the file still has that version. Implementations
+    may keep values in memory only or persist them across runner restarts; in the
+    latter case ``key`` must identify everything besides file content that the
+    value depends on (see ``make_cache_key``).
+    """
+
     async def save_file_cache(
-        self, file_path: Path, file_version: str, key: str, value: Any
-    ) -> None: ...
+        self,
+        file_path: Path,
+        file_version: str,
+        key: str,
+        value: Any,
+        *,
+        persistent: bool = True,
+    ) -> None:
+        """Save ``value`` computed from ``file_version`` of the file.
+
+        Pass ``persistent=False`` for values that depend not only on the file itself
+        but also on other files (e.g. type checking results): they are valid only as
+        long as the caller tracks those dependencies and must not outlive the runner.
+        """
+        ...
+
+    async def get_file_cache(self, file_path: Path, key: str) -> Any:
+        """Return the cached value for the current version of the file.
 
-    async def get_file_cache(self, file_path: Path, key: str) -> Any: ...
+        Raises:
+            CacheMissException: no value is cached for the current file version.
+        """
+        ...
 
 
 class CacheMissException(Exception):
     pass
+
+
+def make_cache_key(
+    name: str, *dependencies: Any, handler_type: type | None = None
+) -> str:
+    """Build a cache key that changes whenever any of ``dependencies`` changes.
+
+    Use it for values that may outlive the current runner: pass the handler config
+    and the version of the wrapped tool so that a persistent cache never returns a
+    result computed with different settings. Pass ``handler_type`` to make the key
+    change also with the code of the handler: digest of its module source and the
+    version of the distribution that provides it.
+    """
+    if handler_type is not None:
+        dependencies = (*dependencies, _get_code_version(handler_type))
+    if len(dependencies) == 0:
+        return name
+
+    serialized = json.dumps(
+        [
+            dataclasses.asdict(dependency)
+            if dataclasses.is_dataclass(dependency) and not isinstance(dependency, type)
+            else dependency
+            for dependency in dependencies
+        ],
+        sort_keys=True,
+        default=str,
+    )
+    digest = hashlib.sha256(serialized.encode()).hexdigest()
+    # the name stays readable in logs and cache stats, the digest is only needed to
+    # distinguish configurations
+    return f"{name}:{digest[:16]}"
+
+
+def _get_code_version(obj_type: type) -> list[str | None]:
+    module_name = obj_type.__module__
+    return [
+        _get_module_source_digest(module_name),
+        _get_distribution_version(module_name),
+    ]
+
+
+@functools.cache
+def _get_module_source_digest(module_name: str) -> str | None:
+    # the distribution version doesn't change on edits of an editable install
+    module_file_path = getattr(sys.modules.get(module_name), "__file__", None)
+    if module_file_path is None:
+        return None
+    try:
+        with open(module_file_path, "rb") as module_file:
+            return hashlib.file_digest(module_file, "sha256").hexdigest()
+    except OSError:
+        return None
+
+
+@functools.cache
+def _get_distribution_version(module_name: str) -> str | None:
+    top_level_package = module_name.split(".", 1)[0]
+    distribution_names = _get_packages_distributions().get(top_level_package, [])
+    versions: list[str] = []
+    for distribution_name in sorted(set(distribution_names)):
+        try:
+            versions.append(
+                f"{distribution_name}=={importlib.metadata.version(distribution_name)}"
+            )
+        except importlib.metadata.PackageNotFoundError:
+            continue
+    if len(versions) == 0:
+        return None
+    return ",".join(versions)
+
+
+@functools.cache
+def _get_packages_distributions() -> dict[str, list[str]]:
+    # scans metadata of all installed distributions, do it once per process
+    return dict(importlib.metadata.packages_distributions())
@@ -1,6 +1,8 @@
+import collections.abc
 import typing
 
 T = typing.TypeVar("T")
+R = typing.TypeVar("R")
 P = typing.ParamSpec("P")
 
 
@@ -8,3 +10,31 @@ class IProcessExecutor(typing.Protocol):
     async def submit(
         self, func: typing.Callable[P, T], *args: P.args, **kwargs: P.kwargs
     ): ...
+
+    async def map(
+        self,
+        func: typing.Callable[..., R],
+        items: collections.abc.Sequence[T],
+        *args: typing.Any,
+        chunk_size: int | None = None,
+    ) -> list[R]:
+        """
+        Call `func(item, *args)` for every item in worker processes.
+
+        Items are sent to workers in chunks, one inter-process call per chunk, so
+        that many small items are not dominated by IPC. Worker processes are
+        shared by the runner and kept between action runs: expensive setup like
+        tool configuration can be cached in module-level functions of the worker
+        (e.g. with `functools.cache`).
+
+        Args:
+            func: Picklable module-level function
+            items: Items, each of them is passed as the first argument of `func`
+            args: Arguments passed to every call of `func` after the item
+            chunk_size: Number of items per chunk, by default chosen by number
+                of items and workers
+
+        Returns:
+            Results of `func` in the order of items
+        """
+        ...
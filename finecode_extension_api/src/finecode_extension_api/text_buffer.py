@@ -0,0 +1,201 @@
+import bisect
+import re
+import sys
+
+# line endings recognized by LSP
+_LINE_RE = re.compile(r"[^\r\n]*(?:\r\n|\r|\n)|[^\r\n]+$")
+# lines are stored in chunks so that an edit touches only a few short lists and
+# lookup of a line is a binary search over chunk starts
+_MAX_CHUNK_LINES = 256
+# character position clamped to the end of any line
+_END_OF_LINE = sys.maxsize
+
+
+def split_lines(text: str) -> list[str]:
+    """Split ``text`` into lines with their line endings.
+
+    The last line has no line ending and is empty if ``text`` ends with one, so
+    the result always has one line more than there are line endings.
+    """
+    lines = _LINE_RE.findall(text)
+    if len(lines) == 0 or lines[-1].endswith(("\n", "\r")):
+        lines.append("")
+    return lines
+
+
+def _strip_line_ending(line: str) -> str:
+    if line.endswith("\r\n"):
+        return line[:-2]
+    if line.endswith(("\n", "\r")):
+        return line[:-1]
+    return line
+
+
+def utf16_to_index(line: str, character: int) -> int:
+    """Convert a UTF-16 based column in ``line`` (without line ending) to a string
+    index. Columns beyond the line are clamped to its length.
+    """
+    if line.isascii():
+        return min(character, len(line))
+
+    units = 0
+    for index, char in enumerate(line):
+        if units >= character:
+            return index
+        units += 2 if ord(char) > 0xFFFF else 1
+    return len(line)
+
+
+class TextBuffer:
+    """Mutable text of an opened document.
+
+    Applying a range change costs time proportional to the changed lines, not to
+    the document size: lines are kept in chunks and found by binary search. The
+    full text is built only when it is read and is reused until the next change.
+
+    Positions are LSP positions: zero-based line and UTF-16 based character.
+    """
+
+    def __init__(self, text: str = "") -> None:
+        self._chunks: list[list[str]] = []
+        # number of the first line of each chunk
+        self._chunk_starts: list[int] = []
+        self._line_count = 0
+        self._text: str | None = None
+        self.set_text(text)
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = "".join(line for chunk in self._chunks for line in chunk)
+        return self._text
+
+    @property
+    def line_count(self) -> int:
+        return self._line_count
+
+    def get_line(self, line: int) -> str:
+        """Return the line with its line ending.
+
+        Raises:
+            IndexError: the line doesn't exist.
+        """
+        if line < 0 or line >= self._line_count:
+            raise IndexError(f"Line {line} is out of range 0..{self._line_count - 1}")
+        chunk_index = bisect.bisect_right(self._chunk_starts, line) - 1
+        return self._chunks[chunk_index][line - self._chunk_starts[chunk_index]]
+
+    def set_text(self, text: str) -> bool:
+        """Replace the whole text. Returns whether the text changed."""
+        if self._text is not None and self._text == text:
+            return False
+        self._chunks = []
+        self._chunk_starts = []
+        self._line_count = 0
+        self._replace_chunks(0, 0, split_lines(text))
+        self._text = text
+        return True
+
+    def replace(
+        self,
+        start_line: int,
+        start_character: int,
+        end_line: int,
+        end_character: int,
+        text: str,
+    ) -> bool:
+        """Replace the range with ``text``. Returns whether the text changed.
+
+        Characters beyond the end of a line are clamped to the line end and an end
+        beyond the last line to the end of the document, as LSP requires.
+
+        Raises:
+            ValueError: the range is invalid.
+        """
+        if start_line < 0 or end_line < 0:
+            raise ValueError("Invalid range: negative line numbers not allowed")
+        if end_line < start_line or (
+            end_line == start_line and end_character < start_character
+        ):
+            raise ValueError("Invalid range: end position is before start position")
+        if start_line > self._line_count:
+            raise ValueError(
+                f"Invalid range: start line {start_line} is beyond file length"
+                f" {self._line_count}"
+            )
+
+        last_line = self._line_count - 1
+        if start_line > last_line:
+            # insertion right after the end of the document
+            start_line = last_line
+            start_character = _END_OF_LINE
+        if end_line > last_line:
+            end_line = last_line
+            end_character = _END_OF_LINE
+
+        first_line = start_line
+        old_lines = [self.get_line(line) for line in range(start_line, end_line + 1)]
+        first_line_content = _strip_line_ending(old_lines[0])
+        last_line_content = _strip_line_ending(old_lines[-1])
+        prefix = first_line_content[
+            : utf16_to_index(first_line_content, start_character)
+        ]
+        suffix = old_lines[-1][utf16_to_index(last_line_content, end_character) :]
+        if (
+            len(prefix) == 0
+            and (text + suffix).startswith("\n")
+            and first_line > 0
+            and self.get_line(first_line - 1).endswith("\r")
+        ):
+            # '\n' right after '\r' of the previous line joins them into one line
+            # ending, resplit the previous line as well
+            first_line -= 1
+            prefix = self.get_line(first_line)
+            old_lines.insert(0, prefix)
+
+        old_segment = "".join(old_lines)
+        new_segment = prefix + text + suffix
+        if new_segment == old_segment:
+            return False
+
+        new_lines = split_lines(new_segment)
+        if end_line != last_line:
+            # the segment ends with the line ending of its last line, the empty line
+            # after it is the next line of the document which is not replaced
+            new_lines.pop()
+        self._replace_lines(first_line, end_line + 1, new_lines)
+        self._text = None
+        return True
+
+    def _replace_lines(self, start: int, end: int, new_lines: list[str]) -> None:
+        first_chunk = bisect.bisect_right(self._chunk_starts, start) - 1
+        last_chunk = bisect.bisect_right(self._chunk_starts, end - 1) - 1
+        chunk_start = self._chunk_starts[first_chunk]
+        lines = [
+            line
+            for chunk in self._chunks[first_chunk : last_chunk + 1]
+            for line in chunk
+        ]
+        lines[start - chunk_start : end - chunk_start] = new_lines
+        self._replace_chunks(first_chunk, last_chunk + 1, lines)
+
+    def _replace_chunks(
+        self, first_chunk: int, end_chunk: int, lines: list[str]
+    ) -> None:
+        new_chunks = [
+            lines[index : index + _MAX_CHUNK_LINES]
+            for index in range(0, len(lines), _MAX_CHUNK_LINES)
+        ]
+        self._chunks[first_chunk:end_chunk] = new_chunks
+
+        line_number = (
+            self._chunk_starts[first_chunk]
+            if first_chunk < len(self._chunk_starts)
+            else self._line_count
+        )
+        chunk_starts = self._chunk_starts[:first_chunk]
+        for chunk in self._chunks[first_chunk:]:
+            chunk_starts.append(line_number)
+            line_number += len(chunk)
+        self._chunk_starts = chunk_starts
+        self._line_count = line_number
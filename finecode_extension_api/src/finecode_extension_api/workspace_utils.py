@@ -1,8 +1,123 @@
 import pathlib
+from collections.abc import Iterable, Iterator
 
 from loguru import logger
 
 
+class _PathTrieNode:
+    __slots__ = ("children", "path")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _PathTrieNode] = {}
+        # set if the path ending in this node is in the trie
+        self.path: pathlib.Path | None = None
+
+
+class PathTrie:
+    """Set of directory paths, e.g. project roots, indexed by path parts.
+
+    Finds the paths containing a given path in O(number of its parts), independent
+    of the number of paths in the trie. Containment is lexical, like in
+    `pathlib.PurePath.is_relative_to`: paths are expected to be absolute and
+    normalized.
+    """
+
+    def __init__(self, paths: Iterable[pathlib.Path] = ()) -> None:
+        self._root = _PathTrieNode()
+        self._paths: set[pathlib.Path] = set()
+        for path in paths:
+            self.add(path)
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def __contains__(self, path: object) -> bool:
+        return path in self._paths
+
+    def __iter__(self) -> Iterator[pathlib.Path]:
+        return iter(self._paths)
+
+    def add(self, path: pathlib.Path) -> None:
+        node = self._root
+        for part in path.parts:
+            child = node.children.get(part)
+            if child is None:
+                child = _PathTrieNode()
+                node.children[part] = child
+            node = child
+        node.path = path
+        self._paths.add(path)
+
+    def remove(self, path: pathlib.Path) -> None:
+        """Remove the path if it is in the trie."""
+        if path not in self._paths:
+            return
+        self._paths.remove(path)
+        nodes = [self._root]
+        for part in path.parts:
+            nodes.append(nodes[-1].children[part])
+        nodes[-1].path = None
+        # prune nodes which lead to no path anymore
+        for parent, part in zip(reversed(nodes[:-1]), reversed(path.parts)):
+            child = parent.children[part]
+            if child.path is not None or child.children:
+                break
+            del parent.children[part]
+
+    def find_all(self, path: pathlib.Path) -> list[pathlib.Path]:
+        """Paths in the trie which contain `path` or are equal to it, the deepest
+        first."""
+        found: list[pathlib.Path] = []
+        node = self._root
+        for part in path.parts:
+            child = node.children.get(part)
+            if child is None:
+                break
+            node = child
+            if node.path is not None:
+                found.append(node.path)
+        found.reverse()
+        return found
+
+    def find_deepest(self, path: pathlib.Path) -> pathlib.Path | None:
+        """The deepest path in the trie which contains `path` or is equal to it."""
+        deepest: pathlib.Path | None = None
+        node = self._root
+        for part in path.parts:
+            child = node.children.get(part)
+            if child is None:
+                break
+            node = child
+            if node.path is not None:
+                deepest = node.path
+        return deepest
+
+    def group(
+        self, paths: Iterable[pathlib.Path]
+    ) -> dict[pathlib.Path, list[pathlib.Path]]:
+        """Group paths by the deepest path in the trie containing them. Paths not
+        contained in any path of the trie are excluded.
+
+        Files of one directory are resolved once, so grouping many files costs about
+        one dict lookup per file.
+        """
+        result: dict[pathlib.Path, list[pathlib.Path]] = {}
+        owner_by_dir: dict[pathlib.Path, pathlib.Path | None] = {}
+        for path in paths:
+            if path in self._paths:
+                owner: pathlib.Path | None = path
+            else:
+                dir_path = path.parent
+                try:
+                    owner = owner_by_dir[dir_path]
+                except KeyError:
+                    owner = self.find_deepest(dir_path)
+                    owner_by_dir[dir_path] = owner
+            if owner is not None:
+                result.setdefault(owner, []).append(path)
+        return result
+
+
 def group_files_by_project(
     files: list[pathlib.Path],
     project_paths: list[pathlib.Path],
@@ -12,23 +127,11 @@ def group_files_by_project(
     Each file is assigned to the project whose root is the deepest (longest)
     ancestor of the file path. Files not under any project are excluded.
     """
-    sorted_projects = sorted(project_paths, key=lambda p: len(p.parts), reverse=True)
-    result: dict[pathlib.Path, list[pathlib.Path]] = {}
-    for file in files:
-        exists_on_disk = file.exists()
-        matched = False
-        for project in sorted_projects:
-            if file.is_relative_to(project):
-                logger.debug(
-                    f"group_files_by_project: assigned {file} to project {project}"
-                    f" (exists_on_disk={exists_on_disk})"
-                )
-                result.setdefault(project, []).append(file)
-                matched = True
-                break
-        if not matched:
-            logger.debug(
-                f"group_files_by_project: {file} not under any known project"
-                f" (exists_on_disk={exists_on_disk})"
-            )
+    result = PathTrie(project_paths).group(files)
+    grouped_count = sum(len(project_files) for project_files in result.values())
+    if grouped_count != len(files):
+        logger.debug(
+            f"group_files_by_project: {len(files) - grouped_count} of {len(files)}"
+            " files are not under any known project"
+        )
     return result
@@ -4,11 +4,11 @@ import asyncio
 import contextlib
 import dataclasses
 from pathlib import Path
-from typing import Any, AsyncIterator
+from typing import Any, AsyncIterator, Awaitable, Callable
 
 import pytest
 
-from finecode_extension_api.contrib.lsp_service import LspService
+from finecode_extension_api.contrib.lsp_service import LspCheckBatch, LspService
 from finecode_extension_api.interfaces import ifileeditor, ilspclient
 
 
@@ -30,6 +30,15 @@ class _FakeLspSession:
         # lets a test simulate a transport-level error (e.g. a server-side
         # cancellation) without a real LSP server.
         self.raise_on_send_request: Exception | None = None
+        self.capabilities: dict[str, Any] = {}
+        # results of send_request by method, requests are recorded in `requests`
+        self.request_results: dict[str, Any] = {}
+        self.requests: list[tuple[str, dict[str, Any] | None]] = []
+        # when set for a method, it is awaited with the request params instead of
+        # returning `request_results`, e.g. to delay or fail requests per document
+        self.request_handlers: dict[
+            str, Callable[[dict[str, Any] | None], Awaitable[Any]]
+        ] = {}
 
     async def __aenter__(self) -> "_FakeLspSession":
         return self
@@ -45,7 +54,11 @@ class _FakeLspSession:
     ) -> Any:
         if self.raise_on_send_request is not None:
             raise self.raise_on_send_request
-        return None
+        self.requests.append((method, params))
+        request_handler = self.request_handlers.get(method)
+        if request_handler is not None:
+            return await request_handler(params)
+        return self.request_results.get(method)
 
     async def send_notification(
         self, method: str, params: dict[str, Any] | None = None
@@ -62,7 +75,7 @@ class _FakeLspSession:
 
     @property
     def server_capabilities(self) -> dict[str, Any]:
-        return {}
+        return self.capabilities
 
     @property
     def server_info(self) -> dict[str, Any] | None:
@@ -155,9 +168,13 @@ class _NullLogger:
 
 @contextlib.asynccontextmanager
 async def _running_service(
-    file_path: Path, content: str
+    file_path: Path,
+    content: str,
+    server_capabilities: dict[str, Any] | None = None,
+    client_capabilities: dict[str, Any] | None = None,
 ) -> AsyncIterator[tuple[LspService, _FakeLspSession, _FakeFileEditor]]:
     session = _FakeLspSession()
+    session.capabilities = server_capabilities or {}
     file_editor = _FakeFileEditor(file_path, content)
     service = LspService(
         lsp_client=_FakeLspClient(session),
@@ -165,6 +182,7 @@ async def _running_service(
         logger=_NullLogger(),  # type: ignore[arg-type]
         cmd="fake-lsp-server",
         language_id="python",
+        client_capabilities=client_capabilities,
     )
     await service.ensure_started(root_uri=file_path.parent.as_uri())
     try:
@@ -328,3 +346,319 @@ async def test_unrelated_send_request_error_is_not_mistranslated(
 
         with pytest.raises(RuntimeError, match="boom"):
             await service.get_hover(file_path, content, {"line": 0, "character": 0})
+
+
+_PULL_DIAGNOSTICS_CLIENT_CAPABILITIES = {
+    "textDocument": {"diagnostic": {"dynamicRegistration": False}}
+}
+_DIAGNOSTIC = {
+    "range": {
+        "start": {"line": 0, "character": 0},
+        "end": {"line": 0, "character": 1},
+    },
+    "message": "undefined name",
+}
+
+
+async def test_check_files_closes_only_documents_not_open_in_editor(
+    tmp_path: Path,
+) -> None:
+    """Documents opened just for the check are closed after the batch, documents
+    the user has open in the IDE stay open."""
+    editor_file_path = tmp_path / "opened.py"
+    other_file_path = tmp_path / "other.py"
+
+    async with _running_service(
+        editor_file_path,
+        "x = 1\n",
+        server_capabilities={"diagnosticProvider": {"identifier": "fake"}},
+        client_capabilities=_PULL_DIAGNOSTICS_CLIENT_CAPABILITIES,
+    ) as (service, session, _):
+        session.request_results["textDocument/diagnostic"] = {
+            "kind": "full",
+            "resultId": "1",
+            "items": [_DIAGNOSTIC],
+        }
+
+        diagnostics = await service.check_files([editor_file_path, other_file_path])
+
+        assert diagnostics == {
+            editor_file_path: [_DIAGNOSTIC],
+            other_file_path: [_DIAGNOSTIC],
+        }
+        closed_uris = [
+            notification.params["textDocument"]["uri"]
+            for notification in session.notifications
+            if notification.method == "textDocument/didClose"
+            and notification.params is not None
+        ]
+        assert closed_uris == [other_file_path.as_uri()]
+
+
+async def test_unchanged_diagnostic_report_returns_previous_diagnostics(
+    tmp_path: Path,
+) -> None:
+    file_path = tmp_path / "subject.py"
+
+    async with _running_service(
+        file_path,
+        "x = 1\n",
+        server_capabilities={"diagnosticProvider": {"identifier": "fake"}},
+        client_capabilities=_PULL_DIAGNOSTICS_CLIENT_CAPABILITIES,
+    ) as (service, session, _):
+        session.request_results["textDocument/diagnostic"] = {
+            "kind": "full",
+            "resultId": "1",
+            "items": [_DIAGNOSTIC],
+        }
+        await service.check_file(file_path)
+        session.request_results["textDocument/diagnostic"] = {
+            "kind": "unchanged",
+            "resultId": "1",
+        }
+
+        diagnostics = await service.check_file(file_path)
+
+        assert diagnostics == [_DIAGNOSTIC]
+        _, last_params = session.requests[-1]
+        assert last_params is not None
+        assert last_params["previousResultId"] == "1"
+
+
+async def test_check_files_uses_workspace_diagnostics_if_supported(
+    tmp_path: Path,
+) -> None:
+    file_path = tmp_path / "subject.py"
+    missing_file_path = tmp_path / "missing_in_report.py"
+
+    async with _running_service(
+        file_path,
+        "x = 1\n",
+        server_capabilities={
+            "diagnosticProvider": {"identifier": "fake", "workspaceDiagnostics": True}
+        },
+        client_capabilities=_PULL_DIAGNOSTICS_CLIENT_CAPABILITIES,
+    ) as (service, session, _):
+        session.request_results["workspace/diagnostic"] = {
+            "items": [
+                {
+                    "uri": file_path.as_uri(),
+                    "kind": "full",
+                    "resultId": "1",
+                    "items": [_DIAGNOSTIC],
+                }
+            ]
+        }
+        session.request_results["textDocument/diagnostic"] = {
+            "kind": "full",
+            "items": [],
+        }
+
+        diagnostics = await service.check_files([file_path, missing_file_path])
+
+        assert diagnostics == {file_path: [_DIAGNOSTIC], missing_file_path: []}
+        document_requests = [
+            params["textDocument"]["uri"]
+            for method, params in session.requests
+            if method == "textDocument/diagnostic" and params is not None
+        ]
+        assert document_requests == [missing_file_path.as_uri()]
+
+
+async def test_workspace_diagnostics_see_content_of_editor_open_files(
+    tmp_path: Path,
+) -> None:
+    file_path = tmp_path / "subject.py"
+
+    async with _running_service(
+        file_path,
+        "x = 1  # unsaved\n",
+        server_capabilities={
+            "diagnosticProvider": {"identifier": "fake", "workspaceDiagnostics": True}
+        },
+        client_capabilities=_PULL_DIAGNOSTICS_CLIENT_CAPABILITIES,
+    ) as (service, session, _):
+        synced_texts_at_request: list[str] = []
+
+        async def pull_workspace_diagnostics(params: dict[str, Any] | None) -> Any:
+            synced_texts_at_request.extend(
+                notification.params["textDocument"]["text"]
+                for notification in session.notifications
+                if notification.method == "textDocument/didOpen"
+                and notification.params is not None
+            )
+            return {"items": [{"uri": file_path.as_uri(), "kind": "full", "items": []}]}
+
+        session.request_handlers["workspace/diagnostic"] = pull_workspace_diagnostics
+
+        await service.check_files([file_path, tmp_path / "not_open.py"])
+
+        assert synced_texts_at_request == ["x = 1  # unsaved\n"]
+
+
+def _pull_diagnostics_by_document(
+    session: _FakeLspSession,
+    failing_uri: str | None = None,
+    released_uri: str | None = None,
+) -> asyncio.Event:
+    """Answer textDocument/diagnostic with one diagnostic, fail for `failing_uri`
+    and delay `released_uri` until the returned event is set."""
+    released = asyncio.Event()
+
+    async def pull_document_diagnostics(params: dict[str, Any] | None) -> Any:
+        assert params is not None
+        uri = params["textDocument"]["uri"]
+        if uri == released_uri:
+            await released.wait()
+        if uri == failing_uri:
+            raise RuntimeError(f"check of {uri} failed")
+        return {"kind": "full", "items": [_DIAGNOSTIC]}
+
+    session.request_handlers["textDocument/diagnostic"] = pull_document_diagnostics
+    return released
+
+
+async def test_check_files_iter_yields_files_as_they_are_checked(
+    tmp_path: Path,
+) -> None:
+    slow_file_path = tmp_path / "slow.py"
+    fast_file_path = tmp_path / "fast.py"
+
+    async with _running_service(
+        tmp_path / "opened.py",
+        "x = 1\n",
+        server_capabilities={"diagnosticProvider": {"identifier": "fake"}},
+        client_capabilities=_PULL_DIAGNOSTICS_CLIENT_CAPABILITIES,
+    ) as (service, session, _):
+        released = _pull_diagnostics_by_document(
+            session, released_uri=slow_file_path.as_uri()
+        )
+        check_results = service.check_files_iter([slow_file_path, fast_file_path])
+
+        first = await asyncio.wait_for(anext(check_results), timeout=5)
+        released.set()
+        rest = [check_result async for check_result in check_results]
+
+        assert first == (fast_file_path, [_DIAGNOSTIC])
+        assert rest == [(slow_file_path, [_DIAGNOSTIC])]
+
+
+async def test_failed_check_of_file_does_not_fail_other_files(tmp_path: Path) -> None:
+    failing_file_path = tmp_path / "failing.py"
+    other_file_path = tmp_path / "other.py"
+
+    async with _running_service(
+        tmp_path / "opened.py",
+        "x = 1\n",
+        server_capabilities={"diagnosticProvider": {"identifier": "fake"}},
+        client_capabilities=_PULL_DIAGNOSTICS_CLIENT_CAPABILITIES,
+    ) as (service, session, _):
+        _pull_diagnostics_by_document(session, failing_uri=failing_file_path.as_uri())
+
+        check_results = dict(
+            [
+                check_result
+                async for check_result in service.check_files_iter(
+                    [failing_file_path, other_file_path]
+                )
+            ]
+        )
+        with pytest.raises(RuntimeError, match="failed"):
+            await service.check_files([failing_file_path, other_file_path])
+
+        assert isinstance(check_results[failing_file_path], RuntimeError)
+        assert check_results[other_file_path] == [_DIAGNOSTIC]
+        # documents of both files were closed after the check
+        closed_uris = {
+            notification.params["textDocument"]["uri"]
+            for notification in session.notifications
+            if notification.method == "textDocument/didClose"
+            and notification.params is not None
+        }
+        assert closed_uris == {failing_file_path.as_uri(), other_file_path.as_uri()}
+
+
+async def test_failed_workspace_diagnostics_request_falls_back_to_documents(
+    tmp_path: Path,
+) -> None:
+    file_path = tmp_path / "subject.py"
+
+    async with _running_service(
+        file_path,
+        "x = 1\n",
+        server_capabilities={
+            "diagnosticProvider": {"identifier": "fake", "workspaceDiagnostics": True}
+        },
+        client_capabilities=_PULL_DIAGNOSTICS_CLIENT_CAPABILITIES,
+    ) as (service, session, _):
+
+        async def fail_workspace_diagnostics(params: dict[str, Any] | None) -> Any:
+            raise RuntimeError("workspace diagnostics failed")
+
+        session.request_handlers["workspace/diagnostic"] = fail_workspace_diagnostics
+        _pull_diagnostics_by_document(session)
+
+        diagnostics = await service.check_files([file_path])
+
+        assert diagnostics == {file_path: [_DIAGNOSTIC]}
+
+
+async def test_lsp_check_batch_resolves_each_file_separately(tmp_path: Path) -> None:
+    failing_file_path = tmp_path / "failing.py"
+    slow_file_path = tmp_path / "slow.py"
+    fast_file_path = tmp_path / "fast.py"
+
+    async with _running_service(
+        tmp_path / "opened.py",
+        "x = 1\n",
+        server_capabilities={"diagnosticProvider": {"identifier": "fake"}},
+        client_capabilities=_PULL_DIAGNOSTICS_CLIENT_CAPABILITIES,
+    ) as (service, session, _):
+        released = _pull_diagnostics_by_document(
+            session,
+            failing_uri=failing_file_path.as_uri(),
+            released_uri=slow_file_path.as_uri(),
+        )
+        batch = LspCheckBatch(
+            service.check_files_iter,
+            [failing_file_path, slow_file_path, fast_file_path],
+        )
+        slow = asyncio.ensure_future(batch.get(slow_file_path))
+
+        fast_diagnostics = await asyncio.wait_for(batch.get(fast_file_path), timeout=5)
+        with pytest.raises(RuntimeError, match="failed"):
+            await batch.get(failing_file_path)
+        assert not slow.done()
+        released.set()
+
+        assert fast_diagnostics == [_DIAGNOSTIC]
+        assert await slow == [_DIAGNOSTIC]
+
+
+async def test_lsp_check_batch_is_not_cancelled_with_first_caller(
+    tmp_path: Path,
+) -> None:
+    first_file_path = tmp_path / "first.py"
+    second_file_path = tmp_path / "second.py"
+
+    async with _running_service(
+        tmp_path / "opened.py",
+        "x = 1\n",
+        server_capabilities={"diagnosticProvider": {"identifier": "fake"}},
+        client_capabilities=_PULL_DIAGNOSTICS_CLIENT_CAPABILITIES,
+    ) as (service, session, _):
+        released = _pull_diagnostics_by_document(
+            session, released_uri=first_file_path.as_uri()
+        )
+        batch = LspCheckBatch(
+            service.check_files_iter, [first_file_path, second_file_path]
+        )
+        first = asyncio.ensure_future(batch.get(first_file_path))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        released.set()
+
+        assert await asyncio.wait_for(batch.get(second_file_path), timeout=5) == [
+            _DIAGNOSTIC
+        ]
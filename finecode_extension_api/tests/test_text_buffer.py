@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import pytest
+
+from finecode_extension_api.text_buffer import TextBuffer
+
+
+def test_replace_uses_utf16_columns() -> None:
+    """LSP clients count characters in UTF-16 code units, so a character outside
+    the BMP occupies two columns."""
+    buffer = TextBuffer("a😀b = 1\n")
+
+    buffer.replace(start_line=0, start_character=3, end_line=0, end_character=4, text="c")
+
+    assert buffer.text == "a😀c = 1\n"
+
+
+def test_replace_across_lines_keeps_line_endings() -> None:
+    buffer = TextBuffer("first\r\nsecond\r\nthird\r\n")
+
+    buffer.replace(start_line=0, start_character=5, end_line=2, end_character=0, text="!\r\n")
+
+    assert buffer.text == "first!\r\nthird\r\n"
+    assert buffer.line_count == 3
+    assert buffer.get_line(1) == "third\r\n"
+
+
+def test_insert_after_end_of_document_appends() -> None:
+    buffer = TextBuffer("x = 1")
+
+    buffer.replace(start_line=1, start_character=0, end_line=1, end_character=0, text="\n")
+
+    assert buffer.text == "x = 1\n"
+
+
+def test_noop_change_is_reported_as_unchanged() -> None:
+    buffer = TextBuffer("x = 1\n")
+
+    assert not buffer.replace(
+        start_line=0, start_character=4, end_line=0, end_character=5, text="1"
+    )
+    assert not buffer.set_text("x = 1\n")
+
+
+def test_edits_in_big_document_keep_line_index_consistent() -> None:
+    """Lines are stored in chunks; edits that split and join lines across chunk
+    borders must keep line numbers right."""
+    lines = [f"line {index}\n" for index in range(2000)]
+    buffer = TextBuffer("".join(lines))
+
+    buffer.replace(start_line=255, start_character=4, end_line=257, end_character=4, text="")
+    del lines[256:258]
+    lines[255] = "line 257\n"
+    buffer.replace(start_line=1000, start_character=0, end_line=1000, end_character=0, text="a\nb\n")
+    lines[1000:1000] = ["a\n", "b\n"]
+
+    assert buffer.text == "".join(lines)
+    assert buffer.line_count == len(lines) + 1
+    assert buffer.get_line(1500) == lines[1500]
+
+
+def test_invalid_range_is_rejected() -> None:
+    buffer = TextBuffer("x = 1\n")
+
+    with pytest.raises(ValueError):
+        buffer.replace(start_line=0, start_character=3, end_line=0, end_character=1, text="")
+    with pytest.raises(ValueError):
+        buffer.replace(start_line=5, start_character=0, end_line=5, end_character=0, text="")
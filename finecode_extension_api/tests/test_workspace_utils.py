@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from pathlib import PurePosixPath
+
+from finecode_extension_api.workspace_utils import PathTrie, group_files_by_project
+
+
+def test_find_all_returns_containing_paths_deepest_first() -> None:
+    trie = PathTrie(
+        [
+            PurePosixPath("/ws"),
+            PurePosixPath("/ws/pkg"),
+            PurePosixPath("/ws/pkg/sub"),
+            PurePosixPath("/ws/pkg2"),
+        ]
+    )
+
+    assert trie.find_all(PurePosixPath("/ws/pkg/sub/module.py")) == [
+        PurePosixPath("/ws/pkg/sub"),
+        PurePosixPath("/ws/pkg"),
+        PurePosixPath("/ws"),
+    ]
+    # a sibling sharing the name prefix is not contained
+    assert trie.find_deepest(PurePosixPath("/ws/pkg2x/a.py")) == PurePosixPath("/ws")
+    assert trie.find_deepest(PurePosixPath("/other/a.py")) is None
+
+
+def test_removed_path_no_longer_contains_files() -> None:
+    trie = PathTrie([PurePosixPath("/ws"), PurePosixPath("/ws/pkg/sub")])
+
+    trie.remove(PurePosixPath("/ws/pkg/sub"))
+    trie.remove(PurePosixPath("/ws/not_added"))
+
+    assert trie.find_deepest(PurePosixPath("/ws/pkg/sub/a.py")) == PurePosixPath("/ws")
+    assert len(trie) == 1
+    trie.remove(PurePosixPath("/ws"))
+    assert trie.find_all(PurePosixPath("/ws/a.py")) == []
+
+
+def test_group_files_by_deepest_project_keeps_file_order() -> None:
+    files = [
+        PurePosixPath("/ws/pkg/b.py"),
+        PurePosixPath("/ws/a.py"),
+        PurePosixPath("/ws/pkg/a.py"),
+        PurePosixPath("/outside/a.py"),
+        PurePosixPath("/ws/pkg"),
+    ]
+
+    result = group_files_by_project(
+        files, [PurePosixPath("/ws"), PurePosixPath("/ws/pkg")]
+    )
+
+    assert result == {
+        PurePosixPath("/ws/pkg"): [
+            PurePosixPath("/ws/pkg/b.py"),
+            PurePosixPath("/ws/pkg/a.py"),
+            PurePosixPath("/ws/pkg"),
+        ],
+        PurePosixPath("/ws"): [PurePosixPath("/ws/a.py")],
+    }
@@ -216,7 +216,7 @@ def _find_caller_kwargs_type(
     run_context_type: type,
 ) -> type[code_action.CallerRunContextKwargs] | None:
     """Inspect run context __init__ to find the concrete CallerRunContextKwargs subtype."""
-    annotations = inspect.get_annotations(run_context_type.__init__, eval_str=True)
+    annotations = _get_injection_plan(run_context_type.__init__).annotations
     annotation = annotations.get("caller_kwargs")
     if annotation is None:
         return None
@@ -1056,26 +1056,66 @@ def create_action_exec_info(action: domain.ActionDeclaration) -> domain.ActionEx
     return action_exec_info
 
 
+@dataclasses.dataclass(frozen=True)
+class _InjectionPlan:
+    """Parameters of a callable that are filled by `resolve_func_args_with_di`,
+    computed once per callable because signature inspection and evaluation of
+    string annotations are expensive compared to a nested action run."""
+
+    # names of parameters in order, without *args and **kwargs
+    param_names: tuple[str, ...]
+    annotations: dict[str, typing.Any]
+
+
+# Key is the function and whether it is bound: bound methods are new objects on
+# each attribute access and their signature has no `self`. Cleared by
+# `clear_injection_plans` when action modules are reloaded.
+_injection_plan_by_func: dict[tuple[typing.Callable, bool], _InjectionPlan] = {}
+
+
+def _get_injection_plan(func: typing.Callable) -> _InjectionPlan:
+    is_bound = inspect.ismethod(func)
+    key = (func.__func__ if is_bound else func, is_bound)
+    plan = _injection_plan_by_func.get(key)
+    if plan is None:
+        func_parameters = inspect.signature(func).parameters
+        plan = _InjectionPlan(
+            # default object constructor(__init__) has signature
+            # __init__(self, *args, **kwargs)
+            # args and kwargs have no annotation and should not be filled by DI
+            # resolver. Ignore them.
+            param_names=tuple(
+                param_name
+                for param_name, parameter in func_parameters.items()
+                if parameter.kind
+                not in (
+                    inspect.Parameter.VAR_POSITIONAL,
+                    inspect.Parameter.VAR_KEYWORD,
+                )
+            ),
+            annotations=inspect.get_annotations(func, eval_str=True),
+        )
+        _injection_plan_by_func[key] = plan
+    return plan
+
+
+def clear_injection_plans() -> None:
+    """Forget injection plans of all callables, e.g. after modules of actions were
+    removed from `sys.modules` to be imported again."""
+    _injection_plan_by_func.clear()
+
+
 async def resolve_func_args_with_di(
     func: typing.Callable,
     registry: Registry,
     known_args: dict[str, typing.Callable[[typing.Any], typing.Any]] | None = None,
     params_to_ignore: list[str] | None = None,
 ) -> dict[str, typing.Any]:
-    func_parameters = inspect.signature(func).parameters
-    func_annotations = inspect.get_annotations(func, eval_str=True)
+    plan = _get_injection_plan(func)
+    func_annotations = plan.annotations
     args: dict[str, typing.Any] = {}
-    for param_name in func_parameters.keys():
-        # default object constructor(__init__) has signature
-        # __init__(self, *args, **kwargs)
-        # args and kwargs have no annotation and should not be filled by DI resolver.
-        # Ignore them.
-        if (
-            params_to_ignore is not None and param_name in params_to_ignore
-        ) or func_parameters[param_name].kind in (
-            inspect.Parameter.VAR_POSITIONAL,
-            inspect.Parameter.VAR_KEYWORD,
-        ):
+    for param_name in plan.param_names:
+        if params_to_ignore is not None and param_name in params_to_ignore:
             continue
         elif known_args is not None and param_name in known_args:
             param_type = func_annotations[param_name]
@@ -77,6 +77,25 @@ def start(
     runner_start.start_runner_sync(wal_writer=wal_writer)
 
 
+@main.command()
+@click.option(
+    "--preload",
+    "preload_modules",
+    type=str,
+    multiple=True,
+    help="Module to import before forking runners, e.g. a handler module",
+)
+def zygote(preload_modules: tuple[str, ...]):
+    """Start a process that forks prewarmed runners (POSIX only)"""
+    if not hasattr(os, "fork"):
+        click.echo("Zygote is not supported on this platform", err=True)
+        sys.exit(1)
+
+    from finecode_extension_runner import zygote as runner_zygote
+
+    runner_zygote.start_zygote_sync(preload_modules=list(preload_modules))
+
+
 @main.command()
 def version():
     """Show version information"""
@@ -14,7 +14,6 @@ import ordered_set
 from loguru import logger
 
 from finecode_extension_api.interfaces import (  # idevenvinfoprovider,
-    icache,
     iextensionrunnerinfoprovider,
     ifileeditor,
     ifilemanager,
@@ -36,7 +35,6 @@ from finecode_extension_runner.impls import (  # dev_env_info_provider,
     extension_runner_info_provider,
     file_editor,
     file_manager,
-    inmemory_cache,
     loguru_logger,
     project_action_runner,
     project_info_provider,
@@ -50,6 +48,15 @@ from finecode_extension_runner.impls import (  # dev_env_info_provider,
 
 _COMMAND_RUNNER_INTERFACE = "finecode_extension_api.interfaces.icommandrunner.ICommandRunner"
 _COMMAND_RUNNER_DEFAULT_SOURCE = "finecode_extension_runner.impls.command_runner.CommandRunner"
+_CACHE_INTERFACE = "finecode_extension_api.interfaces.icache.ICache"
+_CACHE_DEFAULT_SOURCE = "finecode_extension_runner.impls.inmemory_cache.InMemoryCache"
+
+# Core services which have a default binding but, unlike the ones registered as
+# instances, can be rebound and configured by a service declaration.
+_CONFIGURABLE_CORE_SERVICES: dict[str, str] = {
+    _COMMAND_RUNNER_INTERFACE: _COMMAND_RUNNER_DEFAULT_SOURCE,
+    _CACHE_INTERFACE: _CACHE_DEFAULT_SOURCE,
+}
 
 
 class StaleEntryPointsError(Exception):
@@ -97,9 +104,6 @@ def bootstrap(
     file_editor_instance = file_editor.FileEditor(
         logger=logger_instance, file_manager=file_manager_instance
     )
-    cache_instance = inmemory_cache.InMemoryCache(
-        file_editor=file_editor_instance, logger=logger_instance
-    )
     registry.register_instance(ilogger.ILogger, logger_instance)
     _send_user_message = send_user_message_notification or (lambda msg, level: None)
     registry.register_instance(
@@ -108,7 +112,6 @@ def bootstrap(
     )
     registry.register_instance(ifilemanager.IFileManager, file_manager_instance)
     registry.register_instance(ifileeditor.IFileEditor, file_editor_instance)
-    registry.register_instance(icache.ICache, cache_instance)
     registry.register_instance(
         iprojectactionrunner.IProjectActionRunner,
         project_action_runner.ProjectActionRunnerImpl(
@@ -159,10 +162,17 @@ def bootstrap(
     )
 
     svc_registry = service_registry.ServiceRegistry(di_registry=registry)
-    _register_command_runner_service(service_declarations, svc_registry)
+    for interface_source, default_source in _CONFIGURABLE_CORE_SERVICES.items():
+        _register_configurable_core_service(
+            interface_source, default_source, service_declarations, svc_registry
+        )
     all_eps, activated = _activate_extensions(handler_packages, svc_registry)
     _apply_user_service_config(
-        [svc for svc in service_declarations if svc.interface != _COMMAND_RUNNER_INTERFACE],
+        [
+            svc
+            for svc in service_declarations
+            if svc.interface not in _CONFIGURABLE_CORE_SERVICES
+        ],
         svc_registry,
     )
 
@@ -293,11 +303,13 @@ def _apply_user_service_config(
             logger.error(f"Failed to configure service '{svc.source}': {e}")
 
 
-def _register_command_runner_service(
+def _register_configurable_core_service(
+    interface_source: str,
+    default_source: str,
     service_declarations: list[object],
     svc_registry: service_registry.ServiceRegistry,
 ) -> None:
-    """Register the default binding for ``ICommandRunner``, merged with any
+    """Register the default binding for a configurable core service, merged with any
     project/user-declared override for the same interface.
 
     ``ICommandRunner`` used to be wired as a hardcoded ``registry.register_instance``
@@ -306,20 +318,21 @@ def _register_command_runner_service(
     personal ``finecode-user.toml`` declaration configure it (e.g.
     ``config.max_concurrent_processes``, used to bound ``prepare-envs``
     subprocess fan-out — ADR-0055) the same way any other service is rebound
-    by declaring the same ``interface``.
+    by declaring the same ``interface``. ``ICache`` follows the same path so that
+    the persistent implementation can be selected and sized per project.
     """
     override = next(
-        (svc for svc in service_declarations if svc.interface == _COMMAND_RUNNER_INTERFACE),
+        (svc for svc in service_declarations if svc.interface == interface_source),
         None,
     )
-    source = (override.source if override is not None else None) or _COMMAND_RUNNER_DEFAULT_SOURCE
+    source = (override.source if override is not None else None) or default_source
     raw_config = override.config if override is not None else None
 
     try:
-        interface = import_module_member_by_source_str(_COMMAND_RUNNER_INTERFACE)
+        interface = import_module_member_by_source_str(interface_source)
         impl_cls = import_module_member_by_source_str(source)
         svc_registry.register_impl(interface, impl_cls, raw_config=raw_config)
-        logger.trace(f"Configured service '{source}' for '{_COMMAND_RUNNER_INTERFACE}'")
+        logger.trace(f"Configured service '{source}' for '{interface_source}'")
     except Exception as e:
         logger.error(f"Failed to configure service '{source}': {e}")
 
@@ -30,6 +30,7 @@ from cattrs.gen import make_dict_structure_fn, make_dict_unstructure_fn, overrid
 from loguru import logger
 
 import finecode_jsonrpc as finecode_jsonrpc_module
+from finecode_jsonrpc import wire_format as jsonrpc_wire_format
 from finecode_extension_api import code_action, textstyler as _textstyler
 from finecode_extension_api.interfaces import ifileeditor, iprojectactionrunner, iprojectinfoprovider
 from finecode_extension_runner import context, er_errors, er_telemetry, er_wal, global_state, logs, schemas, services
@@ -37,6 +38,7 @@ from finecode_extension_runner.di import bootstrap as di_bootstrap
 from finecode_extension_runner._converter import converter as _converter
 from finecode_extension_runner._services import merge_results as merge_results_service
 from finecode_extension_runner._services import run_action as run_action_service
+from finecode_extension_runner.impls import process_executor as process_executor_impl
 from finecode_extension_runner.impls import project_action_runner as project_action_runner_module
 
 # ---------------------------------------------------------------------------
@@ -190,7 +192,18 @@ class ErServer:
         self._async_exit_event = asyncio.Event()
         self._tcp_server: asyncio.Server | None = None
         self._runner_context: context.RunnerContext | None = None
+        # The WM can share one runner between projects whose envs are identical.
+        # Requests of the WM name their project in the `projectPath` param, the
+        # runner keeps a context and a file editor session per project.
+        # `_runner_context` and `_finecode_file_editor_session` belong to the first
+        # configured project and serve requests without `projectPath`.
+        self._runner_contexts: dict[pathlib.Path, context.RunnerContext] = {}
+        self._file_editor_sessions: dict[
+            pathlib.Path, ifileeditor.IFileEditorProviderSession
+        ] = {}
         self._wal_writer: er_wal.ErWalWriter | None = None
+        # negotiated in `initialize`, applied on `initialized`
+        self._negotiated_wire_format: jsonrpc_wire_format.WireFormat | None = None
 
     # ------------------------------------------------------------------
     # Server → client helpers
@@ -338,6 +351,28 @@ def file_editor_file_change_to_text_edit(
     )
 
 
+def get_runner_context(
+    server: ErServer, params: dict | None
+) -> context.RunnerContext | None:
+    """Runner context of the project in the `projectPath` param of a WM request,
+    of the first configured project if the param is missing."""
+    project_path = (params or {}).get("projectPath")
+    if project_path is None:
+        return server._runner_context
+    return server._runner_contexts.get(pathlib.Path(project_path))
+
+
+def get_file_editor_session(
+    server: ErServer, params: dict | None
+) -> ifileeditor.IFileEditorProviderSession:
+    project_path = (params or {}).get("projectPath")
+    if project_path is not None:
+        session = server._file_editor_sessions.get(pathlib.Path(project_path))
+        if session is not None:
+            return session
+    return server._finecode_file_editor_session
+
+
 def uri_to_path(uri: str) -> pathlib.Path:
     return pathlib.Path(uri.removeprefix("file://"))
 
@@ -358,12 +393,26 @@ def convert_path_keys(
 # ---------------------------------------------------------------------------
 
 
-async def _on_initialize(_server: ErServer, params: dict | None) -> dict:
+async def _on_initialize(server: ErServer, params: dict | None) -> dict:
     logger.info(f"initialize: {params}")
+    capabilities: dict[str, typing.Any] = {
+        "textDocumentSync": 1,  # Full sync
+    }
+
+    offered_formats = (
+        ((params or {}).get("capabilities") or {}).get("experimental") or {}
+    ).get(jsonrpc_wire_format.CAPABILITY_NAME)
+    chosen_format = jsonrpc_wire_format.choose_format(offered_formats)
+    server._negotiated_wire_format = jsonrpc_wire_format.create_wire_format(
+        chosen_format
+    )
+    if server._negotiated_wire_format is not None:
+        capabilities["experimental"] = {
+            jsonrpc_wire_format.CAPABILITY_NAME: chosen_format
+        }
+
     return {
-        "capabilities": {
-            "textDocumentSync": 1,  # Full sync
-        },
+        "capabilities": capabilities,
         "serverInfo": {
             "name": "FineCode_Extension_Runner_Server",
             "version": "v1",
@@ -371,15 +420,26 @@ async def _on_initialize(_server: ErServer, params: dict | None) -> dict:
     }
 
 
-async def _on_initialized(_server: ErServer, params: dict | None) -> None:
+async def _on_initialized(server: ErServer, params: dict | None) -> None:
     logger.info(f"initialized: {params}")
+    # the whole handshake stays in JSON, switch once the client confirmed it has
+    # received the format chosen in the initialize result
+    if server._negotiated_wire_format is not None:
+        logger.debug(
+            f"Use {server._negotiated_wire_format.codec.name} wire format"
+        )
+        server._session._transport.set_wire_format(  # type: ignore[union-attr]
+            server._negotiated_wire_format
+        )
 
 
 async def _on_shutdown(server: ErServer, _params: dict | None) -> None:
     logger.info("Shutdown extension runner")
     if server._wal_writer is not None:
         server._wal_writer.close()
-    services.shutdown_all_action_handlers(server._runner_context)
+    for runner_context in server._runner_contexts.values():
+        services.shutdown_all_action_handlers(runner_context)
+    process_executor_impl.shutdown_worker_pool()
 
     logger.debug("Stop Finecode async tasks")
     for task in server._finecode_async_tasks:
@@ -406,7 +466,7 @@ async def _document_did_open(server: ErServer, params: dict | None) -> None:
     # IDE may send `didOpen` for a file that no longer exists on disk (e.g. a
     # stale tab left open after the file was deleted), and the buffer is the
     # source of truth for "open" content regardless of what's on disk.
-    await server._finecode_file_editor_session.open_file(
+    await get_file_editor_session(server, params).open_file(
         file_path=file_path, content=typed.text_document.text
     )
 
@@ -415,7 +475,7 @@ async def _document_did_close(server: ErServer, params: dict | None) -> None:
     typed = _protocol_converter.structure(params, DidCloseTextDocumentParams)
     logger.info(f"document did close: {typed.text_document.uri}")
     file_path = uri_to_path(uri=typed.text_document.uri)
-    await server._finecode_file_editor_session.close_file(file_path=file_path)
+    await get_file_editor_session(server, params).close_file(file_path=file_path)
 
 
 def _change_to_file_editor_change(
@@ -445,10 +505,11 @@ async def _document_did_change(server: ErServer, params: dict | None) -> None:
         f"document did change: {typed.text_document.uri} {typed.text_document.version}"
     )
     file_path = uri_to_path(uri=typed.text_document.uri)
+    file_editor_session = get_file_editor_session(server, params)
     for change in typed.content_changes:
         logger.trace(str(change))
         file_editor_change = _change_to_file_editor_change(change)
-        await server._finecode_file_editor_session.change_file(
+        await file_editor_session.change_file(
             file_path=file_path, change=file_editor_change
         )
 
@@ -562,6 +623,9 @@ async def update_config(server: ErServer, params: dict | None) -> dict:
             )
 
         async def _send_request_to_wm(method: str, req_params: dict):
+            # the WM resolves the project of a request by its runner, which is
+            # ambiguous if the runner is shared between projects
+            req_params = {**req_params, "projectPath": working_dir.as_posix()}
             try:
                 return await server.send_request_to_wm(method, req_params)
             except finecode_jsonrpc_module.JsonRpcError as exc:
@@ -577,17 +641,24 @@ async def update_config(server: ErServer, params: dict | None) -> dict:
             send_user_message_notification=server.send_user_message_notification,
         )
         runner_context.wal_writer = server._wal_writer
-        server._runner_context = runner_context
+        is_first_project = (
+            server._runner_context is None
+            or server._runner_context.project.dir_path == working_dir
+        )
+        server._runner_contexts[working_dir] = runner_context
+        if is_first_project:
+            server._runner_context = runner_context
 
         file_editor = await runner_context.di_registry.get_instance(ifileeditor.IFileEditor)
-        server._finecode_file_editor_session = (
-            await server._finecode_exit_stack.enter_async_context(
-                file_editor.session(author=server._finecode_file_operation_author)
-            )
+        file_editor_session = await server._finecode_exit_stack.enter_async_context(
+            file_editor.session(author=server._finecode_file_operation_author)
         )
+        server._file_editor_sessions[working_dir] = file_editor_session
+        if is_first_project:
+            server._finecode_file_editor_session = file_editor_session
 
         async def send_changed_files_to_wm() -> None:
-            async with server._finecode_file_editor_session.subscribe_to_changes_of_opened_files() as file_change_events:
+            async with file_editor_session.subscribe_to_changes_of_opened_files() as file_change_events:
                 async for file_change_event in file_change_events:
                     if (
                         file_change_event.author
@@ -614,7 +685,7 @@ async def update_config(server: ErServer, params: dict | None) -> dict:
         task = asyncio.create_task(send_changed_files_to_wm())
         server._finecode_async_tasks.append(task)
 
-        return response.to_dict()
+        return {"documentLanguages": response.document_languages}
     except di_bootstrap.StaleEntryPointsError as exc:
         logger.info(str(exc))
         raise finecode_jsonrpc_module.JsonRpcHandlerError(
@@ -625,6 +696,23 @@ async def update_config(server: ErServer, params: dict | None) -> dict:
         raise
 
 
+async def remove_project(server: ErServer, params: dict | None) -> dict:
+    """Handler for ``finecodeRunner/removeProject``.
+
+    Shuts down handlers of one project of a runner shared between projects, the
+    runner keeps serving the other ones.
+    """
+    assert params is not None
+    project_path = pathlib.Path(params["projectPath"])
+    logger.trace(f"Remove project: {project_path}")
+    runner_context = server._runner_contexts.pop(project_path, None)
+    server._file_editor_sessions.pop(project_path, None)
+    if runner_context is not None:
+        services.shutdown_all_action_handlers(runner_context)
+        services.exit_all_action_handlers(runner_context)
+    return {}
+
+
 async def update_logging(server: ErServer, params: dict | None) -> dict:
     """Handler for ``finecodeRunner/updateLogging``. Toggles ER->WM log forwarding.
 
@@ -652,9 +740,10 @@ async def run_action(server: ErServer, params: dict | None) -> dict:
     meta = (options or {}).get("meta") or {}
     trigger = meta.get("trigger", "unknown")
     dev_env = meta.get("devEnv", "unknown")
-    if server._runner_context is None:
+    runner_context = get_runner_context(server, params)
+    if runner_context is None:
         return {"error": "Extension runner not initialized"}
-    project_path = server._runner_context.project.dir_path
+    project_path = runner_context.project.dir_path
     er_wal.emit_run_event(
         server._wal_writer,
         event_type=er_wal.ErWalEventType.RUN_ACCEPTED,
@@ -677,7 +766,7 @@ async def run_action(server: ErServer, params: dict | None) -> dict:
 
     try:
         response = await services.run_action_raw(
-            request=request, options=options_schema, runner_context=server._runner_context
+            request=request, options=options_schema, runner_context=runner_context
         )
     except Exception as exception:
         if isinstance(exception, services.StopWithResponse):
@@ -776,9 +865,10 @@ async def run_handlers(server: ErServer, params: dict | None) -> dict:
     meta = (options or {}).get("meta") or {}
     trigger = meta.get("trigger", "unknown")
     dev_env = meta.get("devEnv", "unknown")
-    if server._runner_context is None:
+    runner_context = get_runner_context(server, params)
+    if runner_context is None:
         return {"error": "Extension runner not initialized"}
-    project_path = server._runner_context.project.dir_path
+    project_path = runner_context.project.dir_path
     er_wal.emit_run_event(
         server._wal_writer,
         event_type=er_wal.ErWalEventType.RUN_ACCEPTED,
@@ -805,7 +895,7 @@ async def run_handlers(server: ErServer, params: dict | None) -> dict:
 
     try:
         response = await services.run_handlers_raw(
-            request=request, options=options_schema, runner_context=server._runner_context
+            request=request, options=options_schema, runner_context=runner_context
         )
     except Exception as exception:
         if isinstance(exception, services.ActionCancelledException):
@@ -873,9 +963,10 @@ async def reload_action(server: ErServer, params: dict | None) -> dict:
     assert params is not None
     action_name: str = params["actionName"]
     logger.trace(f"Reload action: {action_name}")
-    if server._runner_context is None:
+    runner_context = get_runner_context(server, params)
+    if runner_context is None:
         return {}
-    services.reload_action(action_name, server._runner_context)
+    services.reload_action(action_name, runner_context)
     return {}
 
 
@@ -888,11 +979,12 @@ async def resolve_package_path(_server: ErServer, params: dict | None) -> dict:
     return {"packagePath": result}
 
 
-async def get_payload_schemas_cmd(server: ErServer, _params: dict | None) -> dict:
+async def get_payload_schemas_cmd(server: ErServer, params: dict | None) -> dict:
     logger.trace("Get payload schemas")
-    if server._runner_context is None:
+    runner_context = get_runner_context(server, params)
+    if runner_context is None:
         return {}
-    return services.get_payload_schemas(server._runner_context)
+    return services.get_payload_schemas(runner_context)
 
 
 async def merge_results_cmd(server: ErServer, params: dict | None) -> dict:
@@ -900,11 +992,12 @@ async def merge_results_cmd(server: ErServer, params: dict | None) -> dict:
     action_name: str = params["actionName"]
     results: list = params["results"]
     logger.trace(f"Merge results: action={action_name}, count={len(results)}")
-    if server._runner_context is None:
+    runner_context = get_runner_context(server, params)
+    if runner_context is None:
         return {"error": "Extension runner not initialized"}
     try:
         merged = await merge_results_service.merge_results(
-            action_name=action_name, results=results, runner_context=server._runner_context
+            action_name=action_name, results=results, runner_context=runner_context
         )
         return {"merged": merged}
     except Exception as exception:
@@ -939,11 +1032,12 @@ async def resolve_source(_server: ErServer, params: dict | None) -> dict:
     return {"canonicalSource": canonical}
 
 
-async def resolve_action_meta(server: ErServer, _params: dict | None) -> dict:
+async def resolve_action_meta(server: ErServer, params: dict | None) -> dict:
     """Handler for ``finecodeRunner/resolveActionMeta``."""
-    if server._runner_context is None:
+    runner_context = get_runner_context(server, params)
+    if runner_context is None:
         return {}
-    return await services.resolve_action_meta(server._runner_context)
+    return await services.resolve_action_meta(runner_context)
 
 
 async def get_runner_info(_server: ErServer, _params: dict | None) -> dict:
@@ -1004,6 +1098,7 @@ def create_er_server(wal_writer: er_wal.ErWalWriter | None = None) -> ErServer:
 
     # ER-specific commands (direct JSON-RPC methods, previously workspace/executeCommand)
     session.on_request("finecodeRunner/updateConfig", _wrap(update_config))
+    session.on_request("finecodeRunner/removeProject", _wrap(remove_project))
     session.on_request("finecodeRunner/updateLogging", _wrap(update_logging))
     session.on_request("finecodeRunner/resolveActionMeta", _wrap(resolve_action_meta))
     session.on_request("actions/run", _wrap(run_action))
@@ -1019,8 +1114,10 @@ def create_er_server(wal_writer: er_wal.ErWalWriter | None = None) -> ErServer:
         logger.info("Exit extension runner (atexit)")
         if server._wal_writer is not None:
             server._wal_writer.close()
-        services.shutdown_all_action_handlers(server._runner_context)
-        services.exit_all_action_handlers(server._runner_context)
+        for runner_context in server._runner_contexts.values():
+            services.shutdown_all_action_handlers(runner_context)
+            services.exit_all_action_handlers(runner_context)
+        process_executor_impl.shutdown_worker_pool()
 
     atexit.register(on_process_exit)
 
@@ -4,6 +4,9 @@ from pathlib import Path
 
 _handler_duration_hist = None
 _handler_errors_counter = None
+_cache_hits_counter = None
+_cache_misses_counter = None
+_cache_evictions_counter = None
 _telemetry_initialized = False
 
 
@@ -125,6 +128,7 @@ def init_tracer_provider(service_name: str, project_path: Path, endpoint: str) -
 
 def init_meter_provider(service_name: str, project_path: Path, endpoint: str) -> None:
     global _handler_duration_hist, _handler_errors_counter
+    global _cache_hits_counter, _cache_misses_counter, _cache_evictions_counter
 
     import importlib.metadata
 
@@ -162,6 +166,18 @@ def init_meter_provider(service_name: str, project_path: Path, endpoint: str) ->
         "finecode.handler.errors",
         description="Number of action handler execution errors",
     )
+    _cache_hits_counter = meter.create_counter(
+        "finecode.cache.hits",
+        description="Number of file cache lookups that returned a value",
+    )
+    _cache_misses_counter = meter.create_counter(
+        "finecode.cache.misses",
+        description="Number of file cache lookups without a value for the current file version",
+    )
+    _cache_evictions_counter = meter.create_counter(
+        "finecode.cache.evictions",
+        description="Number of file cache entries removed before they were replaced",
+    )
 
 
 def get_current_traceparent() -> str | None:
@@ -333,3 +349,20 @@ def handler_metrics(handler_name: str, action_name: str):
                 time.perf_counter() - start,
                 {"handler.name": handler_name, "action.name": action_name},
             )
+
+
+def record_cache_hit(namespace: str, layer: str) -> None:
+    if _cache_hits_counter is not None:
+        _cache_hits_counter.add(1, {"cache.namespace": namespace, "cache.layer": layer})
+
+
+def record_cache_miss(namespace: str) -> None:
+    if _cache_misses_counter is not None:
+        _cache_misses_counter.add(1, {"cache.namespace": namespace})
+
+
+def record_cache_eviction(namespace: str, reason: str, count: int = 1) -> None:
+    if _cache_evictions_counter is not None:
+        _cache_evictions_counter.add(
+            count, {"cache.namespace": namespace, "cache.eviction_reason": reason}
+        )
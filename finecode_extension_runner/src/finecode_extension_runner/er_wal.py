@@ -43,6 +43,8 @@ class ErWalConfig:
     dir_path: pathlib.Path | None = None
     max_segment_bytes: int = shared_wal.DEFAULT_MAX_SEGMENT_BYTES
     max_segments: int = shared_wal.DEFAULT_MAX_SEGMENTS
+    durability: shared_wal.WalDurability = shared_wal.WalDurability.FLUSH
+    group_commit_interval_sec: float = shared_wal.DEFAULT_GROUP_COMMIT_INTERVAL_SEC
 
 
 class ErWalWriter:
@@ -56,6 +58,8 @@ class ErWalWriter:
                 max_segment_bytes=effective_config.max_segment_bytes,
                 max_segments=effective_config.max_segments,
                 writer_id_prefix="er",
+                durability=effective_config.durability,
+                group_commit_interval_sec=effective_config.group_commit_interval_sec,
             )
         )
 
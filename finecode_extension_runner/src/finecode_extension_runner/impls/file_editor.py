@@ -2,9 +2,11 @@ import asyncio
 import contextlib
 import collections.abc
 import dataclasses
+import hashlib
 import pathlib
 from typing import TypeVar
 
+from finecode_extension_api import text_buffer
 from finecode_extension_api.interfaces import ifileeditor, ifilemanager, ilogger
 
 
@@ -110,11 +112,53 @@ class MultiQueueIterator(collections.abc.AsyncIterator[T]):
         self.shutdown()
 
 
-@dataclasses.dataclass
+def apply_change_to_buffer(
+    change: ifileeditor.FileChange, buffer: text_buffer.TextBuffer
+) -> bool:
+    if isinstance(change, ifileeditor.FileChangeFull):
+        return buffer.set_text(change.text)
+    return buffer.replace(
+        start_line=change.range.start.line,
+        start_character=change.range.start.character,
+        end_line=change.range.end.line,
+        end_character=change.range.end.character,
+        text=change.text,
+    )
+
+
 class OpenedFileInfo:
-    content: str
-    version: str
-    opened_by: list[ifileeditor.IFileEditorSession]
+    def __init__(
+        self, content: str, opened_by: list[ifileeditor.IFileEditorSession]
+    ) -> None:
+        self.buffer = text_buffer.TextBuffer(content)
+        self.opened_by = opened_by
+        self._version: str | None = None
+
+    @property
+    def content(self) -> str:
+        return self.buffer.text
+
+    @property
+    def version(self) -> str:
+        # computed on read, so that typing in a big file doesn't hash it on every
+        # keystroke. The same digest as of files on disk, so that a file opened with
+        # unchanged content keeps its version
+        if self._version is None:
+            self._version = hashlib.sha256(
+                self.buffer.text.encode("utf-8", errors="surrogatepass")
+            ).hexdigest()
+        return self._version
+
+    def apply_change(self, change: ifileeditor.FileChange) -> bool:
+        """Apply ``change`` to the content. Returns whether the content changed.
+
+        Raises:
+            ValueError: range of the change is invalid.
+        """
+        changed = apply_change_to_buffer(change=change, buffer=self.buffer)
+        if changed:
+            self._version = None
+        return changed
 
 
 @dataclasses.dataclass
@@ -227,14 +271,7 @@ class FileEditorSession(ifileeditor.IFileEditorProviderSession):
         self.logger.trace(f"Change file {file_path}")
         if file_path in self._opened_files:
             opened_file_info = self._opened_files[file_path]
-            file_content = opened_file_info.content
-            new_file_content = FileEditorSession.apply_change_to_file_content(
-                change=change, file_content=file_content
-            )
-            content_changed = new_file_content != file_content
-            self._update_opened_file_info(
-                file_path=file_path, new_file_content=new_file_content
-            )
+            content_changed = opened_file_info.apply_change(change)
             self.logger.trace(f"File {file_path} is opened, updated its content")
         else:
             file_content = await self._file_manager.get_content(file_path=file_path)
@@ -269,53 +306,9 @@ class FileEditorSession(ifileeditor.IFileEditorProviderSession):
     ) -> str:
         if isinstance(change, ifileeditor.FileChangeFull):
             return change.text
-        else:
-            # Split file content into lines
-            lines = file_content.splitlines(keepends=True)
-
-            # Get start and end positions
-            start_line = change.range.start.line
-            start_char = change.range.start.character
-            end_line = change.range.end.line
-            end_char = change.range.end.character
-
-            # Validate range
-            if start_line < 0 or end_line < 0:
-                raise ValueError("Invalid range: negative line numbers not allowed")
-
-            if end_line < start_line or (
-                end_line == start_line and end_char < start_char
-            ):
-                raise ValueError("Invalid range: end position is before start position")
-
-            # For bounds checking: line indices beyond file length should be treated as
-            # appending to the end. LSP spec allows this for insertions at end of file,
-            # make it also here the same.
-            # However, if both start and end are beyond bounds, it's likely an error.
-            if start_line > len(lines):
-                raise ValueError(
-                    f"Invalid range: start line {start_line} is beyond file length {len(lines)}"
-                )
-
-            # Build the new content
-            # Part before the change
-            before_parts: list[str] = []
-            for i in range(start_line):
-                before_parts.append(lines[i])
-            if start_line < len(lines):
-                before_parts.append(lines[start_line][:start_char])
-            before = "".join(before_parts)
-
-            # Part after the change
-            after_parts: list[str] = []
-            if end_line < len(lines):
-                after_parts.append(lines[end_line][end_char:])
-                for i in range(end_line + 1, len(lines)):
-                    after_parts.append(lines[i])
-            after = "".join(after_parts)
-
-            new_file_content = before + change.text + after
-            return new_file_content
+        buffer = text_buffer.TextBuffer(file_content)
+        apply_change_to_buffer(change=change, buffer=buffer)
+        return buffer.text
 
     @contextlib.asynccontextmanager
     async def subscribe_to_changes_of_opened_files(
@@ -394,11 +387,7 @@ class FileEditorSession(ifileeditor.IFileEditorProviderSession):
 
             opened_file_info.opened_by.append(self)
         else:
-            new_opened_file_info = OpenedFileInfo(
-                content=content,
-                version=str(hash(content)),
-                opened_by=[self],
-            )
+            new_opened_file_info = OpenedFileInfo(content=content, opened_by=[self])
             self._opened_files[file_path] = new_opened_file_info
 
         if self._subscribed_to_opened_files:
@@ -445,7 +434,9 @@ class FileEditorSession(ifileeditor.IFileEditorProviderSession):
             raise ValueError(f"{file_path} is not opened") from exception
 
         if len(self._all_events_subscriptions) > 0:
-            file_close_event = ifileeditor.FileOpenEvent(file_path=file_path)
+            file_close_event = ifileeditor.FileCloseEvent(
+                file_path=file_path, author=self.author
+            )
             for subscription in self._all_events_subscriptions.values():
                 subscription.event_queue.put_nowait(file_close_event)
 
@@ -454,9 +445,9 @@ class FileEditorSession(ifileeditor.IFileEditorProviderSession):
     ) -> None:
         # this method expects `file_path` is opened
         opened_file_info = self._opened_files[file_path]
-        opened_file_info.content = new_file_content
-        new_version = hash(new_file_content)  # or just increase?
-        opened_file_info.version = str(new_version)
+        opened_file_info.apply_change(
+            ifileeditor.FileChangeFull(text=new_file_content)
+        )
 
     @contextlib.asynccontextmanager
     async def subscribe_to_all_events(
@@ -1,9 +1,25 @@
+import asyncio
 import hashlib
+import os
 import shutil
+import time
 from pathlib import Path
+from typing import TypeAlias
 
 from finecode_extension_api.interfaces import ifilemanager, ilogger
 
+# (inode, size, modification time in ns)
+FileStatKey: TypeAlias = tuple[int, int, int]
+
+# A file can be changed again within the modification time granularity of the file
+# system without changing its size. Digests of files modified that recently are
+# therefore not memoized, otherwise the second change would stay unnoticed.
+_RACY_MTIME_WINDOW_NS = 2_000_000_000
+
+
+def _get_stat_key(stat_result: os.stat_result) -> FileStatKey:
+    return (stat_result.st_ino, stat_result.st_size, stat_result.st_mtime_ns)
+
 
 class FileManager(ifilemanager.IFileManager):
     def __init__(
@@ -11,6 +27,8 @@ class FileManager(ifilemanager.IFileManager):
         logger: ilogger.ILogger,
     ) -> None:
         self.logger = logger
+        # content digests of files, valid as long as stat of the file is the same
+        self._digest_by_file: dict[Path, tuple[FileStatKey, str]] = {}
 
     async def get_content(self, file_path: Path) -> str:
         file_content = self.read_content_file_from_fs(file_path=file_path)
@@ -18,8 +36,24 @@ class FileManager(ifilemanager.IFileManager):
         return file_content
 
     async def get_file_version(self, file_path: Path) -> str:
-        file_version: str = ""
-        file_version = self.get_hash_of_file_from_fs(file_path=file_path)
+        stat_key = _get_stat_key(os.stat(file_path))
+        memoized = self._digest_by_file.get(file_path)
+        if memoized is not None and memoized[0] == stat_key:
+            return memoized[1]
+
+        hashing_start_ns = time.time_ns()
+        # hashing of big files would block the event loop, run it in a thread
+        file_version = await asyncio.to_thread(
+            self.get_hash_of_file_from_fs, file_path=file_path
+        )
+        stat_key_after_hashing = _get_stat_key(os.stat(file_path))
+        if (
+            stat_key_after_hashing == stat_key
+            and stat_key[2] < hashing_start_ns - _RACY_MTIME_WINDOW_NS
+        ):
+            self._digest_by_file[file_path] = (stat_key, file_version)
+        else:
+            self._digest_by_file.pop(file_path, None)
 
         # 12 chars is enough to distinguish. The whole value is 64 chars length and
         # is not really needed in logs
@@ -29,6 +63,7 @@ class FileManager(ifilemanager.IFileManager):
 
     async def save_file(self, file_path: Path, file_content: str) -> None:
         self.logger.debug(f"Save file {file_path}")
+        self._digest_by_file.pop(file_path, None)
         with open(file_path, "w") as f:
             f.write(file_content)
 
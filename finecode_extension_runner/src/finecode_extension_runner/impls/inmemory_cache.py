@@ -1,29 +1,116 @@
+import asyncio
+import collections
+import dataclasses
+import pickle
+import sys
 from pathlib import Path
 from typing import Any, TypeAlias
 
+from finecode_extension_api import service
 from finecode_extension_api.interfaces import icache, ifileeditor, ilogger
+from finecode_extension_runner import er_telemetry
 
 CacheKeyType: TypeAlias = str
 
+DEFAULT_MAX_ENTRIES_PER_NAMESPACE = 10_000
+
+
+@dataclasses.dataclass
+class CacheLimits:
+    # `None` means no limit
+    max_entries: int | None = DEFAULT_MAX_ENTRIES_PER_NAMESPACE
+    # approximate, measured as size of the pickled value
+    max_bytes: int | None = None
+
+
+@dataclasses.dataclass
+class InMemoryCacheConfig:
+    # limits applied to each key namespace separately. Namespace is the part of the
+    # cache key before the first ':', see `icache.make_cache_key`
+    default_limits: CacheLimits = dataclasses.field(default_factory=CacheLimits)
+    limits_by_namespace: dict[str, CacheLimits] = dataclasses.field(
+        default_factory=dict
+    )
+
+
+@dataclasses.dataclass
+class _Entry:
+    file_version: str
+    value: Any
+    size_bytes: int
+
+
+class _Namespace:
+    def __init__(self, name: str, limits: CacheLimits) -> None:
+        self.name = name
+        self.limits = limits
+        # least recently used entries first
+        self.entries: collections.OrderedDict[tuple[Path, CacheKeyType], _Entry] = (
+            collections.OrderedDict()
+        )
+        self.size_bytes = 0
+
+
+def get_key_namespace(key: CacheKeyType) -> str:
+    return key.split(":", 1)[0]
+
+
+def _estimate_size(value: Any) -> int:
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except (pickle.PicklingError, TypeError, AttributeError):
+        return sys.getsizeof(value)
+
+
+class InMemoryCache(icache.ICache, service.DisposableService):
+    """ICache implementation that keeps values in memory of the runner.
+
+    Memory is bounded by LRU limits per key namespace. Values of a file are dropped
+    as soon as the file is changed through the file editor, or opened or closed with
+    content of another version, because they cannot be returned for the new file
+    version anyway.
+    """
 
-class InMemoryCache(icache.ICache):
     FILE_OPERATION_AUTHOR = ifileeditor.FileOperationAuthor(
         id="InMemoryCache"
     )
 
     def __init__(
-        self, file_editor: ifileeditor.IFileEditor, logger: ilogger.ILogger
+        self,
+        file_editor: ifileeditor.IFileEditor,
+        logger: ilogger.ILogger,
+        config: InMemoryCacheConfig,
     ):
         self.file_editor = file_editor
         self.logger = logger
+        self.config = config
+
+        self._namespaces: dict[str, _Namespace] = {}
+        self._keys_by_file: dict[Path, set[CacheKeyType]] = {}
+        self._invalidation_task: asyncio.Task[None] | None = None
 
-        self.cache_by_file: dict[Path, dict[CacheKeyType, tuple[str, Any]]] = {}
+    async def init(self) -> None:
+        subscribed = asyncio.Event()
+        self._invalidation_task = asyncio.create_task(
+            self._invalidate_on_file_events(subscribed)
+        )
+        await subscribed.wait()
 
-        # TODO: clear file cache when file changes
+    def dispose(self) -> None:
+        if self._invalidation_task is not None:
+            self._invalidation_task.cancel()
+            self._invalidation_task = None
 
     async def save_file_cache(
-        self, file_path: Path, file_version: str, key: CacheKeyType, value: Any
+        self,
+        file_path: Path,
+        file_version: str,
+        key: CacheKeyType,
+        value: Any,
+        *,
+        persistent: bool = True,
     ) -> None:
+        # values are never persisted, `persistent` makes no difference
         async with self.file_editor.session(
             author=self.FILE_OPERATION_AUTHOR
         ) as session:
@@ -33,23 +120,15 @@ class InMemoryCache(icache.ICache):
             # `value` was created for older version of file, don't save it
             return None
 
-        if file_path not in self.cache_by_file:
-            # no cache for file, create
-            self.cache_by_file[file_path] = {}
-
-        self.cache_by_file[file_path][key] = (file_version, value)
+        self.put_value(file_path, key, file_version, value)
 
     async def get_file_cache(self, file_path: Path, key: CacheKeyType) -> Any:
-        try:
-            file_cache = self.cache_by_file[file_path]
-        except KeyError as exception:
-            self.logger.debug(f"No cache for file {file_path}, cache miss")
-            raise icache.CacheMissException() from exception
-
-        if key not in file_cache:
+        namespace = get_key_namespace(key)
+        if (file_path, key) not in self._get_namespace(namespace).entries:
             self.logger.debug(
                 f"No cache with key {key} for file {file_path}, cache miss"
             )
+            er_telemetry.record_cache_miss(namespace)
             raise icache.CacheMissException()
 
         async with self.file_editor.session(
@@ -57,13 +136,142 @@ class InMemoryCache(icache.ICache):
         ) as session:
             current_file_version = await session.read_file_version(file_path)
 
-        cached_file_version = file_cache[key][0]
-        if cached_file_version != current_file_version:
+        try:
+            value = self.get_value(file_path, key, current_file_version)
+        except icache.CacheMissException:
             self.logger.debug(
                 f"Cached value for file {file_path} is outdated, cache miss"
             )
+            er_telemetry.record_cache_miss(namespace)
+            raise
+
+        self.logger.debug(f"Use cached value for {file_path}, key {key}")
+        er_telemetry.record_cache_hit(namespace, layer="memory")
+        return value
+
+    def get_value(self, file_path: Path, key: CacheKeyType, file_version: str) -> Any:
+        """Return the value saved for ``file_version`` without reading the file.
+
+        Raises:
+            CacheMissException: no value is cached for this file version.
+        """
+        namespace = self._get_namespace(get_key_namespace(key))
+        entry = namespace.entries.get((file_path, key))
+        if entry is None:
+            raise icache.CacheMissException()
+        if entry.file_version != file_version:
+            self._remove_entry(namespace, file_path, key)
             raise icache.CacheMissException()
-        else:
-            self.logger.debug(f"Use cached value for {file_path}, key {key}")
-            cached_value = file_cache[key][1]
-            return cached_value
+
+        namespace.entries.move_to_end((file_path, key))
+        return entry.value
+
+    def put_value(
+        self, file_path: Path, key: CacheKeyType, file_version: str, value: Any
+    ) -> None:
+        """Save ``value`` for ``file_version`` without checking the current file
+        version and evict least recently used entries of the key namespace if its
+        limits are exceeded.
+        """
+        namespace = self._get_namespace(get_key_namespace(key))
+        if (file_path, key) in namespace.entries:
+            self._remove_entry(namespace, file_path, key)
+
+        size_bytes = (
+            _estimate_size(value) if namespace.limits.max_bytes is not None else 0
+        )
+        namespace.entries[(file_path, key)] = _Entry(
+            file_version=file_version, value=value, size_bytes=size_bytes
+        )
+        namespace.size_bytes += size_bytes
+        self._keys_by_file.setdefault(file_path, set()).add(key)
+        self._evict_over_limits(namespace)
+
+    def invalidate_file(
+        self, file_path: Path, *, keep_file_version: str | None = None
+    ) -> None:
+        """Drop values of the file, except the ones saved for ``keep_file_version``."""
+        keys = self._keys_by_file.get(file_path)
+        if keys is None:
+            return
+
+        evicted_count_by_namespace: collections.Counter[str] = collections.Counter()
+        for key in list(keys):
+            namespace = self._get_namespace(get_key_namespace(key))
+            if (
+                keep_file_version is not None
+                and namespace.entries[(file_path, key)].file_version
+                == keep_file_version
+            ):
+                continue
+            self._remove_entry(namespace, file_path, key)
+            evicted_count_by_namespace[namespace.name] += 1
+        for namespace_name, count in evicted_count_by_namespace.items():
+            er_telemetry.record_cache_eviction(
+                namespace_name, reason="file_changed", count=count
+            )
+
+    def _get_namespace(self, name: str) -> _Namespace:
+        namespace = self._namespaces.get(name)
+        if namespace is None:
+            limits = self.config.limits_by_namespace.get(
+                name, self.config.default_limits
+            )
+            namespace = _Namespace(name=name, limits=limits)
+            self._namespaces[name] = namespace
+        return namespace
+
+    def _remove_entry(
+        self, namespace: _Namespace, file_path: Path, key: CacheKeyType
+    ) -> None:
+        entry = namespace.entries.pop((file_path, key))
+        namespace.size_bytes -= entry.size_bytes
+        file_keys = self._keys_by_file[file_path]
+        file_keys.discard(key)
+        if len(file_keys) == 0:
+            del self._keys_by_file[file_path]
+
+    def _evict_over_limits(self, namespace: _Namespace) -> None:
+        limits = namespace.limits
+        evicted_count = 0
+        # the most recently saved entry is never evicted, even if it alone exceeds
+        # `max_bytes`
+        while len(namespace.entries) > 1 and (
+            (limits.max_entries is not None and len(namespace.entries) > limits.max_entries)
+            or (limits.max_bytes is not None and namespace.size_bytes > limits.max_bytes)
+        ):
+            file_path, key = next(iter(namespace.entries))
+            self._remove_entry(namespace, file_path, key)
+            evicted_count += 1
+        if evicted_count > 0:
+            er_telemetry.record_cache_eviction(
+                namespace.name, reason="limit", count=evicted_count
+            )
+
+    async def _invalidate_on_file_events(self, subscribed: asyncio.Event) -> None:
+        async with self.file_editor.session(
+            author=self.FILE_OPERATION_AUTHOR
+        ) as session:
+            async with session.subscribe_to_all_events() as events:
+                subscribed.set()
+                async for event in events:
+                    if isinstance(event, ifileeditor.FileChangeEvent):
+                        self.invalidate_file(event.file_path)
+                        continue
+
+                    # opening or closing a file changes its version only if content
+                    # in the editor differs from the one on disk, compare versions to
+                    # keep values that are still valid
+                    if event.file_path not in self._keys_by_file:
+                        continue
+                    try:
+                        current_file_version = await session.read_file_version(
+                            event.file_path
+                        )
+                    except OSError:
+                        # e.g. the file was closed and doesn't exist on disk
+                        self.invalidate_file(event.file_path)
+                        continue
+                    self.invalidate_file(
+                        event.file_path, keep_file_version=current_file_version
+                    )
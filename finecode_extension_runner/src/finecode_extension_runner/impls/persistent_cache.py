@@ -0,0 +1,366 @@
+import dataclasses
+import pathlib
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+from typing import Any
+
+from finecode_extension_api import service
+from finecode_extension_api.interfaces import icache, ifileeditor, ilogger
+from finecode_extension_runner import er_telemetry
+from finecode_extension_runner.impls import inmemory_cache
+
+DEFAULT_MAX_SIZE_BYTES = 512 * 1024 * 1024
+STORE_FILE_NAME = "results.sqlite3"
+# after eviction the store is shrunk a bit below the limit, otherwise every save of a
+# full store would trigger another eviction round
+_EVICTION_TARGET_RATIO = 0.9
+
+
+def default_store_dir_path() -> pathlib.Path:
+    venv_dir_path = pathlib.Path(sys.executable).parent.parent
+    return venv_dir_path / "state" / "finecode" / "cache"
+
+
+@dataclasses.dataclass
+class ResultStoreStats:
+    path: pathlib.Path
+    entries_count: int
+    files_count: int
+    size_bytes: int
+    entries_count_by_key: dict[str, int]
+
+
+class ResultStore:
+    """SQLite-backed store of pickled values keyed by file path, cache key and file
+    version (content hash).
+
+    Synchronous and thread-safe. Used by ``PersistentCache`` in the Extension Runner and
+    directly by the CLI for stats and pruning, so it must not depend on a running
+    runner.
+
+    Reads don't write: access times of read entries are kept in memory and written
+    together with the next change of the store or on close, so that a cache hit
+    doesn't wait for a commit.
+    """
+
+    def __init__(self, db_path: pathlib.Path, max_size_bytes: int = DEFAULT_MAX_SIZE_BYTES) -> None:
+        self.db_path = db_path
+        self.max_size_bytes = max_size_bytes
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+        self._total_size: int | None = None
+        # (file path, key) -> last access time not written to the store yet
+        self._pending_accesses: dict[tuple[str, str], float] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.db_path, check_same_thread=False)
+            # WAL journal allows the CLI to read stats while a runner writes, NORMAL
+            # synchronous mode is durable enough for a cache that can be rebuilt
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    file_path TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    file_version TEXT NOT NULL,
+                    value BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (file_path, key)
+                )
+                """
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)"
+            )
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def get(self, file_path: pathlib.Path, key: str, file_version: str) -> bytes | None:
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT value FROM entries WHERE file_path = ? AND key = ? AND file_version = ?",
+                (str(file_path), key, file_version),
+            ).fetchone()
+            if row is None:
+                return None
+            self._pending_accesses[(str(file_path), key)] = time.time()
+            return row[0]
+
+    def put(
+        self, file_path: pathlib.Path, key: str, file_version: str, value: bytes
+    ) -> None:
+        with self._lock:
+            connection = self._connect()
+            self._write_pending_accesses(connection)
+            total_size = self._get_total_size(connection)
+            previous = connection.execute(
+                "SELECT size FROM entries WHERE file_path = ? AND key = ?",
+                (str(file_path), key),
+            ).fetchone()
+            if previous is not None:
+                total_size -= previous[0]
+            connection.execute(
+                "INSERT OR REPLACE INTO entries"
+                " (file_path, key, file_version, value, size, last_access)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (str(file_path), key, file_version, value, len(value), time.time()),
+            )
+            total_size += len(value)
+            if total_size > self.max_size_bytes:
+                total_size = self._evict(
+                    connection,
+                    total_size=total_size,
+                    target_size=int(self.max_size_bytes * _EVICTION_TARGET_RATIO),
+                )
+            connection.commit()
+            self._total_size = total_size
+
+    def prune(self, max_size_bytes: int | None = None, older_than_s: float | None = None) -> int:
+        """Remove least recently used entries until the store fits ``max_size_bytes``
+        and entries not accessed for ``older_than_s`` seconds. Returns the number of
+        removed entries.
+        """
+        with self._lock:
+            connection = self._connect()
+            self._write_pending_accesses(connection)
+            removed_count = 0
+            if older_than_s is not None:
+                cursor = connection.execute(
+                    "DELETE FROM entries WHERE last_access < ?",
+                    (time.time() - older_than_s,),
+                )
+                removed_count += cursor.rowcount
+                self._total_size = None
+            total_size = self._get_total_size(connection)
+            if max_size_bytes is not None and total_size > max_size_bytes:
+                count_before = self._count_entries(connection)
+                total_size = self._evict(
+                    connection, total_size=total_size, target_size=max_size_bytes
+                )
+                removed_count += count_before - self._count_entries(connection)
+            connection.commit()
+            self._total_size = total_size
+        if removed_count > 0:
+            self.vacuum()
+        return removed_count
+
+    def clear(self) -> None:
+        with self._lock:
+            connection = self._connect()
+            connection.execute("DELETE FROM entries")
+            connection.commit()
+            self._pending_accesses.clear()
+            self._total_size = 0
+        self.vacuum()
+
+    def stats(self) -> ResultStoreStats:
+        with self._lock:
+            connection = self._connect()
+            entries_count, files_count, size_bytes = connection.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT file_path), COALESCE(SUM(size), 0)"
+                " FROM entries"
+            ).fetchone()
+            entries_count_by_key = {
+                key: count
+                for key, count in connection.execute(
+                    "SELECT key, COUNT(*) FROM entries GROUP BY key ORDER BY key"
+                )
+            }
+        return ResultStoreStats(
+            path=self.db_path,
+            entries_count=entries_count,
+            files_count=files_count,
+            size_bytes=size_bytes,
+            entries_count_by_key=entries_count_by_key,
+        )
+
+    def vacuum(self) -> None:
+        with self._lock:
+            connection = self._connect()
+            connection.execute("VACUUM")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._write_pending_accesses(self._connection)
+                self._connection.commit()
+                self._connection.close()
+                self._connection = None
+
+    def _write_pending_accesses(self, connection: sqlite3.Connection) -> None:
+        # the caller commits. Rows removed meanwhile are not updated
+        if len(self._pending_accesses) == 0:
+            return
+        connection.executemany(
+            "UPDATE entries SET last_access = ? WHERE file_path = ? AND key = ?",
+            [
+                (last_access, file_path, key)
+                for (file_path, key), last_access in self._pending_accesses.items()
+            ],
+        )
+        self._pending_accesses.clear()
+
+    def _get_total_size(self, connection: sqlite3.Connection) -> int:
+        if self._total_size is None:
+            self._total_size = connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()[0]
+        return self._total_size
+
+    def _count_entries(self, connection: sqlite3.Connection) -> int:
+        return connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def _evict(
+        self, connection: sqlite3.Connection, total_size: int, target_size: int
+    ) -> int:
+        rows_to_remove: list[tuple[str, str]] = []
+        for file_path, key, size in connection.execute(
+            "SELECT file_path, key, size FROM entries ORDER BY last_access"
+        ):
+            if total_size <= target_size:
+                break
+            rows_to_remove.append((file_path, key))
+            total_size -= size
+        connection.executemany(
+            "DELETE FROM entries WHERE file_path = ? AND key = ?", rows_to_remove
+        )
+        return total_size
+
+
+@dataclasses.dataclass
+class PersistentCacheConfig:
+    # directory of the store, `<venv>/state/finecode/cache` by default
+    dir_path: str | None = None
+    max_size_bytes: int = DEFAULT_MAX_SIZE_BYTES
+    # limits of unpickled values kept in memory of the runner
+    memory: inmemory_cache.InMemoryCacheConfig = dataclasses.field(
+        default_factory=inmemory_cache.InMemoryCacheConfig
+    )
+
+
+class PersistentCache(icache.ICache, service.DisposableService):
+    """ICache implementation that keeps values across runner restarts.
+
+    Values are stored on disk by file path, cache key and file content hash, so a
+    fresh runner reuses results for all files that didn't change since the previous
+    run. Keys must therefore include everything besides file content the value
+    depends on, see ``icache.make_cache_key``. Values that cannot be pickled are kept
+    in memory only.
+    """
+
+    FILE_OPERATION_AUTHOR = ifileeditor.FileOperationAuthor(id="PersistentCache")
+
+    def __init__(
+        self,
+        file_editor: ifileeditor.IFileEditor,
+        logger: ilogger.ILogger,
+        config: PersistentCacheConfig,
+    ) -> None:
+        self.file_editor = file_editor
+        self.logger = logger
+
+        store_dir_path = (
+            pathlib.Path(config.dir_path)
+            if config.dir_path is not None
+            else default_store_dir_path()
+        )
+        self._store = ResultStore(
+            db_path=store_dir_path / STORE_FILE_NAME,
+            max_size_bytes=config.max_size_bytes,
+        )
+        # unpickled values of the current runner, avoids deserialization on repeated
+        # reads of the same file
+        self._memory = inmemory_cache.InMemoryCache(
+            file_editor=file_editor, logger=logger, config=config.memory
+        )
+
+    async def init(self) -> None:
+        self.logger.debug(f"Persistent cache store: {self._store.db_path}")
+        await self._memory.init()
+
+    def dispose(self) -> None:
+        self._memory.dispose()
+        self._store.close()
+
+    async def save_file_cache(
+        self,
+        file_path: pathlib.Path,
+        file_version: str,
+        key: str,
+        value: Any,
+        *,
+        persistent: bool = True,
+    ) -> None:
+        current_file_version = await self._read_file_version(file_path)
+        if file_version != current_file_version:
+            # `value` was created for older version of file, don't save it
+            return None
+
+        self._memory.put_value(file_path, key, file_version, value)
+        if not persistent:
+            return None
+
+        try:
+            serialized_value = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError) as exception:
+            self.logger.debug(
+                f"Value with key {key} for {file_path} cannot be persisted, keep it"
+                f" only in memory: {exception}"
+            )
+            return None
+
+        self._store.put(
+            file_path=file_path, key=key, file_version=file_version, value=serialized_value
+        )
+
+    async def get_file_cache(self, file_path: pathlib.Path, key: str) -> Any:
+        current_file_version = await self._read_file_version(file_path)
+        namespace = inmemory_cache.get_key_namespace(key)
+
+        try:
+            value = self._memory.get_value(file_path, key, current_file_version)
+        except icache.CacheMissException:
+            pass
+        else:
+            self.logger.debug(f"Use cached value for {file_path}, key {key}")
+            er_telemetry.record_cache_hit(namespace, layer="memory")
+            return value
+
+        serialized_value = self._store.get(
+            file_path=file_path, key=key, file_version=current_file_version
+        )
+        if serialized_value is None:
+            self.logger.debug(f"No cache with key {key} for file {file_path}, cache miss")
+            er_telemetry.record_cache_miss(namespace)
+            raise icache.CacheMissException()
+
+        try:
+            value = pickle.loads(serialized_value)
+        except Exception as exception:
+            # e.g. class of the value was renamed or removed since it was saved
+            self.logger.debug(
+                f"Failed to load cached value with key {key} for {file_path}, cache"
+                f" miss: {exception}"
+            )
+            er_telemetry.record_cache_miss(namespace)
+            raise icache.CacheMissException() from exception
+
+        self.logger.debug(f"Use persisted value for {file_path}, key {key}")
+        er_telemetry.record_cache_hit(namespace, layer="disk")
+        self._memory.put_value(file_path, key, current_file_version, value)
+        return value
+
+    async def _read_file_version(self, file_path: pathlib.Path) -> str:
+        async with self.file_editor.session(
+            author=self.FILE_OPERATION_AUTHOR
+        ) as session:
+            return await session.read_file_version(file_path)
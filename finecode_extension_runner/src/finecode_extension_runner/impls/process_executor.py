@@ -1,9 +1,12 @@
 import asyncio
 import collections.abc
 import concurrent.futures
+import concurrent.futures.process
 import contextlib
 import functools
+import math
 import multiprocessing as mp
+import os
 import sys
 import typing
 
@@ -13,41 +16,90 @@ from finecode_extension_api.interfaces import iprocessexecutor
 
 P = typing.ParamSpec("P")
 T = typing.TypeVar("T")
+R = typing.TypeVar("R")
+
+# chunks per worker in `ProcessExecutor.map`: more than one balances items of
+# different cost between workers, few keeps IPC per item low
+CHUNKS_PER_WORKER = 4
+
+# worker processes shared by all actions of the runner. They are started on first
+# use and kept until the runner exits, so that module imports and tool config
+# cached in workers (e.g. with `functools.cache`) survive between action runs.
+_worker_pool: concurrent.futures.ProcessPoolExecutor | None = None
+
+
+def _get_worker_pool() -> concurrent.futures.ProcessPoolExecutor:
+    global _worker_pool
+    if _worker_pool is not None and _worker_pool._broken:
+        # a worker died, the pool doesn't accept new work anymore
+        _discard_worker_pool(_worker_pool)
+    if _worker_pool is None:
+        if sys.version_info < (3, 14, 0) and sys.platform == "linux":
+            # forkserver is default on linux in Python 3.14+, use the same also
+            # with older versions
+            mp_context = mp.get_context("forkserver")
+        else:
+            mp_context = mp.get_context("spawn")
+        _worker_pool = concurrent.futures.ProcessPoolExecutor(mp_context=mp_context)
+    return _worker_pool
+
+
+def shutdown_worker_pool() -> None:
+    """Stop worker processes of the runner, called on runner shutdown."""
+    global _worker_pool
+    if _worker_pool is not None:
+        logger.trace("Shutdown process executor worker pool")
+        _worker_pool.shutdown(wait=False, cancel_futures=True)
+        _worker_pool = None
+
+
+def _discard_worker_pool(pool: concurrent.futures.ProcessPoolExecutor) -> None:
+    """Shutdown a broken pool, the next action run starts a new one."""
+    global _worker_pool
+    logger.warning("Process executor worker pool is broken, it will be restarted")
+    pool.shutdown(wait=False, cancel_futures=True)
+    if _worker_pool is pool:
+        _worker_pool = None
+
+
+def _worker_count(pool: concurrent.futures.ProcessPoolExecutor) -> int:
+    return pool._max_workers or os.cpu_count() or 1
+
+
+def chunk_size_for(items_count: int, workers_count: int) -> int:
+    """Size of chunks `items_count` items are split into: about
+    `CHUNKS_PER_WORKER` chunks per worker."""
+    if items_count <= 0:
+        return 1
+    return max(1, math.ceil(items_count / (workers_count * CHUNKS_PER_WORKER)))
+
+
+def _run_chunk(
+    func: typing.Callable[..., R], items: list[typing.Any], args: tuple[typing.Any, ...]
+) -> list[R]:
+    return [func(item, *args) for item in items]
 
 
 class ProcessExecutor(iprocessexecutor.IProcessExecutor):
     def __init__(self) -> None:
-        self._py_process_executor: concurrent.futures.ProcessPoolExecutor | None = None
         self._active: bool = False
 
     @contextlib.contextmanager
     def activate(self) -> collections.abc.Iterator[None]:
+        # the worker pool is shared by the runner and stays running after the action
+        # run, see `_worker_pool`
         self._active = True
-        try:
-            yield
-        except Exception as exc:
-            raise exc
-        finally:
-            if self._py_process_executor is not None:
-                self._py_process_executor.shutdown()
-                self._py_process_executor = None
+        yield
 
-    async def submit(
-        self, func: typing.Callable[P, T], *args: P.args, **kwargs: P.kwargs
-    ):
+    def _ensure_pool(self) -> concurrent.futures.ProcessPoolExecutor:
         if not self._active:
             raise Exception("Process Executor is not activated")
+        return _get_worker_pool()
 
-        if self._py_process_executor is None:
-            if sys.version_info < (3, 14, 0) and sys.platform == "linux":
-                # forkserver is default on linux in Python 3.14+, use the same also
-                # with older versions
-                mp_context = mp.get_context("forkserver")
-            else:
-                mp_context = mp.get_context("spawn")
-            self._py_process_executor = concurrent.futures.ProcessPoolExecutor(
-                mp_context=mp_context
-            )
+    async def submit(
+        self, func: typing.Callable[P, T], *args: P.args, **kwargs: P.kwargs
+    ):
+        pool = self._ensure_pool()
 
         loop = asyncio.get_running_loop()
         func_to_execute = func
@@ -56,15 +108,55 @@ class ProcessExecutor(iprocessexecutor.IProcessExecutor):
 
         logger.debug(
             f"Run in process executor,"
-            f" queue: {self._py_process_executor._queue_count},"
-            f" processes: {len(self._py_process_executor._processes)},"
-            f" max workers: {self._py_process_executor._max_workers}"
+            f" queue: {pool._queue_count},"
+            f" processes: {len(pool._processes or {})},"
+            f" max workers: {pool._max_workers}"
         )
         try:
-            result = await loop.run_in_executor(
-                self._py_process_executor, func_to_execute, *args
-            )
+            result = await loop.run_in_executor(pool, func_to_execute, *args)
+        except concurrent.futures.process.BrokenProcessPool as exc:
+            _discard_worker_pool(pool)
+            logger.exception(exc)
+            raise exc
         except Exception as exc:
             logger.exception(exc)
             raise exc
         return result
+
+    async def map(
+        self,
+        func: typing.Callable[..., R],
+        items: collections.abc.Sequence[T],
+        *args: typing.Any,
+        chunk_size: int | None = None,
+    ) -> list[R]:
+        pool = self._ensure_pool()
+        if len(items) == 0:
+            return []
+
+        if chunk_size is None:
+            chunk_size = chunk_size_for(len(items), _worker_count(pool))
+        chunks = [
+            list(items[start : start + chunk_size])
+            for start in range(0, len(items), chunk_size)
+        ]
+        logger.debug(
+            f"Map {len(items)} items in process executor, chunks: {len(chunks)},"
+            f" chunk size: {chunk_size}, max workers: {pool._max_workers}"
+        )
+
+        loop = asyncio.get_running_loop()
+        futures = [
+            loop.run_in_executor(pool, _run_chunk, func, chunk, args)
+            for chunk in chunks
+        ]
+        try:
+            chunk_results = await asyncio.gather(*futures)
+        except Exception as exc:
+            for future in futures:
+                future.cancel()
+            if isinstance(exc, concurrent.futures.process.BrokenProcessPool):
+                _discard_worker_pool(pool)
+            logger.exception(exc)
+            raise exc
+        return [result for chunk_result in chunk_results for result in chunk_result]
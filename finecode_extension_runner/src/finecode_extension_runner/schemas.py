@@ -49,7 +49,10 @@ class UpdateConfigRequest(BaseSchema):
 
 
 @dataclass
-class UpdateConfigResponse(BaseSchema): ...
+class UpdateConfigResponse(BaseSchema):
+    # languages of documents whose open/change/close notifications the ER needs,
+    # None if it needs notifications of all documents
+    document_languages: list[str] | None = None
 
 
 @dataclass
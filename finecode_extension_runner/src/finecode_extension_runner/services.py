@@ -16,6 +16,7 @@ from finecode_extension_runner._services.run_action import (
     ActionCancelledException,
     ActionFailedException,
     StopWithResponse,
+    clear_injection_plans,
     run_action_raw,
     run_handlers_raw,
     create_action_exec_info,
@@ -142,7 +143,37 @@ async def update_config(
     if request.handlers_to_initialize is not None:
         await initialize_handlers(request.handlers_to_initialize, runner_context)
 
-    return schemas.UpdateConfigResponse(), runner_context
+    return (
+        schemas.UpdateConfigResponse(document_languages=_document_languages(actions)),
+        runner_context,
+    )
+
+
+def _document_languages(actions: dict[str, domain.ActionDeclaration]) -> list[str] | None:
+    """Languages of documents the handlers of the actions can process.
+
+    Handlers of a language-specific action (``Action.LANGUAGE``) only process
+    documents of its language. A language-agnostic action, or one whose class cannot
+    be imported, can process any document, then None is returned.
+    """
+    from finecode_extension_api.code_action import Action
+
+    languages: set[str] = set()
+    for action in actions.values():
+        if action.source is None:
+            return None
+        try:
+            cls = run_utils.import_module_member_by_source_str(action.source)
+        except Exception as exception:
+            logger.debug(f"Could not import action {action.source}: {exception}")
+            return None
+        language = (
+            cls.LANGUAGE if isinstance(cls, type) and issubclass(cls, Action) else None
+        )
+        if language is None:
+            return None
+        languages.add(language)
+    return sorted(languages)
 
 
 def _file_loc(cls: type, project_dir: Path | None) -> str | None:
@@ -356,6 +387,10 @@ def reload_action(action_name: str, runner_context: context.RunnerContext) -> No
 
         logger.trace(f"Remove modules of package '{source_package}' from cache")
 
+    # classes and functions of reloaded modules are new objects, plans of the old
+    # ones would only hold them in memory
+    clear_injection_plans()
+
 
 def resolve_package_path(package_name: str) -> str:
     try:
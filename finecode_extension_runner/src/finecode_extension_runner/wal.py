@@ -25,11 +25,20 @@ Present for run events (``run.*``, ``runner.selected``)
 Present for runner lifecycle events (``runner.*``)
 ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 ``env_name``        str   Execution environment name (e.g. ``"dev_no_runtime"``).
+
+Writing
+-------
+The writer keeps the active segment open and tracks its size in memory. Events are
+queued and written in groups by a background thread every
+``WalConfig.group_commit_interval_sec``; ``WalConfig.durability`` defines what
+happens after each group, see ``WalDurability``. Events queued when the process
+crashes are lost, at most one commit interval of events.
 """
 from __future__ import annotations
 
 import dataclasses
 import datetime as dt
+import enum
 import json
 import os
 import pathlib
@@ -38,12 +47,24 @@ import typing
 
 DEFAULT_MAX_SEGMENT_BYTES = 1_048_576  # 1 MiB
 DEFAULT_MAX_SEGMENTS = 20
+DEFAULT_GROUP_COMMIT_INTERVAL_SEC = 0.05
+# queued events are written without waiting for the commit interval above this size
+MAX_PENDING_BYTES = 262_144
 
 
 def utc_now_iso() -> str:
     return dt.datetime.now(dt.timezone.utc).isoformat()
 
 
+class WalDurability(enum.StrEnum):
+    # events are handed to the OS when the file buffer is full or on close
+    NONE = "none"
+    # each group of events is handed to the OS, it survives a crash of the process
+    FLUSH = "flush"
+    # each group of events is written to disk, it survives a crash of the OS
+    FSYNC = "fsync"
+
+
 @dataclasses.dataclass
 class WalConfig:
     enabled: bool = False
@@ -51,10 +72,13 @@ class WalConfig:
     max_segment_bytes: int = DEFAULT_MAX_SEGMENT_BYTES
     max_segments: int = DEFAULT_MAX_SEGMENTS
     writer_id_prefix: str = "writer"
+    durability: WalDurability = WalDurability.FLUSH
+    # 0 writes every event in `append`
+    group_commit_interval_sec: float = DEFAULT_GROUP_COMMIT_INTERVAL_SEC
 
 
 class WalWriter:
-    """Append-only JSONL WAL with segment rotation.
+    """Append-only JSONL WAL with segment rotation and group commit.
 
     This class intentionally contains only generic writer behavior so different
     processes can define independent event catalogs while sharing durable IO
@@ -68,10 +92,17 @@ class WalWriter:
             raise ValueError("WalConfig.max_segment_bytes must be > 0")
         if config.max_segments <= 0:
             raise ValueError("WalConfig.max_segments must be > 0")
+        if config.group_commit_interval_sec < 0:
+            raise ValueError("WalConfig.group_commit_interval_sec must be >= 0")
 
         self._dir_path = config.dir_path
-        self.config = dataclasses.replace(config)
+        self.config = dataclasses.replace(
+            config, durability=WalDurability(config.durability)
+        )
+        # guards sequence and queued events
         self._lock = threading.Lock()
+        # guards the segment file, held while a group is written
+        self._io_lock = threading.Lock()
         self._writer_id = (
             f"{self.config.writer_id_prefix}-{os.getpid()}-{int(dt.datetime.now().timestamp())}"
         )
@@ -79,6 +110,13 @@ class WalWriter:
         self._sequence = self._discover_last_sequence()
         self._active_path = self._segment_path(self._segment_index)
         self._dir_path.mkdir(parents=True, exist_ok=True)
+        self._handle: typing.BinaryIO | None = None
+        self._active_size = 0
+        self._pending: list[bytes] = []
+        self._pending_bytes = 0
+        self._flusher: threading.Thread | None = None
+        self._stop_flusher = threading.Event()
+        self._closed = False
 
     @property
     def writer_id(self) -> str:
@@ -97,7 +135,6 @@ class WalWriter:
         payload: dict[str, typing.Any] | None = None,
     ) -> None:
         with self._lock:
-            self._rotate_if_needed()
             self._sequence += 1
             event: dict[str, typing.Any] = {
                 "schema_version": 2,
@@ -118,22 +155,89 @@ class WalWriter:
                 event["dev_env"] = dev_env
             if env_name is not None:
                 event["env_name"] = env_name
-            with self._active_path.open("a", encoding="utf-8") as handle:
-                handle.write(json.dumps(event, ensure_ascii=True, default=str))
-                handle.write("\n")
+            line = json.dumps(event, ensure_ascii=True, default=str) + "\n"
+            encoded_line = line.encode("ascii")
+            self._pending.append(encoded_line)
+            self._pending_bytes += len(encoded_line)
+            write_now = (
+                self._closed
+                or self.config.group_commit_interval_sec == 0
+                or self._pending_bytes >= MAX_PENDING_BYTES
+            )
+            if not write_now and self._flusher is None:
+                self._start_flusher()
+
+        if write_now:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write queued events to the active segment."""
+        with self._io_lock:
+            with self._lock:
+                lines = self._pending
+                self._pending = []
+                self._pending_bytes = 0
+            if not lines:
+                return
+            for line in lines:
+                handle = self._get_segment_handle()
+                handle.write(line)
+                self._active_size += len(line)
+
+            if self.config.durability is WalDurability.FSYNC:
+                handle.flush()
+                os.fsync(handle.fileno())
+            elif self.config.durability is WalDurability.FLUSH:
+                handle.flush()
 
     def close(self) -> None:
-        return None
+        """Write queued events and close the active segment. Events appended after
+        close are written immediately."""
+        with self._lock:
+            self._closed = True
+            flusher = self._flusher
+            self._flusher = None
+        if flusher is not None:
+            self._stop_flusher.set()
+            flusher.join()
+        self.flush()
+        with self._io_lock:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
 
-    def _rotate_if_needed(self) -> None:
-        self._dir_path.mkdir(parents=True, exist_ok=True)
-        if not self._active_path.exists():
-            return
-        if self._active_path.stat().st_size < self.config.max_segment_bytes:
-            return
-        self._segment_index += 1
-        self._active_path = self._segment_path(self._segment_index)
-        self._cleanup_old_segments()
+    def _start_flusher(self) -> None:
+        self._stop_flusher.clear()
+        self._flusher = threading.Thread(
+            target=self._run_flusher, name="wal-flusher", daemon=True
+        )
+        self._flusher.start()
+
+    def _run_flusher(self) -> None:
+        while not self._stop_flusher.wait(self.config.group_commit_interval_sec):
+            self.flush()
+
+    def _get_segment_handle(self) -> typing.BinaryIO:
+        """Handle of the active segment, rotated if it is full. Call with
+        `_io_lock`."""
+        if (
+            self._handle is not None
+            and self._active_size >= self.config.max_segment_bytes
+        ):
+            self._handle.close()
+            self._handle = None
+            self._segment_index += 1
+            self._active_path = self._segment_path(self._segment_index)
+        if self._handle is None:
+            self._dir_path.mkdir(parents=True, exist_ok=True)
+            self._handle = self._active_path.open("ab")
+            self._active_size = self._handle.tell()
+            # after opening, so that the new segment counts in `max_segments`
+            self._cleanup_old_segments()
+            if self._active_size >= self.config.max_segment_bytes:
+                # filled by a previous writer
+                return self._get_segment_handle()
+        return self._handle
 
     def _cleanup_old_segments(self) -> None:
         segment_paths = self._list_segments()
@@ -177,4 +281,4 @@ class WalWriter:
         return 0
 
     def _segment_path(self, index: int) -> pathlib.Path:
-        return self._dir_path / f"wal-{index:06d}.jsonl"
\ No newline at end of file
+        return self._dir_path / f"wal-{index:06d}.jsonl"
@@ -0,0 +1,241 @@
+"""Prewarmed process that forks Extension Runners.
+
+Starting an ER pays interpreter startup and imports of the runner, its
+dependencies and handler modules. The zygote is started once per env, does these
+imports and then forks a ready runner on every request of the WM. POSIX only.
+
+Protocol: the zygote listens on a unix socket and prints
+`Zygote serving on <socket path>` to stdout. The WM opens one connection per
+runner and sends one JSON line `{"args": [...], "cwd": "..."}` together with file
+descriptors for stdout and stderr of the runner. `args` are arguments of the ER
+CLI, e.g. `["start", "--env-name=dev"]`. The zygote replies `{"pid": <pid>}`
+after the fork and `{"returncode": <code>}` when the runner exits. The reply is
+`{"stale": true}` if files of imported modules changed since the zygote started,
+e.g. after reinstalling the env; the zygote exits then, because its runners
+would run outdated code. If the fork fails, e.g. because of the process limit,
+the reply is `{"error": "<message>"}` and the zygote keeps serving, the WM starts
+the runner as a new process then.
+
+The zygote exits on EOF of its stdin, i.e. when the WM exits.
+"""
+
+import contextlib
+import importlib
+import importlib.metadata
+import json
+import os
+import selectors
+import signal
+import socket
+import sys
+import tempfile
+
+from loguru import logger
+
+MAX_REQUEST_SIZE = 64 * 1024
+SERVING_MESSAGE_PREFIX = "Zygote serving on "
+
+
+def preload(modules: list[str]) -> None:
+    # imports needed by every runner
+    import finecode_extension_runner.cli  # noqa: F401
+    import finecode_extension_runner.di.bootstrap  # noqa: F401
+    import finecode_extension_runner.er_server  # noqa: F401
+
+    for module_name in modules:
+        try:
+            importlib.import_module(module_name)
+        except Exception as exception:
+            # the runner reports the error when it initializes the handler
+            logger.debug(f"Failed to preload {module_name}: {exception}")
+
+    # fills caches of importlib.metadata used for entry point lookup in bootstrap
+    importlib.metadata.entry_points()
+
+
+def _snapshot_module_files() -> dict[str, int]:
+    mtimes: dict[str, int] = {}
+    for module in list(sys.modules.values()):
+        file_path = getattr(module, "__file__", None)
+        if file_path is None or file_path in mtimes:
+            continue
+        try:
+            mtimes[file_path] = os.stat(file_path).st_mtime_ns
+        except OSError:
+            continue
+    return mtimes
+
+
+def _module_files_changed(mtimes: dict[str, int]) -> bool:
+    for file_path, mtime_ns in mtimes.items():
+        try:
+            if os.stat(file_path).st_mtime_ns != mtime_ns:
+                return True
+        except OSError:
+            return True
+    return False
+
+
+class Zygote:
+    def __init__(self) -> None:
+        self._socket_dir_path = tempfile.mkdtemp(prefix="finecode-zygote-")
+        self.socket_path = os.path.join(self._socket_dir_path, "zygote.sock")
+        self._listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._listener.bind(self.socket_path)
+        self._listener.listen()
+        self._selector = selectors.DefaultSelector()
+        self._connection_by_pid: dict[int, socket.socket] = {}
+        self._module_mtimes: dict[str, int] = {}
+        self._wakeup_read_fd, self._wakeup_write_fd = os.pipe()
+
+    def serve(self) -> None:
+        self._module_mtimes = _snapshot_module_files()
+
+        os.set_blocking(self._wakeup_write_fd, False)
+        # SIGCHLD wakes up the selector, exited runners are reaped in the loop
+        signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+        signal.set_wakeup_fd(self._wakeup_write_fd, warn_on_full_buffer=False)
+
+        self._selector.register(self._listener, selectors.EVENT_READ, "listener")
+        self._selector.register(self._wakeup_read_fd, selectors.EVENT_READ, "wakeup")
+        self._selector.register(sys.stdin.fileno(), selectors.EVENT_READ, "stdin")
+        print(f"{SERVING_MESSAGE_PREFIX}{self.socket_path}", flush=True)
+
+        try:
+            while True:
+                for key, _ in self._selector.select():
+                    if key.data == "listener":
+                        connection, _ = self._listener.accept()
+                        if not self._handle_connection(connection):
+                            return
+                    elif key.data == "wakeup":
+                        os.read(self._wakeup_read_fd, 4096)
+                        self._reap_runners()
+                    elif key.data == "stdin":
+                        if not os.read(sys.stdin.fileno(), 4096):
+                            return
+        finally:
+            self._close()
+
+    def _handle_connection(self, connection: socket.socket) -> bool:
+        """Fork a runner requested on the connection. Returns False if the zygote
+        should exit."""
+        try:
+            message, fds, _, _ = socket.recv_fds(connection, MAX_REQUEST_SIZE, 2)
+            request = json.loads(message)
+            args = [str(arg) for arg in request["args"]]
+            cwd = str(request["cwd"])
+            if len(fds) != 2:
+                raise ValueError(f"Expected 2 file descriptors, got {len(fds)}")
+        except (OSError, ValueError, KeyError, TypeError) as exception:
+            logger.debug(f"Invalid zygote request: {exception}")
+            connection.close()
+            return True
+
+        try:
+            if _module_files_changed(self._module_mtimes):
+                _reply_and_close(connection, {"stale": True})
+                return False
+
+            try:
+                pid = os.fork()
+            except OSError as exception:
+                logger.debug(f"Failed to fork a runner: {exception}")
+                _reply_and_close(connection, {"error": f"fork failed: {exception}"})
+                return True
+            if pid == 0:
+                self._run_runner(args=args, cwd=cwd, stdout_fd=fds[0], stderr_fd=fds[1])
+        finally:
+            for fd in fds:
+                os.close(fd)
+
+        self._connection_by_pid[pid] = connection
+        # if the WM disconnected, the runner is reaped without reporting its exit
+        with contextlib.suppress(OSError):
+            _send_message(connection, {"pid": pid})
+        return True
+
+    def _run_runner(self, args: list[str], cwd: str, stdout_fd: int, stderr_fd: int) -> None:
+        # in the forked child, never returns to the zygote loop
+        exit_code = 1
+        try:
+            signal.set_wakeup_fd(-1)
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            self._selector.close()
+            self._listener.close()
+            for connection in self._connection_by_pid.values():
+                connection.close()
+            os.close(self._wakeup_read_fd)
+            os.close(self._wakeup_write_fd)
+            # like `start_new_session` of the runners started by the WM directly
+            os.setsid()
+
+            devnull_fd = os.open(os.devnull, os.O_RDONLY)
+            os.dup2(devnull_fd, 0)
+            os.close(devnull_fd)
+            os.dup2(stdout_fd, 1)
+            os.dup2(stderr_fd, 2)
+            os.chdir(cwd)
+
+            from finecode_extension_runner import cli
+
+            cli.main(args=args, prog_name="finecode_extension_runner")
+            exit_code = 0
+        except SystemExit as exception:
+            if isinstance(exception.code, int):
+                exit_code = exception.code
+            elif exception.code is None:
+                exit_code = 0
+        except BaseException as exception:
+            print(f"Extension Runner failed: {exception!r}", file=sys.stderr, flush=True)
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(exit_code)
+
+    def _reap_runners(self) -> None:
+        while self._connection_by_pid:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            connection = self._connection_by_pid.pop(pid, None)
+            if connection is None:
+                continue
+            try:
+                _send_message(
+                    connection, {"returncode": os.waitstatus_to_exitcode(status)}
+                )
+            except OSError:
+                ...
+            connection.close()
+
+    def _close(self) -> None:
+        self._selector.close()
+        self._listener.close()
+        for connection in self._connection_by_pid.values():
+            connection.close()
+        try:
+            os.unlink(self.socket_path)
+            os.rmdir(self._socket_dir_path)
+        except OSError:
+            ...
+
+
+def _send_message(connection: socket.socket, message: dict) -> None:
+    connection.sendall(json.dumps(message).encode("utf-8") + b"\n")
+
+
+def _reply_and_close(connection: socket.socket, message: dict) -> None:
+    with contextlib.suppress(OSError):
+        _send_message(connection, message)
+    connection.close()
+
+
+def start_zygote_sync(preload_modules: list[str]) -> None:
+    # the zygote has no log file, errors of runners are logged by the runners
+    logger.remove()
+    preload(preload_modules)
+    Zygote().serve()
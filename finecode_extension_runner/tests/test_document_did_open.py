@@ -44,3 +44,41 @@ async def test_did_open_notification_seeds_content_for_a_deleted_file(
 
         async with session.read_file(deleted_file) as file_info:
             assert file_info.content == "print(1)\n"
+
+
+async def test_did_open_notification_goes_to_session_of_its_project(
+    tmp_path: pathlib.Path,
+) -> None:
+    """A runner shared between projects keeps a file editor session per project
+    and routes documents by the `projectPath` param."""
+    # each project has its own runner context and therefore its own file editor
+    editor_a = FileEditor(logger=logger, file_manager=FileManager(logger=logger))
+    editor_b = FileEditor(logger=logger, file_manager=FileManager(logger=logger))
+    file_path = tmp_path / "b" / "module.py"
+    author = ifileeditor.FileOperationAuthor(id="FineCode_Extension_Runner_Server")
+
+    async with (
+        editor_a.session(author=author) as session_a,
+        editor_b.session(author=author) as session_b,
+    ):
+        fake_server = types.SimpleNamespace(
+            _finecode_file_editor_session=session_a,
+            _file_editor_sessions={
+                tmp_path / "a": session_a,
+                tmp_path / "b": session_b,
+            },
+        )
+        params = {
+            "textDocument": {
+                "uri": f"file://{file_path.as_posix()}",
+                "languageId": "python",
+                "version": 1,
+                "text": "print(1)\n",
+            },
+            "projectPath": (tmp_path / "b").as_posix(),
+        }
+
+        await er_server._document_did_open(fake_server, params)
+
+        assert editor_b.get_opened_files() == [file_path]
+        assert editor_a.get_opened_files() == []
@@ -0,0 +1,47 @@
+from finecode_extension_api import code_action
+from finecode_extension_runner import domain
+from finecode_extension_runner.services import _document_languages
+
+
+class _PythonAction(code_action.Action):
+    LANGUAGE = "python"
+
+
+class _TomlAction(code_action.Action):
+    LANGUAGE = "toml"
+
+
+class _AnyLanguageAction(code_action.Action):
+    pass
+
+
+def _actions(*classes: type) -> dict[str, domain.ActionDeclaration]:
+    return {
+        cls.__name__: domain.ActionDeclaration(
+            name=cls.__name__,
+            config={},
+            handlers=[],
+            source=f"{__name__}.{cls.__name__}",
+        )
+        for cls in classes
+    }
+
+
+def test_document_languages_are_languages_of_actions() -> None:
+    assert _document_languages(_actions(_TomlAction, _PythonAction)) == [
+        "python",
+        "toml",
+    ]
+
+
+def test_language_agnostic_action_needs_all_documents() -> None:
+    assert _document_languages(_actions(_PythonAction, _AnyLanguageAction)) is None
+
+
+def test_not_importable_action_needs_all_documents() -> None:
+    actions = _actions(_PythonAction)
+    actions["missing"] = domain.ActionDeclaration(
+        name="missing", config={}, handlers=[], source=f"{__name__}.Missing"
+    )
+
+    assert _document_languages(actions) is None
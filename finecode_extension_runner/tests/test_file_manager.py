@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import os
+import pathlib
+import time
+
+import pytest
+from loguru import logger
+
+from finecode_extension_runner.impls.file_manager import FileManager
+
+
+def _set_mtime_in_past(file_path: pathlib.Path) -> None:
+    past_s = time.time() - 60
+    os.utime(file_path, (past_s, past_s))
+
+
+@pytest.fixture
+def hashed_files(monkeypatch: pytest.MonkeyPatch) -> list[pathlib.Path]:
+    hashed: list[pathlib.Path] = []
+    original = FileManager.get_hash_of_file_from_fs
+
+    def counting_hash(self: FileManager, file_path: pathlib.Path) -> str:
+        hashed.append(file_path)
+        return original(self, file_path=file_path)
+
+    monkeypatch.setattr(FileManager, "get_hash_of_file_from_fs", counting_hash)
+    return hashed
+
+
+async def test_unchanged_file_is_hashed_once(
+    tmp_path: pathlib.Path, hashed_files: list[pathlib.Path]
+) -> None:
+    """Repeated version reads of an unchanged file use only its stat.
+
+    Every cache lookup and save reads the file version, so hashing the content each
+    time would read every checked file at least twice per run.
+    """
+    file_path = tmp_path / "module.py"
+    file_path.write_text("x = 1\n")
+    _set_mtime_in_past(file_path)
+    file_manager = FileManager(logger=logger)
+
+    first_version = await file_manager.get_file_version(file_path)
+    assert await file_manager.get_file_version(file_path) == first_version
+    assert hashed_files == [file_path]
+
+
+async def test_changed_file_gets_new_version(
+    tmp_path: pathlib.Path, hashed_files: list[pathlib.Path]
+) -> None:
+    file_path = tmp_path / "module.py"
+    file_path.write_text("x = 1\n")
+    _set_mtime_in_past(file_path)
+    file_manager = FileManager(logger=logger)
+    first_version = await file_manager.get_file_version(file_path)
+
+    file_path.write_text("x = 10\n")
+    _set_mtime_in_past(file_path)
+
+    assert await file_manager.get_file_version(file_path) != first_version
+    assert len(hashed_files) == 2
+
+
+async def test_recently_modified_file_is_always_hashed(
+    tmp_path: pathlib.Path, hashed_files: list[pathlib.Path]
+) -> None:
+    """A file modified within the mtime granularity can change again unnoticed by
+    stat, so its digest must not be reused."""
+    file_path = tmp_path / "module.py"
+    file_path.write_text("x = 1\n")
+    file_manager = FileManager(logger=logger)
+
+    await file_manager.get_file_version(file_path)
+    await file_manager.get_file_version(file_path)
+    assert len(hashed_files) == 2
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import asyncio
+import pathlib
+
+import pytest
+from loguru import logger
+
+from finecode_extension_api.interfaces import icache, ifileeditor
+from finecode_extension_runner.impls.file_editor import FileEditor
+from finecode_extension_runner.impls.file_manager import FileManager
+from finecode_extension_runner.impls.inmemory_cache import (
+    CacheLimits,
+    InMemoryCache,
+    InMemoryCacheConfig,
+)
+
+
+def _make_cache(
+    config: InMemoryCacheConfig | None = None,
+) -> tuple[InMemoryCache, FileEditor]:
+    editor = FileEditor(logger=logger, file_manager=FileManager(logger=logger))
+    cache = InMemoryCache(
+        file_editor=editor,
+        logger=logger,
+        config=config if config is not None else InMemoryCacheConfig(),
+    )
+    return cache, editor
+
+
+async def _save(cache: InMemoryCache, file_path: pathlib.Path, key: str, value: object) -> None:
+    async with cache.file_editor.session(author=cache.FILE_OPERATION_AUTHOR) as session:
+        version = await session.read_file_version(file_path)
+    await cache.save_file_cache(file_path, version, key, value)
+
+
+async def test_values_of_changed_file_are_dropped(tmp_path: pathlib.Path) -> None:
+    """A change through the file editor frees the memory of the file's values.
+
+    They could never be returned again, so keeping them until the next lookup
+    would let memory grow with every edited file during a long session.
+    """
+    file_path = tmp_path / "module.py"
+    file_path.write_text("x = 1\n")
+    cache, editor = _make_cache()
+    await cache.init()
+    try:
+        await _save(cache, file_path, "linter", ["E1"])
+        async with editor.session(
+            author=ifileeditor.FileOperationAuthor(id="test")
+        ) as session:
+            await session.save_file(file_path, "x = 2\n")
+            # let the invalidation task process the event
+            await asyncio.sleep(0)
+
+        assert cache._keys_by_file == {}
+        with pytest.raises(icache.CacheMissException):
+            await cache.get_file_cache(file_path, "linter")
+    finally:
+        cache.dispose()
+
+
+async def test_values_survive_opening_file_with_unchanged_content(
+    tmp_path: pathlib.Path,
+) -> None:
+    """Opening a file in the editor keeps values while its content matches disk."""
+    file_path = tmp_path / "module.py"
+    file_path.write_text("x = 1\n")
+    cache, editor = _make_cache()
+    await cache.init()
+    try:
+        await _save(cache, file_path, "linter", ["E1"])
+        async with editor.session(
+            author=ifileeditor.FileOperationAuthor(id="test")
+        ) as session:
+            await session.open_file(file_path, "x = 1\n")
+            # let the invalidation task process the event
+            await asyncio.sleep(0.01)
+
+            assert await cache.get_file_cache(file_path, "linter") == ["E1"]
+
+            await session.close_file(file_path)
+            await asyncio.sleep(0.01)
+
+        assert await cache.get_file_cache(file_path, "linter") == ["E1"]
+    finally:
+        cache.dispose()
+
+
+async def test_values_are_dropped_on_opening_file_with_other_content(
+    tmp_path: pathlib.Path,
+) -> None:
+    file_path = tmp_path / "module.py"
+    file_path.write_text("x = 1\n")
+    cache, editor = _make_cache()
+    await cache.init()
+    try:
+        await _save(cache, file_path, "linter", ["E1"])
+        async with editor.session(
+            author=ifileeditor.FileOperationAuthor(id="test")
+        ) as session:
+            await session.open_file(file_path, "x = 2\n")
+            await asyncio.sleep(0.01)
+
+            assert cache._keys_by_file == {}
+            await session.close_file(file_path)
+    finally:
+        cache.dispose()
+
+
+async def test_least_recently_used_entries_are_evicted_per_namespace(
+    tmp_path: pathlib.Path,
+) -> None:
+    """Each key namespace keeps at most `max_entries` values, recently used first.
+
+    Limits of one namespace don't affect values of other namespaces.
+    """
+    file_paths = []
+    for index in range(3):
+        file_path = tmp_path / f"module_{index}.py"
+        file_path.write_text(f"x = {index}\n")
+        file_paths.append(file_path)
+    cache, _ = _make_cache(
+        InMemoryCacheConfig(limits_by_namespace={"linter": CacheLimits(max_entries=2)})
+    )
+
+    await _save(cache, file_paths[0], "linter:abc", 0)
+    await _save(cache, file_paths[1], "linter:abc", 1)
+    await _save(cache, file_paths[0], "ast", "tree")
+    # touch the first file so that the second one becomes least recently used
+    assert await cache.get_file_cache(file_paths[0], "linter:abc") == 0
+    await _save(cache, file_paths[2], "linter:abc", 2)
+
+    assert await cache.get_file_cache(file_paths[0], "linter:abc") == 0
+    assert await cache.get_file_cache(file_paths[2], "linter:abc") == 2
+    with pytest.raises(icache.CacheMissException):
+        await cache.get_file_cache(file_paths[1], "linter:abc")
+    assert await cache.get_file_cache(file_paths[0], "ast") == "tree"
+
+
+async def test_namespace_is_bounded_by_size(tmp_path: pathlib.Path) -> None:
+    file_paths = []
+    for index in range(3):
+        file_path = tmp_path / f"module_{index}.py"
+        file_path.write_text(f"x = {index}\n")
+        file_paths.append(file_path)
+    cache, _ = _make_cache(
+        InMemoryCacheConfig(default_limits=CacheLimits(max_entries=None, max_bytes=2500))
+    )
+
+    for file_path in file_paths:
+        await _save(cache, file_path, "linter", "x" * 1000)
+
+    namespace = cache._namespaces["linter"]
+    assert namespace.size_bytes <= 2500
+    assert [file_path for file_path, _ in namespace.entries] == file_paths[1:]
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import pathlib
+
+import pytest
+from loguru import logger
+
+from finecode_extension_api.interfaces import icache
+from finecode_extension_runner.impls.file_editor import FileEditor
+from finecode_extension_runner.impls.inmemory_cache import InMemoryCache
+from finecode_extension_runner.impls.file_manager import FileManager
+from finecode_extension_runner.impls.persistent_cache import (
+    PersistentCache,
+    PersistentCacheConfig,
+    ResultStore,
+)
+
+
+def _make_cache(store_dir: pathlib.Path, max_size_bytes: int = 1024 * 1024) -> PersistentCache:
+    editor = FileEditor(logger=logger, file_manager=FileManager(logger=logger))
+    return PersistentCache(
+        file_editor=editor,
+        logger=logger,
+        config=PersistentCacheConfig(dir_path=str(store_dir), max_size_bytes=max_size_bytes),
+    )
+
+
+async def _file_version(cache: PersistentCache, file_path: pathlib.Path) -> str:
+    return await cache._read_file_version(file_path)
+
+
+async def test_results_survive_runner_restart(tmp_path: pathlib.Path) -> None:
+    """A fresh runner reuses results of unchanged files computed by a previous one.
+
+    This is what makes a warm CLI or CI run skip linting of files nobody touched.
+    """
+    file_path = tmp_path / "module.py"
+    file_path.write_text("x = 1\n")
+    store_dir = tmp_path / "store"
+
+    first_runner_cache = _make_cache(store_dir)
+    version = await _file_version(first_runner_cache, file_path)
+    await first_runner_cache.save_file_cache(file_path, version, "linter", ["E1"])
+    first_runner_cache.dispose()
+
+    second_runner_cache = _make_cache(store_dir)
+    assert await second_runner_cache.get_file_cache(file_path, "linter") == ["E1"]
+
+
+async def test_changed_file_is_a_cache_miss(tmp_path: pathlib.Path) -> None:
+    """Results of an older file version are never returned after the file changed."""
+    file_path = tmp_path / "module.py"
+    file_path.write_text("x = 1\n")
+    cache = _make_cache(tmp_path / "store")
+    version = await _file_version(cache, file_path)
+    await cache.save_file_cache(file_path, version, "linter", ["E1"])
+
+    file_path.write_text("x = 2\n")
+    restarted_cache = _make_cache(tmp_path / "store")
+    with pytest.raises(icache.CacheMissException):
+        await restarted_cache.get_file_cache(file_path, "linter")
+
+
+async def test_non_persistent_values_do_not_outlive_runner(tmp_path: pathlib.Path) -> None:
+    """Values that depend on other files stay in memory only.
+
+    Persisting them would return stale results in the next run when only a
+    dependency of the file changed.
+    """
+    file_path = tmp_path / "module.py"
+    file_path.write_text("import other\n")
+    cache = _make_cache(tmp_path / "store")
+    version = await _file_version(cache, file_path)
+    await cache.save_file_cache(file_path, version, "typecheck", [], persistent=False)
+    assert await cache.get_file_cache(file_path, "typecheck") == []
+
+    restarted_cache = _make_cache(tmp_path / "store")
+    with pytest.raises(icache.CacheMissException):
+        await restarted_cache.get_file_cache(file_path, "typecheck")
+
+
+def test_store_evicts_least_recently_used_entries_when_full(tmp_path: pathlib.Path) -> None:
+    """The store stays within its size budget and keeps recently used results."""
+    store = ResultStore(db_path=tmp_path / "results.sqlite3", max_size_bytes=250)
+    value = b"x" * 100
+    store.put(pathlib.Path("/a.py"), "k", "v1", value)
+    store.put(pathlib.Path("/b.py"), "k", "v1", value)
+    # touch `a.py` so that `b.py` becomes the least recently used entry
+    assert store.get(pathlib.Path("/a.py"), "k", "v1") == value
+    store.put(pathlib.Path("/c.py"), "k", "v1", value)
+
+    assert store.stats().size_bytes <= 250
+    assert store.get(pathlib.Path("/a.py"), "k", "v1") == value
+    assert store.get(pathlib.Path("/b.py"), "k", "v1") is None
+
+
+def test_store_reads_dont_write(tmp_path: pathlib.Path) -> None:
+    """A cache hit only reads; its access time is written with the next change."""
+    store = ResultStore(db_path=tmp_path / "results.sqlite3")
+    store.put(pathlib.Path("/a.py"), "k", "v1", b"value")
+    connection = store._connect()
+    changes_before = connection.total_changes
+
+    assert store.get(pathlib.Path("/a.py"), "k", "v1") == b"value"
+    assert connection.total_changes == changes_before
+
+    store.put(pathlib.Path("/b.py"), "k", "v1", b"value")
+    assert store._pending_accesses == {}
+
+
+def test_cache_key_changes_with_config_and_tool_version() -> None:
+    """Persisted results are never reused after handler config or tool upgrade."""
+    base_key = icache.make_cache_key("linter", {"line_length": 88}, "1.0.0")
+    assert base_key == icache.make_cache_key("linter", {"line_length": 88}, "1.0.0")
+    assert base_key != icache.make_cache_key("linter", {"line_length": 100}, "1.0.0")
+    assert base_key != icache.make_cache_key("linter", {"line_length": 88}, "1.1.0")
+
+
+def test_cache_key_changes_with_handler_code() -> None:
+    """Persisted results are never reused after the handler code changes."""
+    key = icache.make_cache_key("linter", {}, handler_type=PersistentCache)
+    assert key == icache.make_cache_key("linter", {}, handler_type=PersistentCache)
+    assert key != icache.make_cache_key("linter", {})
+    # handler in another module of the same distribution
+    assert key != icache.make_cache_key("linter", {}, handler_type=InMemoryCache)
+    assert "finecode_extension_runner==" in icache._get_distribution_version(
+        PersistentCache.__module__
+    )
@@ -0,0 +1,68 @@
+import concurrent.futures
+import concurrent.futures.process
+import operator
+import os
+
+import pytest
+
+from finecode_extension_runner.impls import process_executor
+
+
+@pytest.fixture(autouse=True)
+def stop_worker_pool():
+    yield
+    process_executor.shutdown_worker_pool()
+
+
+def test_chunk_size_gives_few_chunks_per_worker() -> None:
+    assert process_executor.chunk_size_for(3000, 8) == 94
+    assert process_executor.chunk_size_for(5, 8) == 1
+    assert process_executor.chunk_size_for(0, 8) == 1
+
+
+async def test_map_returns_results_in_item_order_and_keeps_workers() -> None:
+    executor = process_executor.ProcessExecutor()
+    with executor.activate():
+        squares = await executor.map(pow, list(range(10)), 2, chunk_size=3)
+    pool = process_executor._worker_pool
+
+    # workers stay for the next run of the action or of another action
+    other_executor = process_executor.ProcessExecutor()
+    with other_executor.activate():
+        products = await other_executor.map(operator.mul, [1, 2, 3], 10)
+        assert await other_executor.map(operator.mul, [], 10) == []
+
+    assert squares == [item**2 for item in range(10)]
+    assert products == [10, 20, 30]
+    assert process_executor._worker_pool is pool
+
+
+async def test_map_requires_activation() -> None:
+    with pytest.raises(Exception, match="not activated"):
+        await process_executor.ProcessExecutor().map(pow, [1], 2)
+
+
+async def test_pool_is_restarted_after_worker_crash() -> None:
+    executor = process_executor.ProcessExecutor()
+    with executor.activate():
+        with pytest.raises(concurrent.futures.process.BrokenProcessPool):
+            await executor.submit(os._exit, 1)
+
+    other_executor = process_executor.ProcessExecutor()
+    with other_executor.activate():
+        squares = await other_executor.map(pow, [1, 2, 3], 2)
+
+    assert squares == [1, 4, 9]
+
+
+async def test_broken_pool_is_not_reused(monkeypatch: pytest.MonkeyPatch) -> None:
+    executor = process_executor.ProcessExecutor()
+    with executor.activate():
+        await executor.map(pow, [1], 2)
+        broken_pool = process_executor._worker_pool
+        # broken by a worker crash which wasn't observed by an executor call
+        monkeypatch.setattr(broken_pool, "_broken", "A worker process died")
+
+        assert await executor.map(pow, [2, 3], 2) == [4, 9]
+
+    assert process_executor._worker_pool is not broken_pool
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import dataclasses
+
+from finecode_extension_runner._services import run_action
+from finecode_extension_runner.di.registry import Registry
+
+
+@dataclasses.dataclass
+class _Config:
+    value: int = 0
+
+
+class _Handler:
+    def __init__(self, config: _Config, *args, **kwargs) -> None:
+        self.config = config
+
+    async def run(self, payload: int) -> None:
+        pass
+
+
+async def test_bound_and_unbound_methods_get_own_injection_plans() -> None:
+    """The unbound `run` has `self` in its signature, a bound one doesn't; a plan
+    shared between them would pass `self` as an argument."""
+    handler = _Handler(config=_Config())
+    registry = Registry()
+
+    run_args = await run_action.resolve_func_args_with_di(
+        _Handler.run,
+        registry=registry,
+        known_args={"payload": lambda _: 1},
+        params_to_ignore=["self"],
+    )
+    bound_run_args = await run_action.resolve_func_args_with_di(
+        handler.run, registry=registry, known_args={"payload": lambda _: 2}
+    )
+
+    assert run_args == {"payload": 1}
+    assert bound_run_args == {"payload": 2}
+
+
+async def test_injection_plan_is_reused_until_cleared() -> None:
+    registry = Registry()
+    known_args = {"config": lambda param_type: param_type(value=1)}
+
+    args = await run_action.resolve_func_args_with_di(
+        _Handler.__init__,
+        registry=registry,
+        known_args=known_args,
+        params_to_ignore=["self"],
+    )
+    plan = run_action._get_injection_plan(_Handler.__init__)
+    assert run_action._get_injection_plan(_Handler.__init__) is plan
+
+    run_action.clear_injection_plans()
+
+    assert run_action._get_injection_plan(_Handler.__init__) is not plan
+    assert args == {"config": _Config(value=1)}
@@ -0,0 +1,90 @@
+import json
+import pathlib
+
+import pytest
+
+from finecode_extension_runner import wal
+
+
+def _read_events(wal_dir: pathlib.Path) -> list[dict]:
+    return [
+        json.loads(line)
+        for segment_path in sorted(wal_dir.glob("wal-*.jsonl"))
+        for line in segment_path.read_text().splitlines()
+    ]
+
+
+def _make_writer(wal_dir: pathlib.Path, **config_kwargs) -> wal.WalWriter:
+    return wal.WalWriter(
+        wal.WalConfig(enabled=True, dir_path=wal_dir, **config_kwargs)
+    )
+
+
+def test_queued_events_are_written_on_close(tmp_path: pathlib.Path) -> None:
+    # long interval: nothing is written by the flusher during the test
+    writer = _make_writer(tmp_path, group_commit_interval_sec=60)
+    for index in range(3):
+        writer.append(event_type="run.accepted", project_path=f"/p{index}")
+    assert _read_events(tmp_path) == []
+
+    writer.close()
+    writer.append(event_type="run.completed", project_path="/p0")
+
+    events = _read_events(tmp_path)
+    assert [event["sequence"] for event in events] == [1, 2, 3, 4]
+    assert events[-1]["event_type"] == "run.completed"
+
+
+def test_flush_writes_queued_events(tmp_path: pathlib.Path) -> None:
+    writer = _make_writer(tmp_path, group_commit_interval_sec=60)
+    writer.append(event_type="run.accepted", project_path="/p")
+
+    writer.flush()
+
+    assert len(_read_events(tmp_path)) == 1
+    writer.close()
+
+
+@pytest.mark.parametrize("durability", list(wal.WalDurability))
+def test_events_are_written_immediately_without_commit_interval(
+    tmp_path: pathlib.Path, durability: wal.WalDurability
+) -> None:
+    writer = _make_writer(
+        tmp_path, durability=durability, group_commit_interval_sec=0
+    )
+    writer.append(event_type="run.accepted", project_path="/p")
+
+    if durability is not wal.WalDurability.NONE:
+        assert len(_read_events(tmp_path)) == 1
+    writer.close()
+    assert len(_read_events(tmp_path)) == 1
+
+
+def test_segments_are_rotated_and_old_ones_removed(tmp_path: pathlib.Path) -> None:
+    writer = _make_writer(tmp_path, max_segment_bytes=500, max_segments=3)
+    for index in range(40):
+        writer.append(event_type="run.accepted", project_path=f"/p{index}")
+    writer.close()
+
+    segment_names = sorted(path.name for path in tmp_path.glob("wal-*.jsonl"))
+    events = _read_events(tmp_path)
+    assert len(segment_names) == 3
+    assert segment_names[-1] != "wal-000003.jsonl"
+    assert events[-1]["sequence"] == 40
+    assert [event["sequence"] for event in events] == list(
+        range(events[0]["sequence"], 41)
+    )
+
+
+def test_sequence_and_segment_continue_after_restart(tmp_path: pathlib.Path) -> None:
+    writer = _make_writer(tmp_path)
+    writer.append(event_type="run.accepted", project_path="/p")
+    writer.close()
+
+    restarted_writer = _make_writer(tmp_path)
+    restarted_writer.append(event_type="run.completed", project_path="/p")
+    restarted_writer.close()
+
+    events = _read_events(tmp_path)
+    assert [event["sequence"] for event in events] == [1, 2]
+    assert [path.name for path in tmp_path.glob("wal-*.jsonl")] == ["wal-000001.jsonl"]
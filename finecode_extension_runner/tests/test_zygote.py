@@ -0,0 +1,161 @@
+import errno
+import json
+import os
+import pathlib
+import socket
+import subprocess
+import sys
+
+import pytest
+
+from finecode_extension_runner import zygote
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(socket, "send_fds"), reason="zygote forks runners, POSIX only"
+)
+
+
+@pytest.fixture
+def zygote_process(tmp_path: pathlib.Path):
+    process = subprocess.Popen(
+        [sys.executable, "-m", "finecode_extension_runner.cli", "zygote"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        cwd=tmp_path,
+    )
+    yield process
+    # the zygote exits on EOF of stdin
+    process.stdin.close()
+    process.wait(timeout=10)
+    process.stdout.close()
+
+
+def _read_socket_path(process: subprocess.Popen) -> str:
+    line = process.stdout.readline().decode("utf-8").strip()
+    assert line.startswith(zygote.SERVING_MESSAGE_PREFIX)
+    return line.removeprefix(zygote.SERVING_MESSAGE_PREFIX)
+
+
+def _send_request(
+    connection: socket.socket, request: dict, fds: list[int]
+) -> None:
+    socket.send_fds(connection, [json.dumps(request).encode("utf-8")], fds)
+
+
+def _read_reply(connection: socket.socket) -> dict:
+    reply = b""
+    while not reply.endswith(b"\n"):
+        chunk = connection.recv(4096)
+        if not chunk:
+            break
+        reply += chunk
+    return json.loads(reply) if reply else {}
+
+
+def test_forked_runner_writes_to_passed_fds_and_exit_code_is_replied(
+    tmp_path: pathlib.Path, zygote_process: subprocess.Popen
+) -> None:
+    socket_path = _read_socket_path(zygote_process)
+    stdout_read_fd, stdout_write_fd = os.pipe()
+    stderr_read_fd, stderr_write_fd = os.pipe()
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.settimeout(10)
+        connection.connect(socket_path)
+        _send_request(
+            connection,
+            {"args": ["version"], "cwd": str(tmp_path)},
+            [stdout_write_fd, stderr_write_fd],
+        )
+        os.close(stdout_write_fd)
+        os.close(stderr_write_fd)
+        pid_reply = _read_reply(connection)
+        exit_reply = _read_reply(connection)
+
+    with os.fdopen(stdout_read_fd, "rb") as runner_stdout:
+        output = runner_stdout.read()
+    os.close(stderr_read_fd)
+    assert pid_reply["pid"] not in (os.getpid(), zygote_process.pid)
+    assert output.startswith(b"FineCode Extension Runner ")
+    assert exit_reply == {"returncode": 0}
+
+
+def test_invalid_request_is_ignored(zygote_process: subprocess.Popen) -> None:
+    socket_path = _read_socket_path(zygote_process)
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.settimeout(10)
+        connection.connect(socket_path)
+        # no file descriptors for stdout and stderr of the runner
+        connection.sendall(json.dumps({"args": [], "cwd": "/"}).encode("utf-8"))
+        assert connection.recv(4096) == b""
+
+    assert zygote_process.poll() is None
+
+
+def _handle_in_process(
+    zygote_server: zygote.Zygote, request: dict
+) -> tuple[bool, dict, bool]:
+    """Handle `request` by a zygote in this process. Returns result of the
+    handling, the reply and whether the zygote closed the passed descriptors."""
+    pipes = [os.pipe(), os.pipe()]
+    client, server = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        _send_request(client, request, [write_fd for _, write_fd in pipes])
+        for _, write_fd in pipes:
+            os.close(write_fd)
+        keep_serving = zygote_server._handle_connection(server)
+        client.settimeout(10)
+        reply = _read_reply(client)
+        fds_closed = True
+        for read_fd, _ in pipes:
+            os.set_blocking(read_fd, False)
+            try:
+                # EOF only if no copy of the write end is open anymore
+                fds_closed = fds_closed and os.read(read_fd, 1) == b""
+            except BlockingIOError:
+                fds_closed = False
+    finally:
+        client.close()
+        server.close()
+        zygote_server._close()
+        for read_fd, _ in pipes:
+            os.close(read_fd)
+    return keep_serving, reply, fds_closed
+
+
+def test_failed_fork_is_replied_and_zygote_keeps_serving(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def fail_fork() -> int:
+        raise OSError(errno.EAGAIN, "Resource temporarily unavailable")
+
+    monkeypatch.setattr(zygote.os, "fork", fail_fork)
+
+    keep_serving, reply, fds_closed = _handle_in_process(
+        zygote.Zygote(), {"args": ["start"], "cwd": str(tmp_path)}
+    )
+
+    assert keep_serving is True
+    assert reply["error"].startswith("fork failed: ")
+    assert fds_closed
+
+
+def test_zygote_with_changed_module_files_replies_stale(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    module_path = tmp_path / "zygote_preloaded_module.py"
+    module_path.write_text("VALUE = 1\n")
+    forks: list[int] = []
+    monkeypatch.setattr(zygote.os, "fork", lambda: forks.append(1))
+    zygote_server = zygote.Zygote()
+    zygote_server._module_mtimes = {str(module_path): 0}
+
+    keep_serving, reply, fds_closed = _handle_in_process(
+        zygote_server, {"args": ["start"], "cwd": str(tmp_path)}
+    )
+
+    assert keep_serving is False
+    assert reply == {"stale": True}
+    assert fds_closed
+    assert forks == []
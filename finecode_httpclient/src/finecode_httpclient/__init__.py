@@ -1,3 +1,3 @@
-from .client import HttpClient, HttpResponse, HttpSession
+from .client import HttpClient, HttpClientConfig, HttpResponse, HttpSession
 
-__all__ = ["HttpClient", "HttpResponse", "HttpSession"]
+__all__ = ["HttpClient", "HttpClientConfig", "HttpResponse", "HttpSession"]
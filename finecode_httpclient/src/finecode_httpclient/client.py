@@ -1,11 +1,33 @@
+import asyncio
+import collections
+import contextlib
+import dataclasses
+import importlib.util
 from types import TracebackType
 from typing import Any, Self
 
 import httpx
 
+from finecode_extension_api import service
 from finecode_extension_api.interfaces import ihttpclient, ilogger
 
 
+@dataclasses.dataclass
+class HttpClientConfig:
+    # limits of the connection pool shared by all sessions of the runner
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    # seconds an idle connection is kept open
+    keepalive_expiry: float = 30.0
+    # concurrent requests to one host, `None` means no limit besides the pool
+    max_connections_per_host: int | None = 10
+    # requires the `h2` package (extra `http2`), HTTP/1.1 is used without it
+    http2: bool = False
+    # GET responses with ETag or Last-Modified kept for conditional requests,
+    # 0 disables the cache
+    response_cache_max_entries: int = 256
+
+
 class HttpResponse(ihttpclient.IHttpResponse):
     """Wrapper for httpx.Response that implements IHttpResponse protocol."""
 
@@ -36,16 +58,21 @@ class HttpResponse(ihttpclient.IHttpResponse):
 
 
 class HttpSession(ihttpclient.IHttpSession):
-    """HTTP session implementation using httpx.AsyncClient."""
+    """HTTP session sending requests through the connection pool of `HttpClient`.
+
+    Opening and closing a session is cheap: connections are kept open by the pool
+    and reused by following sessions.
+    """
 
-    def __init__(self, logger: ilogger.ILogger):
+    def __init__(self, logger: ilogger.ILogger, http_client: "HttpClient"):
         self.logger = logger
+        self._http_client = http_client
         self._client: httpx.AsyncClient | None = None
 
     async def __aenter__(self) -> Self:
-        """Async context manager entry. Creates and initializes the httpx client."""
+        """Async context manager entry. Gets the shared httpx client."""
         self.logger.debug("HTTP session opened")
-        self._client = httpx.AsyncClient(follow_redirects=True)
+        self._client = self._http_client._get_pool()
         return self
 
     async def __aexit__(
@@ -54,9 +81,8 @@ class HttpSession(ihttpclient.IHttpSession):
         _exc_val: BaseException | None,
         _exc_tb: TracebackType | None,
     ) -> None:
-        """Async context manager exit. Automatically closes the client."""
+        """Async context manager exit. Connections stay in the shared pool."""
         if self._client is not None:
-            await self._client.aclose()
             self._client = None
             self.logger.debug("HTTP session closed")
 
@@ -68,6 +94,11 @@ class HttpSession(ihttpclient.IHttpSession):
             )
         return self._client
 
+    async def _send(self, request: httpx.Request) -> httpx.Response:
+        client = self._ensure_client()
+        async with self._http_client._host_slot(request.url.host):
+            return await client.send(request)
+
     async def get(
         self,
         url: str,
@@ -77,9 +108,24 @@ class HttpSession(ihttpclient.IHttpSession):
     ) -> ihttpclient.IHttpResponse:
         self.logger.debug(f"HTTP GET: {url}")
         client = self._ensure_client()
-        response = await client.get(
-            url, headers=headers, params=params, timeout=timeout
+        request = client.build_request(
+            "GET", url, headers=headers, params=params, timeout=timeout
         )
+        response_cache = self._http_client._response_cache
+        if response_cache is None or _is_conditional(request):
+            # the caller validates its own copy, it gets 304 responses as they are
+            return HttpResponse(await self._send(request))
+
+        cache_key = _ResponseCache.key(request.url, headers)
+        cached_response = response_cache.get(cache_key)
+        if cached_response is not None:
+            _add_validators(request, cached_response)
+        response = await self._send(request)
+        if response.status_code == 304 and cached_response is not None:
+            self.logger.debug(f"HTTP GET not modified, use cached response: {url}")
+            response_cache.move_to_end(cache_key)
+            return HttpResponse(cached_response)
+        response_cache.put(cache_key, response)
         return HttpResponse(response)
 
     async def post(
@@ -92,10 +138,10 @@ class HttpSession(ihttpclient.IHttpSession):
     ) -> ihttpclient.IHttpResponse:
         self.logger.debug(f"HTTP POST: {url}")
         client = self._ensure_client()
-        response = await client.post(
-            url, data=data, json=json, headers=headers, timeout=timeout
+        request = client.build_request(
+            "POST", url, data=data, json=json, headers=headers, timeout=timeout
         )
-        return HttpResponse(response)
+        return HttpResponse(await self._send(request))
 
     async def put(
         self,
@@ -107,10 +153,10 @@ class HttpSession(ihttpclient.IHttpSession):
     ) -> ihttpclient.IHttpResponse:
         self.logger.debug(f"HTTP PUT: {url}")
         client = self._ensure_client()
-        response = await client.put(
-            url, data=data, json=json, headers=headers, timeout=timeout
+        request = client.build_request(
+            "PUT", url, data=data, json=json, headers=headers, timeout=timeout
         )
-        return HttpResponse(response)
+        return HttpResponse(await self._send(request))
 
     async def delete(
         self,
@@ -120,8 +166,10 @@ class HttpSession(ihttpclient.IHttpSession):
     ) -> ihttpclient.IHttpResponse:
         self.logger.debug(f"HTTP DELETE: {url}")
         client = self._ensure_client()
-        response = await client.delete(url, headers=headers, timeout=timeout)
-        return HttpResponse(response)
+        request = client.build_request(
+            "DELETE", url, headers=headers, timeout=timeout
+        )
+        return HttpResponse(await self._send(request))
 
     async def head(
         self,
@@ -131,8 +179,10 @@ class HttpSession(ihttpclient.IHttpSession):
     ) -> ihttpclient.IHttpResponse:
         self.logger.debug(f"HTTP HEAD: {url}")
         client = self._ensure_client()
-        response = await client.head(url, headers=headers, timeout=timeout)
-        return HttpResponse(response)
+        request = client.build_request(
+            "HEAD", url, headers=headers, timeout=timeout
+        )
+        return HttpResponse(await self._send(request))
 
     async def request(
         self,
@@ -146,7 +196,7 @@ class HttpSession(ihttpclient.IHttpSession):
     ) -> ihttpclient.IHttpResponse:
         self.logger.debug(f"HTTP {method.upper()}: {url}")
         client = self._ensure_client()
-        response = await client.request(
+        request = client.build_request(
             method,
             url,
             data=data,
@@ -155,15 +205,181 @@ class HttpSession(ihttpclient.IHttpSession):
             params=params,
             timeout=timeout,
         )
-        return HttpResponse(response)
+        return HttpResponse(await self._send(request))
+
+
+class _ResponseCache:
+    """LRU cache of GET responses which can be validated with a conditional
+    request (ETag or Last-Modified)."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._responses: collections.OrderedDict[
+            tuple[str, tuple[tuple[str, str], ...]], httpx.Response
+        ] = collections.OrderedDict()
 
+    @staticmethod
+    def key(
+        url: httpx.URL, headers: dict[str, str] | None
+    ) -> tuple[str, tuple[tuple[str, str], ...]]:
+        # request headers like Accept or Authorization can change the response
+        headers_key = tuple(
+            sorted((name.lower(), value) for name, value in (headers or {}).items())
+        )
+        return (str(url), headers_key)
+
+    def get(
+        self, key: tuple[str, tuple[tuple[str, str], ...]]
+    ) -> httpx.Response | None:
+        return self._responses.get(key)
+
+    def move_to_end(self, key: tuple[str, tuple[tuple[str, str], ...]]) -> None:
+        if key in self._responses:
+            self._responses.move_to_end(key)
+
+    def put(
+        self, key: tuple[str, tuple[tuple[str, str], ...]], response: httpx.Response
+    ) -> None:
+        if not _is_cacheable(response):
+            # e.g. the resource was deleted or doesn't support validation anymore
+            self._responses.pop(key, None)
+            return
+        self._responses[key] = response
+        self._responses.move_to_end(key)
+        while len(self._responses) > self.max_entries:
+            self._responses.popitem(last=False)
 
-class HttpClient(ihttpclient.IHttpClient):
-    """HTTP client factory that creates sessions."""
+    def clear(self) -> None:
+        self._responses.clear()
 
-    def __init__(self, logger: ilogger.ILogger):
+
+def _is_cacheable(response: httpx.Response) -> bool:
+    if response.status_code != 200:
+        return False
+    if "no-store" in response.headers.get("cache-control", "").lower():
+        return False
+    return "etag" in response.headers or "last-modified" in response.headers
+
+
+def _is_conditional(request: httpx.Request) -> bool:
+    return (
+        "if-none-match" in request.headers or "if-modified-since" in request.headers
+    )
+
+
+def _add_validators(request: httpx.Request, cached_response: httpx.Response) -> None:
+    etag = cached_response.headers.get("etag")
+    if etag is not None:
+        request.headers["If-None-Match"] = etag
+    last_modified = cached_response.headers.get("last-modified")
+    if last_modified is not None:
+        request.headers["If-Modified-Since"] = last_modified
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+class HttpClient(ihttpclient.IHttpClient, service.DisposableService):
+    """HTTP client factory that creates sessions.
+
+    All sessions share one httpx client, created on first use, so connections
+    (DNS resolution, TCP and TLS handshakes) are reused across sessions, e.g. by
+    registry checks of many packages. GET responses with ETag or Last-Modified are
+    cached in memory and revalidated with conditional requests.
+    """
+
+    def __init__(
+        self,
+        logger: ilogger.ILogger,
+        config: HttpClientConfig,
+    ):
         self.logger = logger
+        self.config = config
+        self._pool: httpx.AsyncClient | None = None
+        self._host_semaphores: dict[str, asyncio.Semaphore] = {}
+        # pools closed by `dispose` in a running event loop
+        self._closing_pools: set[asyncio.Task[None]] = set()
+        self._response_cache: _ResponseCache | None = (
+            _ResponseCache(self.config.response_cache_max_entries)
+            if self.config.response_cache_max_entries > 0
+            else None
+        )
+
+    async def init(self) -> None:
+        # the pool is created lazily, runners which don't send requests don't pay
+        # for it
+        ...
+
+    def dispose(self) -> None:
+        if self._response_cache is not None:
+            self._response_cache.clear()
+        self._host_semaphores.clear()
+        if self._pool is not None:
+            pool = self._pool
+            self._pool = None
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                # e.g. the runner disposes services after its event loop stopped
+                try:
+                    asyncio.run(pool.aclose())
+                except Exception as exception:
+                    self.logger.warning(
+                        f"Failed to close HTTP connection pool: {exception}"
+                    )
+                else:
+                    self.logger.debug("HTTP connection pool closed")
+                return
+            close_task = loop.create_task(pool.aclose())
+            self._closing_pools.add(close_task)
+            close_task.add_done_callback(self._on_pool_closed)
+
+    async def wait_closed(self) -> None:
+        """Wait until connection pools closed by `dispose` are closed."""
+        if self._closing_pools:
+            await asyncio.gather(*self._closing_pools, return_exceptions=True)
+
+    def _on_pool_closed(self, close_task: asyncio.Task[None]) -> None:
+        self._closing_pools.discard(close_task)
+        if close_task.cancelled():
+            return
+        exception = close_task.exception()
+        if exception is not None:
+            self.logger.warning(f"Failed to close HTTP connection pool: {exception}")
+        else:
+            self.logger.debug("HTTP connection pool closed")
 
     def session(self) -> ihttpclient.IHttpSession:
         """Create a new HTTP session that should be used as a context manager."""
-        return HttpSession(self.logger)
+        return HttpSession(self.logger, self)
+
+    def _get_pool(self) -> httpx.AsyncClient:
+        if self._pool is None:
+            http2 = self.config.http2
+            if http2 and not _http2_available():
+                self.logger.warning(
+                    "HTTP/2 is enabled, but package 'h2' is not installed, use"
+                    " HTTP/1.1. Install finecode_httpclient[http2] to use HTTP/2."
+                )
+                http2 = False
+            self._pool = httpx.AsyncClient(
+                follow_redirects=True,
+                http2=http2,
+                limits=httpx.Limits(
+                    max_connections=self.config.max_connections,
+                    max_keepalive_connections=self.config.max_keepalive_connections,
+                    keepalive_expiry=self.config.keepalive_expiry,
+                ),
+            )
+            self.logger.debug("HTTP connection pool created")
+        return self._pool
+
+    def _host_slot(self, host: str) -> asyncio.Semaphore | contextlib.nullcontext[None]:
+        if self.config.max_connections_per_host is None:
+            return contextlib.nullcontext()
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.config.max_connections_per_host)
+            self._host_semaphores[host] = semaphore
+        return semaphore
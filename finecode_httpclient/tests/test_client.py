@@ -0,0 +1,162 @@
+import asyncio
+
+import httpx
+import pytest
+
+from finecode_httpclient.client import HttpClient, HttpClientConfig
+
+
+class _FakeLogger:
+    def debug(self, message: str) -> None: ...
+
+    def warning(self, message: str) -> None: ...
+
+
+class _FakeServer:
+    """Serves one resource with validators, answers conditional requests with 304
+    if the client has the current version."""
+
+    def __init__(self, validator_header: str = "ETag") -> None:
+        self.validator_header = validator_header
+        self.version = 1
+        self.requests: list[httpx.Request] = []
+
+    def _validator(self) -> str:
+        if self.validator_header == "ETag":
+            return f'"v{self.version}"'
+        return f"Thu, 01 Oct 2026 12:00:0{self.version} GMT"
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        conditional_header = (
+            "If-None-Match" if self.validator_header == "ETag" else "If-Modified-Since"
+        )
+        if request.headers.get(conditional_header) == self._validator():
+            return httpx.Response(304)
+        return httpx.Response(
+            200,
+            headers={self.validator_header: self._validator()},
+            content=f"version {self.version}".encode(),
+        )
+
+
+def _make_client(
+    handler, config: HttpClientConfig | None = None
+) -> HttpClient:
+    client = HttpClient(_FakeLogger(), config or HttpClientConfig())  # type: ignore[arg-type]
+    client._pool = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+@pytest.mark.parametrize("validator_header", ["ETag", "Last-Modified"])
+async def test_unchanged_response_is_returned_from_cache(validator_header: str) -> None:
+    server = _FakeServer(validator_header)
+    client = _make_client(server.handle)
+
+    async with client.session() as session:
+        first = await session.get("https://example.com/package")
+        second = await session.get("https://example.com/package")
+
+    assert (first.status_code, first.text) == (200, "version 1")
+    assert (second.status_code, second.text) == (200, "version 1")
+    assert [request.headers.get("If-None-Match") for request in server.requests] == (
+        [None, '"v1"'] if validator_header == "ETag" else [None, None]
+    )
+    assert server.requests[1].headers.get("If-Modified-Since") == (
+        None if validator_header == "ETag" else "Thu, 01 Oct 2026 12:00:01 GMT"
+    )
+
+
+async def test_changed_response_replaces_cached_one() -> None:
+    server = _FakeServer()
+    client = _make_client(server.handle)
+
+    async with client.session() as session:
+        await session.get("https://example.com/package")
+        server.version = 2
+        changed = await session.get("https://example.com/package")
+        unchanged = await session.get("https://example.com/package")
+
+    assert changed.text == "version 2"
+    assert unchanged.text == "version 2"
+    assert server.requests[2].headers["If-None-Match"] == '"v2"'
+
+
+async def test_caller_conditional_request_gets_not_modified_response() -> None:
+    server = _FakeServer()
+    client = _make_client(server.handle)
+    # the caller has an outdated copy first and the current one then
+    caller_headers = {"If-None-Match": '"v1"'}
+
+    async with client.session() as session:
+        server.version = 2
+        modified = await session.get(
+            "https://example.com/package", headers=caller_headers
+        )
+        server.version = 1
+        not_modified = await session.get(
+            "https://example.com/package", headers=caller_headers
+        )
+
+    assert modified.status_code == 200
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+
+async def test_responses_are_not_cached_if_cache_is_disabled() -> None:
+    server = _FakeServer()
+    client = _make_client(server.handle, HttpClientConfig(response_cache_max_entries=0))
+
+    async with client.session() as session:
+        await session.get("https://example.com/package")
+        await session.get("https://example.com/package")
+
+    assert "If-None-Match" not in server.requests[1].headers
+
+
+async def test_concurrent_requests_are_limited_per_host() -> None:
+    in_flight_by_host: dict[str, int] = {}
+    max_in_flight_by_host: dict[str, int] = {}
+
+    async def handle(request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        in_flight_by_host[host] = in_flight_by_host.get(host, 0) + 1
+        max_in_flight_by_host[host] = max(
+            max_in_flight_by_host.get(host, 0), in_flight_by_host[host]
+        )
+        await asyncio.sleep(0.01)
+        in_flight_by_host[host] -= 1
+        return httpx.Response(200)
+
+    client = _make_client(handle, HttpClientConfig(max_connections_per_host=2))
+
+    async with client.session() as session:
+        await asyncio.gather(
+            *(
+                session.post(f"https://{host}/upload")
+                for host in ["a.example.com", "b.example.com"] * 5
+            )
+        )
+
+    assert max_in_flight_by_host == {"a.example.com": 2, "b.example.com": 2}
+
+
+async def test_dispose_closes_pool_in_running_loop() -> None:
+    client = _make_client(_FakeServer().handle)
+    pool = client._pool
+    assert pool is not None
+
+    client.dispose()
+    await client.wait_closed()
+
+    assert pool.is_closed
+    assert client._pool is None
+
+
+def test_dispose_closes_pool_without_running_loop() -> None:
+    client = HttpClient(_FakeLogger(), HttpClientConfig())  # type: ignore[arg-type]
+    pool = client._get_pool()
+
+    client.dispose()
+
+    assert pool.is_closed
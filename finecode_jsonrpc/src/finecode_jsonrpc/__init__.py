@@ -5,6 +5,8 @@ from .client import (
     NoResponse,
     ResponseTimeout,
     ServerFailedToStart,
+    ServerProcess,
+    SpawnServerProcess,
     RequestCancelledError,
     ServerStoppedError,
 )
@@ -13,6 +15,8 @@ from .transports import StdioTransport
 from .server_transport import ServerStdioTransport, TcpServerTransport
 from .jsonrpc_server import JsonRpcHandlerError, JsonRpcServerSession, REQUEST_CANCELLED
 from .tracing import ITracingHooks
+from .codec import Codec, CodecNotAvailableError, create_codec, get_default_codec
+from .wire_format import WireFormat, WireFormatNotAvailableError
 
 
 __all__ = [
@@ -21,11 +25,19 @@ __all__ = [
     "JsonRpcHandlerError",
     "REQUEST_CANCELLED",
     "ITracingHooks",
+    "Codec",
+    "CodecNotAvailableError",
+    "create_codec",
+    "get_default_codec",
+    "WireFormat",
+    "WireFormatNotAvailableError",
     "BaseRunnerRequestException",
     "ErrorOnRequest",
     "NoResponse",
     "ResponseTimeout",
     "ServerFailedToStart",
+    "ServerProcess",
+    "SpawnServerProcess",
     "RequestCancelledError",
     "ServerStoppedError",
     "StdioTransport",
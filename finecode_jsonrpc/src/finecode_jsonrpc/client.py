@@ -7,7 +7,6 @@ import contextlib
 import dataclasses
 import enum
 import functools
-import json
 import os
 import re
 import subprocess
@@ -22,6 +21,8 @@ import cattrs
 import culsans
 from finecode_jsonrpc._converter import converter as _converter
 from finecode_jsonrpc import _io_thread
+from finecode_jsonrpc import codec as codec_module
+from finecode_jsonrpc import wire_format as wire_format_module
 from finecode_jsonrpc.tracing import ITracingHooks
 from loguru import logger
 
@@ -76,6 +77,27 @@ class ServerFailedToStart(Exception):
         self.message: typing.Final = message
 
 
+class ServerProcess(typing.Protocol):
+    """Server process as used by the client, e.g. `asyncio.subprocess.Process`."""
+
+    pid: int
+    stdin: asyncio.StreamWriter | None
+    stdout: asyncio.StreamReader | None
+    stderr: asyncio.StreamReader | None
+
+    @property
+    def returncode(self) -> int | None: ...
+
+    async def wait(self) -> int: ...
+
+
+# Starts the server process instead of a subprocess of the client, e.g. by forking
+# a prewarmed process. Called in the IO thread.
+SpawnServerProcess = collections.abc.Callable[
+    [], collections.abc.Awaitable[ServerProcess]
+]
+
+
 class ServerExitedBeforePort(Exception):
     def __init__(self, return_code: int | None) -> None:
         super().__init__()
@@ -149,8 +171,6 @@ class ServerStoppedError(BaseRunnerRequestException):
 
 
 class JsonRpcClient:
-    CHARSET: typing.Final[str] = "utf-8"
-    CONTENT_TYPE: typing.Final[str] = "application/vscode-jsonrpc"
     VERSION: typing.Final[str] = "2.0"
 
     def __init__(
@@ -159,6 +179,7 @@ class JsonRpcClient:
         readable_id: str,
         communication_type: CommunicationType = CommunicationType.TCP,
         tracing: ITracingHooks | None = None,
+        codec: codec_module.Codec | None = None,
     ) -> None:
         self.server_process_stopped: typing.Final = threading.Event()
         self.server_exit_callback: (
@@ -170,6 +191,8 @@ class JsonRpcClient:
         self.message_types = message_types
         self.readable_id: str = readable_id
         self.communication_type = communication_type
+        self._codec = codec if codec is not None else codec_module.get_default_codec()
+        self._wire_format = wire_format_module.WireFormat(codec=self._codec)
 
         self._async_tasks: list[asyncio.Task[typing.Any]] = []
         self._stop_event: typing.Final = threading.Event()
@@ -207,6 +230,7 @@ class JsonRpcClient:
         io_thread: _io_thread.AsyncIOThread,
         debug_port_future: concurrent.futures.Future[int] | None,
         connect: bool = True,
+        spawn_server_process: SpawnServerProcess | None = None,
     ) -> None:
         old_working_dir = os.getcwd()
         os.chdir(working_dir_path)
@@ -221,6 +245,7 @@ class JsonRpcClient:
                 debug_port_future=debug_port_future,
                 stderr_buffer=self._stderr_buffer,
                 stdout_buffer=self._stdout_buffer,
+                spawn_server_process=spawn_server_process,
             )
             if connect:
                 await self.connect_to_server(io_thread=io_thread)
@@ -237,6 +262,7 @@ class JsonRpcClient:
         debug_port_future: concurrent.futures.Future[int] | None,
         stderr_buffer: list[str] | None = None,
         stdout_buffer: list[str] | None = None,
+        spawn_server_process: SpawnServerProcess | None = None,
     ) -> None:
         server_future = io_thread.run_coroutine(
             start_server(
@@ -250,6 +276,7 @@ class JsonRpcClient:
                 debug_port_future=debug_port_future,
                 stderr_buffer=stderr_buffer,
                 stdout_buffer=stdout_buffer,
+                spawn_server_process=spawn_server_process,
             )
         )
 
@@ -339,15 +366,15 @@ class JsonRpcClient:
     def stop(self) -> None:
         self._stop_event.set()
 
-    def _send_data(self, data: str):
-        header = (
-            f"Content-Length: {len(data)}\r\n"
-            f"Content-Type: {self.CONTENT_TYPE}; charset={self.CHARSET}\r\n\r\n"
-        )
-        data = header + data
+    def set_wire_format(self, wire_format: wire_format_module.WireFormat) -> None:
+        """Use ``wire_format`` for messages sent from now on, e.g. the binary format
+        negotiated in ``initialize``. Incoming messages are decoded according to
+        their headers regardless of it."""
+        self._wire_format = wire_format
 
+    def _send_data(self, data: bytes):
         try:
-            self.writer.write(data.encode(self.CHARSET))
+            self.writer.write(data)
         except culsans.QueueShutDown:
             logger.debug(f"Cannot send data to {self.readable_id}: client already disconnected")
         except Exception as error:
@@ -382,9 +409,9 @@ class JsonRpcClient:
             "error": error_object,
         }
 
-        response_str = json.dumps(response_dict)
+        response_body = self._wire_format.frame(response_dict)
         logger.debug(f"Sending error response: {code} - {message}")
-        self._send_data(response_str)
+        self._send_data(response_body)
 
     def notify(self, method: str, params: typing.Any | None = None) -> None:
         logger.debug(f"Sending notification: '{method}' {params}")
@@ -410,13 +437,13 @@ class JsonRpcClient:
                 notification_dict["_meta"] = {"traceparent": traceparent}
 
         try:
-            notification_str = json.dumps(notification_dict)
+            notification_body = self._wire_format.frame(notification_dict)
         except (TypeError, ValueError) as error:
             raise InvalidResponse(
                 f"Failed to serialize notification: {error}"
             ) from error
-        logger.trace(notification_str)
-        self._send_data(notification_str)
+        logger.trace("{!r}", notification_body)
+        self._send_data(notification_body)
         if self._tracing is not None:
             self._tracing.notification_sent(method)
 
@@ -461,14 +488,14 @@ class JsonRpcClient:
                 request_dict["_meta"] = {"traceparent": traceparent}
 
         try:
-            request_str = json.dumps(request_dict)
+            request_body = self._wire_format.frame(request_dict)
         except (TypeError, ValueError) as error:
             # Clean up the future if serialization fails
             self._sync_request_futures.pop(msg_id, None)
             self._expected_result_type_by_msg_id.pop(msg_id, None)
             raise InvalidResponse(f"Failed to serialize request: {error}") from error
 
-        self._send_data(request_str)
+        self._send_data(request_body)
 
         return future
         # try:
@@ -519,7 +546,7 @@ class JsonRpcClient:
                     message_dict["_meta"] = {"traceparent": traceparent}
 
             try:
-                request_str = json.dumps(message_dict)
+                request_body = self._wire_format.frame(message_dict)
             except (TypeError, ValueError) as error:
                 raise InvalidResponse(f"Failed to serialize request: {error}") from error
 
@@ -531,7 +558,7 @@ class JsonRpcClient:
             except KeyError:
                 raise ValueError(f"Message type not found for {method}")
 
-            self._send_data(request_str)
+            self._send_data(request_body)
 
             try:
                 response = await asyncio.wait_for(
@@ -773,9 +800,9 @@ class JsonRpcClient:
                 "result": _converter.unstructure(result),
             }
 
-            response_str = json.dumps(response_dict)
+            response_body = self._wire_format.frame(response_dict)
             logger.debug(f"Sending response for request {message_id}")
-            self._send_data(response_str)
+            self._send_data(response_body)
         except Exception as exception:
             message = getattr(exception, "message", None) or str(exception)
             if not message:
@@ -873,6 +900,7 @@ class JsonRpcClient:
                 self._expected_result_type_by_msg_id,
                 self._stop_event,
                 server_id=self.readable_id,
+                codec=self._codec,
             )
         )
         task.add_done_callback(
@@ -922,9 +950,33 @@ async def start_server(
     debug_port_future: concurrent.futures.Future[int] | None,
     stderr_buffer: list[str] | None = None,
     stdout_buffer: list[str] | None = None,
+    spawn_server_process: SpawnServerProcess | None = None,
 ) -> tuple[
     asyncio.StreamReader | None, asyncio.StreamWriter | None, asyncio.Future[int] | None
 ]:
+    if spawn_server_process is not None:
+        logger.debug(f"Spawning server process: {cmd}")
+        server = await spawn_server_process()
+    else:
+        server = await _create_server_subprocess(cmd, communication_type)
+
+    return _start_server_io(
+        server=server,
+        communication_type=communication_type,
+        out_message_queue=out_message_queue,
+        stop_event=stop_event,
+        server_stopped_event=server_stopped_event,
+        server_id=server_id,
+        async_tasks=async_tasks,
+        debug_port_future=debug_port_future,
+        stderr_buffer=stderr_buffer,
+        stdout_buffer=stdout_buffer,
+    )
+
+
+async def _create_server_subprocess(
+    cmd: str, communication_type: CommunicationType
+) -> asyncio.subprocess.Process:
     logger.debug(f"Starting server process: {cmd}")
 
     creationflags = 0
@@ -963,7 +1015,23 @@ async def start_server(
         )
     else:
         raise ValueError(f"Unsupported communication type: {communication_type}")
+    return server
 
+
+def _start_server_io(
+    server: ServerProcess,
+    communication_type: CommunicationType,
+    out_message_queue: culsans.Queue[bytes],
+    stop_event: threading.Event,
+    server_stopped_event: threading.Event,
+    server_id: str,
+    async_tasks: list[asyncio.Task[typing.Any]],
+    debug_port_future: concurrent.futures.Future[int] | None,
+    stderr_buffer: list[str] | None,
+    stdout_buffer: list[str] | None,
+) -> tuple[
+    asyncio.StreamReader | None, asyncio.StreamWriter | None, asyncio.Future[int] | None
+]:
     logger.debug(f"{server_id} - process id: {server.pid}")
 
     task = asyncio.create_task(log_stderr(server.stderr, stop_event, stderr_buffer))
@@ -1027,7 +1095,7 @@ async def start_server(
 
 async def wait_for_stop_event_and_clean(
     stop_event: threading.Event,
-    server_process: asyncio.subprocess.Process,
+    server_process: ServerProcess,
     tasks: list[asyncio.Task[typing.Any]],
     server_stopped_event: threading.Event,
     out_message_queue: culsans.AsyncQueue[bytes],
@@ -1174,8 +1242,10 @@ async def read_messages_from_reader(
     result_types: dict[str, typing.Any],
     stop_event: threading.Event,
     server_id: str,
+    codec: codec_module.Codec,
 ) -> None:
     content_length = 0
+    headers: dict[str, str] = {}
 
     try:
         while not stop_event.is_set():
@@ -1208,6 +1278,12 @@ async def read_messages_from_reader(
                         logger.debug(
                             f"Not matched content length: {header} | {server_id}"
                         )
+                elif header.strip():
+                    # remaining headers (Content-Type, Content-Encoding) describe the
+                    # body
+                    parsed_header = wire_format_module.parse_header(header)
+                    if parsed_header is not None:
+                        headers[parsed_header[0]] = parsed_header[1]
 
                 # Check if all headers have been read (as indicated by an empty line \r\n)
                 if content_length and not header.strip():
@@ -1220,6 +1296,7 @@ async def read_messages_from_reader(
                             f"Incomplete read error: {error} | {server_id} : {error.partial}"
                         )
                         content_length = 0
+                        headers = {}
                         continue
                     except ConnectionResetError:
                         logger.warning(
@@ -1228,16 +1305,20 @@ async def read_messages_from_reader(
                         stop_event.set()
                         break
 
+                    message_headers, headers = headers, {}
                     if not body:
                         content_length = 0
                         continue
 
-                    logger.trace(f"Got content {server_id}: {body}")
+                    # formatted only if trace level is enabled, bodies can be big
+                    logger.trace("Got content {}: {!r}", server_id, body)
                     try:
-                        message = json.loads(body)
-                    except json.JSONDecodeError as exc:
+                        message = wire_format_module.decode_body(
+                            body, message_headers, json_codec=codec
+                        )
+                    except ValueError as exc:
                         logger.error(
-                            f"Failed to parse JSON message: {exc} | {server_id}"
+                            f"Failed to parse message: {exc} | {server_id}"
                         )
                         continue
                     finally:
@@ -1297,8 +1378,8 @@ async def read_messages_from_reader(
                         message_queue.put(message)
                 else:
                     if not header.startswith(
-                        b"Content-Length:"
-                    ) and not header.startswith(b"Content-Type:"):
+                        (b"Content-Length:", b"Content-Type:", b"Content-Encoding:")
+                    ):
                         logger.debug(
                             f'Something is wrong: {content_length} "{header}" {not header.strip()} | {server_id}'
                         )
@@ -1308,6 +1389,7 @@ async def read_messages_from_reader(
                 )
                 # Reset state to avoid infinite loop on persistent errors
                 content_length = 0
+                headers = {}
     except asyncio.CancelledError:
         ...
 
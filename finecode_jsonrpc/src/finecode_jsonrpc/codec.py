@@ -0,0 +1,233 @@
+"""Serialization of JSON-RPC messages to and from bytes.
+
+The fastest available JSON library is used: ``orjson`` or ``msgspec`` if
+installed, the standard library ``json`` otherwise. Set the
+``FINECODE_JSONRPC_CODEC`` environment variable to ``orjson``, ``msgspec`` or
+``json`` to choose one explicitly.
+
+All JSON codecs produce the same JSON for the same message: non-string keys are
+converted to strings, NaN and infinity are encoded as ``null`` (they are not valid
+JSON), integers beyond 64 bits are encoded exactly except by ``orjson``, which
+rejects them.
+
+:class:`MsgpackCodec` is a binary alternative for peers that negotiated it, see
+:mod:`finecode_jsonrpc.wire_format`. It is never the default, because LSP and
+third-party clients understand only JSON.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import typing
+
+from loguru import logger
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+CODEC_ENV_VAR = "FINECODE_JSONRPC_CODEC"
+JSON_CONTENT_TYPE = "application/vscode-jsonrpc; charset=utf-8"
+MSGPACK_CONTENT_TYPE = "application/x-msgpack"
+_CONTENT_LENGTH_HEADER_TEMPLATE = (
+    b"Content-Length: %d\r\n"
+    b"Content-Type: application/vscode-jsonrpc; charset=utf-8\r\n\r\n"
+)
+
+
+class CodecNotAvailableError(Exception):
+    def __init__(self, message: str) -> None:
+        self.message = message
+        super().__init__(message)
+
+
+class Codec(typing.Protocol):
+    name: str
+    # value of the `Content-Type` header of messages encoded by this codec
+    content_type: str
+
+    def encode(self, message: typing.Any) -> bytes:
+        """Serialize ``message`` to bytes, UTF-8 encoded JSON for JSON codecs.
+
+        Raises:
+            TypeError: ``message`` contains a value that cannot be serialized.
+            ValueError: ``message`` contains a value that cannot be serialized.
+        """
+        ...
+
+    def decode(self, data: bytes) -> typing.Any:
+        """Deserialize bytes produced by :meth:`encode`.
+
+        Raises:
+            ValueError: ``data`` is not valid in the format of the codec.
+        """
+        ...
+
+
+class StdlibJsonCodec:
+    name = "json"
+    content_type = JSON_CONTENT_TYPE
+
+    def encode(self, message: typing.Any) -> bytes:
+        # output is pure ASCII because of `ensure_ascii`, so encoding doesn't copy
+        # more than needed
+        try:
+            return json.dumps(message, separators=(",", ":"), allow_nan=False).encode(
+                "ascii"
+            )
+        except ValueError as exception:
+            if not str(exception).startswith(_OUT_OF_RANGE_FLOAT_ERROR):
+                raise
+        # encoded as null like by orjson and msgspec, instead of invalid JSON
+        return json.dumps(
+            _replace_non_finite_floats(message), separators=(",", ":")
+        ).encode("ascii")
+
+    def decode(self, data: bytes) -> typing.Any:
+        return json.loads(data)
+
+
+class OrjsonCodec:
+    name = "orjson"
+    content_type = JSON_CONTENT_TYPE
+
+    def __init__(self) -> None:
+        if orjson is None:
+            raise CodecNotAvailableError("orjson is not installed")
+
+    def encode(self, message: typing.Any) -> bytes:
+        # the standard library converts non-string keys to strings, do the same
+        return orjson.dumps(message, option=orjson.OPT_NON_STR_KEYS)
+
+    def decode(self, data: bytes) -> typing.Any:
+        return orjson.loads(data)
+
+
+class MsgspecCodec:
+    name = "msgspec"
+    content_type = JSON_CONTENT_TYPE
+
+    def __init__(self) -> None:
+        if msgspec is None:
+            raise CodecNotAvailableError("msgspec is not installed")
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+
+    def encode(self, message: typing.Any) -> bytes:
+        try:
+            return self._encoder.encode(message)
+        except msgspec.EncodeError as exception:
+            # callers handle serialization errors as TypeError or ValueError
+            raise ValueError(str(exception)) from exception
+
+    def decode(self, data: bytes) -> typing.Any:
+        return self._decoder.decode(data)
+
+
+class MsgpackCodec:
+    name = "msgpack"
+    content_type = MSGPACK_CONTENT_TYPE
+
+    def __init__(self) -> None:
+        if msgspec is None:
+            raise CodecNotAvailableError("msgspec is not installed")
+        self._encoder = msgspec.msgpack.Encoder()
+        self._decoder = msgspec.msgpack.Decoder()
+
+    def encode(self, message: typing.Any) -> bytes:
+        try:
+            # converted to the values the JSON codecs produce, e.g. non-string keys
+            # to strings, so that handlers get the same payload with any codec
+            return self._encoder.encode(msgspec.to_builtins(message, str_keys=True))
+        except (msgspec.EncodeError, OverflowError) as exception:
+            # callers handle serialization errors as TypeError or ValueError
+            raise ValueError(str(exception)) from exception
+
+    def decode(self, data: bytes) -> typing.Any:
+        return self._decoder.decode(data)
+
+
+_CODEC_CLASSES: dict[str, type[Codec]] = {
+    "orjson": OrjsonCodec,
+    "msgspec": MsgspecCodec,
+    "json": StdlibJsonCodec,
+    "msgpack": MsgpackCodec,
+}
+_default_codec: Codec | None = None
+# start of the message of the ValueError raised by `json.dumps` for NaN and infinity
+_OUT_OF_RANGE_FLOAT_ERROR = "Out of range float values"
+
+
+def _replace_non_finite_floats(value: typing.Any) -> typing.Any:
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _replace_non_finite_floats(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_replace_non_finite_floats(item) for item in value]
+    return value
+
+
+def create_codec(name: str) -> Codec:
+    """Create the codec with the given name.
+
+    Raises:
+        CodecNotAvailableError: the codec is unknown or its library is not installed.
+    """
+    try:
+        codec_cls = _CODEC_CLASSES[name]
+    except KeyError as exception:
+        raise CodecNotAvailableError(
+            f"Unknown codec '{name}', available: {', '.join(_CODEC_CLASSES)}"
+        ) from exception
+    return codec_cls()
+
+
+def get_default_codec() -> Codec:
+    """Return the codec chosen by ``FINECODE_JSONRPC_CODEC`` or the fastest
+    installed one.
+
+    Raises:
+        CodecNotAvailableError: the codec chosen by the environment variable is not
+            available.
+    """
+    global _default_codec
+    if _default_codec is None:
+        codec_name = os.environ.get(CODEC_ENV_VAR)
+        if codec_name:
+            _default_codec = create_codec(codec_name)
+        elif orjson is not None:
+            _default_codec = OrjsonCodec()
+        elif msgspec is not None:
+            _default_codec = MsgspecCodec()
+        else:
+            _default_codec = StdlibJsonCodec()
+        logger.debug(f"Use '{_default_codec.name}' JSON-RPC codec")
+    return _default_codec
+
+
+def frame_with_content_length(
+    body: bytes,
+    content_type: str = JSON_CONTENT_TYPE,
+    content_encoding: str | None = None,
+) -> bytes:
+    """Prepend the LSP-style header to ``body``. Content-Length is the number of
+    bytes, not of characters.
+
+    ``content_encoding`` is the name of the compression applied to ``body``, if
+    any."""
+    if content_type == JSON_CONTENT_TYPE and content_encoding is None:
+        return _CONTENT_LENGTH_HEADER_TEMPLATE % len(body) + body
+
+    header = f"Content-Length: {len(body)}\r\nContent-Type: {content_type}\r\n"
+    if content_encoding is not None:
+        header += f"Content-Encoding: {content_encoding}\r\n"
+    return (header + "\r\n").encode("ascii") + body
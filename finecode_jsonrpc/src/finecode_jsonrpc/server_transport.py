@@ -8,16 +8,16 @@ from __future__ import annotations
 
 import asyncio
 import collections.abc
-import json
 import re
 import sys
 import typing
 
 from loguru import logger
 
+from finecode_jsonrpc import codec as codec_module
+from finecode_jsonrpc import wire_format as wire_format_module
+
 CONTENT_LENGTH_PATTERN = re.compile(rb"^Content-Length: (\d+)\r\n$")
-CHARSET = "utf-8"
-CONTENT_TYPE = "application/vscode-jsonrpc"
 
 
 class ServerStdioTransport:
@@ -35,10 +35,20 @@ class ServerStdioTransport:
     - ``"content-length"`` (default): LSP-style ``Content-Length`` header framing.
     - ``"newline"``: newline-delimited JSON — one JSON object per line, no headers.
       Required by the MCP stdio transport spec.
+
+    With ``"content-length"`` framing, outgoing messages can be switched to a
+    negotiated binary format with :meth:`set_wire_format`.
     """
 
-    def __init__(self, readable_id: str = "", framing: str = "content-length") -> None:
+    def __init__(
+        self,
+        readable_id: str = "",
+        framing: str = "content-length",
+        codec: codec_module.Codec | None = None,
+    ) -> None:
         self._readable_id = readable_id
+        self._codec = codec if codec is not None else codec_module.get_default_codec()
+        self._wire_format = wire_format_module.WireFormat(codec=self._codec)
         self._framing = framing
         self._stop_event = asyncio.Event()
         self._out_queue: asyncio.Queue[bytes | None] = asyncio.Queue()
@@ -74,6 +84,11 @@ class ServerStdioTransport:
     ) -> None:
         self._on_exit = handler
 
+    def set_wire_format(self, wire_format: wire_format_module.WireFormat) -> None:
+        """Use ``wire_format`` for messages sent from now on. Incoming messages are
+        decoded according to their headers regardless of it."""
+        self._wire_format = wire_format
+
     # ------------------------------------------------------------------
     # Lifecycle
     # ------------------------------------------------------------------
@@ -139,14 +154,9 @@ class ServerStdioTransport:
     def send(self, message: dict[str, typing.Any]) -> None:
         """Serialize *message* and enqueue for writing."""
         if self._framing == "newline":
-            data = (json.dumps(message) + "\n").encode(CHARSET)
+            data = self._codec.encode(message) + b"\n"
         else:
-            body = json.dumps(message)
-            header = (
-                f"Content-Length: {len(body)}\r\n"
-                f"Content-Type: {CONTENT_TYPE}; charset={CHARSET}\r\n\r\n"
-            )
-            data = (header + body).encode(CHARSET)
+            data = self._wire_format.frame(message)
 
         if self._loop is not None and self._loop.is_running():
             self._loop.call_soon_threadsafe(self._out_queue.put_nowait, data)
@@ -213,8 +223,8 @@ class ServerStdioTransport:
                     continue
 
                 try:
-                    message = json.loads(line)
-                except json.JSONDecodeError as exc:
+                    message = self._codec.decode(line)
+                except ValueError as exc:
                     logger.error(f"JSON parse error | {self._readable_id}: {exc}")
                     continue
 
@@ -233,8 +243,9 @@ class ServerStdioTransport:
             pass
 
     async def _read_messages_content_length(self, reader: asyncio.StreamReader) -> None:
-        """Read Content-Length-framed JSON messages (LSP-style)."""
+        """Read Content-Length-framed messages (LSP-style)."""
         content_length = 0
+        headers: dict[str, str] = {}
 
         try:
             while not self._stop_event.is_set():
@@ -258,26 +269,37 @@ class ServerStdioTransport:
                         content_length = int(match.group(1))
                     continue
 
+                # remaining headers (Content-Type, Content-Encoding) describe the body
+                if header.strip():
+                    parsed_header = wire_format_module.parse_header(header)
+                    if parsed_header is not None:
+                        headers[parsed_header[0]] = parsed_header[1]
+                    continue
+
                 if content_length and not header.strip():
                     try:
                         body = await reader.readexactly(content_length)
                     except asyncio.IncompleteReadError as exc:
                         logger.debug(f"Incomplete read | {self._readable_id}: {exc}")
                         content_length = 0
+                        headers = {}
                         continue
                     except ConnectionResetError:
                         logger.warning(f"Connection reset | {self._readable_id}")
                         break
 
                     content_length = 0
+                    message_headers, headers = headers, {}
 
                     if not body:
                         continue
 
                     try:
-                        message = json.loads(body)
-                    except json.JSONDecodeError as exc:
-                        logger.error(f"JSON parse error | {self._readable_id}: {exc}")
+                        message = wire_format_module.decode_body(
+                            body, message_headers, json_codec=self._codec
+                        )
+                    except ValueError as exc:
+                        logger.error(f"Message parse error | {self._readable_id}: {exc}")
                         continue
 
                     if not isinstance(message, dict):
@@ -314,10 +336,13 @@ class TcpServerTransport:
         reader: asyncio.StreamReader,
         writer: asyncio.StreamWriter,
         readable_id: str = "",
+        codec: codec_module.Codec | None = None,
     ) -> None:
         self._reader = reader
         self._writer = writer
         self._readable_id = readable_id
+        self._codec = codec if codec is not None else codec_module.get_default_codec()
+        self._wire_format = wire_format_module.WireFormat(codec=self._codec)
         self._stop_event = asyncio.Event()
         self._out_queue: asyncio.Queue[bytes | None] = asyncio.Queue()
         self._on_message: (
@@ -350,6 +375,11 @@ class TcpServerTransport:
     ) -> None:
         self._on_exit = handler
 
+    def set_wire_format(self, wire_format: wire_format_module.WireFormat) -> None:
+        """Use ``wire_format`` for messages sent from now on. Incoming messages are
+        decoded according to their headers regardless of it."""
+        self._wire_format = wire_format
+
     # ------------------------------------------------------------------
     # Lifecycle
     # ------------------------------------------------------------------
@@ -397,12 +427,7 @@ class TcpServerTransport:
 
     def send(self, message: dict[str, typing.Any]) -> None:
         """Serialize *message* and enqueue for writing."""
-        body = json.dumps(message)
-        header = (
-            f"Content-Length: {len(body)}\r\n"
-            f"Content-Type: {CONTENT_TYPE}; charset={CHARSET}\r\n\r\n"
-        )
-        data = (header + body).encode(CHARSET)
+        data = self._wire_format.frame(message)
 
         if self._loop is not None and self._loop.is_running():
             self._loop.call_soon_threadsafe(self._out_queue.put_nowait, data)
@@ -436,6 +461,7 @@ class TcpServerTransport:
     async def _read_messages(self, reader: asyncio.StreamReader) -> None:
         logger.debug(f"Start reading messages | {self._readable_id}")
         content_length = 0
+        headers: dict[str, str] = {}
 
         try:
             while not self._stop_event.is_set():
@@ -457,26 +483,37 @@ class TcpServerTransport:
                         content_length = int(match.group(1))
                     continue
 
+                # remaining headers (Content-Type, Content-Encoding) describe the body
+                if header.strip():
+                    parsed_header = wire_format_module.parse_header(header)
+                    if parsed_header is not None:
+                        headers[parsed_header[0]] = parsed_header[1]
+                    continue
+
                 if content_length and not header.strip():
                     try:
                         body = await reader.readexactly(content_length)
                     except asyncio.IncompleteReadError as exc:
                         logger.debug(f"Incomplete read | {self._readable_id}: {exc}")
                         content_length = 0
+                        headers = {}
                         continue
                     except ConnectionResetError:
                         logger.warning(f"Connection reset | {self._readable_id}")
                         break
 
                     content_length = 0
+                    message_headers, headers = headers, {}
 
                     if not body:
                         continue
 
                     try:
-                        message = json.loads(body)
-                    except json.JSONDecodeError as exc:
-                        logger.error(f"JSON parse error | {self._readable_id}: {exc}")
+                        message = wire_format_module.decode_body(
+                            body, message_headers, json_codec=self._codec
+                        )
+                    except ValueError as exc:
+                        logger.error(f"Message parse error | {self._readable_id}: {exc}")
                         continue
 
                     if not isinstance(message, dict):
@@ -2,7 +2,6 @@ from __future__ import annotations
 
 import asyncio
 import collections.abc
-import json
 import re
 import sys
 import subprocess  # needed for windows
@@ -11,9 +10,9 @@ from pathlib import Path
 
 from loguru import logger
 
+from finecode_jsonrpc import codec as codec_module
+
 CONTENT_LENGTH_PATTERN = re.compile(rb"^Content-Length: (\d+)\r\n$")
-CHARSET = "utf-8"
-CONTENT_TYPE = "application/vscode-jsonrpc"
 
 
 class StdioTransport:
@@ -23,8 +22,11 @@ class StdioTransport:
     ``send()`` is thread-safe (writes go through an ``asyncio.Queue``).
     """
 
-    def __init__(self, readable_id: str = "") -> None:
+    def __init__(
+        self, readable_id: str = "", codec: codec_module.Codec | None = None
+    ) -> None:
         self._readable_id = readable_id
+        self._codec = codec if codec is not None else codec_module.get_default_codec()
         self._process: asyncio.subprocess.Process | None = None
         self._stop_event = asyncio.Event()
         self._out_queue: asyncio.Queue[bytes | None] = asyncio.Queue()
@@ -165,12 +167,7 @@ class StdioTransport:
 
         Safe to call from any thread.
         """
-        body = json.dumps(message)
-        header = (
-            f"Content-Length: {len(body)}\r\n"
-            f"Content-Type: {CONTENT_TYPE}; charset={CHARSET}\r\n\r\n"
-        )
-        data = (header + body).encode(CHARSET)
+        data = codec_module.frame_with_content_length(self._codec.encode(message))
 
         if self._loop is not None and self._loop.is_running():
             self._loop.call_soon_threadsafe(self._out_queue.put_nowait, data)
@@ -243,8 +240,8 @@ class StdioTransport:
                         continue
 
                     try:
-                        message = json.loads(body)
-                    except json.JSONDecodeError as exc:
+                        message = self._codec.decode(body)
+                    except ValueError as exc:
                         logger.error(f"JSON parse error | {self._readable_id}: {exc}")
                         continue
 
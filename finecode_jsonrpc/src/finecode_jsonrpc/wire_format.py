@@ -0,0 +1,310 @@
+"""Negotiable binary and compressed encoding of message bodies.
+
+Every Content-Length-framed message describes its own body with the
+``Content-Type`` and optional ``Content-Encoding`` headers, so readers decode
+JSON and binary messages alike and peers can switch the format of *outgoing*
+messages at any moment without coordinating with the reader.
+
+A peer starts with plain JSON, the only format LSP and third-party clients
+understand. The client advertises the formats it can read in ``initialize``
+(see :func:`get_supported_formats`), the server picks one of them in the
+initialize result (:func:`choose_format`) and both sides switch after the
+handshake (:func:`create_wire_format`). Set the ``FINECODE_JSONRPC_WIRE_FORMAT``
+environment variable to ``json`` to keep JSON, e.g. to read messages in traces.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import os
+import typing
+
+from loguru import logger
+
+from finecode_jsonrpc import codec as codec_module
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+# key in `capabilities.experimental` of initialize params and result
+CAPABILITY_NAME = "finecodeWireFormat"
+WIRE_FORMAT_ENV_VAR = "FINECODE_JSONRPC_WIRE_FORMAT"
+DEFAULT_COMPRESSION_THRESHOLD = 64 * 1024
+
+# `Content-Type` values are compared without parameters like charset
+_CONTENT_TYPE_TO_CODEC_NAME = {
+    codec_module.MSGPACK_CONTENT_TYPE: "msgpack",
+}
+
+
+class WireFormatNotAvailableError(Exception):
+    def __init__(self, message: str) -> None:
+        self.message = message
+        super().__init__(message)
+
+
+class Compressor(typing.Protocol):
+    # value of the `Content-Encoding` header of compressed messages
+    name: str
+
+    def compress(self, data: bytes) -> bytes: ...
+
+    def decompress(self, data: bytes) -> bytes:
+        """Raises:
+        ValueError: ``data`` is not valid compressed data.
+        """
+        ...
+
+
+class ZstdCompressor:
+    name = "zstd"
+
+    def __init__(self) -> None:
+        if zstandard is None:
+            raise WireFormatNotAvailableError("zstandard is not installed")
+
+    # module-level functions instead of (de)compressor objects: the objects are not
+    # thread-safe and messages are sent from multiple threads
+    def compress(self, data: bytes) -> bytes:
+        # low level: the channel is local, speed matters more than ratio
+        return zstandard.compress(data, 1)
+
+    def decompress(self, data: bytes) -> bytes:
+        try:
+            return zstandard.decompress(data)
+        except zstandard.ZstdError as exception:
+            raise ValueError(str(exception)) from exception
+
+
+class Lz4Compressor:
+    name = "lz4"
+
+    def __init__(self) -> None:
+        if lz4_frame is None:
+            raise WireFormatNotAvailableError("lz4 is not installed")
+
+    def compress(self, data: bytes) -> bytes:
+        return lz4_frame.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        try:
+            return lz4_frame.decompress(data)
+        except RuntimeError as exception:
+            raise ValueError(str(exception)) from exception
+
+
+# in order of preference
+_COMPRESSOR_CLASSES: dict[str, type[Compressor]] = {
+    "zstd": ZstdCompressor,
+    "lz4": Lz4Compressor,
+}
+# binary codecs in order of preference, JSON is always supported implicitly
+_BINARY_CODEC_NAMES = ("msgpack",)
+
+_codec_by_content_type: dict[str, codec_module.Codec] = {}
+_compressor_by_name: dict[str, Compressor] = {}
+
+
+def create_compressor(name: str) -> Compressor:
+    """Raises:
+    WireFormatNotAvailableError: the compression is unknown or its library is not
+        installed.
+    """
+    try:
+        compressor_cls = _COMPRESSOR_CLASSES[name]
+    except KeyError as exception:
+        raise WireFormatNotAvailableError(
+            f"Unknown compression '{name}', available: {', '.join(_COMPRESSOR_CLASSES)}"
+        ) from exception
+    return compressor_cls()
+
+
+@dataclasses.dataclass(frozen=True)
+class WireFormat:
+    """Format of outgoing messages.
+
+    Immutable, so that a transport can switch formats by replacing the reference
+    while other threads are sending.
+    """
+
+    codec: codec_module.Codec
+    compressor: Compressor | None = None
+    compression_threshold: int = DEFAULT_COMPRESSION_THRESHOLD
+
+    def frame(self, message: typing.Any) -> bytes:
+        """Encode ``message`` and prepend the Content-Length header.
+
+        Raises:
+            TypeError: ``message`` contains a value that cannot be serialized.
+            ValueError: ``message`` contains a value that cannot be serialized.
+        """
+        body = self.codec.encode(message)
+        content_encoding: str | None = None
+        if self.compressor is not None and len(body) >= self.compression_threshold:
+            body = self.compressor.compress(body)
+            content_encoding = self.compressor.name
+        return codec_module.frame_with_content_length(
+            body,
+            content_type=self.codec.content_type,
+            content_encoding=content_encoding,
+        )
+
+
+def parse_header(line: bytes) -> tuple[str, str] | None:
+    """Split a header line like ``Content-Type: application/x-msgpack\\r\\n`` into
+    lowercased name and value. Returns ``None`` if ``line`` is not a header."""
+    name, separator, value = line.partition(b":")
+    if not separator:
+        return None
+    try:
+        return name.strip().decode("ascii").lower(), value.strip().decode("ascii")
+    except UnicodeDecodeError:
+        return None
+
+
+def decode_body(
+    body: bytes, headers: dict[str, str], json_codec: codec_module.Codec
+) -> typing.Any:
+    """Decode a message body according to its ``Content-Type`` and
+    ``Content-Encoding`` headers. Bodies without a known binary content type are
+    decoded with ``json_codec``.
+
+    Raises:
+        ValueError: the body is not valid in the format declared by the headers or
+            the format is not supported.
+    """
+    content_encoding = headers.get("content-encoding")
+    if content_encoding:
+        body = _get_compressor(content_encoding).decompress(body)
+
+    content_type = headers.get("content-type", "").split(";", 1)[0].strip()
+    codec_name = _CONTENT_TYPE_TO_CODEC_NAME.get(content_type)
+    if codec_name is None:
+        return json_codec.decode(body)
+    return _get_codec(content_type, codec_name).decode(body)
+
+
+def get_supported_formats() -> dict[str, list[str]]:
+    """Return the binary codecs and compressions available in this process, to
+    advertise them in ``capabilities.experimental`` of initialize params."""
+    if _is_binary_format_disabled():
+        return {"codecs": [], "compressions": []}
+    return {
+        "codecs": [name for name in _BINARY_CODEC_NAMES if _is_codec_available(name)],
+        "compressions": [
+            name for name in _COMPRESSOR_CLASSES if _is_compressor_available(name)
+        ],
+    }
+
+
+def choose_format(
+    offered: typing.Any,
+    compression_threshold: int = DEFAULT_COMPRESSION_THRESHOLD,
+) -> dict[str, typing.Any] | None:
+    """Choose the wire format from the formats ``offered`` by the peer (the value
+    returned by :func:`get_supported_formats` on its side) and the ones available
+    locally. Returns ``None`` if the peer didn't offer any usable binary codec, then
+    JSON stays in use.
+    """
+    if not isinstance(offered, dict) or _is_binary_format_disabled():
+        return None
+
+    offered_codecs = offered.get("codecs") or []
+    codec_name = next(
+        (
+            name
+            for name in _BINARY_CODEC_NAMES
+            if name in offered_codecs and _is_codec_available(name)
+        ),
+        None,
+    )
+    if codec_name is None:
+        return None
+
+    offered_compressions = offered.get("compressions") or []
+    compression = next(
+        (
+            name
+            for name in _COMPRESSOR_CLASSES
+            if name in offered_compressions and _is_compressor_available(name)
+        ),
+        None,
+    )
+    return {
+        "codec": codec_name,
+        "compression": compression,
+        "compressionThreshold": compression_threshold,
+    }
+
+
+def create_wire_format(chosen: typing.Any) -> WireFormat | None:
+    """Create the wire format chosen by :func:`choose_format`. Returns ``None`` if
+    nothing was chosen or the choice cannot be used in this process, then JSON
+    stays in use."""
+    if not isinstance(chosen, dict) or not chosen.get("codec"):
+        return None
+
+    try:
+        codec = codec_module.create_codec(chosen["codec"])
+        compression = chosen.get("compression")
+        compressor = create_compressor(compression) if compression else None
+    except (codec_module.CodecNotAvailableError, WireFormatNotAvailableError) as exception:
+        logger.warning(f"Cannot use negotiated wire format, keep JSON: {exception.message}")
+        return None
+
+    return WireFormat(
+        codec=codec,
+        compressor=compressor,
+        compression_threshold=chosen.get(
+            "compressionThreshold", DEFAULT_COMPRESSION_THRESHOLD
+        ),
+    )
+
+
+def _is_binary_format_disabled() -> bool:
+    return os.environ.get(WIRE_FORMAT_ENV_VAR) == "json"
+
+
+def _is_codec_available(name: str) -> bool:
+    try:
+        codec_module.create_codec(name)
+    except codec_module.CodecNotAvailableError:
+        return False
+    return True
+
+
+def _is_compressor_available(name: str) -> bool:
+    try:
+        create_compressor(name)
+    except WireFormatNotAvailableError:
+        return False
+    return True
+
+
+def _get_codec(content_type: str, codec_name: str) -> codec_module.Codec:
+    codec = _codec_by_content_type.get(content_type)
+    if codec is None:
+        try:
+            codec = codec_module.create_codec(codec_name)
+        except codec_module.CodecNotAvailableError as exception:
+            raise ValueError(exception.message) from exception
+        _codec_by_content_type[content_type] = codec
+    return codec
+
+
+def _get_compressor(name: str) -> Compressor:
+    compressor = _compressor_by_name.get(name)
+    if compressor is None:
+        try:
+            compressor = create_compressor(name)
+        except WireFormatNotAvailableError as exception:
+            raise ValueError(exception.message) from exception
+        _compressor_by_name[name] = compressor
+    return compressor
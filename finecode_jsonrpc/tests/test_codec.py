@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import math
+
+import pytest
+
+from finecode_jsonrpc import codec as codec_module
+
+
+def _available_codecs() -> list[codec_module.Codec]:
+    codecs: list[codec_module.Codec] = []
+    for name in ("json", "orjson", "msgspec"):
+        try:
+            codecs.append(codec_module.create_codec(name))
+        except codec_module.CodecNotAvailableError:
+            pass
+    return codecs
+
+
+@pytest.fixture(params=_available_codecs(), ids=lambda codec: codec.name)
+def codec(request: pytest.FixtureRequest) -> codec_module.Codec:
+    return request.param
+
+
+def test_messages_survive_round_trip(codec: codec_module.Codec) -> None:
+    message = {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "result": {"messages": {"file:///ä.py": [{"message": "ünïcode 😀", "line": 3}]}},
+    }
+
+    assert codec.decode(codec.encode(message)) == message
+
+
+def test_non_string_keys_are_encoded_as_strings(codec: codec_module.Codec) -> None:
+    """The standard library converts int keys to strings, other codecs must not
+    fail on them."""
+    assert codec.decode(codec.encode({1: "a"})) == {"1": "a"}
+
+
+def test_nan_and_infinity_are_encoded_as_null(codec: codec_module.Codec) -> None:
+    """NaN and infinity are not valid JSON, all codecs encode them the same way."""
+    message = {"values": [math.nan, math.inf, -math.inf, 1.5]}
+
+    encoded = codec.encode(message)
+
+    assert encoded == b'{"values":[null,null,null,1.5]}'
+    assert codec.decode(encoded) == {"values": [None, None, None, 1.5]}
+
+
+def test_integers_beyond_64_bits_are_exact_or_rejected(
+    codec: codec_module.Codec,
+) -> None:
+    message = {"values": [2**64, -(2**63) - 1]}
+
+    if codec.name == "orjson":
+        # orjson supports only 64-bit integers
+        with pytest.raises(TypeError):
+            codec.encode(message)
+    else:
+        assert codec.decode(codec.encode(message)) == message
+
+
+def test_msgspec_encode_error_is_raised_as_value_error(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Senders handle serialization errors as TypeError or ValueError, msgspec's
+    EncodeError is neither."""
+    msgspec = pytest.importorskip("msgspec")
+    codec = codec_module.MsgspecCodec()
+
+    class _FailingEncoder:
+        def encode(self, message: object) -> bytes:
+            raise msgspec.EncodeError("too long")
+
+    monkeypatch.setattr(codec, "_encoder", _FailingEncoder())
+
+    with pytest.raises(ValueError, match="too long"):
+        codec.encode({})
+
+
+def test_invalid_json_raises_value_error(codec: codec_module.Codec) -> None:
+    with pytest.raises(ValueError):
+        codec.decode(b"{not json")
+
+
+def test_content_length_counts_bytes() -> None:
+    """Content-Length is a byte count; counting characters would cut multi-byte
+    bodies and desynchronize the stream."""
+    body = "{\"text\":\"😀\"}".encode("utf-8")
+
+    framed = codec_module.frame_with_content_length(body)
+
+    header, framed_body = framed.split(b"\r\n\r\n", 1)
+    assert header.startswith(f"Content-Length: {len(body)}\r\n".encode())
+    assert framed_body == body
+
+
+def test_unknown_codec_is_rejected() -> None:
+    with pytest.raises(codec_module.CodecNotAvailableError):
+        codec_module.create_codec("yaml")
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from finecode_jsonrpc import codec as codec_module
+from finecode_jsonrpc import server_transport
+from finecode_jsonrpc import wire_format
+
+pytest.importorskip("msgspec")
+
+MESSAGE = {
+    "jsonrpc": "2.0",
+    "id": "1",
+    "result": {"messages": {"file:///ä.py": [{"message": "line too long" * 100}]}},
+}
+
+
+def _split_frame(data: bytes) -> tuple[dict[str, str], bytes]:
+    raw_headers, body = data.split(b"\r\n\r\n", 1)
+    headers = dict(
+        wire_format.parse_header(line + b"\r\n") for line in raw_headers.split(b"\r\n")
+    )
+    assert int(headers["content-length"]) == len(body)
+    return headers, body
+
+
+def test_binary_message_survives_round_trip() -> None:
+    pytest.importorskip("zstandard")
+    binary_format = wire_format.create_wire_format(
+        {"codec": "msgpack", "compression": "zstd", "compressionThreshold": 1024}
+    )
+    assert binary_format is not None
+
+    headers, body = _split_frame(binary_format.frame(MESSAGE))
+
+    assert headers["content-type"] == codec_module.MSGPACK_CONTENT_TYPE
+    assert headers["content-encoding"] == "zstd"
+    assert (
+        wire_format.decode_body(body, headers, json_codec=codec_module.StdlibJsonCodec())
+        == MESSAGE
+    )
+
+
+def test_msgpack_decodes_the_same_values_as_json() -> None:
+    """Handlers get the same payload whichever codec was negotiated."""
+    message = {"result": {1: "a", 2.5: ["b", {3: "c"}]}}
+    msgpack_codec = codec_module.create_codec("msgpack")
+    json_codec = codec_module.create_codec("json")
+
+    decoded = msgpack_codec.decode(msgpack_codec.encode(message))
+
+    assert decoded == json_codec.decode(json_codec.encode(message))
+    assert decoded == {"result": {"1": "a", "2.5": ["b", {"3": "c"}]}}
+
+
+def test_msgpack_rejects_integers_beyond_64_bits_with_value_error() -> None:
+    msgpack_codec = codec_module.create_codec("msgpack")
+
+    with pytest.raises(ValueError):
+        msgpack_codec.encode({"id": 2**64})
+
+
+def test_small_messages_are_not_compressed() -> None:
+    binary_format = wire_format.WireFormat(
+        codec=codec_module.create_codec("msgpack"),
+        compressor=wire_format.ZstdCompressor() if wire_format.zstandard else None,
+        compression_threshold=1024 * 1024,
+    )
+
+    headers, _ = _split_frame(binary_format.frame(MESSAGE))
+
+    assert "content-encoding" not in headers
+
+
+def test_messages_without_content_type_are_decoded_as_json() -> None:
+    """Third-party clients may send only Content-Length."""
+    assert wire_format.decode_body(
+        b'{"jsonrpc":"2.0","method":"initialized"}',
+        {},
+        json_codec=codec_module.StdlibJsonCodec(),
+    ) == {"jsonrpc": "2.0", "method": "initialized"}
+
+
+def test_unknown_compression_raises_value_error() -> None:
+    with pytest.raises(ValueError):
+        wire_format.decode_body(
+            b"...",
+            {"content-encoding": "brotli"},
+            json_codec=codec_module.StdlibJsonCodec(),
+        )
+
+
+def test_json_is_kept_if_peer_offers_no_binary_codec() -> None:
+    assert wire_format.choose_format(None) is None
+    assert wire_format.choose_format({"codecs": [], "compressions": ["zstd"]}) is None
+
+
+def test_binary_format_can_be_disabled_by_env_var(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setenv(wire_format.WIRE_FORMAT_ENV_VAR, "json")
+
+    assert wire_format.get_supported_formats()["codecs"] == []
+    assert wire_format.choose_format({"codecs": ["msgpack"]}) is None
+
+
+async def test_server_transport_reads_json_and_binary_messages() -> None:
+    """The peer switches its format after the handshake, so JSON and binary
+    messages arrive on the same connection."""
+    received: list[dict] = []
+    all_received = asyncio.Event()
+
+    async def on_message(message: dict) -> None:
+        received.append(message)
+        if len(received) == 2:
+            all_received.set()
+
+    async def handle_connection(
+        reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        transport = server_transport.TcpServerTransport(reader, writer)
+        transport.on_message(on_message)
+        await transport.start()
+
+    server = await asyncio.start_server(handle_connection, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    _, writer = await asyncio.open_connection("127.0.0.1", port)
+    binary_format = wire_format.WireFormat(
+        codec=codec_module.create_codec("msgpack"), compression_threshold=0
+    )
+
+    writer.write(
+        wire_format.WireFormat(codec=codec_module.StdlibJsonCodec()).frame(MESSAGE)
+    )
+    writer.write(binary_format.frame(MESSAGE))
+    await writer.drain()
+    await asyncio.wait_for(all_received.wait(), timeout=5)
+
+    writer.close()
+    server.close()
+    assert received == [MESSAGE, MESSAGE]
@@ -23,6 +23,8 @@ from fine_format.format_file_action import (
 )
 from fine_format.format_files_action import (
     FormatFilesAction,
+    FormatFilesBatchCallerRunContextKwargs,
+    FormatFilesBatchRunContext,
     FormatFilesRunContext,
     FormatFilesRunPayload,
     FormatFilesRunResult,
@@ -49,6 +51,8 @@ __all__ = [
     "FormatFileRunPayload",
     "FormatFileRunResult",
     "FormatFilesAction",
+    "FormatFilesBatchCallerRunContextKwargs",
+    "FormatFilesBatchRunContext",
     "FormatFilesIterateHandler",
     "FormatFilesRunContext",
     "FormatFilesRunPayload",
@@ -16,7 +16,9 @@ else:
 from finecode_extension_api import code_action, textstyler
 from fine_format.format_file_action import (
     FILE_OPERATION_AUTHOR,
+    FileInfo,
 )
+from finecode_extension_api.resource_uri import resource_uri_to_path
 
 
 @dataclasses.dataclass
@@ -78,6 +80,86 @@ class FormatFilesRunContext(
         )
 
 
+@dataclasses.dataclass
+class FormatFilesBatchCallerRunContextKwargs(code_action.CallerRunContextKwargs):
+    """Caller-provided parameters for FormatFilesBatchRunContext.
+
+    In batched mode ``format_files`` runs the language-specific batch subaction
+    (e.g. ``format_python_files``) once per batch of files. The iterate handler
+    passes its file editor session and the files of the batch, which it has
+    already read and blocked, so that the subaction doesn't read them again.
+
+    When the batch subaction is called standalone, no kwargs are passed and the
+    context opens its own session and reads and blocks all files of the payload.
+    """
+
+    file_editor_session: ifileeditor.IFileEditorSession | None = None
+    file_info_by_path: dict[ResourceUri, FileInfo] | None = None
+
+
+class FormatFilesBatchRunContext(FormatFilesRunContext):
+    """Run context of language-specific batch subactions of ``format_files``.
+
+    Handlers read input content from ``file_info_by_path`` and update it with the
+    formatted content for the next handler in the pipeline, in the same way as
+    ``file_info`` of ``FormatFileRunContext``.
+    """
+
+    def __init__(
+        self,
+        run_id: int,
+        initial_payload: FormatFilesRunPayload,
+        meta: code_action.RunActionMeta,
+        file_editor: ifileeditor.IFileEditor,
+        info_provider: code_action.RunContextInfoProvider,
+        caller_kwargs: FormatFilesBatchCallerRunContextKwargs | None = None,
+        partial_result_sender: code_action.PartialResultSender = code_action._NOOP_SENDER,
+        progress_sender: code_action.ProgressSender = code_action._NOOP_PROGRESS_SENDER,
+    ) -> None:
+        super().__init__(
+            run_id=run_id,
+            initial_payload=initial_payload,
+            meta=meta,
+            file_editor=file_editor,
+            info_provider=info_provider,
+            partial_result_sender=partial_result_sender,
+            progress_sender=progress_sender,
+        )
+        self._caller_kwargs = caller_kwargs
+        self.file_info_by_path: dict[ResourceUri, FileInfo] = {}
+
+    @override
+    async def init(self) -> None:
+        parent_session = (
+            self._caller_kwargs.file_editor_session if self._caller_kwargs else None
+        )
+        parent_file_info_by_path = (
+            self._caller_kwargs.file_info_by_path if self._caller_kwargs else None
+        )
+
+        if parent_session is not None:
+            self.file_editor_session = parent_session
+        else:
+            await super().init()
+
+        if parent_file_info_by_path is not None:
+            # files are already read and blocked by the caller
+            self.file_info_by_path = dict(parent_file_info_by_path)
+            return
+
+        # read and block the files for the duration of this context
+        for file_uri in self.initial_payload.file_paths:
+            file_info = await self.exit_stack.enter_async_context(
+                self.file_editor_session.read_file(
+                    resource_uri_to_path(file_uri), block=True
+                )
+            )
+            self.file_info_by_path[file_uri] = FileInfo(
+                file_content=file_info.content,
+                file_version=file_info.version,
+            )
+
+
 @dataclasses.dataclass
 class FormatRunFileResult:
     changed: bool
@@ -132,7 +214,13 @@ class FormatFilesAction(
         FormatFilesRunPayload, FormatFilesRunContext, FormatFilesRunResult
     ]
 ):
-    """Format specific files. Internal action dispatched by format."""
+    """Format specific files. Internal action dispatched by format.
+
+    Language-specific subactions of this action (e.g. ``format_python_files``) are
+    batch contracts: their handlers format many files in one call. They run with
+    ``FormatFilesBatchRunContext`` and are used by ``FormatFilesIterateHandler``
+    in batched mode.
+    """
 
     DESCRIPTION = "Format specific files. Internal action dispatched by format."
     PAYLOAD_TYPE = FormatFilesRunPayload
@@ -1,19 +1,29 @@
+import asyncio
+import collections.abc
+import contextlib
 import dataclasses
+import functools
 
 from finecode_extension_api import code_action
+from fine_src_artifacts import group_src_artifact_files_by_lang_action
 from fine_format import format_files_action
 from fine_format.format_file_action import (
+    FileInfo,
     FormatFileAction,
     FormatFileCallerRunContextKwargs,
     FormatFileRunPayload,
     FormatFileRunResult,
 )
 from finecode_extension_api.interfaces import ilogger, iprojectactionrunner
-from finecode_extension_api.resource_uri import ResourceUri
+from finecode_extension_api.resource_uri import ResourceUri, resource_uri_to_path
 
 
 @dataclasses.dataclass
-class FormatFilesIterateHandlerConfig(code_action.ActionHandlerConfig): ...
+class FormatFilesIterateHandlerConfig(code_action.ActionHandlerConfig):
+    # Number of files formatted by one run of a language-specific batch subaction of
+    # format_files (e.g. format_python_files). Files of languages without such
+    # subaction are formatted one by one. 0 disables batching.
+    batch_size: int = 0
 
 
 class FormatFilesIterateHandler(
@@ -32,13 +42,24 @@ class FormatFilesIterateHandler(
     ``caller_kwargs`` so that all files share one session. Each file is
     read and blocked individually in FormatFileRunContext.init(), and the block
     is released when that file's run context exits.
+
+    In batched mode (``batch_size`` > 0) files are grouped by language once and
+    files of languages with a batch subaction of FormatFilesAction are formatted in
+    batches: one subaction run per ``batch_size`` files instead of a FormatFileAction
+    run, language detection and language subaction run per file. The handler reads
+    and blocks the files of a batch itself and saves the changed ones. Partial
+    result of each file is sent as soon as the file is saved; if the batch
+    subaction fails, files of the batch are formatted one by one, so that only
+    files which can't be formatted fail.
     """
 
     def __init__(
         self,
+        config: FormatFilesIterateHandlerConfig,
         action_runner: iprojectactionrunner.IProjectActionRunner,
         logger: ilogger.ILogger,
     ) -> None:
+        self.config = config
         self.action_runner = action_runner
         self.logger = logger
 
@@ -69,15 +90,237 @@ class FormatFilesIterateHandler(
             }
         )
 
+    async def _format_batch(
+        self,
+        subaction: iprojectactionrunner.ActionRef,
+        file_uris: list[ResourceUri],
+        save: bool,
+        run_context: format_files_action.FormatFilesRunContext,
+        batch: "_BatchRun",
+    ) -> None:
+        """Format files with one run of the batch subaction and set the result of
+        each file in `batch` as soon as it is saved."""
+        session = run_context.file_editor_session
+        async with contextlib.AsyncExitStack() as exit_stack:
+            file_info_by_path: dict[ResourceUri, FileInfo] = {}
+            for file_uri in file_uris:
+                file_info = await exit_stack.enter_async_context(
+                    session.read_file(resource_uri_to_path(file_uri), block=True)
+                )
+                file_info_by_path[file_uri] = FileInfo(
+                    file_content=file_info.content, file_version=file_info.version
+                )
+
+            batch_result: format_files_action.FormatFilesRunResult = (
+                await self.action_runner.run_action(
+                    action_type=subaction,
+                    payload=format_files_action.FormatFilesRunPayload(
+                        file_paths=file_uris, save=save
+                    ),
+                    meta=run_context.meta,
+                    caller_kwargs=format_files_action.FormatFilesBatchCallerRunContextKwargs(
+                        file_editor_session=session,
+                        file_info_by_path=file_info_by_path,
+                    ),
+                )
+            )
+
+            for file_uri in file_uris:
+                file_result = batch_result.result_by_file_path.get(file_uri)
+                if file_result is None:
+                    # no handler of the subaction processed the file
+                    file_result = format_files_action.FormatRunFileResult(
+                        changed=False,
+                        code=file_info_by_path[file_uri].file_content,
+                    )
+
+                # handlers of the subaction never write files, save them like
+                # SaveFormatFileHandler does after format_file, while they are still
+                # blocked
+                if save and file_result.changed:
+                    try:
+                        await session.save_file(
+                            file_path=resource_uri_to_path(file_uri),
+                            file_content=file_result.code,
+                        )
+                    except Exception as exception:
+                        batch.set_exception(file_uri, exception)
+                        continue
+                batch.set_result(
+                    file_uri,
+                    format_files_action.FormatFilesRunResult(
+                        result_by_file_path={file_uri: file_result}
+                    ),
+                )
+
+    async def _schedule_batches(
+        self,
+        payload: format_files_action.FormatFilesRunPayload,
+        run_context: format_files_action.FormatFilesRunContext,
+    ) -> set[ResourceUri]:
+        """Schedule formatting of files which have a batch subaction for their
+        language and return them."""
+        batch_subactions_by_lang = await self.action_runner.get_actions_for_parent(
+            format_files_action.FormatFilesAction
+        )
+        if not batch_subactions_by_lang:
+            self.logger.debug(
+                "FormatFilesIterateHandler: no batch subactions registered, format"
+                " files one by one"
+            )
+            return set()
+
+        files_by_lang_result = await self.action_runner.run_action(
+            action_type=iprojectactionrunner.ActionRef.from_type(
+                group_src_artifact_files_by_lang_action.GroupSrcArtifactFilesByLangAction
+            ),
+            payload=group_src_artifact_files_by_lang_action.GroupSrcArtifactFilesByLangRunPayload(
+                file_paths=payload.file_paths,
+                langs=list(batch_subactions_by_lang.keys()),
+            ),
+            meta=run_context.meta,
+        )
+
+        batched_file_uris: set[ResourceUri] = set()
+        for lang, lang_file_uris in files_by_lang_result.files_by_lang.items():
+            subaction = batch_subactions_by_lang.get(lang)
+            if subaction is None:
+                continue
+            file_uris = [
+                file_uri
+                for file_uri in lang_file_uris
+                if file_uri not in batched_file_uris
+            ]
+            for start in range(0, len(file_uris), self.config.batch_size):
+                batch_file_uris = file_uris[start : start + self.config.batch_size]
+                batch = _BatchRun(
+                    batch_file_uris,
+                    format_batch=functools.partial(
+                        self._format_batch,
+                        subaction,
+                        batch_file_uris,
+                        payload.save,
+                        run_context,
+                    ),
+                    format_one_file=functools.partial(
+                        self._format_one_file,
+                        save=payload.save,
+                        meta=run_context.meta,
+                        run_context=run_context,
+                    ),
+                    logger=self.logger,
+                )
+                for file_uri in batch_file_uris:
+                    run_context.partial_result_scheduler.schedule(
+                        file_uri, batch.get(file_uri)
+                    )
+                batched_file_uris.update(batch_file_uris)
+        return batched_file_uris
+
     async def run(
         self,
         payload: format_files_action.FormatFilesRunPayload,
         run_context: format_files_action.FormatFilesRunContext,
     ) -> None:
+        batched_file_uris: set[ResourceUri] = set()
+        if self.config.batch_size > 0:
+            batched_file_uris = await self._schedule_batches(payload, run_context)
+
         for file_uri in payload.file_paths:
+            if file_uri in batched_file_uris:
+                continue
             run_context.partial_result_scheduler.schedule(
                 file_uri,
                 self._format_one_file(
                     file_uri, payload.save, run_context.meta, run_context
                 ),
             )
+
+
+class _BatchRun:
+    """Run of one batch, shared by partial results of the batch files.
+
+    Partial results are scheduled per file, the first of them starts the batch run
+    and each of them waits only for the result of its file. If the batch run
+    fails, files without result are formatted one by one, so that a file which
+    can't be formatted fails only its own partial result. The batch run is
+    cancelled when all partial results are cancelled.
+    """
+
+    def __init__(
+        self,
+        file_uris: list[ResourceUri],
+        format_batch: collections.abc.Callable[
+            ["_BatchRun"], collections.abc.Awaitable[None]
+        ],
+        format_one_file: collections.abc.Callable[
+            [ResourceUri],
+            collections.abc.Awaitable[format_files_action.FormatFilesRunResult],
+        ],
+        logger: ilogger.ILogger,
+    ) -> None:
+        self._file_uris = file_uris
+        self._format_batch = format_batch
+        self._format_one_file = format_one_file
+        self._logger = logger
+        self._results: dict[
+            ResourceUri, asyncio.Future[format_files_action.FormatFilesRunResult]
+        ] = {}
+        self._task: asyncio.Task[None] | None = None
+
+    async def get(
+        self, file_uri: ResourceUri
+    ) -> format_files_action.FormatFilesRunResult:
+        if self._task is None:
+            loop = asyncio.get_running_loop()
+            for batch_file_uri in self._file_uris:
+                result = loop.create_future()
+                result.add_done_callback(self._on_result_done)
+                self._results[batch_file_uri] = result
+            self._task = asyncio.create_task(self._run())
+        return await self._results[file_uri]
+
+    def set_result(
+        self, file_uri: ResourceUri, result: format_files_action.FormatFilesRunResult
+    ) -> None:
+        if not self._results[file_uri].done():
+            self._results[file_uri].set_result(result)
+
+    def set_exception(self, file_uri: ResourceUri, exception: BaseException) -> None:
+        if not self._results[file_uri].done():
+            self._results[file_uri].set_exception(exception)
+
+    async def _run(self) -> None:
+        try:
+            await self._format_batch(self)
+        except Exception as exception:
+            self._logger.warning(
+                f"Formatting of a batch of {len(self._file_uris)} files failed,"
+                f" format them one by one: {exception}"
+            )
+        pending_file_uris = [
+            file_uri
+            for file_uri, result in self._results.items()
+            if not result.done()
+        ]
+        await asyncio.gather(
+            *(self._format_file_alone(file_uri) for file_uri in pending_file_uris)
+        )
+
+    async def _format_file_alone(self, file_uri: ResourceUri) -> None:
+        try:
+            result = await self._format_one_file(file_uri)
+        except Exception as exception:
+            self.set_exception(file_uri, exception)
+        else:
+            self.set_result(file_uri, result)
+
+    def _on_result_done(
+        self, _result: asyncio.Future[format_files_action.FormatFilesRunResult]
+    ) -> None:
+        if (
+            self._task is not None
+            and not self._task.done()
+            and all(result.cancelled() for result in self._results.values())
+        ):
+            self._task.cancel()
@@ -0,0 +1,244 @@
+import asyncio
+import contextlib
+import pathlib
+import types
+
+import pytest
+from fine_format import format_files_action
+from fine_format.format_file_action import FormatFileRunResult
+from fine_format.format_files_iterate_handler import (
+    FormatFilesIterateHandler,
+    FormatFilesIterateHandlerConfig,
+)
+from fine_src_artifacts import group_src_artifact_files_by_lang_action
+from finecode_extension_api import code_action
+from finecode_extension_api.interfaces import ifileeditor, iprojectactionrunner
+from finecode_extension_api.partialresultscheduler import PartialResultScheduler
+from finecode_extension_api.resource_uri import ResourceUri, path_to_resource_uri
+
+_BATCH_SUBACTION = iprojectactionrunner.ActionRef(
+    source="fine_python_lang.FormatPythonFilesAction",
+    result_type=format_files_action.FormatFilesRunResult,
+)
+
+
+class _FakeLogger:
+    def debug(self, message: str) -> None: ...
+
+    def warning(self, message: str) -> None: ...
+
+
+class _FakeFileEditorSession:
+    def __init__(self) -> None:
+        self.saved: dict[pathlib.Path, str] = {}
+        self.failing_saves: set[pathlib.Path] = set()
+        self.save_released: dict[pathlib.Path, asyncio.Event] = {}
+
+    @contextlib.asynccontextmanager
+    async def read_file(self, file_path: pathlib.Path, block: bool = False):
+        yield ifileeditor.FileInfo(content=f"code of {file_path.name}", version="1")
+
+    async def save_file(self, file_path: pathlib.Path, file_content: str) -> None:
+        if file_path in self.save_released:
+            await self.save_released[file_path].wait()
+        if file_path in self.failing_saves:
+            raise OSError(f"Failed to save {file_path.name}")
+        self.saved[file_path] = file_content
+
+
+class _FakeActionRunner:
+    """Formats files by upper-casing them, fails on files with "invalid" in name."""
+
+    def __init__(self, fail_batch: bool = False) -> None:
+        self.fail_batch = fail_batch
+        self.batches: list[list[ResourceUri]] = []
+        self.formatted_one_by_one: list[ResourceUri] = []
+
+    async def get_actions_for_parent(self, parent_action_type: type):
+        return {"python": _BATCH_SUBACTION}
+
+    async def run_action(self, action_type, payload, meta, caller_kwargs=None):
+        if (
+            action_type.action_type
+            is group_src_artifact_files_by_lang_action.GroupSrcArtifactFilesByLangAction
+        ):
+            return group_src_artifact_files_by_lang_action.GroupSrcArtifactFilesByLangRunResult(
+                files_by_lang={"python": list(payload.file_paths)}
+            )
+        if action_type is _BATCH_SUBACTION:
+            self.batches.append(list(payload.file_paths))
+            if self.fail_batch or any("invalid" in uri for uri in payload.file_paths):
+                raise RuntimeError("Batch formatting failed")
+            return format_files_action.FormatFilesRunResult(
+                result_by_file_path={
+                    uri: format_files_action.FormatRunFileResult(
+                        changed=True,
+                        code=caller_kwargs.file_info_by_path[uri].file_content.upper(),
+                    )
+                    for uri in payload.file_paths
+                }
+            )
+        # format_file
+        self.formatted_one_by_one.append(payload.file_path)
+        if "invalid" in payload.file_path:
+            raise RuntimeError(f"Failed to format {payload.file_path}")
+        return FormatFileRunResult(changed=False, code="")
+
+
+def _make_handler(
+    action_runner: _FakeActionRunner, batch_size: int = 10
+) -> FormatFilesIterateHandler:
+    return FormatFilesIterateHandler(
+        config=FormatFilesIterateHandlerConfig(batch_size=batch_size),
+        action_runner=action_runner,  # type: ignore[arg-type]
+        logger=_FakeLogger(),  # type: ignore[arg-type]
+    )
+
+
+def _make_run_context(session: _FakeFileEditorSession):
+    return types.SimpleNamespace(
+        meta=code_action.RunActionMeta(
+            trigger=code_action.RunActionTrigger.SYSTEM,
+            dev_env=code_action.DevEnv.CI,
+        ),
+        file_editor_session=session,
+        partial_result_scheduler=PartialResultScheduler(),
+    )
+
+
+def _file_uris(tmp_path: pathlib.Path, *names: str) -> list[ResourceUri]:
+    return [path_to_resource_uri(tmp_path / name) for name in names]
+
+
+async def _run(
+    handler: FormatFilesIterateHandler,
+    file_uris: list[ResourceUri],
+    run_context,
+) -> dict[ResourceUri, format_files_action.FormatFilesRunResult | BaseException]:
+    await handler.run(
+        format_files_action.FormatFilesRunPayload(file_paths=file_uris, save=True),
+        run_context,
+    )
+    coroutines_by_key = run_context.partial_result_scheduler.coroutines_by_key
+    results = await asyncio.gather(
+        *(coroutines[0] for coroutines in coroutines_by_key.values()),
+        return_exceptions=True,
+    )
+    return dict(zip(coroutines_by_key.keys(), results))
+
+
+async def test_files_are_formatted_and_saved_in_batches(
+    tmp_path: pathlib.Path,
+) -> None:
+    file_uris = _file_uris(tmp_path, "a.py", "b.py", "c.py")
+    action_runner = _FakeActionRunner()
+    session = _FakeFileEditorSession()
+
+    results = await _run(
+        _make_handler(action_runner, batch_size=2),
+        file_uris,
+        _make_run_context(session),
+    )
+
+    assert action_runner.batches == [file_uris[:2], file_uris[2:]]
+    assert action_runner.formatted_one_by_one == []
+    # each partial result has only its own file
+    assert {
+        file_uri: result.result_by_file_path[file_uri].code
+        for file_uri, result in results.items()
+    } == {
+        file_uris[0]: "CODE OF A.PY",
+        file_uris[1]: "CODE OF B.PY",
+        file_uris[2]: "CODE OF C.PY",
+    }
+    assert session.saved == {
+        tmp_path / "a.py": "CODE OF A.PY",
+        tmp_path / "b.py": "CODE OF B.PY",
+        tmp_path / "c.py": "CODE OF C.PY",
+    }
+
+
+async def test_failed_batch_fails_only_files_which_cannot_be_formatted(
+    tmp_path: pathlib.Path,
+) -> None:
+    file_uris = _file_uris(tmp_path, "a.py", "invalid.py", "c.py")
+    action_runner = _FakeActionRunner()
+
+    results = await _run(
+        _make_handler(action_runner),
+        file_uris,
+        _make_run_context(_FakeFileEditorSession()),
+    )
+
+    assert action_runner.formatted_one_by_one == file_uris
+    assert isinstance(results[file_uris[1]], RuntimeError)
+    assert results[file_uris[0]].result_by_file_path[file_uris[0]].changed is False
+    assert results[file_uris[2]].result_by_file_path[file_uris[2]].changed is False
+
+
+async def test_failed_save_fails_only_its_file(tmp_path: pathlib.Path) -> None:
+    file_uris = _file_uris(tmp_path, "a.py", "b.py")
+    session = _FakeFileEditorSession()
+    session.failing_saves.add(tmp_path / "a.py")
+    action_runner = _FakeActionRunner()
+
+    results = await _run(
+        _make_handler(action_runner), file_uris, _make_run_context(session)
+    )
+
+    assert isinstance(results[file_uris[0]], OSError)
+    assert results[file_uris[1]].result_by_file_path[file_uris[1]].changed is True
+    # the failed file is not formatted again one by one
+    assert action_runner.formatted_one_by_one == []
+
+
+async def test_result_of_file_is_available_before_batch_is_saved(
+    tmp_path: pathlib.Path,
+) -> None:
+    file_uris = _file_uris(tmp_path, "a.py", "b.py")
+    session = _FakeFileEditorSession()
+    session.save_released[tmp_path / "b.py"] = asyncio.Event()
+    run_context = _make_run_context(session)
+    await _make_handler(_FakeActionRunner()).run(
+        format_files_action.FormatFilesRunPayload(file_paths=file_uris, save=True),
+        run_context,
+    )
+    coroutines_by_key = run_context.partial_result_scheduler.coroutines_by_key
+    first = asyncio.ensure_future(coroutines_by_key[file_uris[0]][0])
+    second = asyncio.ensure_future(coroutines_by_key[file_uris[1]][0])
+
+    await asyncio.wait_for(first, timeout=5)
+
+    assert not second.done()
+    session.save_released[tmp_path / "b.py"].set()
+    assert (await second).result_by_file_path[file_uris[1]].changed is True
+
+
+async def test_batch_is_cancelled_when_all_its_files_are_cancelled(
+    tmp_path: pathlib.Path,
+) -> None:
+    file_uris = _file_uris(tmp_path, "a.py", "b.py")
+    session = _FakeFileEditorSession()
+    save_released = asyncio.Event()
+    session.save_released[tmp_path / "a.py"] = save_released
+    run_context = _make_run_context(session)
+    await _make_handler(_FakeActionRunner()).run(
+        format_files_action.FormatFilesRunPayload(file_paths=file_uris, save=True),
+        run_context,
+    )
+    tasks = [
+        asyncio.ensure_future(coroutines[0])
+        for coroutines in run_context.partial_result_scheduler.coroutines_by_key.values()
+    ]
+    await asyncio.sleep(0.01)
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await asyncio.sleep(0.01)
+    save_released.set()
+    await asyncio.sleep(0.01)
+
+    assert session.saved == {}
+    with pytest.raises(asyncio.CancelledError):
+        await tasks[0]
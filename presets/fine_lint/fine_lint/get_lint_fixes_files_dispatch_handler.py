@@ -4,10 +4,22 @@ from finecode_extension_api import code_action
 from fine_src_artifacts import group_src_artifact_files_by_lang_action
 from fine_lint import get_lint_fixes_action
 from finecode_extension_api.interfaces import ilogger, iprojectactionrunner
+from finecode_extension_api.resource_uri import ResourceUri
+
+
+# remembered file languages are forgotten all at once when the limit is reached
+_MAX_REMEMBERED_FILE_LANGUAGES = 10_000
 
 
 @dataclasses.dataclass
-class GetLintFixesFilesDispatchHandlerConfig(code_action.ActionHandlerConfig): ...
+class GetLintFixesFilesDispatchHandlerConfig(code_action.ActionHandlerConfig):
+    # Remember registered language subactions and the language of each file for the
+    # lifetime of the handler instead of asking the WM and grouping the file by
+    # language on every request. The IDE requests fixes for the same file on each
+    # cursor move, this makes repeated requests skip both. Subactions or languages
+    # changed in the project config are picked up after restart of the extension
+    # runner.
+    remember_file_languages: bool = False
 
 
 class GetLintFixesFilesDispatchHandler(
@@ -25,40 +37,50 @@ class GetLintFixesFilesDispatchHandler(
 
     def __init__(
         self,
+        config: GetLintFixesFilesDispatchHandlerConfig,
         action_runner: iprojectactionrunner.IProjectActionRunner,
         logger: ilogger.ILogger,
     ) -> None:
+        self.config = config
         self.action_runner = action_runner
         self.logger = logger
 
-    async def run(
+        self._subactions_by_lang: (
+            dict[str, iprojectactionrunner.ActionRef] | None
+        ) = None
+        # `None` value: file has no language with registered subaction
+        self._lang_by_file_path: dict[ResourceUri, str | None] = {}
+
+    async def _get_subactions_by_lang(
         self,
-        payload: get_lint_fixes_action.GetLintFixesRunPayload,
-        run_context: get_lint_fixes_action.GetLintFixesRunContext,
-    ) -> None:
+    ) -> dict[str, iprojectactionrunner.ActionRef]:
+        if self._subactions_by_lang is not None:
+            return self._subactions_by_lang
+
         subactions_by_lang = await self.action_runner.get_actions_for_parent(
             get_lint_fixes_action.GetLintFixesAction
         )
+        if self.config.remember_file_languages:
+            self._subactions_by_lang = subactions_by_lang
+        return subactions_by_lang
 
-        if not subactions_by_lang:
-            self.logger.debug(
-                "GetLintFixesFilesDispatchHandler: no language subactions registered"
-            )
-            await run_context.partial_result_sender.send(
-                get_lint_fixes_action.GetLintFixesRunResult(
-                    file_version=payload.file_version or "", fixes=[]
-                )
-            )
-            return
+    async def _get_file_lang(
+        self,
+        file_path: ResourceUri,
+        subactions_by_lang: dict[str, iprojectactionrunner.ActionRef],
+        meta: code_action.RunActionMeta,
+    ) -> str | None:
+        if file_path in self._lang_by_file_path:
+            return self._lang_by_file_path[file_path]
 
         # Group the single file by language to find the correct language subaction.
         files_by_lang_result = await self.action_runner.run_action(
             action_type=iprojectactionrunner.ActionRef.from_type(group_src_artifact_files_by_lang_action.GroupSrcArtifactFilesByLangAction),
             payload=group_src_artifact_files_by_lang_action.GroupSrcArtifactFilesByLangRunPayload(
-                file_paths=[payload.file_path],
+                file_paths=[file_path],
                 langs=list(subactions_by_lang.keys()),
             ),
-            meta=run_context.meta,
+            meta=meta,
         )
 
         file_lang = next(
@@ -69,6 +91,33 @@ class GetLintFixesFilesDispatchHandler(
             ),
             None,
         )
+        if self.config.remember_file_languages:
+            if len(self._lang_by_file_path) >= _MAX_REMEMBERED_FILE_LANGUAGES:
+                self._lang_by_file_path.clear()
+            self._lang_by_file_path[file_path] = file_lang
+        return file_lang
+
+    async def run(
+        self,
+        payload: get_lint_fixes_action.GetLintFixesRunPayload,
+        run_context: get_lint_fixes_action.GetLintFixesRunContext,
+    ) -> None:
+        subactions_by_lang = await self._get_subactions_by_lang()
+
+        if not subactions_by_lang:
+            self.logger.debug(
+                "GetLintFixesFilesDispatchHandler: no language subactions registered"
+            )
+            await run_context.partial_result_sender.send(
+                get_lint_fixes_action.GetLintFixesRunResult(
+                    file_version=payload.file_version or "", fixes=[]
+                )
+            )
+            return
+
+        file_lang = await self._get_file_lang(
+            payload.file_path, subactions_by_lang, run_context.meta
+        )
         if file_lang is None or file_lang not in subactions_by_lang:
             self.logger.debug(
                 f"GetLintFixesFilesDispatchHandler: no subaction for file "
@@ -16,7 +16,8 @@ class GetServiceLogsRunPayload(code_action.RunActionPayload):
     returns the 200 lines before them."""
     since_ts_iso: str | None = None
     """Omit lines timestamped before this ISO 8601 UTC value.
-    Best-effort: requires parseable timestamps in log lines."""
+    Best-effort: requires parseable timestamps in log lines. Lines without a
+    timestamp are returned with the entry they continue."""
 
 
 class GetServiceLogsRunContext(
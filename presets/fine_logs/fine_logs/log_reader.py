@@ -0,0 +1,294 @@
+"""Reading windows of service log files without loading whole files.
+
+Log files are append-only and their lines start with a timestamp in increasing
+order, continuation lines (e.g. tracebacks) have no timestamp. The start of a time
+window is found by binary search over the memory-mapped file, the last lines of a
+window are read backwards from its end.
+
+The time span of each file is kept in a sidecar index in the log directory, so
+that rotated files outside of the window are skipped without being opened.
+"""
+
+import dataclasses
+import json
+import mmap
+import os
+import pathlib
+import re
+from datetime import datetime
+
+INDEX_FILE_NAME = ".log_index.json"
+
+_TS_RE = re.compile(rb"^(\d{4}-\d{2}-\d{2}[\sT]\d{2}:\d{2}:\d{2})")
+
+
+@dataclasses.dataclass
+class LogFileSpan:
+    size: int
+    mtime_ns: int
+    first_ts: datetime | None
+    """Timestamp of the first line with a timestamp. None if there is none."""
+    last_ts: datetime | None
+
+
+@dataclasses.dataclass
+class LogWindow:
+    lines: list[str]
+    truncated: bool
+    """True if the window has more lines before the returned ones."""
+
+
+def log_file_sort_key(f: pathlib.Path) -> int:
+    """Sort log files by their numeric rotation ID (e.g. 'runner_1.log' → 1)."""
+    stem = f.stem
+    parts = stem.rsplit("_", 1)
+    if len(parts) == 2 and parts[1].isdigit():
+        return int(parts[1])
+    return 0
+
+
+def parse_since_ts(since_ts_iso: str) -> datetime | None:
+    try:
+        since_dt = datetime.fromisoformat(since_ts_iso.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    # Strip timezone for naive comparison — log timestamps are local time
+    return since_dt.replace(tzinfo=None)
+
+
+def read_log_window(
+    log_dir: pathlib.Path,
+    since: datetime | None = None,
+    tail_lines: int | None = None,
+    offset_lines: int = 0,
+) -> LogWindow:
+    """Read lines of all log files in `log_dir` logged at or after `since`.
+
+    Lines are counted back from the most recent end: `offset_lines` most recent
+    lines are skipped, then at most `tail_lines` lines are returned. Only the
+    returned lines and lines skipped by the offset are read.
+    """
+    files = sorted(log_dir.glob("*.log"), key=log_file_sort_key)
+    spans = _get_spans(log_dir, files)
+
+    # (path, start offset) of each file in the window, oldest first
+    segments: list[tuple[pathlib.Path, int]] = []
+    for f in files:
+        span = spans.get(f.name)
+        if span is None or span.size == 0:
+            continue
+        if since is None or span.first_ts is None or span.first_ts >= since:
+            segments.append((f, 0))
+        elif span.last_ts is not None and span.last_ts >= since:
+            start = _find_window_start(f, since)
+            if start is not None:
+                segments.append((f, start))
+
+    if tail_lines is None:
+        lines: list[str] = []
+        for f, start in segments:
+            lines.extend(_read_lines_forward(f, start))
+        return LogWindow(
+            lines=lines[: max(0, len(lines) - offset_lines)], truncated=False
+        )
+
+    # one more line than needed to know whether the window continues
+    needed = offset_lines + tail_lines + 1
+    lines_reversed: list[str] = []
+    for f, start in reversed(segments):
+        lines_reversed.extend(
+            _read_lines_backward(f, start, needed - len(lines_reversed))
+        )
+        if len(lines_reversed) >= needed:
+            break
+    truncated = len(lines_reversed) == needed
+    selected = lines_reversed[offset_lines : offset_lines + tail_lines]
+    selected.reverse()
+    return LogWindow(lines=selected, truncated=truncated)
+
+
+def _get_spans(
+    log_dir: pathlib.Path, files: list[pathlib.Path]
+) -> dict[str, LogFileSpan]:
+    """Spans of `files` by file name. Spans of files changed since they were
+    indexed are computed again and the index is updated."""
+    index_path = log_dir / INDEX_FILE_NAME
+    indexed = _read_index(index_path)
+    spans: dict[str, LogFileSpan] = {}
+    changed = set(indexed) != {f.name for f in files}
+    for f in files:
+        try:
+            stat = f.stat()
+        except OSError:
+            continue
+        span = indexed.get(f.name)
+        if (
+            span is None
+            or span.size != stat.st_size
+            or span.mtime_ns != stat.st_mtime_ns
+        ):
+            try:
+                span = _compute_span(f, stat)
+            except OSError:
+                continue
+            changed = True
+        spans[f.name] = span
+
+    if changed:
+        _write_index(index_path, spans)
+    return spans
+
+
+def _read_index(index_path: pathlib.Path) -> dict[str, LogFileSpan]:
+    try:
+        raw_index = json.loads(index_path.read_text(encoding="utf-8"))
+        return {
+            file_name: LogFileSpan(
+                size=entry["size"],
+                mtime_ns=entry["mtime_ns"],
+                first_ts=_ts_from_index(entry["first_ts"]),
+                last_ts=_ts_from_index(entry["last_ts"]),
+            )
+            for file_name, entry in raw_index.items()
+        }
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        # missing or corrupted index, files are indexed again
+        return {}
+
+
+def _write_index(index_path: pathlib.Path, spans: dict[str, LogFileSpan]) -> None:
+    raw_index = {
+        file_name: {
+            "size": span.size,
+            "mtime_ns": span.mtime_ns,
+            "first_ts": span.first_ts.isoformat() if span.first_ts else None,
+            "last_ts": span.last_ts.isoformat() if span.last_ts else None,
+        }
+        for file_name, span in spans.items()
+    }
+    tmp_path = index_path.with_name(f"{index_path.name}.{os.getpid()}.tmp")
+    try:
+        tmp_path.write_text(json.dumps(raw_index), encoding="utf-8")
+        os.replace(tmp_path, index_path)
+    except OSError:
+        # the index only saves work, reading logs doesn't depend on it
+        tmp_path.unlink(missing_ok=True)
+
+
+def _ts_from_index(value: str | None) -> datetime | None:
+    return datetime.fromisoformat(value) if value is not None else None
+
+
+def _compute_span(f: pathlib.Path, stat: os.stat_result) -> LogFileSpan:
+    first_ts: datetime | None = None
+    last_ts: datetime | None = None
+    if stat.st_size > 0:
+        with f.open("rb") as handle, mmap.mmap(
+            handle.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mm:
+            first = _first_ts_line_from(mm, 0)
+            if first is not None:
+                first_ts = first[1]
+                last_ts = _last_ts_before(mm, len(mm))
+    return LogFileSpan(
+        size=stat.st_size,
+        mtime_ns=stat.st_mtime_ns,
+        first_ts=first_ts,
+        last_ts=last_ts,
+    )
+
+
+def _find_window_start(f: pathlib.Path, since: datetime) -> int | None:
+    """Offset of the first line with timestamp at or after `since`, None if there
+    is no such line."""
+    try:
+        with f.open("rb") as handle, mmap.mmap(
+            handle.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mm:
+            # smallest position from which the next timestamped line is in window
+            low, high = 0, len(mm)
+            while low < high:
+                middle = (low + high) // 2
+                found = _first_ts_line_from(mm, _line_start_at_or_after(mm, middle))
+                if found is None or found[1] >= since:
+                    high = middle
+                else:
+                    low = middle + 1
+            found = _first_ts_line_from(mm, _line_start_at_or_after(mm, low))
+    except (OSError, ValueError):
+        return None
+    return found[0] if found is not None else None
+
+
+def _line_start_at_or_after(mm: mmap.mmap, position: int) -> int:
+    if position == 0 or mm[position - 1 : position] == b"\n":
+        return position
+    newline_position = mm.find(b"\n", position)
+    return len(mm) if newline_position == -1 else newline_position + 1
+
+
+def _first_ts_line_from(
+    mm: mmap.mmap, line_start: int
+) -> tuple[int, datetime] | None:
+    """Start offset and timestamp of the first timestamped line starting at or
+    after `line_start`."""
+    size = len(mm)
+    while line_start < size:
+        ts = _parse_line_ts(mm[line_start : line_start + 32])
+        if ts is not None:
+            return line_start, ts
+        line_start = _line_start_at_or_after(mm, line_start + 1)
+    return None
+
+
+def _last_ts_before(mm: mmap.mmap, end: int) -> datetime | None:
+    while end > 0:
+        line_start = mm.rfind(b"\n", 0, end - 1) + 1
+        ts = _parse_line_ts(mm[line_start : line_start + 32])
+        if ts is not None:
+            return ts
+        end = line_start
+    return None
+
+
+def _parse_line_ts(line_head: bytes) -> datetime | None:
+    m = _TS_RE.match(line_head)
+    if not m:
+        return None
+    try:
+        return datetime.fromisoformat(m.group(1).decode("ascii").replace(" ", "T"))
+    except ValueError:
+        return None
+
+
+def _decode_line(raw_line: bytes) -> str:
+    return raw_line.removesuffix(b"\r").decode("utf-8", errors="replace")
+
+
+def _read_lines_forward(f: pathlib.Path, start: int) -> list[str]:
+    try:
+        with f.open("rb") as handle:
+            handle.seek(start)
+            return [_decode_line(raw_line.rstrip(b"\n")) for raw_line in handle]
+    except OSError:
+        return []
+
+
+def _read_lines_backward(f: pathlib.Path, start: int, limit: int) -> list[str]:
+    """At most `limit` last lines of `f` after offset `start`, newest first."""
+    lines: list[str] = []
+    try:
+        with f.open("rb") as handle, mmap.mmap(
+            handle.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mm:
+            end = len(mm)
+            if end > start and mm[end - 1 : end] == b"\n":
+                # the file ends with a line break, not an empty line
+                end -= 1
+            while end > start and len(lines) < limit:
+                line_start = max(start, mm.rfind(b"\n", start, end) + 1)
+                lines.append(_decode_line(mm[line_start:end]))
+                end = line_start - 1
+    except (OSError, ValueError):
+        return lines
+    return lines
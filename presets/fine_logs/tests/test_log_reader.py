@@ -0,0 +1,162 @@
+import json
+import os
+import pathlib
+from datetime import datetime
+
+from fine_logs import log_reader
+
+
+def _log_line(minute: int, message: str) -> str:
+    return f"2026-10-01 12:{minute:02d}:00.000 | INFO | {message}\n"
+
+
+def _write_log(path: pathlib.Path, lines: list[str]) -> pathlib.Path:
+    path.write_text("".join(lines))
+    return path
+
+
+def _since(minute: int) -> datetime:
+    return datetime(2026, 10, 1, 12, minute)
+
+
+def _messages(lines: list[str]) -> list[str]:
+    return [line.rsplit("| ", 1)[-1] for line in lines]
+
+
+def test_window_starts_at_first_timestamped_line_in_window(
+    tmp_path: pathlib.Path,
+) -> None:
+    _write_log(
+        tmp_path / "runner_1.log",
+        [
+            _log_line(0, "started"),
+            _log_line(1, "failed"),
+            "Traceback (most recent call last):\n",
+            '  File "handler.py", line 1\n',
+            _log_line(2, "retried"),
+            "  continuation of retried\n",
+            _log_line(3, "done"),
+        ],
+    )
+
+    window = log_reader.read_log_window(tmp_path, since=_since(2))
+
+    # continuation lines of an entry before the window are not in it, these of
+    # entries in the window are
+    assert _messages(window.lines) == [
+        "retried",
+        "  continuation of retried",
+        "done",
+    ]
+    assert window.truncated is False
+
+
+def test_window_after_last_line_is_empty(tmp_path: pathlib.Path) -> None:
+    _write_log(tmp_path / "runner_1.log", [_log_line(0, "a"), _log_line(1, "b")])
+
+    window = log_reader.read_log_window(tmp_path, since=_since(5), tail_lines=10)
+
+    assert window.lines == []
+    assert window.truncated is False
+
+
+def test_lines_of_files_without_timestamps_are_not_filtered(
+    tmp_path: pathlib.Path,
+) -> None:
+    _write_log(tmp_path / "runner_1.log", ["plain output\n", "more output\n"])
+
+    window = log_reader.read_log_window(tmp_path, since=_since(30))
+
+    assert window.lines == ["plain output", "more output"]
+
+
+def test_tail_and_offset_lines_span_rotated_files(tmp_path: pathlib.Path) -> None:
+    _write_log(
+        tmp_path / "runner_1.log",
+        [_log_line(minute, f"old {minute}") for minute in range(3)],
+    )
+    _write_log(
+        tmp_path / "runner_2.log",
+        [_log_line(minute, f"new {minute}") for minute in range(3, 5)],
+    )
+
+    last = log_reader.read_log_window(tmp_path, tail_lines=3)
+    previous = log_reader.read_log_window(tmp_path, tail_lines=3, offset_lines=3)
+    everything = log_reader.read_log_window(tmp_path, tail_lines=5)
+
+    assert _messages(last.lines) == ["old 2", "new 3", "new 4"]
+    assert last.truncated is True
+    assert _messages(previous.lines) == ["old 0", "old 1"]
+    assert previous.truncated is False
+    assert len(everything.lines) == 5
+    assert everything.truncated is False
+
+
+def test_offset_without_tail_skips_most_recent_lines(tmp_path: pathlib.Path) -> None:
+    _write_log(
+        tmp_path / "runner_1.log",
+        [_log_line(minute, str(minute)) for minute in range(4)],
+    )
+
+    window = log_reader.read_log_window(tmp_path, since=_since(1), offset_lines=1)
+
+    assert _messages(window.lines) == ["1", "2"]
+
+
+def _read_index(log_dir: pathlib.Path) -> dict:
+    return json.loads((log_dir / log_reader.INDEX_FILE_NAME).read_text())
+
+
+def test_index_is_refreshed_when_file_changes(tmp_path: pathlib.Path) -> None:
+    log_path = _write_log(tmp_path / "runner_1.log", [_log_line(0, "first")])
+    log_reader.read_log_window(tmp_path, since=_since(0))
+    assert _read_index(tmp_path)["runner_1.log"]["last_ts"] == "2026-10-01T12:00:00"
+
+    with log_path.open("a") as handle:
+        handle.write(_log_line(5, "appended"))
+    window = log_reader.read_log_window(tmp_path, since=_since(5))
+
+    assert _messages(window.lines) == ["appended"]
+    indexed = _read_index(tmp_path)["runner_1.log"]
+    assert indexed["size"] == log_path.stat().st_size
+    assert indexed["last_ts"] == "2026-10-01T12:05:00"
+
+
+def test_index_with_changed_mtime_is_not_trusted(tmp_path: pathlib.Path) -> None:
+    log_path = _write_log(tmp_path / "runner_1.log", [_log_line(0, "a")])
+    log_reader.read_log_window(tmp_path)
+    # the same size, but other content, e.g. the file was replaced by rotation
+    _write_log(log_path, [_log_line(9, "b")])
+    stat = log_path.stat()
+    os.utime(log_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    window = log_reader.read_log_window(tmp_path, since=_since(9))
+
+    assert _messages(window.lines) == ["b"]
+
+
+def test_corrupted_index_is_rebuilt(tmp_path: pathlib.Path) -> None:
+    _write_log(tmp_path / "runner_1.log", [_log_line(0, "a"), _log_line(1, "b")])
+    (tmp_path / log_reader.INDEX_FILE_NAME).write_text('{"runner_1.log": {"size"')
+
+    window = log_reader.read_log_window(tmp_path, since=_since(1))
+
+    assert _messages(window.lines) == ["b"]
+    assert _read_index(tmp_path)["runner_1.log"]["first_ts"] == "2026-10-01T12:00:00"
+
+
+def test_removed_files_are_dropped_from_index(tmp_path: pathlib.Path) -> None:
+    _write_log(tmp_path / "runner_1.log", [_log_line(0, "a")])
+    old_log_path = _write_log(tmp_path / "runner_2.log", [_log_line(1, "b")])
+    log_reader.read_log_window(tmp_path)
+    old_log_path.unlink()
+
+    window = log_reader.read_log_window(tmp_path)
+
+    assert _messages(window.lines) == ["a"]
+    assert list(_read_index(tmp_path)) == ["runner_1.log"]
+
+
+def test_parse_since_ts_accepts_utc_suffix() -> None:
+    assert log_reader.parse_since_ts("2026-10-01T12:00:00Z") == _since(0)
+    assert log_reader.parse_since_ts("not a timestamp") is None
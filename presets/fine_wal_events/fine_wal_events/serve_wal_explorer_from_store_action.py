@@ -13,6 +13,9 @@ class ServeWalExplorerFromStoreRunPayload(code_action.RunActionPayload):
     host: str = "127.0.0.1"
     port: int = DEFAULT_WAL_EXPLORER_PORT
     read_only: bool = True
+    live: bool = False
+    """Tail WAL sources of the workspace, append new events to the store and push
+    them to the browser while serving."""
 
 
 class ServeWalExplorerFromStoreRunContext(
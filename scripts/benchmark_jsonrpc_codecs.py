@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Compares JSON-RPC codecs of `finecode_jsonrpc.codec` and the binary wire formats
+of `finecode_jsonrpc.wire_format` on a `LintFilesRunResult` response, the biggest
+regular message between WM and ER.
+
+Run in the dev workspace venv, optionally with `orjson`, `msgspec`, `zstandard`
+and/or `lz4` installed:
+
+    python scripts/benchmark_jsonrpc_codecs.py --files 5000 --messages-per-file 5
+"""
+import argparse
+import dataclasses
+import time
+
+from fine_lint import lint_files_action
+from fine_inspect_code import diagnostic_types
+from finecode_jsonrpc import codec as codec_module
+from finecode_jsonrpc import wire_format
+
+
+def _make_response(files_count: int, messages_per_file: int) -> dict:
+    result = lint_files_action.LintFilesRunResult(
+        messages={
+            f"file:///workspace/project/src/package/module_{file_index}.py": [
+                diagnostic_types.Diagnostic(
+                    range=diagnostic_types.Range(
+                        start=diagnostic_types.Position(line=message_index, character=4),
+                        end=diagnostic_types.Position(line=message_index, character=20),
+                    ),
+                    message=f"Line too long ({message_index + 89} > 88)",
+                    code="E501",
+                    source="ruff",
+                    severity=diagnostic_types.DiagnosticSeverity.WARNING,
+                )
+                for message_index in range(messages_per_file)
+            ]
+            for file_index in range(files_count)
+        }
+    )
+    return {
+        "jsonrpc": "2.0",
+        "id": "7d0c5f7e-6c0a-4a43-9b57-3c1a1e0f9f8e",
+        "result": {"resultByFormat": {"json": dataclasses.asdict(result)}},
+    }
+
+
+def _measure(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--messages-per-file", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    response = _make_response(args.files, args.messages_per_file)
+    print(
+        f"LintFilesRunResult response: {args.files} files,"
+        f" {args.messages_per_file} messages per file, best of {args.repeat}"
+    )
+    print(f"{'format':<16}{'size, KiB':>12}{'encode, ms':>14}{'decode, ms':>14}")
+    formats = [
+        (codec_name, None)
+        for codec_name in ("json", "orjson", "msgspec", "msgpack")
+    ] + [("msgpack", compression) for compression in ("zstd", "lz4")]
+    for codec_name, compression in formats:
+        format_name = codec_name if compression is None else f"{codec_name}+{compression}"
+        try:
+            format = wire_format.WireFormat(
+                codec=codec_module.create_codec(codec_name),
+                compressor=(
+                    wire_format.create_compressor(compression)
+                    if compression is not None
+                    else None
+                ),
+            )
+        except (
+            codec_module.CodecNotAvailableError,
+            wire_format.WireFormatNotAvailableError,
+        ) as exception:
+            print(f"{format_name:<16}{exception.message}")
+            continue
+
+        framed = format.frame(response)
+        encode_s = _measure(lambda: format.frame(response), args.repeat)
+        header, body = framed.split(b"\r\n\r\n", 1)
+        headers = dict(
+            wire_format.parse_header(line) for line in header.split(b"\r\n")
+        )
+        decode_s = _measure(
+            # JSON bodies are decoded with the codec itself, binary ones by headers
+            lambda: wire_format.decode_body(body, headers, json_codec=format.codec),
+            args.repeat,
+        )
+        print(
+            f"{format_name:<16}{len(framed) / 1024:>12.1f}{encode_s * 1000:>14.1f}"
+            f"{decode_s * 1000:>14.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Compares appending run events with `finecode_extension_runner.wal.WalWriter` in
+different durability modes against the previous writer, which opened, appended to
+and closed the segment file for every event.
+
+Run in the dev workspace venv:
+
+    python scripts/benchmark_wal_writer.py --events 20000
+"""
+import argparse
+import json
+import pathlib
+import tempfile
+import time
+
+from finecode_extension_runner import wal
+
+
+class _OpenPerEventWriter:
+    """Previous writer: checks the segment size on disk, opens, appends to and
+    closes the segment for each event."""
+
+    def __init__(self, dir_path: pathlib.Path) -> None:
+        self._path = dir_path / "wal-000001.jsonl"
+        self._sequence = 0
+
+    def append(self, **event) -> None:
+        self._sequence += 1
+        line = json.dumps(
+            {"sequence": self._sequence, "ts": wal.utc_now_iso(), **event},
+            ensure_ascii=True,
+            default=str,
+        )
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        if self._path.exists():
+            self._path.stat()
+        with self._path.open("a", encoding="utf-8") as handle:
+            handle.write(line)
+            handle.write("\n")
+
+    def close(self) -> None:
+        pass
+
+
+def _append_events(writer, events_count: int) -> None:
+    for index in range(events_count):
+        writer.append(
+            event_type="run.accepted",
+            project_path="/workspace/project",
+            wal_run_id=f"run-{index}",
+            action_name="lint_files",
+            trigger="user",
+            dev_env="ide",
+            payload={"params": {"file_paths": ["/workspace/project/src/module.py"]}},
+        )
+    writer.close()
+
+
+def _measure(make_writer, events_count: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as dir_name:
+            writer = make_writer(pathlib.Path(dir_name))
+            start = time.perf_counter()
+            _append_events(writer, events_count)
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    def new_writer(durability: wal.WalDurability, interval: float):
+        def make_writer(dir_path: pathlib.Path) -> wal.WalWriter:
+            return wal.WalWriter(
+                wal.WalConfig(
+                    enabled=True,
+                    dir_path=dir_path,
+                    durability=durability,
+                    group_commit_interval_sec=interval,
+                )
+            )
+
+        return make_writer
+
+    writers = [("open per event", _OpenPerEventWriter)]
+    for durability in wal.WalDurability:
+        for interval in (0, wal.DEFAULT_GROUP_COMMIT_INTERVAL_SEC):
+            writers.append(
+                (f"{durability}, interval {interval}", new_writer(durability, interval))
+            )
+
+    print(f"{args.events} run events, best of {args.repeat}")
+    print(f"{'writer':<26}{'total, ms':>12}{'per event, us':>16}")
+    for writer_name, make_writer in writers:
+        duration = _measure(make_writer, args.events, args.repeat)
+        print(
+            f"{writer_name:<26}{duration * 1000:>12.1f}"
+            f"{duration / args.events * 1_000_000:>16.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -563,3 +563,39 @@ def dump_config(log_level: str, debug: bool, project: str | None, shared_server:
     except dump_config_cmd.DumpFailed as exception:
         click.echo(exception.message, err=True)
         sys.exit(1)
+
+
+@click.group()
+def cache() -> None:
+    """Inspect and prune persistent result caches of the workspace environments."""
+
+
+@cache.command("stats")
+@click.option("--workdir", "workdir", default=None, type=click.Path(exists=True, file_okay=False, path_type=pathlib.Path), help="Workspace root, cwd by default.")
+def cache_stats(workdir: pathlib.Path | None) -> None:
+    from finecode.cli_app.commands import cache_cmd
+
+    workdir_path = (workdir or pathlib.Path(os.getcwd())).resolve()
+    click.echo(cache_cmd.cache_stats(workdir_path))
+
+
+@cache.command("prune")
+@click.option("--workdir", "workdir", default=None, type=click.Path(exists=True, file_okay=False, path_type=pathlib.Path), help="Workspace root, cwd by default.")
+@click.option("--max-size", "max_size_mb", default=None, type=int, metavar="MB", help="Evict least recently used entries until each store fits this size.")
+@click.option("--older-than-days", "older_than_days", default=None, type=float, help="Remove entries not used for this many days.")
+@click.option("--all", "clear", is_flag=True, default=False, help="Remove all entries.")
+def cache_prune(workdir: pathlib.Path | None, max_size_mb: int | None, older_than_days: float | None, clear: bool) -> None:
+    from finecode.cli_app.commands import cache_cmd
+
+    workdir_path = (workdir or pathlib.Path(os.getcwd())).resolve()
+    try:
+        output = cache_cmd.cache_prune(
+            workdir_path,
+            max_size_bytes=max_size_mb * 1024 * 1024 if max_size_mb is not None else None,
+            older_than_days=older_than_days,
+            clear=clear,
+        )
+    except cache_cmd.CacheCommandFailed as exception:
+        click.echo(exception.message, err=True)
+        sys.exit(1)
+    click.echo(output)
@@ -0,0 +1,108 @@
+# docs: docs/cli.md
+import os
+import pathlib
+
+from finecode.wm_server.config import discovery_index
+from finecode_extension_runner.impls import persistent_cache
+
+
+class CacheCommandFailed(Exception):
+    def __init__(self, message: str) -> None:
+        self.message = message
+
+
+def find_result_stores(workdir_path: pathlib.Path) -> list[pathlib.Path]:
+    """Return paths of persistent result stores of all envs in the workspace.
+
+    Stores live in `<project>/.venvs/<env>/state/finecode/cache/`, so only `.venvs`
+    directories of projects are inspected, not the venvs themselves.
+    """
+    store_paths: list[pathlib.Path] = []
+    for root, dirs, _ in os.walk(workdir_path):
+        if ".venvs" in dirs:
+            venvs_dir_path = pathlib.Path(root) / ".venvs"
+            for env_dir_path in sorted(venvs_dir_path.iterdir()):
+                store_path = (
+                    env_dir_path
+                    / "state"
+                    / "finecode"
+                    / "cache"
+                    / persistent_cache.STORE_FILE_NAME
+                )
+                if store_path.exists():
+                    store_paths.append(store_path)
+        # the same directories as in project discovery, `.venvs` was inspected above
+        dirs[:] = [d for d in dirs if d not in discovery_index.DEFAULT_IGNORED_DIRS]
+    return store_paths
+
+
+def _format_size(size_bytes: int) -> str:
+    size = float(size_bytes)
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+def cache_stats(workdir_path: pathlib.Path) -> str:
+    store_paths = find_result_stores(workdir_path)
+    if len(store_paths) == 0:
+        return f"No persistent result caches found in {workdir_path}"
+
+    lines: list[str] = []
+    total_size = 0
+    for store_path in store_paths:
+        store = persistent_cache.ResultStore(db_path=store_path)
+        try:
+            stats = store.stats()
+        finally:
+            store.close()
+        total_size += stats.size_bytes
+        lines.append(
+            f"{store_path.relative_to(workdir_path)}: {stats.entries_count} entries"
+            f" for {stats.files_count} files, {_format_size(stats.size_bytes)}"
+        )
+        for key, count in stats.entries_count_by_key.items():
+            lines.append(f"    {key}: {count}")
+    lines.append(f"Total: {_format_size(total_size)} in {len(store_paths)} stores")
+    return "\n".join(lines)
+
+
+def cache_prune(
+    workdir_path: pathlib.Path,
+    max_size_bytes: int | None,
+    older_than_days: float | None,
+    clear: bool,
+) -> str:
+    if not clear and max_size_bytes is None and older_than_days is None:
+        raise CacheCommandFailed(
+            "Nothing to prune: pass --max-size, --older-than-days or --all"
+        )
+
+    store_paths = find_result_stores(workdir_path)
+    lines: list[str] = []
+    for store_path in store_paths:
+        store = persistent_cache.ResultStore(db_path=store_path)
+        try:
+            if clear:
+                store.clear()
+                lines.append(f"{store_path.relative_to(workdir_path)}: cleared")
+            else:
+                removed_count = store.prune(
+                    max_size_bytes=max_size_bytes,
+                    older_than_s=(
+                        older_than_days * 24 * 60 * 60
+                        if older_than_days is not None
+                        else None
+                    ),
+                )
+                lines.append(
+                    f"{store_path.relative_to(workdir_path)}: removed {removed_count}"
+                    " entries"
+                )
+        finally:
+            store.close()
+    if len(lines) == 0:
+        return f"No persistent result caches found in {workdir_path}"
+    return "\n".join(lines)
@@ -0,0 +1,91 @@
+"""Routing of file-based LSP requests to the project of the file.
+
+IDE requests like hover or definition run an action in the project containing the
+document. The project of a directory is cached, so that a request costs one
+request to the WM: ``actions/run`` with the cached project, or
+``actions/runForFile`` which resolves the project and runs the action at once if
+the directory is not cached yet.
+
+The cache is cleared when projects can change: on ``actions/treeChanged``
+notifications of the WM and on changes of the workspace folders. A cached project
+which is unknown to the WM nevertheless (invalid params error) is dropped and the
+request is repeated with ``actions/runForFile``.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from finecode import wm_client
+from finecode.lsp_server import global_state
+
+_INVALID_PARAMS = -32602
+
+# directory path -> project dir path or None if the directory is not in any project
+_project_dir_by_dir: dict[str, str | None] = {}
+# incremented on clear, results of requests started before are not cached
+_generation: int = 0
+
+
+def clear() -> None:
+    global _generation
+    _project_dir_by_dir.clear()
+    _generation += 1
+
+
+async def run_action_for_file(
+    action_source: str,
+    file_path: Path,
+    params: dict[str, Any] | None = None,
+    options: dict[str, Any] | None = None,
+) -> dict[str, Any] | None:
+    """Run the action in the project containing the file.
+
+    Returns the ``actions/run`` result or None if the file does not belong to any
+    project.
+
+    Raises:
+        wm_client.ApiError: if the WM failed to run the action.
+    """
+    client = global_state.wm_client
+    if client is None:
+        return None
+
+    dir_key = str(file_path.parent)
+    if dir_key in _project_dir_by_dir:
+        project_dir = _project_dir_by_dir[dir_key]
+        if project_dir is None:
+            return None
+        try:
+            return await client.run_action(
+                action_source=action_source,
+                project=project_dir,
+                params=params,
+                options=options,
+            )
+        except wm_client.ApiServerError as error:
+            if error.code != _INVALID_PARAMS:
+                raise
+            logger.debug(
+                f"Cached project {project_dir} of {file_path} was rejected by WM,"
+                f" resolve it again: {error}"
+            )
+            if _project_dir_by_dir.get(dir_key) == project_dir:
+                del _project_dir_by_dir[dir_key]
+
+    generation = _generation
+    result = await client.run_action_for_file(
+        action_source=action_source,
+        file_path=str(file_path),
+        params=params,
+        options=options,
+    )
+    project_dir = result.get("project")
+    if generation == _generation:
+        _project_dir_by_dir[dir_key] = project_dir
+    if project_dir is None:
+        return None
+    return result
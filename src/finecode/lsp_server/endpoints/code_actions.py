@@ -8,6 +8,7 @@ from lsprotocol import types
 
 from finecode._converter import converter as _converter
 from finecode.lsp_server import global_state, pygls_types_utils
+from finecode.lsp_server.endpoints import _project_routing
 from fine_lint.code_action_types import (
     CodeAction,
     DiagnosticRef,
@@ -107,10 +108,6 @@ async def document_code_action(
         return []
 
     file_path = pygls_types_utils.uri_str_to_path(params.text_document.uri)
-    project_dir = await global_state.wm_client.find_project_for_file(str(file_path))
-    if project_dir is None:
-        logger.debug(f"No project found for code actions: {file_path}")
-        return []
 
     file_uri = file_path.as_uri()
     request_range = params.range
@@ -151,9 +148,9 @@ async def document_code_action(
         action_params["trigger_kind"] = context.trigger_kind.value
 
     try:
-        response = await global_state.wm_client.run_action(
+        response = await _project_routing.run_action_for_file(
             action_source="fine_lint.GetCodeActionsAction",
-            project=project_dir,
+            file_path=file_path,
             params=action_params,
             options={"trigger": "user", "devEnv": "ide"},
         )
@@ -162,6 +159,7 @@ async def document_code_action(
         return []
 
     if response is None:
+        logger.debug(f"No project found for code actions: {file_path}")
         return []
 
     json_result = (response.get("resultByFormat") or {}).get("json")
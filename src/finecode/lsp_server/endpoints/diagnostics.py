@@ -1,6 +1,9 @@
 # TODO: handle all validation errors
 from __future__ import annotations
 
+import asyncio
+import dataclasses
+import uuid
 from pathlib import Path
 from typing import TYPE_CHECKING, cast
 
@@ -17,6 +20,52 @@ if TYPE_CHECKING:
     from finecode.lsp_server.lsp_server import LspServer
 
 
+# (document version, config generation) a diagnostic report is computed for. The
+# version is None for documents not opened in the IDE
+type _ReportKey = tuple[int | None, int]
+
+
+@dataclasses.dataclass
+class _DiagnosticRun:
+    key: _ReportKey
+    task: asyncio.Task[types.RelatedFullDocumentDiagnosticReport | None]
+
+
+@dataclasses.dataclass
+class _CachedReport:
+    key: _ReportKey
+    report: types.RelatedFullDocumentDiagnosticReport
+
+
+# uri -> run of InspectCodeAction in progress. Concurrent pulls of the same document
+# version share the run, a run of an older version is cancelled.
+_diagnostic_runs: dict[str, _DiagnosticRun] = {}
+# uri -> the last report of an opened document, its `result_id` identifies it for
+# `previous_result_id` of the next pull. Evicted by clear_cache_for_uri (called
+# from document_did_close).
+_last_reports: dict[str, _CachedReport] = {}
+
+
+def clear_cache_for_uri(uri: str) -> None:
+    _last_reports.pop(uri, None)
+    run = _diagnostic_runs.pop(uri, None)
+    if run is not None:
+        run.task.cancel()
+
+
+def cancel_outdated_run(uri: str) -> None:
+    """Cancel the diagnostic run of the document if it was started for an older
+    version than the current one."""
+    run = _diagnostic_runs.get(uri)
+    if run is not None and run.key != _current_report_key(uri):
+        del _diagnostic_runs[uri]
+        run.task.cancel()
+
+
+def _current_report_key(uri: str) -> _ReportKey:
+    return (global_state.document_versions.get(uri), global_state.config_generation)
+
+
 def map_lint_message_to_diagnostic(
     lint_message: Diagnostic,
 ) -> types.Diagnostic:
@@ -49,8 +98,58 @@ def map_lint_message_to_diagnostic(
 
 
 async def document_diagnostic_with_full_result(
-    file_path: Path,
+    file_path: Path, uri: str, previous_result_id: str | None = None
 ) -> types.DocumentDiagnosticReport | None:
+    """Diagnostics of the document, reusing the last report and runs in progress.
+
+    Report of an opened document is reused as long as its version and config of
+    projects are unchanged, then an `unchanged` report is returned if the client
+    already has it.
+
+    Raises:
+        asyncio.CancelledError: the run was cancelled because the document
+            changed.
+    """
+    key = _current_report_key(uri)
+    cached = _last_reports.get(uri)
+    if cached is not None and cached.key == key:
+        if (
+            previous_result_id is not None
+            and previous_result_id == cached.report.result_id
+        ):
+            return types.UnchangedDocumentDiagnosticReport(result_id=previous_result_id)
+        return cached.report
+
+    run = _diagnostic_runs.get(uri)
+    if run is None or run.key != key:
+        if run is not None:
+            run.task.cancel()
+        run = _DiagnosticRun(
+            key=key, task=asyncio.create_task(_run_document_diagnostic(file_path))
+        )
+        _diagnostic_runs[uri] = run
+        run.task.add_done_callback(
+            lambda _, run=run: _on_diagnostic_run_done(uri, run)
+        )
+
+    # a cancelled pull doesn't cancel the run, other pulls can wait for it
+    return await asyncio.shield(run.task)
+
+
+def _on_diagnostic_run_done(uri: str, run: _DiagnosticRun) -> None:
+    if _diagnostic_runs.get(uri) is run:
+        del _diagnostic_runs[uri]
+    if run.task.cancelled() or run.task.exception() is not None:
+        return
+    report = run.task.result()
+    # only reports of opened documents are reused, closed ones can change on disk
+    if report is not None and run.key[0] is not None:
+        _last_reports[uri] = _CachedReport(key=run.key, report=report)
+
+
+async def _run_document_diagnostic(
+    file_path: Path,
+) -> types.RelatedFullDocumentDiagnosticReport | None:
     logger.trace(f"Document diagnostic with full result: {file_path}")
 
     if global_state.wm_client is None:
@@ -95,7 +194,7 @@ async def document_diagnostic_with_full_result(
         for lint_message in requested_file_messages
     ]
     response = types.RelatedFullDocumentDiagnosticReport(
-        items=requested_files_diagnostic_items
+        items=requested_files_diagnostic_items, result_id=str(uuid.uuid4())
     )
 
     related_files_diagnostics: dict[str, types.FullDocumentDiagnosticReport] = {}
@@ -160,7 +259,11 @@ async def document_diagnostic(
             )
             return None
         else:
-            return await document_diagnostic_with_full_result(file_path=file_path)
+            return await document_diagnostic_with_full_result(
+                file_path=file_path,
+                uri=params.text_document.uri,
+                previous_result_id=params.previous_result_id,
+            )
     except Exception as e:
         logger.exception(e)
 
@@ -6,7 +6,7 @@ from loguru import logger
 from lsprotocol import types
 
 from finecode.lsp_server import global_state
-from finecode.lsp_server.endpoints import semantic_tokens
+from finecode.lsp_server.endpoints import diagnostics, semantic_tokens
 
 if TYPE_CHECKING:
     from finecode.lsp_server.lsp_server import LspServer
@@ -21,10 +21,14 @@ async def document_did_open(
     if global_state.wm_client is None:
         raise Exception("WM server not connected")
 
+    global_state.document_versions[params.text_document.uri] = (
+        params.text_document.version
+    )
     await global_state.wm_client.notify_document_opened(
         uri=params.text_document.uri,
         version=params.text_document.version,
         text=params.text_document.text,
+        language_id=params.text_document.language_id,
     )
 
 
@@ -37,10 +41,12 @@ async def document_did_close(
     if global_state.wm_client is None:
         raise Exception("WM server not connected")
 
+    global_state.document_versions.pop(params.text_document.uri, None)
     await global_state.wm_client.notify_document_closed(
         uri=params.text_document.uri
     )
     semantic_tokens.clear_cache_for_uri(params.text_document.uri)
+    diagnostics.clear_cache_for_uri(params.text_document.uri)
 
 
 async def document_did_save(
@@ -87,8 +93,13 @@ async def document_did_change(
             )
             continue
 
+    global_state.document_versions[params.text_document.uri] = (
+        params.text_document.version
+    )
     await global_state.wm_client.notify_document_changed(
         uri=params.text_document.uri,
         version=params.text_document.version,
         content_changes=content_changes,
     )
+    # diagnostics of the previous version are not needed anymore
+    diagnostics.cancel_outdated_run(params.text_document.uri)
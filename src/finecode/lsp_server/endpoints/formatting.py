@@ -7,6 +7,7 @@ from lsprotocol import types
 
 from finecode._converter import converter as _converter
 from finecode.lsp_server import global_state, pygls_types_utils
+from finecode.lsp_server.endpoints import _project_routing
 from fine_format import format_files_action
 from finecode_extension_api.resource_uri import ResourceUri
 
@@ -24,17 +25,12 @@ async def format_document(_ls: LspServer, params: types.DocumentFormattingParams
         logger.error("Formatting requested but WM client not connected")
         return None
 
-    project_dir = await global_state.wm_client.find_project_for_file(str(file_path))
-    if project_dir is None:
-        logger.error(f"Cannot determine project for formatting: {file_path}")
-        return []
-
     file_uri = file_path.as_uri()
 
     try:
-        response = await global_state.wm_client.run_action(
+        response = await _project_routing.run_action_for_file(
             action_source="fine_format.FormatAction",
-            project=project_dir,
+            file_path=file_path,
             params={"file_paths": [file_uri], "save": False, "target": "files"},
             options={"trigger": "user", "devEnv": "ide"},
         )
@@ -43,6 +39,7 @@ async def format_document(_ls: LspServer, params: types.DocumentFormattingParams
         return None
 
     if response is None:
+        logger.error(f"Cannot determine project for formatting: {file_path}")
         return []
 
     json_result = (response.get("resultByFormat") or {}).get("json")
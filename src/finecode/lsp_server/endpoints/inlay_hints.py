@@ -6,6 +6,7 @@ from loguru import logger
 from lsprotocol import types
 
 from finecode.lsp_server import global_state, pygls_types_utils
+from finecode.lsp_server.endpoints import _project_routing
 
 if TYPE_CHECKING:
     from finecode.lsp_server.lsp_server import LspServer
@@ -51,14 +52,10 @@ async def document_inlay_hint(
         logger.error("Inlay hints requested but WM client not connected")
         return None
 
-    project_dir = await global_state.wm_client.find_project_for_file(str(file_path))
-    if project_dir is None:
-        return []
-
     try:
-        response = await global_state.wm_client.run_action(
+        response = await _project_routing.run_action_for_file(
             action_source="fine_inlay_hints.TextDocumentInlayHintAction",
-            project=project_dir,
+            file_path=file_path,
             params=inlay_hint_params_to_dict(params),
             options={"trigger": "system", "devEnv": "ide"},
         )
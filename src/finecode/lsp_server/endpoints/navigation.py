@@ -5,7 +5,7 @@ from typing import TYPE_CHECKING, Any
 from loguru import logger
 
 from finecode.lsp_server import global_state, pygls_types_utils
-from finecode.lsp_server.endpoints import _cancellation
+from finecode.lsp_server.endpoints import _cancellation, _project_routing
 
 if TYPE_CHECKING:
     from finecode.lsp_server.lsp_server import LspServer
@@ -24,13 +24,10 @@ async def hover(_ls: LspServer, params: dict[str, Any] | None) -> dict[str, Any]
     uri: str = params["textDocument"]["uri"]
     position = params["position"]
     file_path = pygls_types_utils.uri_str_to_path(uri)
-    project_dir = await global_state.wm_client.find_project_for_file(str(file_path))
-    if project_dir is None:
-        return None
     try:
-        response = await global_state.wm_client.run_action(
+        response = await _project_routing.run_action_for_file(
             action_source="fine_symbol_info.TextDocumentHoverAction",
-            project=project_dir,
+            file_path=file_path,
             params={
                 "uri": uri,
                 "position": {"line": position["line"], "character": position["character"]},
@@ -60,13 +57,10 @@ async def definition(_ls: LspServer, params: dict[str, Any] | None) -> list[dict
     uri: str = params["textDocument"]["uri"]
     position = params["position"]
     file_path = pygls_types_utils.uri_str_to_path(uri)
-    project_dir = await global_state.wm_client.find_project_for_file(str(file_path))
-    if project_dir is None:
-        return None
     try:
-        response = await global_state.wm_client.run_action(
+        response = await _project_routing.run_action_for_file(
             action_source="fine_symbol_info.TextDocumentDefinitionAction",
-            project=project_dir,
+            file_path=file_path,
             params={
                 "uri": uri,
                 "position": {"line": position["line"], "character": position["character"]},
@@ -93,13 +87,10 @@ async def references(_ls: LspServer, params: dict[str, Any] | None) -> list[dict
     position = params["position"]
     include_declaration: bool = (params.get("context") or {}).get("includeDeclaration", True)
     file_path = pygls_types_utils.uri_str_to_path(uri)
-    project_dir = await global_state.wm_client.find_project_for_file(str(file_path))
-    if project_dir is None:
-        return None
     try:
-        response = await global_state.wm_client.run_action(
+        response = await _project_routing.run_action_for_file(
             action_source="fine_symbol_info.TextDocumentReferencesAction",
-            project=project_dir,
+            file_path=file_path,
             params={
                 "uri": uri,
                 "position": {"line": position["line"], "character": position["character"]},
@@ -126,13 +117,10 @@ async def type_definition(_ls: LspServer, params: dict[str, Any] | None) -> list
     uri: str = params["textDocument"]["uri"]
     position = params["position"]
     file_path = pygls_types_utils.uri_str_to_path(uri)
-    project_dir = await global_state.wm_client.find_project_for_file(str(file_path))
-    if project_dir is None:
-        return None
     try:
-        response = await global_state.wm_client.run_action(
+        response = await _project_routing.run_action_for_file(
             action_source="fine_symbol_info.TextDocumentTypeDefinitionAction",
-            project=project_dir,
+            file_path=file_path,
             params={
                 "uri": uri,
                 "position": {"line": position["line"], "character": position["character"]},
@@ -158,13 +146,10 @@ async def implementation(_ls: LspServer, params: dict[str, Any] | None) -> list[
     uri: str = params["textDocument"]["uri"]
     position = params["position"]
     file_path = pygls_types_utils.uri_str_to_path(uri)
-    project_dir = await global_state.wm_client.find_project_for_file(str(file_path))
-    if project_dir is None:
-        return None
     try:
-        response = await global_state.wm_client.run_action(
+        response = await _project_routing.run_action_for_file(
             action_source="fine_symbol_info.TextDocumentImplementationAction",
-            project=project_dir,
+            file_path=file_path,
             params={
                 "uri": uri,
                 "position": {"line": position["line"], "character": position["character"]},
@@ -190,13 +175,10 @@ async def document_highlight(_ls: LspServer, params: dict[str, Any] | None) -> l
     uri: str = params["textDocument"]["uri"]
     position = params["position"]
     file_path = pygls_types_utils.uri_str_to_path(uri)
-    project_dir = await global_state.wm_client.find_project_for_file(str(file_path))
-    if project_dir is None:
-        return None
     try:
-        response = await global_state.wm_client.run_action(
+        response = await _project_routing.run_action_for_file(
             action_source="fine_symbol_info.TextDocumentDocumentHighlightAction",
-            project=project_dir,
+            file_path=file_path,
             params={
                 "uri": uri,
                 "position": {"line": position["line"], "character": position["character"]},
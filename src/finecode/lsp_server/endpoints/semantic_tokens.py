@@ -7,7 +7,7 @@ from typing import TYPE_CHECKING, Any
 from loguru import logger
 
 from finecode.lsp_server import global_state, pygls_types_utils
-from finecode.lsp_server.endpoints import _cancellation
+from finecode.lsp_server.endpoints import _cancellation, _project_routing
 from fine_semantic_tokens.text_document_semantic_tokens_action import (
     SEMANTIC_TOKEN_TYPES,
     SEMANTIC_TOKEN_MODIFIERS,
@@ -112,18 +112,14 @@ async def _run_full_or_range(
         return None
 
     file_path = pygls_types_utils.uri_str_to_path(uri)
-    project_dir = await global_state.wm_client.find_project_for_file(str(file_path))
-    if project_dir is None:
-        return None
-
     params: dict[str, Any] = {"uri": uri}
     if range_dict is not None:
         params["range"] = range_dict
 
     try:
-        response = await global_state.wm_client.run_action(
+        response = await _project_routing.run_action_for_file(
             action_source="fine_semantic_tokens.TextDocumentSemanticTokensAction",
-            project=project_dir,
+            file_path=file_path,
             params=params,
             options={"trigger": "system", "devEnv": "ide"},
         )
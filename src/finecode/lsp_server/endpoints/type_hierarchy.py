@@ -5,7 +5,7 @@ from typing import TYPE_CHECKING, Any
 from loguru import logger
 
 from finecode.lsp_server import global_state, pygls_types_utils
-from finecode.lsp_server.endpoints import _cancellation
+from finecode.lsp_server.endpoints import _cancellation, _project_routing
 
 if TYPE_CHECKING:
     from finecode.lsp_server.lsp_server import LspServer
@@ -69,14 +69,10 @@ async def prepare_type_hierarchy(
     position = params["position"]
 
     file_path = pygls_types_utils.uri_str_to_path(uri)
-    project_dir = await global_state.wm_client.find_project_for_file(str(file_path))
-    if project_dir is None:
-        return None
-
     try:
-        response = await global_state.wm_client.run_action(
+        response = await _project_routing.run_action_for_file(
             action_source="fine_code_hierarchy.TextDocumentPrepareTypeHierarchyAction",
-            project=project_dir,
+            file_path=file_path,
             params={
                 "uri": uri,
                 "position": {"line": position["line"], "character": position["character"]},
@@ -112,14 +108,10 @@ async def type_hierarchy_supertypes(
     uri: str = lsp_item["uri"]
 
     file_path = pygls_types_utils.uri_str_to_path(uri)
-    project_dir = await global_state.wm_client.find_project_for_file(str(file_path))
-    if project_dir is None:
-        return None
-
     try:
-        response = await global_state.wm_client.run_action(
+        response = await _project_routing.run_action_for_file(
             action_source="fine_code_hierarchy.TypeHierarchySupertypesAction",
-            project=project_dir,
+            file_path=file_path,
             params={"item": _lsp_item_to_action(lsp_item)},
             options={"trigger": "user", "devEnv": "ide"},
         )
@@ -152,14 +144,10 @@ async def type_hierarchy_subtypes(
     uri: str = lsp_item["uri"]
 
     file_path = pygls_types_utils.uri_str_to_path(uri)
-    project_dir = await global_state.wm_client.find_project_for_file(str(file_path))
-    if project_dir is None:
-        return None
-
     try:
-        response = await global_state.wm_client.run_action(
+        response = await _project_routing.run_action_for_file(
             action_source="fine_code_hierarchy.TypeHierarchySubtypesAction",
-            project=project_dir,
+            file_path=file_path,
             params={"item": _lsp_item_to_action(lsp_item)},
             options={"trigger": "user", "devEnv": "ide"},
         )
@@ -8,5 +8,10 @@ from finecode.wm_client import ApiClient
 server_initialized = asyncio.Event()
 wm_client: ApiClient | None = None
 partial_result_tokens: dict[str | int, tuple[str, str]] = {}
+# uri -> version of documents opened in the IDE
+document_versions: dict[str, int] = {}
+# incremented when config of any project changes, results of actions computed with
+# an older generation can be outdated
+config_generation: int = 0
 wm_log_level: str = "INFO"
 lsp_log_file_path: Path | None = None
@@ -16,6 +16,7 @@ from finecode import telemetry
 from finecode.wm_server import wm_lifecycle
 from finecode.wm_client import ApiClient
 from finecode.lsp_server import global_state
+from finecode.lsp_server.endpoints import _project_routing
 from finecode.lsp_server.endpoints import action_tree as action_tree_endpoints
 from finecode.lsp_server.endpoints import code_actions as code_actions_endpoints
 from finecode.lsp_server.endpoints import code_lens as code_lens_endpoints
@@ -396,16 +397,26 @@ async def _on_initialized(server: LspServer, _params: dict | None) -> None:
 
     # Register notification handlers for server→client push messages.
     async def on_tree_changed(push_params: dict) -> None:
+        # e.g. runners of the project were restarted
+        global_state.config_generation += 1
+        # status of the project changed, it can start or stop owning files
+        _project_routing.clear()
         node = push_params.get("node")
         if isinstance(node, dict):
             server.notify_client("actionsNodes/changed", node)
 
+    async def on_project_config_changed(push_params: dict) -> None:
+        global_state.config_generation += 1
+
     async def on_user_message(push_params: dict) -> None:
         await send_user_message_notification(
             server, push_params["message"], push_params["type"]
         )
 
     global_state.wm_client.on_notification("actions/treeChanged", on_tree_changed)
+    global_state.wm_client.on_notification(
+        "projects/configChanged", on_project_config_changed
+    )
     global_state.wm_client.on_notification("server/userMessage", on_user_message)
 
     # Forward progress notifications to the IDE progress reporter.
@@ -553,6 +564,7 @@ async def _workspace_did_change_workspace_folders(
         await global_state.wm_client.add_dir(
             Path(ws_folder.uri.removeprefix("file://"))
         )
+    _project_routing.clear()
 
 
 async def _lsp_server_shutdown(_server: LspServer, _params: dict | None) -> dict:
@@ -7,6 +7,8 @@ _action_duration_hist = None
 _action_errors_counter = None
 _er_startup_hist = None
 _er_active_counter = None
+_er_evictions_counter = None
+_er_pool_live_gauge = None
 
 
 def init_otel_logging(service_name: str, workspace_path: Path | None = None, endpoint: str | None = None) -> None:
@@ -115,6 +117,7 @@ def init_tracer_provider(service_name: str, workspace_path: Path | None = None,
 
 def init_meter_provider(service_name: str, workspace_path: Path | None = None, endpoint: str | None = None) -> None:
     global _action_duration_hist, _action_errors_counter, _er_startup_hist, _er_active_counter
+    global _er_evictions_counter, _er_pool_live_gauge
 
     if not endpoint:
         return
@@ -165,6 +168,14 @@ def init_meter_provider(service_name: str, workspace_path: Path | None = None, e
         "finecode.er.active",
         description="Number of active extension runners",
     )
+    _er_evictions_counter = meter.create_counter(
+        "finecode.er.evictions",
+        description="Number of extension runners stopped by the runner pool",
+    )
+    _er_pool_live_gauge = meter.create_gauge(
+        "finecode.er.pool.live",
+        description="Number of live extension runners counted by the runner pool",
+    )
 
 
 @contextlib.contextmanager
@@ -188,14 +199,14 @@ def action_metrics(action_name: str, project_name: str):
 
 @contextlib.contextmanager
 def er_startup_metrics(env_name: str):
+    # the caller can add attributes to the yielded dict, e.g. how the ER was started
+    attributes: dict[str, str] = {"env.name": env_name}
     start = time.perf_counter()
     try:
-        yield
+        yield attributes
     finally:
         if _er_startup_hist is not None:
-            _er_startup_hist.record(
-                time.perf_counter() - start, {"env.name": env_name}
-            )
+            _er_startup_hist.record(time.perf_counter() - start, attributes)
 
 
 def er_active_inc(env_name: str) -> None:
@@ -208,6 +219,16 @@ def er_active_dec(env_name: str) -> None:
         _er_active_counter.add(-1, {"env.name": env_name})
 
 
+def er_eviction(env_name: str, reason: str) -> None:
+    if _er_evictions_counter is not None:
+        _er_evictions_counter.add(1, {"env.name": env_name, "eviction.reason": reason})
+
+
+def er_pool_occupancy(live_count: int, max_live: int) -> None:
+    if _er_pool_live_gauge is not None:
+        _er_pool_live_gauge.set(live_count, {"pool.max_live": max_live})
+
+
 @contextlib.contextmanager
 def action_run_span(
     action_name: str,
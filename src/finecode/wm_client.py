@@ -324,6 +324,33 @@ class ApiClient:
             body["partialResultToken"] = partial_result_token
         return await self.request("actions/run", body)
 
+    async def run_action_for_file(
+        self,
+        action_source: str,
+        file_path: str,
+        params: dict | None = None,
+        options: dict | None = None,
+    ) -> dict:
+        """Run an action in the project containing ``file_path``.
+
+        Resolves the project and runs the action with one ``actions/runForFile``
+        request. Returns the ``actions/run`` result extended with ``project``, or
+        ``{"project": None}`` if the file does not belong to any project.
+        """
+        body: dict = {
+            "actionSource": action_source,
+            "filePath": file_path,
+            "options": options,
+        }
+        if params:
+            body["params"] = params
+        result = await self.request("actions/runForFile", body)
+        if not isinstance(result, dict) or "project" not in result:
+            raise ApiResponseError(
+                "actions/runForFile", f"missing 'project' field, got {result!r}"
+            )
+        return result
+
     async def add_dir(
         self,
         dir_path: pathlib.Path,
@@ -441,12 +468,18 @@ class ApiClient:
     # -- Document notifications -------------------------------------------------
 
     async def notify_document_opened(
-        self, uri: str, version: int | str | None = None, text: str = ""
+        self,
+        uri: str,
+        version: int | str | None = None,
+        text: str = "",
+        language_id: str = "",
     ) -> None:
         """Send document opened notification to the server."""
         params = {"uri": uri, "text": text}
         if version is not None:
             params["version"] = version
+        if language_id:
+            params["languageId"] = language_id
 
         self._send_notification("documents/opened", params)
 
@@ -487,7 +520,8 @@ class ApiClient:
     # -- Low-level request --------------------------------------------------
 
     async def request(self, method: str, params: dict | None = None) -> dict:
-        """Send a JSON-RPC request and wait for the response.
+        """Send a JSON-RPC request and wait for the response. If the caller is
+        cancelled, the request is cancelled on the server with `$/cancelRequest`.
 
         Raises:
             ApiServerError: the server returned a JSON-RPC error.
@@ -520,7 +554,14 @@ class ApiClient:
         self._writer.write(header + body)
         await self._writer.drain()
 
-        response = await future
+        try:
+            response = await future
+        except asyncio.CancelledError:
+            # let the server stop handling the request, e.g. a running action.
+            # Its late response is discarded by the read loop
+            if self._writer is not None and not self._writer.is_closing():
+                self._send_notification("$/cancelRequest", {"id": rid})
+            raise
 
         if "error" in response:
             error = response["error"]
@@ -15,6 +15,7 @@ from finecode.wm_server._api_handlers._workspace import (
 from finecode.wm_server._api_handlers._actions import (
     _handle_get_tree,
     _handle_run_action,
+    _handle_run_action_for_file,
     _handle_actions_reload,
     _handle_run_batch,
     _handle_server_reset,
@@ -51,6 +52,7 @@ __all__ = [
     "_handle_list_actions",
     "_handle_prepare_envs",
     "_handle_run_action",
+    "_handle_run_action_for_file",
     "_handle_actions_reload",
     "_handle_run_batch",
     "_handle_run_action_with_partial_results_task",
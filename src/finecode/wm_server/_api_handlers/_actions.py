@@ -13,6 +13,7 @@ from finecode.wm_server._api_handlers._helpers import (
     _apply_config_overrides_to_projects,
     _build_batch_result,
     _find_project_by_path,
+    _find_project_for_file,
     _parse_and_validate_run_action_params,
     _parse_run_batch_params,
     _resolve_actions_by_project,
@@ -81,6 +82,37 @@ async def _handle_run_action(
             raise
 
 
+async def _handle_run_action_for_file(
+    params: dict | None, ws_context: context.WorkspaceContext
+) -> dict:
+    """Run an action in the project containing a file.
+
+    Combines ``workspace/findProjectForFile`` and ``actions/run`` so that IDE
+    requests like hover cost one request to the WM.
+
+    Params: ``{"filePath": "/abs/path", "actionSource": ..., "params": {...},
+    "options": {...}}``, ``options`` as in ``actions/run``.
+    Result: ``{"project": "/abs/path/to/project", "resultByFormat": {...},
+    "returnCode": 0}`` or ``{"project": null}`` if the file does not belong to any
+    project using finecode.
+    """
+    raw_params = params or {}
+    file_path = raw_params.get("filePath")
+    if not file_path:
+        raise ValueError("filePath is required")
+
+    project = _find_project_for_file(ws_context, pathlib.Path(file_path))
+    if project is None:
+        return {"project": None}
+
+    run_params = {
+        key: value for key, value in raw_params.items() if key != "filePath"
+    }
+    run_params["project"] = str(project.dir_path)
+    result = await _handle_run_action(run_params, ws_context)
+    return {"project": str(project.dir_path), **result}
+
+
 async def _handle_actions_reload(
     params: dict | None, ws_context: context.WorkspaceContext
 ) -> dict:
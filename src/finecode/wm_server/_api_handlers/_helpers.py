@@ -55,6 +55,20 @@ def _find_project_by_path(
     return ws_context.ws_projects.get(pathlib.Path(project_path))
 
 
+def _find_project_for_file(
+    ws_context: context.WorkspaceContext, file_path: pathlib.Path
+) -> domain.Project | None:
+    """The nearest project containing the file which uses finecode (has a valid
+    config), or None."""
+    # the trie returns nested/child projects before their parents
+    for project_dir in ws_context.project_path_trie.find_all(file_path):
+        project = ws_context.ws_projects[project_dir]
+        if project.status == domain.ProjectStatus.CONFIG_VALID:
+            return project
+        # skip projects that aren't using finecode
+    return None
+
+
 # ---------------------------------------------------------------------------
 # Action lookup by source (ADR-0019: import-path aliases as action identifiers)
 # ---------------------------------------------------------------------------
@@ -11,6 +11,7 @@ from finecode.wm_server import context, domain
 from finecode.wm_server._api_handlers._helpers import (
     _apply_config_overrides_to_projects,
     _find_project_by_path,
+    _find_project_for_file,
     _project_to_dict,
 )
 
@@ -72,26 +73,11 @@ async def _handle_find_project_for_file(
     the file does not belong to any suitable project.
     """
 
-    file_path = pathlib.Path(params["filePath"])
-
-    # iterate over known projects in reverse-sorted order so that nested/child
-    # projects are considered before their parents.  This mirrors the behaviour
-    # in ``find_project_with_action_for_file`` but without any action-specific
-    # checks.
-    sorted_dirs = list(ws_context.ws_projects.keys())
-    # reverse sort by path (string) ensures children come first
-    sorted_dirs.sort(reverse=True)
-
-    for project_dir in sorted_dirs:
-        if file_path.is_relative_to(project_dir):
-            project = ws_context.ws_projects[project_dir]
-            if project.status == domain.ProjectStatus.CONFIG_VALID:
-                return {"project": str(project.dir_path)}
-            # skip projects that aren't using finecode
-            continue
-
-    # not in any project or none of the containing projects are CONFIG_VALID
-    return {"project": None}
+    project = _find_project_for_file(ws_context, pathlib.Path(params["filePath"]))
+    if project is None:
+        # not in any project or none of the containing projects are CONFIG_VALID
+        return {"project": None}
+    return {"project": str(project.dir_path)}
 
 
 
@@ -313,6 +299,7 @@ async def _handle_remove_dir(
             for runner in runners.values():
                 await runner_manager.stop_extension_runner(runner=runner)
             del ws_context.ws_projects[project_dir]
+            ws_context.project_path_trie.remove(project_dir)
             ws_context.ws_projects_raw_configs.pop(project_dir, None)
 
     return {}
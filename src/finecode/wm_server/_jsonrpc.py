@@ -2,9 +2,9 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import typing
 
+from finecode_jsonrpc import codec as jsonrpc_codec
 from loguru import logger
 
 CONTENT_LENGTH_HEADER = "Content-Length: "
@@ -50,12 +50,12 @@ async def _read_message(reader: asyncio.StreamReader) -> dict | None:
         logger.warning(f"FineCode API: expected blank line, got: {separator!r}")
 
     body = await reader.readexactly(content_length)
-    return json.loads(body.decode("utf-8"))
+    return jsonrpc_codec.get_default_codec().decode(body)
 
 
 def _write_message(writer: asyncio.StreamWriter, msg: dict) -> None:
     """Write one Content-Length framed JSON-RPC message."""
-    body = json.dumps(msg).encode("utf-8")
+    body = jsonrpc_codec.get_default_codec().encode(msg)
     header = f"Content-Length: {len(body)}\r\n\r\n".encode("utf-8")
     writer.write(header + body)
 
@@ -15,6 +15,16 @@ def _parse_env_bool(name: str, default: bool) -> bool:
     return raw.strip().lower() in {"1", "true", "yes", "on"}
 
 
+def _parse_env_number(name: str, default: float) -> float:
+    raw = os.environ.get(name)
+    if raw is None:
+        return default
+    try:
+        return max(float(raw), 0.0)
+    except ValueError:
+        return default
+
+
 @click.command()
 @click.option("--log-level", "log_level", default="INFO", type=click.Choice(["TRACE", "DEBUG", "INFO", "WARNING", "ERROR"], case_sensitive=False), show_default=True)
 @click.option(
@@ -67,6 +77,22 @@ def start_wm_server(
 
     wal_config = wal.WalConfig(
         enabled=final_wal_enabled,
+        durability=wal.shared_wal.WalDurability(wm_wal.durability),
+        group_commit_interval_sec=wm_wal.group_commit_interval_sec,
+    )
+
+    wm_runners = read_configs.read_wm_runners_config(workspace_root)
+    share_identical_env_runners = _parse_env_bool(
+        "FINECODE_SHARE_IDENTICAL_ENV_RUNNERS", wm_runners.share_identical_envs
+    )
+    prewarm_er_zygotes = _parse_env_bool(
+        "FINECODE_PREWARM_ER_ZYGOTES", wm_runners.prewarm_zygotes
+    )
+    max_live_runners = int(
+        _parse_env_number("FINECODE_WM_MAX_LIVE_ERS", wm_runners.max_live)
+    )
+    runner_idle_timeout_sec = _parse_env_number(
+        "FINECODE_WM_ER_IDLE_TIMEOUT", wm_runners.idle_timeout_sec
     )
 
     asyncio.run(
@@ -75,5 +101,9 @@ def start_wm_server(
             disconnect_timeout=disconnect_timeout,
             wal_config=wal_config,
             otlp_endpoint=wm_telemetry.otlp_endpoint,
+            share_identical_env_runners=share_identical_env_runners,
+            prewarm_er_zygotes=prewarm_er_zygotes,
+            max_live_runners=max_live_runners,
+            runner_idle_timeout_sec=runner_idle_timeout_sec,
         )
     )
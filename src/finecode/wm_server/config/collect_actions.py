@@ -1,8 +1,10 @@
 # docs: docs/configuration.md
+import dataclasses
 from pathlib import Path
 from typing import Any
 
 import cattrs
+from loguru import logger
 
 import finecode.wm_server.config.config_models as config_models
 from finecode._converter import converter as _converter
@@ -101,6 +103,21 @@ def _collect_action_handler_configs_in_config(
         if handler_config is not None:
             action_handler_config_by_source[handler_def["source"]] = handler_config
 
+    # batch variants of handlers use the config of the handler, unless they are
+    # configured themselves
+    for action_def_raw in config["tool"]["finecode"].get("action", {}).values():
+        for handler_def in action_def_raw.get("handlers", []):
+            batch_source = handler_def.get("batch_source", "")
+            handler_config = action_handler_config_by_source.get(
+                handler_def.get("source", "")
+            )
+            if (
+                batch_source != ""
+                and handler_config is not None
+                and batch_source not in action_handler_config_by_source
+            ):
+                action_handler_config_by_source[batch_source] = handler_config
+
     return action_handler_config_by_source
 
 
@@ -112,13 +129,9 @@ def _collect_actions_in_config(
     env_table: dict[str, Any] = config.get("tool", {}).get("finecode", {}).get(
         "env", {}
     )
-    for action_name, action_def_raw in (
-        config["tool"]["finecode"].get("action", {}).items()
-    ):
-        try:
-            action_def = _converter.structure(action_def_raw, config_models.ActionDefinition)
-        except cattrs.ClassValidationError as exception:
-            raise config_models.ConfigurationError(str(exception)) from exception
+    actions_raw: dict[str, Any] = config["tool"]["finecode"].get("action", {})
+    for action_name, action_def_raw in actions_raw.items():
+        action_def = _structure_action(action_def_raw)
 
         if action_def.source is None:
             if presets_resolved:
@@ -132,6 +145,15 @@ def _collect_actions_in_config(
             # collected once presets are merged into the raw config.
             continue
 
+        handler_defs = action_def.handlers
+        if action_def.batch_of is not None:
+            batch_handler_defs = _get_batch_handler_defs(
+                action_name, action_def, actions_raw
+            )
+            if batch_handler_defs is None:
+                continue
+            handler_defs = batch_handler_defs
+
         new_action = domain.Action(
             name=action_name,
             handlers=[
@@ -143,7 +165,7 @@ def _collect_actions_in_config(
                     dependencies=handler.dependencies,
                     interpreter=env_table.get(handler.env, {}).get("interpreter"),
                 )
-                for handler in action_def.handlers
+                for handler in handler_defs
                 if handler.enabled
             ],
             source=action_def.source,
@@ -152,3 +174,49 @@ def _collect_actions_in_config(
         actions.append(new_action)
 
     return actions
+
+
+def _structure_action(action_def_raw: dict[str, Any]) -> config_models.ActionDefinition:
+    try:
+        return _converter.structure(action_def_raw, config_models.ActionDefinition)
+    except cattrs.ClassValidationError as exception:
+        raise config_models.ConfigurationError(str(exception)) from exception
+
+
+def _get_batch_handler_defs(
+    action_name: str,
+    action_def: config_models.ActionDefinition,
+    actions_raw: dict[str, Any],
+) -> list[config_models.ActionHandlerDefinition] | None:
+    """Handlers of a batch action: batch variants of the enabled handlers of the
+    action it batches, in the same order and with the same config.
+
+    None if any of these handlers has no batch variant, the batch action is then
+    not available and callers process items one by one.
+    """
+    if len(action_def.handlers) > 0:
+        raise config_models.ConfigurationError(
+            f"Action '{action_name}' is the batch variant of '{action_def.batch_of}'"
+            " and gets handlers from it, it cannot declare own handlers"
+        )
+    batched_action_raw = actions_raw.get(action_def.batch_of)
+    if batched_action_raw is None:
+        raise config_models.ConfigurationError(
+            f"Action '{action_name}' is the batch variant of unknown action"
+            f" '{action_def.batch_of}'"
+        )
+
+    batch_handler_defs: list[config_models.ActionHandlerDefinition] = []
+    for handler in _structure_action(batched_action_raw).handlers:
+        if not handler.enabled:
+            continue
+        if handler.batch_source == "":
+            logger.info(
+                f"Handler '{handler.name}' of action '{action_def.batch_of}' has no"
+                f" batch variant, action '{action_name}' is not available"
+            )
+            return None
+        batch_handler_defs.append(
+            dataclasses.replace(handler, source=handler.batch_source, batch_source="")
+        )
+    return batch_handler_defs
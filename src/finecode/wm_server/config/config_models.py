@@ -42,6 +42,9 @@ class ActionHandlerDefinition:
     dependencies_override: list[str] = field(default_factory=list)
     config: dict[str, Any] | None = None
     enabled: bool = True
+    # source of the handler's variant for the batch action of this action, see
+    # `ActionDefinition.batch_of`
+    batch_source: str = ""
 
 
 @dataclass
@@ -63,6 +66,9 @@ class ActionDefinition:
     handlers: list[ActionHandlerDefinition] = field(default_factory=list)
     handlers_mode: str = "merge"  # "merge" or "replace"
     config: dict[str, Any] | None = None
+    # name of the action this action is the batch variant of. Its handlers are the
+    # `batch_source` handlers of that action, with their config
+    batch_of: str | None = None
 
 
 @dataclass
@@ -85,6 +91,34 @@ class WmTelemetryConfig:
 @dataclass
 class WmWalConfig:
     enabled: bool = False
+    # "none", "flush" or "fsync", see `finecode_extension_runner.wal.WalDurability`
+    durability: str = "flush"
+    # events are written in groups, 0 writes every event immediately
+    group_commit_interval_sec: float = 0.05
+
+
+@dataclass
+class WmRunnersConfig:
+    # start one ER for projects whose env has the same interpreter and installed
+    # packages instead of one ER per project and env
+    share_identical_envs: bool = False
+    # keep a prewarmed zygote process per env and fork new ERs from it (POSIX only)
+    prewarm_zygotes: bool = False
+    # maximum number of live ERs, least recently used idle ERs are stopped to stay
+    # below it. 0 means no limit
+    max_live: int = 0
+    # stop ERs which were not used for this number of seconds. 0 disables it
+    idle_timeout_sec: float = 0
+
+
+@dataclass
+class WorkspaceDiscoveryConfig:
+    # glob patterns of directories skipped by project discovery in addition to the
+    # default ones. Patterns without '/' match a directory name at any depth, others
+    # the directory path relative to the workspace directory.
+    ignore: list[str] = field(default_factory=list)
+    # skip directories ignored by the .gitignore of the workspace directory
+    respect_gitignore: bool = False
 
 
 @dataclass
@@ -0,0 +1,320 @@
+"""Persisted index of project discovery.
+
+`read_configs.read_projects_in_dir` walks the whole workspace directory and parses
+every `pyproject.toml` it finds. The index remembers, per workspace directory, the
+listing of every walked directory and what was read from every definition file,
+each with the mtime it had. On the next scan, e.g. on the next WM startup, entries
+are re-validated by stat: only directories whose mtime changed are listed again and
+only changed definition files are parsed again.
+
+The index is a cache: a missing, corrupted or outdated index file is ignored and
+rebuilt by the scan.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import fnmatch
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from loguru import logger
+
+from finecode.wm_server import domain
+from finecode.wm_server.config import config_models
+
+try:
+    import pathspec
+except ImportError:
+    pathspec = None
+
+
+INDEX_VERSION = 1
+
+# Directories that are never FineCode projects and are often large. Skipping them
+# avoids traversing thousands of files in virtualenvs, caches, and third-party
+# package trees.
+DEFAULT_IGNORED_DIRS = (
+    ".venv",
+    ".venvs",
+    ".git",
+    "node_modules",
+    "__pycache__",
+    ".tox",
+    "dist",
+    "build",
+    ".mypy_cache",
+    ".ruff_cache",
+    ".pytest_cache",
+)
+
+# Entries modified shortly before the scan are not stored: a change right after the
+# scan could keep the same mtime on file systems with coarse timestamps and would
+# then be missed.
+_RACY_MTIME_WINDOW_NS = 2_000_000_000
+
+
+@dataclasses.dataclass
+class DirListing:
+    mtime_ns: int
+    subdirs: list[str]
+    has_def_file: bool
+
+
+@dataclasses.dataclass
+class DefFileInfo:
+    mtime_ns: int
+    size: int
+    project_name: str | None
+    status: domain.ProjectStatus
+    # whether the definition file has a [tool.finecode] table
+    has_finecode_config: bool
+
+
+class DiscoveryIndex:
+    """Discovery index of one workspace directory.
+
+    Paths in the index are POSIX paths relative to the workspace directory. Only
+    entries used or updated since the index was loaded are saved, so entries of
+    removed or newly ignored directories are dropped.
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path
+        self._dir_listings: dict[str, DirListing] = {}
+        self._def_files: dict[str, DefFileInfo] = {}
+        self._used_dirs: set[str] = set()
+        self._used_def_files: set[str] = set()
+        self._changed = False
+
+    @classmethod
+    def load(cls, path: Path) -> DiscoveryIndex:
+        index = cls(path)
+        try:
+            raw = json.loads(path.read_bytes())
+        except FileNotFoundError:
+            return index
+        except (OSError, ValueError) as exception:
+            logger.debug(f"Ignore unreadable project discovery index {path}: {exception}")
+            return index
+
+        if not isinstance(raw, dict) or raw.get("version") != INDEX_VERSION:
+            logger.debug(f"Ignore project discovery index {path} of other version")
+            return index
+
+        try:
+            for rel_path, raw_listing in raw["dirs"].items():
+                index._dir_listings[rel_path] = DirListing(
+                    mtime_ns=raw_listing["mtimeNs"],
+                    subdirs=list(raw_listing["subdirs"]),
+                    has_def_file=raw_listing["hasDefFile"],
+                )
+            for rel_path, raw_info in raw["defFiles"].items():
+                index._def_files[rel_path] = DefFileInfo(
+                    mtime_ns=raw_info["mtimeNs"],
+                    size=raw_info["size"],
+                    project_name=raw_info["projectName"],
+                    status=domain.ProjectStatus[raw_info["status"]],
+                    has_finecode_config=raw_info["hasFinecodeConfig"],
+                )
+        except (KeyError, TypeError, AttributeError) as exception:
+            logger.debug(f"Ignore malformed project discovery index {path}: {exception}")
+            index._dir_listings.clear()
+            index._def_files.clear()
+        return index
+
+    def get_dir_listing(self, rel_path: str, dir_stat: os.stat_result) -> DirListing | None:
+        self._used_dirs.add(rel_path)
+        listing = self._dir_listings.get(rel_path)
+        if listing is None or listing.mtime_ns != dir_stat.st_mtime_ns:
+            return None
+        return listing
+
+    def set_dir_listing(
+        self, rel_path: str, dir_stat: os.stat_result, subdirs: list[str], has_def_file: bool
+    ) -> None:
+        self._used_dirs.add(rel_path)
+        self._changed = True
+        if _is_racy(dir_stat):
+            self._dir_listings.pop(rel_path, None)
+            return
+        self._dir_listings[rel_path] = DirListing(
+            mtime_ns=dir_stat.st_mtime_ns, subdirs=subdirs, has_def_file=has_def_file
+        )
+
+    def get_def_file(self, rel_path: str, file_stat: os.stat_result) -> DefFileInfo | None:
+        self._used_def_files.add(rel_path)
+        info = self._def_files.get(rel_path)
+        if (
+            info is None
+            or info.mtime_ns != file_stat.st_mtime_ns
+            or info.size != file_stat.st_size
+        ):
+            return None
+        return info
+
+    def set_def_file(self, rel_path: str, info: DefFileInfo, file_stat: os.stat_result) -> None:
+        self._used_def_files.add(rel_path)
+        self._changed = True
+        if _is_racy(file_stat):
+            self._def_files.pop(rel_path, None)
+            return
+        self._def_files[rel_path] = info
+
+    def save(self) -> None:
+        """Write the index if it changed. Failures are logged, not raised: the index
+        is only a cache."""
+        stale_dirs = self._dir_listings.keys() - self._used_dirs
+        stale_def_files = self._def_files.keys() - self._used_def_files
+        if self.path is None or not (self._changed or stale_dirs or stale_def_files):
+            return
+
+        raw = {
+            "version": INDEX_VERSION,
+            "dirs": {
+                rel_path: {
+                    "mtimeNs": listing.mtime_ns,
+                    "subdirs": listing.subdirs,
+                    "hasDefFile": listing.has_def_file,
+                }
+                for rel_path, listing in self._dir_listings.items()
+                if rel_path in self._used_dirs
+            },
+            "defFiles": {
+                rel_path: {
+                    "mtimeNs": info.mtime_ns,
+                    "size": info.size,
+                    "projectName": info.project_name,
+                    "status": info.status.name,
+                    "hasFinecodeConfig": info.has_finecode_config,
+                }
+                for rel_path, info in self._def_files.items()
+                if rel_path in self._used_def_files
+            },
+        }
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(json.dumps(raw), encoding="utf-8")
+            # atomic, a concurrent reader sees either the old or the new index
+            os.replace(tmp_path, self.path)
+        except OSError as exception:
+            logger.debug(f"Failed to save project discovery index {self.path}: {exception}")
+            tmp_path.unlink(missing_ok=True)
+            return
+        self._changed = False
+
+
+def index_file_name(ws_dir_path: Path) -> str:
+    return hashlib.sha256(str(ws_dir_path).encode("utf-8")).hexdigest()[:32] + ".json"
+
+
+class DirFilter:
+    """Decides which directories project discovery skips."""
+
+    def __init__(
+        self, ws_dir_path: Path, config: config_models.WorkspaceDiscoveryConfig
+    ) -> None:
+        self._name_patterns: list[str] = list(DEFAULT_IGNORED_DIRS)
+        self._path_patterns: list[str] = []
+        for pattern in config.ignore:
+            pattern = pattern.strip("/")
+            if "/" in pattern:
+                self._path_patterns.append(pattern)
+            else:
+                self._name_patterns.append(pattern)
+
+        self._gitignore_spec = None
+        if config.respect_gitignore:
+            self._gitignore_spec = _read_gitignore(ws_dir_path)
+
+    def is_ignored(self, rel_path: str, name: str) -> bool:
+        if any(fnmatch.fnmatchcase(name, pattern) for pattern in self._name_patterns):
+            return True
+        if any(fnmatch.fnmatchcase(rel_path, pattern) for pattern in self._path_patterns):
+            return True
+        # trailing slash, because patterns like `build/` match only directories
+        return self._gitignore_spec is not None and self._gitignore_spec.match_file(
+            rel_path + "/"
+        )
+
+
+def _read_gitignore(ws_dir_path: Path):
+    gitignore_path = ws_dir_path / ".gitignore"
+    if not gitignore_path.exists():
+        return None
+    if pathspec is None:
+        logger.warning(
+            "respect_gitignore is enabled in [workspace.discovery], but 'pathspec'"
+            " is not installed, .gitignore is not applied to project discovery"
+        )
+        return None
+    try:
+        lines = gitignore_path.read_text(encoding="utf-8").splitlines()
+    except OSError as exception:
+        logger.warning(f"Failed to read {gitignore_path}: {exception}")
+        return None
+    return pathspec.GitIgnoreSpec.from_lines(lines)
+
+
+def find_def_files(
+    ws_dir_path: Path, index: DiscoveryIndex, dir_filter: DirFilter
+) -> list[Path]:
+    """Find `pyproject.toml` files in the workspace directory.
+
+    Directories with the same mtime as in the index are not listed again, their
+    subdirectories are still checked.
+    """
+    def_files: list[Path] = []
+    # (relative path, absolute path), relative path of the workspace dir is ''
+    dirs_to_visit: list[tuple[str, Path]] = [("", ws_dir_path)]
+    while dirs_to_visit:
+        rel_path, dir_path = dirs_to_visit.pop()
+        try:
+            dir_stat = dir_path.stat()
+        except OSError:
+            continue
+
+        listing = index.get_dir_listing(rel_path, dir_stat)
+        if listing is None:
+            listing = _list_dir(dir_path, dir_stat)
+            if listing is None:
+                continue
+            index.set_dir_listing(
+                rel_path, dir_stat, listing.subdirs, listing.has_def_file
+            )
+
+        if listing.has_def_file:
+            def_files.append(dir_path / "pyproject.toml")
+        # reversed, so that directories are visited in listing order
+        for subdir_name in reversed(listing.subdirs):
+            subdir_rel_path = f"{rel_path}/{subdir_name}" if rel_path else subdir_name
+            if dir_filter.is_ignored(subdir_rel_path, subdir_name):
+                continue
+            dirs_to_visit.append((subdir_rel_path, dir_path / subdir_name))
+    return def_files
+
+
+def _list_dir(dir_path: Path, dir_stat: os.stat_result) -> DirListing | None:
+    subdirs: list[str] = []
+    has_def_file = False
+    try:
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                # symlinked directories are not followed, like in `os.walk`
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.name)
+                elif entry.name == "pyproject.toml":
+                    has_def_file = True
+    except OSError:
+        return None
+    return DirListing(
+        mtime_ns=dir_stat.st_mtime_ns, subdirs=subdirs, has_def_file=has_def_file
+    )
+
+
+def _is_racy(stat: os.stat_result) -> bool:
+    return stat.st_mtime_ns >= time.time_ns() - _RACY_MTIME_WINDOW_NS
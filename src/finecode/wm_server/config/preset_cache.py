@@ -0,0 +1,169 @@
+"""Cache of resolved preset configuration.
+
+Reading the config of a project resolves the package path of every preset in its
+preset chain with a request to the dev_workspace ER of the project, then reads and
+merges `preset.toml` of every preset. Most projects of a workspace use the same
+presets from identical envs, so the WM keeps:
+
+- package paths of presets per preset source and ER env. The env key contains the
+  fingerprint of the env (see `finecode_cmd.get_env_fingerprint`), so that a
+  reinstalled env resolves its presets again.
+- parsed preset files per path, validated by the digests of the files.
+- merged preset config per project, persisted in the WM cache dir. An entry is
+  keyed by the digest of the project definition path, the preset sources of the
+  project and the env key, and is valid as long as the digests of the preset files
+  it was merged from are unchanged. On a warm WM start, config of projects with
+  unchanged presets is read without requests to the ER.
+
+The cache is only an optimization: a missing, corrupted or outdated entry is
+ignored and rebuilt.
+"""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from finecode.wm_server.config import config_models
+
+CACHE_VERSION = 1
+
+
+def file_digest(file_path: Path) -> str:
+    try:
+        return hashlib.sha256(file_path.read_bytes()).hexdigest()
+    except OSError:
+        return "missing"
+
+
+def merged_config_key(def_path: Path, presets_sources: list[str], env_key: str) -> str:
+    digest = hashlib.sha256()
+    for part in [str(def_path), env_key, *presets_sources]:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def merged_config_file_name(def_path: Path) -> str:
+    # derived from the definition path only, so that an outdated entry of a project
+    # is overwritten
+    return hashlib.sha256(str(def_path).encode("utf-8")).hexdigest()[:32] + ".json"
+
+
+class PresetConfigCache:
+    """Preset resolution cache of the WM, see module docstring.
+
+    Values are copied on get and set: merging configs modifies them in place.
+    """
+
+    def __init__(self, merged_configs_dir_path: Path | None = None) -> None:
+        self.merged_configs_dir_path = merged_configs_dir_path
+        # (preset source, env key) -> package path
+        self._package_paths: dict[tuple[str, str], Path] = {}
+        # preset.toml path -> (digests of preset files, preset toml, preset definition)
+        self._preset_configs: dict[
+            Path, tuple[list[str], dict[str, Any], config_models.PresetDefinition]
+        ] = {}
+
+    def get_package_path(self, preset_source: str, env_key: str) -> Path | None:
+        package_path = self._package_paths.get((preset_source, env_key))
+        if package_path is None or not package_path.exists():
+            return None
+        return package_path
+
+    def set_package_path(
+        self, preset_source: str, env_key: str, package_path: Path
+    ) -> None:
+        self._package_paths[(preset_source, env_key)] = package_path
+
+    def get_preset_config(
+        self, config_path: Path, digests: list[str]
+    ) -> tuple[dict[str, Any], config_models.PresetDefinition] | None:
+        cached = self._preset_configs.get(config_path)
+        if cached is None or cached[0] != digests:
+            return None
+        return copy.deepcopy(cached[1]), cached[2]
+
+    def set_preset_config(
+        self,
+        config_path: Path,
+        digests: list[str],
+        preset_toml: dict[str, Any],
+        preset_definition: config_models.PresetDefinition,
+    ) -> None:
+        self._preset_configs[config_path] = (
+            digests,
+            copy.deepcopy(preset_toml),
+            preset_definition,
+        )
+
+    def load_merged_config(self, def_path: Path, key: str) -> dict[str, Any] | None:
+        if self.merged_configs_dir_path is None:
+            return None
+        path = self.merged_configs_dir_path / merged_config_file_name(def_path)
+        try:
+            raw = json.loads(path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as exception:
+            logger.debug(f"Ignore unreadable preset config cache {path}: {exception}")
+            return None
+
+        try:
+            if raw["version"] != CACHE_VERSION or raw["key"] != key:
+                return None
+            for file_path, digest in raw["presetFiles"].items():
+                if file_digest(Path(file_path)) != digest:
+                    return None
+            config = raw["config"]
+        except (KeyError, TypeError, AttributeError) as exception:
+            logger.debug(f"Ignore malformed preset config cache {path}: {exception}")
+            return None
+        if not isinstance(config, dict):
+            return None
+        return config
+
+    def save_merged_config(
+        self,
+        def_path: Path,
+        key: str,
+        preset_file_digests: dict[Path, str],
+        config: dict[str, Any],
+    ) -> None:
+        """Persist merged preset config of the project. `preset_file_digests` are
+        digests of the preset files taken before they were read. Failures are logged,
+        not raised: the cache is only an optimization."""
+        if self.merged_configs_dir_path is None:
+            return
+        path = self.merged_configs_dir_path / merged_config_file_name(def_path)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            serialized = json.dumps(
+                {
+                    "version": CACHE_VERSION,
+                    "key": key,
+                    "presetFiles": {
+                        str(file_path): digest
+                        for file_path, digest in preset_file_digests.items()
+                    },
+                    "config": config,
+                }
+            )
+        except (TypeError, ValueError) as exception:
+            # e.g. TOML dates, they are not JSON serializable
+            logger.debug(f"Preset config of {def_path} is not cached: {exception}")
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(serialized, encoding="utf-8")
+            # atomic, a concurrent reader sees either the old or the new entry
+            os.replace(tmp_path, path)
+        except OSError as exception:
+            logger.debug(f"Failed to save preset config cache {path}: {exception}")
+            tmp_path.unlink(missing_ok=True)
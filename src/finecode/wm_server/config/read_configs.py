@@ -9,9 +9,14 @@ from typing import Any, NamedTuple
 import cattrs
 from finecode import user_messages
 from finecode._converter import converter as _converter
-from finecode.wm_server import context, domain
-from finecode.wm_server.config import config_models, interpreter_matrix
-from finecode.wm_server.runner import runner_client
+from finecode.wm_server import context, domain, wm_lifecycle
+from finecode.wm_server.config import (
+    config_models,
+    discovery_index,
+    interpreter_matrix,
+    preset_cache,
+)
+from finecode.wm_server.runner import finecode_cmd, runner_client
 from loguru import logger
 from tomlkit import loads as toml_loads
 
@@ -75,90 +80,117 @@ async def read_projects_in_dir(
     # Find all projects in directory
     # `dir_path` expected to be absolute path
     #
-    # Directories that are never FineCode projects and are often large.
-    # Skipping them avoids traversing thousands of files in virtualenvs,
-    # caches, and third-party package trees.
-    _SKIP_DIRS = {
-        ".venv", ".venvs",
-        ".git",
-        "node_modules",
-        "__pycache__",
-        ".tox",
-        "dist", "build",
-        ".mypy_cache", ".ruff_cache", ".pytest_cache",
-    }
-
+    # Directory listings and definition files unchanged since the previous scan are
+    # taken from the persisted discovery index instead of being read again, see
+    # `discovery_index`.
     logger.trace(f"Read directories in {dir_path}")
+    index = discovery_index.DiscoveryIndex.load(
+        wm_lifecycle.project_discovery_index_dir_path()
+        / discovery_index.index_file_name(dir_path)
+    )
+    dir_filter = discovery_index.DirFilter(
+        dir_path, read_workspace_discovery_config(dir_path)
+    )
+    def_files = discovery_index.find_def_files(dir_path, index, dir_filter)
+
     new_projects: list[domain.Project] = []
-    def_files: list[Path] = []
-    for root, dirs, files in os.walk(dir_path):
-        dirs[:] = [d for d in dirs if d not in _SKIP_DIRS]
-        if "pyproject.toml" in files:
-            def_files.append(Path(root) / "pyproject.toml")
-
-    for def_file in def_files:
-        # ignore definition files in `__testdata__` directory, projects in test data
-        # can be started only in tests, not from outside
-        # TODO: make configurable?
-        # path to definition file relative to workspace directory in which this
-        # definition was found
-        def_file_rel_dir_path = def_file.relative_to(dir_path)
-        if "__testdata__" in def_file_rel_dir_path.parts:
-            logger.debug(
-                f"Skip '{def_file}' because it is in test data and it is not a test session"
-            )
-            continue
-        if def_file.parent.name == "finecode_config_dump":
-            logger.debug(
-                f"Skip '{def_file}' because it is config dump, not real project config"
+    try:
+        for def_file in def_files:
+            # ignore definition files in `__testdata__` directory, projects in test data
+            # can be started only in tests, not from outside
+            # TODO: make configurable?
+            # path to definition file relative to workspace directory in which this
+            # definition was found
+            def_file_rel_dir_path = def_file.relative_to(dir_path)
+            if "__testdata__" in def_file_rel_dir_path.parts:
+                logger.debug(
+                    f"Skip '{def_file}' because it is in test data and it is not a test session"
+                )
+                continue
+            if def_file.parent.name == "finecode_config_dump":
+                logger.debug(
+                    f"Skip '{def_file}' because it is config dump, not real project config"
+                )
+                continue
+
+            try:
+                def_file_stat = def_file.stat()
+            except OSError:
+                # removed since the directory was listed
+                continue
+            def_file_info = index.get_def_file(
+                def_file_rel_dir_path.as_posix(), def_file_stat
             )
-            continue
+            if def_file_info is None:
+                def_file_info = _read_def_file_info(def_file, def_file_stat)
+                index.set_def_file(
+                    def_file_rel_dir_path.as_posix(), def_file_info, def_file_stat
+                )
 
-        status = domain.ProjectStatus.CONFIG_VALID
+            finecode_toml_exists = (def_file.parent / "finecode.toml").exists()
+            if finecode_toml_exists and def_file_info.has_finecode_config:
+                raise config_models.ConfigurationError(
+                    f"Project FineCode configuration is defined in two places for project\n"
+                    f"{def_file.parent}:\n"
+                    f"  - {def_file.parent / 'finecode.toml'}\n"
+                    f"  - {def_file} ([tool.finecode.*])\n"
+                    f"Pick one location and remove the other. The two files cannot be\n"
+                    f"combined — one wins entirely."
+                )
 
-        try:
-            with open(def_file, "rb") as pyproject_file:
-                project_def = toml_loads(pyproject_file.read()).unwrap()
-        except Exception as e:
-            raise config_models.ConfigurationError(
-                f"Failed to parse '{def_file}': {e}"
-            ) from e
+            is_new_project = def_file.parent not in ws_context.ws_projects
+            if is_new_project:
+                new_project = domain.Project(
+                    name=def_file_info.project_name,
+                    dir_path=def_file.parent,
+                    def_path=def_file,
+                    status=def_file_info.status,
+                )
+                ws_context.ws_projects[def_file.parent] = new_project
+                ws_context.project_path_trie.add(def_file.parent)
+                new_projects.append(new_project)
+            else:
+                # Preserve existing collected/resolved state — only update status in case
+                # the finecode dependency was added or removed since the last scan.
+                ws_context.ws_projects[def_file.parent].status = def_file_info.status
+    finally:
+        # also on configuration error: entries read until then stay valid
+        index.save()
+    return new_projects
 
-        finecode_toml_exists = (def_file.parent / "finecode.toml").exists()
-        has_pyproject_finecode = project_def.get("tool", {}).get("finecode") is not None
-        if finecode_toml_exists and has_pyproject_finecode:
-            raise config_models.ConfigurationError(
-                f"Project FineCode configuration is defined in two places for project\n"
-                f"{def_file.parent}:\n"
-                f"  - {def_file.parent / 'finecode.toml'}\n"
-                f"  - {def_file} ([tool.finecode.*])\n"
-                f"Pick one location and remove the other. The two files cannot be\n"
-                f"combined — one wins entirely."
-            )
 
-        dependency_groups = project_def.get("dependency-groups", {})
-        dev_workspace_group = dependency_groups.get("dev_workspace", [])
-        finecode_in_dev_workspace = any(
-            dep for dep in dev_workspace_group if get_dependency_name(dep) == "finecode"
-        )
-        if not finecode_in_dev_workspace:
-            status = domain.ProjectStatus.NO_FINECODE
-
-        is_new_project = def_file.parent not in ws_context.ws_projects
-        if is_new_project:
-            new_project = domain.Project(
-                name=project_def.get("project", {}).get("name"),
-                dir_path=def_file.parent,
-                def_path=def_file,
-                status=status,
-            )
-            ws_context.ws_projects[def_file.parent] = new_project
-            new_projects.append(new_project)
-        else:
-            # Preserve existing collected/resolved state — only update status in case
-            # the finecode dependency was added or removed since the last scan.
-            ws_context.ws_projects[def_file.parent].status = status
-    return new_projects
+def _read_def_file_info(
+    def_file: Path, def_file_stat: os.stat_result
+) -> discovery_index.DefFileInfo:
+    """Parse a definition file for project discovery.
+
+    Raises:
+        ConfigurationError: The definition file cannot be parsed.
+    """
+    try:
+        with open(def_file, "rb") as pyproject_file:
+            project_def = toml_loads(pyproject_file.read()).unwrap()
+    except Exception as e:
+        raise config_models.ConfigurationError(
+            f"Failed to parse '{def_file}': {e}"
+        ) from e
+
+    status = domain.ProjectStatus.CONFIG_VALID
+    dependency_groups = project_def.get("dependency-groups", {})
+    dev_workspace_group = dependency_groups.get("dev_workspace", [])
+    finecode_in_dev_workspace = any(
+        dep for dep in dev_workspace_group if get_dependency_name(dep) == "finecode"
+    )
+    if not finecode_in_dev_workspace:
+        status = domain.ProjectStatus.NO_FINECODE
+
+    return discovery_index.DefFileInfo(
+        mtime_ns=def_file_stat.st_mtime_ns,
+        size=def_file_stat.st_size,
+        project_name=project_def.get("project", {}).get("name"),
+        status=status,
+        has_finecode_config=project_def.get("tool", {}).get("finecode") is not None,
+    )
 
 
 def get_dependency_name(dependency_str: str) -> str:
@@ -284,7 +316,10 @@ def read_wm_telemetry_config(workspace_root: Path) -> config_models.WmTelemetryC
 def read_wm_wal_config(workspace_root: Path) -> config_models.WmWalConfig:
     """Read WM WAL config from [workspace.wm.wal] in finecode-workspace.toml.
     """
-    enabled = False
+    default_config = config_models.WmWalConfig()
+    enabled = default_config.enabled
+    durability = default_config.durability
+    group_commit_interval_sec = default_config.group_commit_interval_sec
 
     ws_config_path = workspace_root / "finecode-workspace.toml"
     if ws_config_path.exists():
@@ -293,10 +328,82 @@ def read_wm_wal_config(workspace_root: Path) -> config_models.WmWalConfig:
                 ws_config = toml_loads(f.read()).unwrap()
             wal_raw = ws_config.get("workspace", {}).get("wm", {}).get("wal", {})
             enabled = bool(wal_raw.get("enabled", False))
+            durability = str(wal_raw.get("durability", durability))
+            group_commit_interval_sec = max(
+                0.0,
+                float(
+                    wal_raw.get("group_commit_interval_sec", group_commit_interval_sec)
+                ),
+            )
+        except Exception:
+            pass
+
+    if durability not in ("none", "flush", "fsync"):
+        logger.warning(
+            f"Invalid workspace.wm.wal.durability '{durability}', expected 'none',"
+            f" 'flush' or 'fsync', use '{default_config.durability}'"
+        )
+        durability = default_config.durability
+
+    return config_models.WmWalConfig(
+        enabled=enabled,
+        durability=durability,
+        group_commit_interval_sec=group_commit_interval_sec,
+    )
+
+
+def read_wm_runners_config(workspace_root: Path) -> config_models.WmRunnersConfig:
+    """Read WM runners config from [workspace.wm.runners] in finecode-workspace.toml.
+    """
+    share_identical_envs = False
+    prewarm_zygotes = False
+    max_live = 0
+    idle_timeout_sec = 0.0
+
+    ws_config_path = workspace_root / "finecode-workspace.toml"
+    if ws_config_path.exists():
+        try:
+            with open(ws_config_path, "rb") as f:
+                ws_config = toml_loads(f.read()).unwrap()
+            runners_raw = ws_config.get("workspace", {}).get("wm", {}).get("runners", {})
+            share_identical_envs = bool(runners_raw.get("share_identical_envs", False))
+            prewarm_zygotes = bool(runners_raw.get("prewarm_zygotes", False))
+            max_live = max(int(runners_raw.get("max_live", 0)), 0)
+            idle_timeout_sec = max(float(runners_raw.get("idle_timeout_sec", 0)), 0.0)
+        except Exception:
+            pass
+
+    return config_models.WmRunnersConfig(
+        share_identical_envs=share_identical_envs,
+        prewarm_zygotes=prewarm_zygotes,
+        max_live=max_live,
+        idle_timeout_sec=idle_timeout_sec,
+    )
+
+
+def read_workspace_discovery_config(
+    workspace_root: Path,
+) -> config_models.WorkspaceDiscoveryConfig:
+    """Read project discovery config from [workspace.discovery] in
+    finecode-workspace.toml.
+    """
+    ignore: list[str] = []
+    respect_gitignore = False
+
+    ws_config_path = workspace_root / "finecode-workspace.toml"
+    if ws_config_path.exists():
+        try:
+            with open(ws_config_path, "rb") as f:
+                ws_config = toml_loads(f.read()).unwrap()
+            discovery_raw = ws_config.get("workspace", {}).get("discovery", {})
+            ignore = [str(pattern) for pattern in discovery_raw.get("ignore", [])]
+            respect_gitignore = bool(discovery_raw.get("respect_gitignore", False))
         except Exception:
             pass
 
-    return config_models.WmWalConfig(enabled=enabled)
+    return config_models.WorkspaceDiscoveryConfig(
+        ignore=ignore, respect_gitignore=respect_gitignore
+    )
 
 
 def read_env_configs(project_config: dict[str, Any]) -> dict[str, domain.EnvConfig]:
@@ -386,6 +493,7 @@ async def read_project_config(
                 presets_sources=preset_sources,
                 def_path=project.def_path,
                 runner=dev_workspace_runner,
+                cache=ws_context.preset_config_cache,
             )
             if new_config is not None:
                 _merge_projects_configs(
@@ -517,27 +625,30 @@ async def get_preset_project_path(
     return preset_project_path
 
 
+def _find_preset_config_path(config_path: Path, preset_id: str) -> Path:
+    if config_path.exists():
+        return config_path
+    # if package is installed in editable mode, we will get path to root directory
+    # of the package, not to source directory. In such case check both flat and
+    # src layouts of the package
+    config_dir_path = config_path.parent
+    flat_path_to_src = config_dir_path / preset_id
+    if flat_path_to_src.exists():
+        return flat_path_to_src / "preset.toml"
+    src_path_to_src = config_dir_path / "src" / preset_id
+    if src_path_to_src.exists():
+        return src_path_to_src / "preset.toml"
+    raise config_models.ConfigurationError(
+        f"preset.toml not found in project '{preset_id}'"
+    )
+
+
 def read_preset_config(
     config_path: Path, preset_id: str
 ) -> tuple[dict[str, Any], config_models.PresetDefinition]:
     # preset_id is used only for logs to make them more useful
     logger.trace(f"Read preset config: {preset_id}")
-    if not config_path.exists():
-        # if package is installed in editable mode, we will get path to root directory
-        # of the package, not to source directory. In such case check both flat and
-        # src layouts of the package
-        config_dir_path = config_path.parent
-        flat_path_to_src = config_dir_path / preset_id
-        if flat_path_to_src.exists():
-            config_path = flat_path_to_src / "preset.toml"
-        else:
-            src_path_to_src = config_dir_path / "src" / preset_id
-            if src_path_to_src.exists():
-                config_path = src_path_to_src / "preset.toml"
-            else:
-                raise config_models.ConfigurationError(
-                    f"preset.toml not found in project '{preset_id}'"
-                )
+    config_path = _find_preset_config_path(config_path, preset_id)
 
     with open(config_path, "rb") as preset_toml_file:
         preset_toml = toml_loads(preset_toml_file.read()).unwrap()
@@ -612,12 +723,59 @@ def read_preset_config(
     return (preset_toml, preset_config)
 
 
+def _read_preset_config_cached(
+    config_path: Path,
+    preset_id: str,
+    cache: preset_cache.PresetConfigCache,
+    file_digests: dict[Path, str],
+) -> tuple[dict[str, Any], config_models.PresetDefinition]:
+    # digests of all read preset files are added to `file_digests`
+    config_path = _find_preset_config_path(config_path, preset_id)
+    preset_files = [config_path, config_path.parent / "finecode-user.toml"]
+    digests = [preset_cache.file_digest(file_path) for file_path in preset_files]
+    file_digests.update(zip(preset_files, digests))
+
+    cached = cache.get_preset_config(config_path, digests)
+    if cached is not None:
+        logger.trace(f"Preset config of {preset_id} found in cache")
+        return cached
+    preset_toml, preset_config = read_preset_config(config_path, preset_id)
+    cache.set_preset_config(config_path, digests, preset_toml, preset_config)
+    return preset_toml, preset_config
+
+
+def _get_preset_env_key(runner: runner_client.ExtensionRunnerInfo) -> str | None:
+    # presets resolve to the same paths as long as the env is not reinstalled
+    env_fingerprint = finecode_cmd.get_env_fingerprint(
+        runner.working_dir_path, runner.env_name
+    )
+    if env_fingerprint is None:
+        return None
+    venv_dir_path = finecode_cmd.get_venv_dir_path(
+        runner.working_dir_path, runner.env_name
+    )
+    return f"{venv_dir_path}:{env_fingerprint}"
+
+
 async def collect_config_from_py_presets(
     presets_sources: list[str],
     def_path: Path,
     runner: runner_client.ExtensionRunnerInfo,
+    cache: preset_cache.PresetConfigCache | None = None,
 ) -> dict[str, Any] | None:
+    env_key = _get_preset_env_key(runner) if cache is not None else None
+    merged_config_key: str | None = None
+    if cache is not None and env_key is not None:
+        merged_config_key = preset_cache.merged_config_key(
+            def_path, presets_sources, env_key
+        )
+        cached_config = cache.load_merged_config(def_path, merged_config_key)
+        if cached_config is not None:
+            logger.trace(f"Merged preset config of {def_path} found in cache")
+            return cached_config
+
     config: dict[str, Any] | None = None
+    preset_file_digests: dict[Path, str] = {}
     processed_presets: set[str] = set()
     presets_to_process: set[PresetToProcess] = set(
         [
@@ -629,12 +787,25 @@ async def collect_config_from_py_presets(
         preset = presets_to_process.pop()
         processed_presets.add(preset.source)
 
-        preset_project_path = await get_preset_project_path(
-            preset=preset, def_path=def_path, runner=runner
-        )
+        preset_project_path: Path | None = None
+        if cache is not None and env_key is not None:
+            preset_project_path = cache.get_package_path(preset.source, env_key)
+        if preset_project_path is None:
+            preset_project_path = await get_preset_project_path(
+                preset=preset, def_path=def_path, runner=runner
+            )
+            if cache is not None and env_key is not None:
+                cache.set_package_path(preset.source, env_key, preset_project_path)
 
         preset_toml_path = preset_project_path / "preset.toml"
-        preset_toml, preset_config = read_preset_config(preset_toml_path, preset.source)
+        if cache is not None:
+            preset_toml, preset_config = _read_preset_config_cached(
+                preset_toml_path, preset.source, cache, preset_file_digests
+            )
+        else:
+            preset_toml, preset_config = read_preset_config(
+                preset_toml_path, preset.source
+            )
         if config is None:
             # use merge instead of just assigning config, because merge not only merges
             # configs, but also adapts relative pathes etc.
@@ -654,6 +825,10 @@ async def collect_config_from_py_presets(
                 )
             )
 
+    if cache is not None and merged_config_key is not None and config is not None:
+        cache.save_merged_config(
+            def_path, merged_config_key, preset_file_digests, config
+        )
     return config
 
 
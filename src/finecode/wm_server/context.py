@@ -9,7 +9,12 @@ from typing import TYPE_CHECKING, Any
 from loguru import logger
 
 from finecode.wm_server import domain
-from finecode.wm_server.runner.runner_client import ExtensionRunnerInfo
+from finecode.wm_server.runner.runner_client import (
+    ExtensionRunnerInfo,
+    SharedRunnerProcess,
+)
+from finecode_extension_api.text_buffer import TextBuffer
+from finecode_extension_api.workspace_utils import PathTrie
 from finecode_extension_runner.concurrency import (
     ConcurrencyDecision,
     machine_subprocess_budget,
@@ -17,6 +22,8 @@ from finecode_extension_runner.concurrency import (
 
 if TYPE_CHECKING:
     from finecode_jsonrpc._io_thread import AsyncIOThread
+    from finecode.wm_server.config.preset_cache import PresetConfigCache
+    from finecode.wm_server.runner.er_zygote import ErZygote
     from finecode.wm_server.wal import WalWriter
 
 
@@ -145,6 +152,11 @@ class WorkspaceContext:
     # Mutated under workspace_state_lock (discovery) and project_init_locks (init).
     ws_projects: dict[Path, domain.Project] = field(default_factory=dict)
 
+    # Directory paths of ws_projects, to find projects containing a file in
+    # O(depth of the file path).  Kept in sync with the keys of ws_projects by
+    # read_configs.read_projects_in_dir and the removeDir handler.
+    project_path_trie: PathTrie = field(default_factory=PathTrie)
+
     # Name → absolute path of workspace-resident editable packages.
     # Populated from finecode-workspace.toml during workspace scan; stable after that.
     ws_editable_packages: dict[str, Path] = field(default_factory=dict)
@@ -160,6 +172,31 @@ class WorkspaceContext:
         default_factory=dict
     )
 
+    # Whether runners of projects with identical envs share one ER process.  Set
+    # from config at construction; immutable thereafter.
+    share_identical_env_runners: bool = False
+
+    # env fingerprint (see finecode_cmd.get_env_fingerprint) → ER process shared by
+    # runners of envs with this fingerprint.  Entries are added when the first such
+    # runner is started and removed when the process stops.
+    shared_runner_processes: dict[str, SharedRunnerProcess] = field(
+        default_factory=dict
+    )
+
+    # Whether new ERs are forked from a prewarmed zygote of their env.  Set from
+    # config at construction; immutable thereafter.
+    prewarm_er_zygotes: bool = False
+
+    # venv directory → zygote of the env.  A zygote is started after the first
+    # runner of the env and replaced when it becomes unusable.
+    er_zygotes: dict[Path, ErZygote] = field(default_factory=dict)
+
+    # Limits of the runner pool, see runner_pool.  0 means no limit on live ERs
+    # and no stopping of idle ERs respectively.  Set from config at construction;
+    # immutable thereafter.
+    max_live_runners: int = 0
+    runner_idle_timeout_sec: float = 0
+
     # Set once during WM startup, before any runner is started.
     # None only before startup completes; non-None for the server's full lifetime.
     runner_io_thread: AsyncIOThread | None = None
@@ -174,6 +211,18 @@ class WorkspaceContext:
     # TODO: move to LSP server — this is an LSP concern, not a WM concern.
     opened_documents: dict[str, domain.TextDocumentInfo] = field(default_factory=dict)
 
+    # document URI → current content of the opened document.  Changes are applied
+    # to the buffer only, `text` of the document in `opened_documents` is updated
+    # from it when the document is sent to a runner, see runner_manager.
+    opened_document_buffers: dict[str, TextBuffer] = field(default_factory=dict)
+
+    # document URI → scheduled sending of changes of the document queued in
+    # runners, see document_sync.  Removed when the changes are sent or the
+    # document is closed.
+    document_change_flush_handles: dict[str, asyncio.TimerHandle] = field(
+        default_factory=dict
+    )
+
     # Handler config overrides supplied via CLI flags or environment variables.
     # Format: {action_name: {handler_name_or_"": {param: value}}}
     # The empty-string key "" means the override applies to all handlers of the action.
@@ -195,6 +244,11 @@ class WorkspaceContext:
     # project_path → { action_name → JSON Schema fragment | None }
     ws_action_schemas: dict[Path, dict[str, dict | None]] = field(default_factory=dict)
 
+    # Resolved preset package paths, parsed preset files and merged preset config
+    # per project, see preset_cache.  Entries are validated on use, no invalidation
+    # is needed.  Set during WM startup; None means preset configs are not cached.
+    preset_config_cache: PresetConfigCache | None = None
+
     # --- Infrastructure ---------------------------------------------------------
 
     # WAL writer.  Set during startup if WAL is configured; None means WAL is
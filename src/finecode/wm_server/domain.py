@@ -557,12 +557,17 @@ class TextDocumentInfo:
             protocol's flexibility.
         text: Full document text.  Empty string if no content has been
             supplied yet (before the first change notification).
+        language_id: Language identifier sent by the client on open (e.g.
+            ``"python"``).  Empty string if the client did not send one.
     """
 
-    def __init__(self, uri: str, version: str | int, text: str = "") -> None:
+    def __init__(
+        self, uri: str, version: str | int, text: str = "", language_id: str = ""
+    ) -> None:
         self.uri = uri
         self.version = version
         self.text = text
+        self.language_id = language_id
 
     def __str__(self) -> str:
         return f'TextDocumentInfo(uri="{self.uri}", version="{self.version}")'
@@ -27,22 +27,14 @@ async def find_project_with_action_for_file(
         f"Find project with action {action_name} for file {file_path.as_posix()}"
     )
 
-    # first find all projects to which file belongs
-    file_projects_pathes: list[Path] = []
-    # TODO: save in workspace context to avoid recalculating
-    sorted_project_dirs = list(ws_context.ws_projects.keys())
-    # reversed sort of pathes sorts them so, that children are always before parents
-    sorted_project_dirs.sort(reverse=True)
-    for project_dir in sorted_project_dirs:
-        if file_path.is_relative_to(project_dir):
-            file_projects_pathes.append(project_dir)
-        else:
-            continue
+    # first find all projects to which file belongs, children are always before
+    # parents
+    file_projects_pathes = ws_context.project_path_trie.find_all(file_path)
 
     if len(file_projects_pathes) == 0:
         logger.debug(
             f"File {file_path} doesn't belong to one of projects in "
-            f"workspace. Workspace projects: {sorted_project_dirs}"
+            f"workspace. Workspace projects: {list(ws_context.ws_projects.keys())}"
         )
         raise FileNotInWorkspaceError(
             f"File {file_path} doesn't belong to one of projects in workspace"
@@ -8,6 +8,7 @@ from loguru import logger
 
 from finecode.wm_server.runner import _internal_client_types
 from finecode_jsonrpc import client as jsonrpc_client
+from finecode_jsonrpc import wire_format
 
 
 async def initialize(
@@ -18,11 +19,15 @@ async def initialize(
     client_workspace_dir: pathlib.Path
 ) -> None:
     logger.debug(f"Send initialize to server {client.readable_id}")
-    await client.send_request(
+    response = await client.send_request(
         method=_internal_client_types.INITIALIZE,
         params=_internal_client_types.InitializeParams(
             process_id=client_process_id,
-            capabilities=_internal_client_types.ClientCapabilities(),
+            capabilities=_internal_client_types.ClientCapabilities(
+                experimental={
+                    wire_format.CAPABILITY_NAME: wire_format.get_supported_formats()
+                }
+            ),
             client_info=_internal_client_types.ClientInfo(
                 name=client_name, version=client_version
             ),
@@ -32,6 +37,21 @@ async def initialize(
         timeout=20,
     )
 
+    # the runner answers in JSON and switches its own messages only after
+    # `initialized`, our messages can be switched right away: messages describe their
+    # format in headers
+    experimental = response.result.capabilities.experimental
+    if isinstance(experimental, dict):
+        chosen_format = wire_format.create_wire_format(
+            experimental.get(wire_format.CAPABILITY_NAME)
+        )
+        if chosen_format is not None:
+            logger.debug(
+                f"Use {chosen_format.codec.name} wire format with"
+                f" {client.readable_id}"
+            )
+            client.set_wire_format(chosen_format)
+
 
 async def notify_initialized(client: jsonrpc_client.JsonRpcClient) -> None:
     logger.debug(f"Notify initialized {client.readable_id}")
@@ -30,6 +30,7 @@ ER_RESOLVE_SOURCE = "actions/resolveSource"
 ER_RESOLVE_PACKAGE_PATH = "packages/resolvePath"
 ER_UPDATE_CONFIG = "finecodeRunner/updateConfig"
 ER_UPDATE_LOGGING = "finecodeRunner/updateLogging"
+ER_REMOVE_PROJECT = "finecodeRunner/removeProject"
 ER_RESOLVE_ACTION_META = "finecodeRunner/resolveActionMeta"
 ER_GET_INFO = "finecodeRunner/getInfo"
 WORKSPACE_APPLY_EDIT = "workspace/applyEdit"
@@ -815,6 +816,10 @@ class DidOpenTextDocumentParams:
     text_document: TextDocumentItem
     """The document that was opened."""
 
+    project_path: str | None = None
+    """FineCode extension: project of the runner the document is sent to. A runner
+    can be shared between projects."""
+
 
 @dataclasses.dataclass
 class TextDocumentItem:
@@ -922,6 +927,10 @@ class DidCloseTextDocumentParams:
     text_document: TextDocumentIdentifier
     """The document that was closed."""
 
+    project_path: str | None = None
+    """FineCode extension: project of the runner the document is sent to. A runner
+    can be shared between projects."""
+
 
 @dataclasses.dataclass
 class TextDocumentIdentifier:
@@ -1460,6 +1469,8 @@ class RunActionInProjectParams:
     partial_result_token: int | str | None = None
     caller_kwargs: dict | None = None
     traceparent: str | None = None
+    # project of the requesting runner, set by runners shared between projects
+    project_path: str | None = None
 
 
 @dataclasses.dataclass
@@ -1487,6 +1498,8 @@ class RunActionInWorkspaceParams:
     project_paths: list[str] | None = None
     concurrently: bool = True
     traceparent: str | None = None
+    # project of the requesting runner, set by runners shared between projects
+    project_path: str | None = None
 
 
 @dataclasses.dataclass
@@ -1576,6 +1589,10 @@ class DidChangeTextDocumentParams:
     - apply the `TextDocumentContentChangeEvent`s in a single notification in the order
       you receive them."""
 
+    project_path: str | None = None
+    """FineCode extension: project of the runner the document is sent to. A runner
+    can be shared between projects."""
+
 
 
 @dataclasses.dataclass
@@ -1645,6 +1662,7 @@ class ErRunActionParams:
     action_name: str
     params: dict
     options: dict | None = None
+    project_path: str | None = None
 
 
 @dataclasses.dataclass
@@ -1674,6 +1692,7 @@ class ErRunHandlersParams:
     previous_context: dict | None = None
     caller_kwargs: dict | None = None
     options: dict | None = None
+    project_path: str | None = None
 
 
 @dataclasses.dataclass
@@ -1699,6 +1718,7 @@ class ErRunHandlersResponse(BaseResponse):
 @dataclasses.dataclass
 class ErReloadActionParams:
     action_name: str
+    project_path: str | None = None
 
 
 @dataclasses.dataclass
@@ -1719,6 +1739,7 @@ class ErReloadActionResponse(BaseResponse):
 class ErMergeResultsParams:
     action_name: str
     results: list
+    project_path: str | None = None
 
 
 @dataclasses.dataclass
@@ -1796,7 +1817,8 @@ class ErUpdateConfigRequest(BaseRequest):
 
 
 @dataclasses.dataclass
-class ErUpdateConfigResult(BaseResult): ...
+class ErUpdateConfigResult(BaseResult):
+    document_languages: list[str] | None = None
 
 
 @dataclasses.dataclass
@@ -1804,6 +1826,27 @@ class ErUpdateConfigResponse(BaseResponse):
     result: ErUpdateConfigResult
 
 
+@dataclasses.dataclass
+class ErProjectParams:
+    """Params of ER requests which only name the project, see `ErRunActionParams`."""
+
+    project_path: str
+
+
+@dataclasses.dataclass
+class ErRemoveProjectRequest(BaseRequest):
+    params: ErProjectParams
+
+
+@dataclasses.dataclass
+class ErRemoveProjectResult(BaseResult): ...
+
+
+@dataclasses.dataclass
+class ErRemoveProjectResponse(BaseResponse):
+    result: ErRemoveProjectResult
+
+
 @dataclasses.dataclass
 class ErUpdateLoggingParams:
     forward: bool
@@ -1882,6 +1925,8 @@ class ExitNotification(BaseNotification):
 @dataclasses.dataclass
 class GetActionsForParentParams:
     parent_action_source: str
+    # project of the requesting runner, set by runners shared between projects
+    project_path: str | None = None
 
 
 @dataclasses.dataclass
@@ -1956,11 +2001,12 @@ METHOD_TO_TYPES: dict[
     ER_RUN_HANDLERS: (ErRunHandlersRequest, ErRunHandlersParams, ErRunHandlersResponse, None),
     ER_RELOAD_ACTION: (ErReloadActionRequest, ErReloadActionParams, ErReloadActionResponse, None),
     ER_MERGE_RESULTS: (ErMergeResultsRequest, ErMergeResultsParams, ErMergeResultsResponse, None),
-    ER_GET_PAYLOAD_SCHEMAS: (None, None, ErGetPayloadSchemasResponse, None),
+    ER_GET_PAYLOAD_SCHEMAS: (None, ErProjectParams, ErGetPayloadSchemasResponse, None),
     ER_RESOLVE_SOURCE: (ErResolveSourceRequest, ErResolveSourceParams, ErResolveSourceResponse, None),
     ER_RESOLVE_PACKAGE_PATH: (ErResolvePackagePathRequest, ErResolvePackagePathParams, ErResolvePackagePathResponse, None),
     ER_UPDATE_CONFIG: (ErUpdateConfigRequest, ErUpdateConfigParams, ErUpdateConfigResponse, None),
     ER_UPDATE_LOGGING: (ErUpdateLoggingRequest, ErUpdateLoggingParams, ErUpdateLoggingResponse, None),
+    ER_REMOVE_PROJECT: (ErRemoveProjectRequest, ErProjectParams, ErRemoveProjectResponse, None),
     ER_LOG_RECORDS: (ErLogRecordsNotification, ErLogRecordsParams, None, None),
     ER_USER_MESSAGE: (ErUserMessageNotification, ErUserMessageParams, None, None),
     ER_GET_INFO: (None, None, ErGetInfoResponse, None),
@@ -2006,7 +2052,7 @@ METHOD_TO_TYPES: dict[
         RunActionInWorkspaceResponse,
         RunActionInWorkspaceResult,
     ),
-    ER_RESOLVE_ACTION_META: (None, None, ErResolveActionMetaResponse, None),
+    ER_RESOLVE_ACTION_META: (None, ErProjectParams, ErResolveActionMetaResponse, None),
     GET_ACTIONS_FOR_PARENT: (GetActionsForParentRequest, GetActionsForParentParams, GetActionsForParentResponse, GetActionsForParentResult),
     LIST_WORKSPACE_ACTIONS: (ListWorkspaceActionsRequest, None, ListWorkspaceActionsResponse, ListWorkspaceActionsResult),
     WORKSPACE_EDITABLE_PACKAGES_GET: (
@@ -0,0 +1,289 @@
+"""
+Prewarmed ER zygotes: processes which fork ready Extension Runners of one env.
+
+The zygote side is implemented in `finecode_extension_runner.zygote`, see it for
+the protocol. All coroutines of `ErZygote` run in the runner IO thread, like the
+processes of JSON-RPC clients of the runners.
+"""
+
+import asyncio
+import enum
+import json
+import os
+import signal
+import socket
+import sys
+from pathlib import Path
+
+from loguru import logger
+
+import finecode_jsonrpc as jsonrpc_client
+from finecode_extension_runner import zygote as er_zygote_process
+
+_ZYGOTE_START_TIMEOUT_SEC = 30
+_FORK_TIMEOUT_SEC = 10
+# if the zygote exits before the forked runner, the runner is not a child process
+# of anyone the WM can wait on, its pid is polled instead
+_ORPHAN_POLL_INTERVAL_SEC = 0.5
+# stdout of runners can contain long lines before the RPC channel exists
+_PIPE_READER_LIMIT = 1024 * 1024
+
+
+def is_supported() -> bool:
+    return sys.platform != "win32" and hasattr(socket, "send_fds")
+
+
+class ErZygoteStatus(enum.Enum):
+    STARTING = enum.auto()
+    READY = enum.auto()
+    # failed to start, exited or runs outdated code
+    UNUSABLE = enum.auto()
+
+
+class ErZygote:
+    def __init__(self, python_cmd: str, venv_dir_path: Path) -> None:
+        self.python_cmd = python_cmd
+        self.venv_dir_path = venv_dir_path
+        self.status = ErZygoteStatus.STARTING
+        self._process: asyncio.subprocess.Process | None = None
+        self._socket_path: str | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._watch_task: asyncio.Task[None] | None = None
+
+    @property
+    def readable_id(self) -> str:
+        return f"zygote:{self.venv_dir_path}"
+
+    async def start(self, working_dir_path: Path, preload_modules: list[str]) -> None:
+        self._loop = asyncio.get_running_loop()
+        args = ["-m", "finecode_extension_runner.cli", "zygote"]
+        for module_name in preload_modules:
+            args.append(f"--preload={module_name}")
+        env = dict(os.environ)
+        # like `JsonRpcClient.start`, avoid starting in wrong venv
+        env.pop("VIRTUAL_ENV", None)
+
+        try:
+            self._process = await asyncio.create_subprocess_exec(
+                self.python_cmd,
+                *args,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                cwd=working_dir_path,
+                env=env,
+                start_new_session=True,
+            )
+            assert self._process.stdout is not None
+            line = await asyncio.wait_for(
+                self._process.stdout.readline(), _ZYGOTE_START_TIMEOUT_SEC
+            )
+        except (OSError, TimeoutError) as exception:
+            self.status = ErZygoteStatus.UNUSABLE
+            self.stop()
+            raise jsonrpc_client.ServerFailedToStart(
+                f"Zygote {self.readable_id} failed to start: {exception!r}"
+            ) from exception
+
+        decoded_line = line.decode("utf-8", errors="replace").strip()
+        if not decoded_line.startswith(er_zygote_process.SERVING_MESSAGE_PREFIX):
+            self.status = ErZygoteStatus.UNUSABLE
+            self.stop()
+            raise jsonrpc_client.ServerFailedToStart(
+                f"Zygote {self.readable_id} failed to start: {decoded_line!r}"
+            )
+
+        self._socket_path = decoded_line.removeprefix(
+            er_zygote_process.SERVING_MESSAGE_PREFIX
+        )
+        self._watch_task = asyncio.create_task(self._watch_process())
+        self.status = ErZygoteStatus.READY
+        logger.debug(f"Zygote {self.readable_id} started, pid {self._process.pid}")
+
+    async def _watch_process(self) -> None:
+        assert self._process is not None
+        # drain output so that the zygote never blocks on a full pipe
+        await asyncio.gather(
+            _log_lines(self._process.stdout, self.readable_id),
+            _log_lines(self._process.stderr, self.readable_id),
+            self._process.wait(),
+        )
+        self.status = ErZygoteStatus.UNUSABLE
+        logger.debug(
+            f"Zygote {self.readable_id} exited with code {self._process.returncode}"
+        )
+
+    async def spawn(self, cli_args: list[str], cwd: Path) -> "ForkedServerProcess":
+        """Fork a runner.
+
+        Raises:
+            ServerFailedToStart: the zygote is not ready or failed to fork.
+        """
+        if self.status != ErZygoteStatus.READY or self._socket_path is None:
+            raise jsonrpc_client.ServerFailedToStart(
+                f"Zygote {self.readable_id} is not ready"
+            )
+
+        stdout_read_fd, stdout_write_fd = os.pipe()
+        stderr_read_fd, stderr_write_fd = os.pipe()
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            try:
+                # local socket, connect and send of one small message don't block
+                connection.connect(self._socket_path)
+                message = json.dumps({"args": cli_args, "cwd": str(cwd)}).encode("utf-8")
+                socket.send_fds(connection, [message], [stdout_write_fd, stderr_write_fd])
+            finally:
+                os.close(stdout_write_fd)
+                os.close(stderr_write_fd)
+
+            control_reader, control_writer = await asyncio.open_unix_connection(
+                sock=connection
+            )
+            line = await asyncio.wait_for(control_reader.readline(), _FORK_TIMEOUT_SEC)
+            reply = json.loads(line) if line else {}
+        except (OSError, ValueError, TimeoutError) as exception:
+            self.status = ErZygoteStatus.UNUSABLE
+            connection.close()
+            os.close(stdout_read_fd)
+            os.close(stderr_read_fd)
+            raise jsonrpc_client.ServerFailedToStart(
+                f"Zygote {self.readable_id} failed to fork a runner: {exception!r}"
+            ) from exception
+
+        if "error" in reply:
+            # e.g. the process limit is reached, the zygote can fork the next runner
+            control_writer.close()
+            os.close(stdout_read_fd)
+            os.close(stderr_read_fd)
+            raise jsonrpc_client.ServerFailedToStart(
+                f"Zygote {self.readable_id} failed to fork a runner: {reply['error']}"
+            )
+
+        if "pid" not in reply:
+            # `stale` or the zygote exited
+            self.status = ErZygoteStatus.UNUSABLE
+            control_writer.close()
+            os.close(stdout_read_fd)
+            os.close(stderr_read_fd)
+            raise jsonrpc_client.ServerFailedToStart(
+                f"Zygote {self.readable_id} cannot fork runners anymore: {reply}"
+            )
+
+        return ForkedServerProcess(
+            pid=int(reply["pid"]),
+            stdout=await _open_pipe_reader(stdout_read_fd),
+            stderr=await _open_pipe_reader(stderr_read_fd),
+            control_reader=control_reader,
+            control_writer=control_writer,
+        )
+
+    def stop(self) -> None:
+        """Stop the zygote. Runners forked by it keep running. Thread-safe."""
+        self.status = ErZygoteStatus.UNUSABLE
+        process = self._process
+        if process is None or process.returncode is not None or self._loop is None:
+            return
+        # the zygote exits on EOF of stdin
+        if process.stdin is not None:
+            try:
+                self._loop.call_soon_threadsafe(process.stdin.close)
+            except RuntimeError:
+                # the loop is closed already, the pipe is closed with it
+                ...
+
+    async def wait_exited(self) -> None:
+        if self._watch_task is not None:
+            await self._watch_task
+
+
+class ForkedServerProcess:
+    """Runner forked by a zygote, implements `finecode_jsonrpc.ServerProcess`.
+
+    The runner is a child of the zygote, the zygote reports its exit code.
+    """
+
+    stdin = None
+
+    def __init__(
+        self,
+        pid: int,
+        stdout: asyncio.StreamReader,
+        stderr: asyncio.StreamReader,
+        control_reader: asyncio.StreamReader,
+        control_writer: asyncio.StreamWriter,
+    ) -> None:
+        self.pid = pid
+        self.stdout = stdout
+        self.stderr = stderr
+        self._control_reader = control_reader
+        self._control_writer = control_writer
+        self._returncode: int | None = None
+        self._exited_event = asyncio.Event()
+        self._watch_task = asyncio.create_task(self._watch_exit())
+
+    @property
+    def returncode(self) -> int | None:
+        return self._returncode
+
+    async def wait(self) -> int:
+        await self._exited_event.wait()
+        assert self._returncode is not None
+        return self._returncode
+
+    def kill(self) -> None:
+        try:
+            os.kill(self.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            ...
+
+    async def _watch_exit(self) -> None:
+        returncode: int | None = None
+        try:
+            line = await self._control_reader.readline()
+            if line:
+                returncode = int(json.loads(line)["returncode"])
+        except (OSError, ValueError, KeyError, TypeError):
+            ...
+        self._control_writer.close()
+
+        if returncode is None:
+            while _pid_exists(self.pid):
+                await asyncio.sleep(_ORPHAN_POLL_INTERVAL_SEC)
+            # exit code of an orphaned runner is unknown
+            returncode = -1
+
+        self._returncode = returncode
+        self._exited_event.set()
+
+
+def _pid_exists(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+async def _open_pipe_reader(fd: int) -> asyncio.StreamReader:
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(limit=_PIPE_READER_LIMIT, loop=loop)
+    await loop.connect_read_pipe(
+        lambda: asyncio.StreamReaderProtocol(reader, loop=loop), os.fdopen(fd, "rb", 0)
+    )
+    return reader
+
+
+async def _log_lines(stream: asyncio.StreamReader | None, readable_id: str) -> None:
+    if stream is None:
+        return
+    while True:
+        try:
+            line = await stream.readline()
+        except ValueError:
+            continue
+        if not line:
+            return
+        logger.trace(f"{readable_id}: {line.decode('utf-8', errors='replace').rstrip()}")
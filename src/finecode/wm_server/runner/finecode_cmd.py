@@ -1,3 +1,4 @@
+import hashlib
 import re
 import sys
 from pathlib import Path
@@ -97,3 +98,57 @@ def get_python_cmd(project_path: Path, env_name: str) -> str:
         )
 
     return venv_python_path.as_posix()
+
+
+# keys of `pyvenv.cfg` which describe the base interpreter. Other keys (e.g.
+# `command` or `prompt`) contain the path or name of the venv itself
+_PYVENV_CFG_INTERPRETER_KEYS = frozenset(
+    ("home", "implementation", "version", "version_info", "include-system-site-packages")
+)
+
+
+def _site_packages_dir_paths(venv_dir_path: Path) -> list[Path]:
+    if sys.platform == "win32":
+        return [venv_dir_path / "Lib" / "site-packages"]
+    return sorted(venv_dir_path.glob("lib/python*/site-packages"))
+
+
+def get_env_fingerprint(project_path: Path, env_name: str) -> str | None:
+    """Return a fingerprint of the interpreter and installed packages of an env.
+
+    Envs with equal fingerprints run the same code: the same base interpreter and
+    the same distributions in the same versions. Editable installs are included
+    with their source location (``direct_url.json`` and ``.pth`` files), so editable
+    installs of different checkouts don't match. Returns None if the env doesn't
+    exist or cannot be read.
+    """
+    venv_dir_path = get_venv_dir_path(project_path=project_path, env_name=env_name)
+    hasher = hashlib.sha256()
+    try:
+        pyvenv_cfg = (venv_dir_path / "pyvenv.cfg").read_text()
+    except OSError:
+        return None
+
+    for line in sorted(pyvenv_cfg.splitlines()):
+        key, _, value = line.partition("=")
+        if key.strip() in _PYVENV_CFG_INTERPRETER_KEYS:
+            hasher.update(f"{key.strip()}={value.strip()}\n".encode())
+
+    site_packages_dir_paths = _site_packages_dir_paths(venv_dir_path)
+    if not site_packages_dir_paths:
+        return None
+    try:
+        for site_packages_dir_path in site_packages_dir_paths:
+            for entry_path in sorted(site_packages_dir_path.iterdir()):
+                if entry_path.name.endswith(".dist-info"):
+                    hasher.update(f"{entry_path.name}\n".encode())
+                    direct_url_path = entry_path / "direct_url.json"
+                    if direct_url_path.exists():
+                        hasher.update(direct_url_path.read_bytes())
+                elif entry_path.suffix == ".pth":
+                    hasher.update(f"{entry_path.name}\n".encode())
+                    hasher.update(entry_path.read_bytes())
+    except OSError:
+        return None
+
+    return hasher.hexdigest()
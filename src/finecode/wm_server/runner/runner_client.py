@@ -5,8 +5,10 @@ API of ER client for "higher" layers like services, CLI.
 from __future__ import annotations
 
 import asyncio
+import contextlib
 import dataclasses
 import enum
+import time
 import typing
 import pathlib
 from typing import Any
@@ -59,12 +61,81 @@ class ExtensionRunnerInfo(domain.ExtensionRunner):
     # Last (enabled, level) sent via finecodeRunner/updateLogging, to avoid
     # redundant RPCs (ADR-0049).
     log_forwarding: tuple[bool, str] | None = dataclasses.field(default=None)
+    # ER process shared with runners of other projects, None if the runner has its
+    # own process
+    shared_process: SharedRunnerProcess | None = None
+    # how the ER process of the runner was started: "process", "zygote" or
+    # "shared" (joined a shared process)
+    start_mode: str | None = None
+    # `time.monotonic()` of the last use, used by the runner pool to find idle and
+    # least recently used runners
+    last_used_at: float = dataclasses.field(default_factory=time.monotonic)
+    # action requests which are currently executed by the runner
+    active_request_count: int = 0
+    # languages of documents the runner is notified about, advertised by the ER in
+    # the response to `update_config`. None means all documents
+    document_languages: list[str] | None = None
+    # changes of documents queued by `queue_document_change` and not sent yet, by
+    # document URI
+    pending_document_changes: dict[
+        str, _internal_client_types.DidChangeTextDocumentParams
+    ] = dataclasses.field(default_factory=dict)
+
+    @property
+    def project_path_param(self) -> str:
+        # every request names its project, the ER can serve several projects
+        return self.working_dir_path.as_posix()
+
+    def mark_used(self) -> None:
+        self.last_used_at = time.monotonic()
+
+    def wants_document(self, document_info: domain.TextDocumentInfo) -> bool:
+        # documents with unknown language are sent to all runners
+        return (
+            self.document_languages is None
+            or not document_info.language_id
+            or document_info.language_id in self.document_languages
+        )
+
+
+@dataclasses.dataclass
+class SharedRunnerProcess:
+    """ER process shared by runners of projects with identical envs.
+
+    The process is started by the first runner (`host`) with the interpreter of its
+    env. Runners of other projects whose env has the same interpreter and the same
+    installed packages join it instead of starting their own process: they use the
+    client of the host and the ER keeps a separate runner context per project.
+    """
+
+    key: str
+    host: ExtensionRunnerInfo
+    # set when the process of the host is started and initialized, or failed to
+    # start
+    process_started_event: asyncio.Event = dataclasses.field(
+        default_factory=asyncio.Event
+    )
+    runners: list[ExtensionRunnerInfo] = dataclasses.field(default_factory=list)
 
 
 # Alias for backward compatibility — status enum now lives in domain
 RunnerStatus = domain.ExtensionRunnerStatus
 
 
+@contextlib.contextmanager
+def _request_in_progress(runner: ExtensionRunnerInfo) -> typing.Iterator[None]:
+    # handlers must see the current content of opened documents
+    flush_document_changes(runner)
+    # the runner pool doesn't stop runners with requests in progress
+    runner.active_request_count += 1
+    runner.mark_used()
+    try:
+        yield
+    finally:
+        runner.active_request_count -= 1
+        runner.mark_used()
+
+
 # JSON object or text
 type RunActionRawResult = dict[str, Any] | str
 
@@ -156,13 +227,17 @@ async def run_action(
         )
 
     try:
-        response = await runner.client.send_request(
-            method=_internal_client_types.ER_RUN_ACTION,
-            params=_internal_client_types.ErRunActionParams(
-                action_name=action_name, params=params, options=options
-            ),
-            timeout=None,
-        )
+        with _request_in_progress(runner):
+            response = await runner.client.send_request(
+                method=_internal_client_types.ER_RUN_ACTION,
+                params=_internal_client_types.ErRunActionParams(
+                    action_name=action_name,
+                    params=params,
+                    options=options,
+                    project_path=runner.project_path_param,
+                ),
+                timeout=None,
+            )
     except jsonrpc_client.ServerStoppedError as exc:
         raise ActionRunFailed(
             "Runner stopped during execution — it may have been restarted."
@@ -229,19 +304,21 @@ async def run_handlers(
         )
 
     try:
-        response = await runner.client.send_request(
-            method=_internal_client_types.ER_RUN_HANDLERS,
-            params=_internal_client_types.ErRunHandlersParams(
-                action_name=action_name,
-                handler_names=handler_names,
-                params=params or {},
-                previous_result=previous_result,
-                previous_context=previous_context,
-                caller_kwargs=caller_kwargs,
-                options=options,
-            ),
-            timeout=None,
-        )
+        with _request_in_progress(runner):
+            response = await runner.client.send_request(
+                method=_internal_client_types.ER_RUN_HANDLERS,
+                params=_internal_client_types.ErRunHandlersParams(
+                    action_name=action_name,
+                    handler_names=handler_names,
+                    params=params or {},
+                    previous_result=previous_result,
+                    previous_context=previous_context,
+                    caller_kwargs=caller_kwargs,
+                    options=options,
+                    project_path=runner.project_path_param,
+                ),
+                timeout=None,
+            )
     except jsonrpc_client.RequestCancelledError as error:
         logger.trace(
             f"Request {error.request_id} to {runner.readable_id} was cancelled"
@@ -285,13 +362,16 @@ async def merge_results(
             f"Runner {runner.readable_id} is not running: {runner.status}"
         )
 
-    response = await runner.client.send_request(
-        method=_internal_client_types.ER_MERGE_RESULTS,
-        params=_internal_client_types.ErMergeResultsParams(
-            action_name=action_name, results=results
-        ),
-        timeout=None,
-    )
+    with _request_in_progress(runner):
+        response = await runner.client.send_request(
+            method=_internal_client_types.ER_MERGE_RESULTS,
+            params=_internal_client_types.ErMergeResultsParams(
+                action_name=action_name,
+                results=results,
+                project_path=runner.project_path_param,
+            ),
+            timeout=None,
+        )
     merge_result = response.result
     if merge_result.error is not None:
         raise ActionRunFailed(merge_result.error)
@@ -307,7 +387,9 @@ async def reload_action(runner: ExtensionRunnerInfo, action_name: str) -> None:
 
     await runner.client.send_request(
         method=_internal_client_types.ER_RELOAD_ACTION,
-        params=_internal_client_types.ErReloadActionParams(action_name=action_name),
+        params=_internal_client_types.ErReloadActionParams(
+            action_name=action_name, project_path=runner.project_path_param
+        ),
     )
 
 
@@ -340,6 +422,9 @@ async def resolve_action_meta(runner: ExtensionRunnerInfo) -> dict[str, dict]:
     """Ask the ER to resolve action meta info (canonical source + execution mode)."""
     response = await runner.client.send_request(
         method=_internal_client_types.ER_RESOLVE_ACTION_META,
+        params=_internal_client_types.ErProjectParams(
+            project_path=runner.project_path_param
+        ),
         timeout=None,
     )
     return response.result
@@ -357,6 +442,9 @@ async def get_payload_schemas(runner: ExtensionRunnerInfo) -> dict[str, dict | N
 
     response = await runner.client.send_request(
         method=_internal_client_types.ER_GET_PAYLOAD_SCHEMAS,
+        params=_internal_client_types.ErProjectParams(
+            project_path=runner.project_path_param
+        ),
         timeout=None,
     )
     return response.result
@@ -414,7 +502,7 @@ class RunnerConfig:
 async def update_config(
     runner: ExtensionRunnerInfo, project_def_path: pathlib.Path, config: RunnerConfig
 ) -> None:
-    await runner.client.send_request(
+    response = await runner.client.send_request(
         method=_internal_client_types.ER_UPDATE_CONFIG,
         params=_internal_client_types.ErUpdateConfigParams(
             working_dir=runner.working_dir_path.as_posix(),
@@ -423,6 +511,18 @@ async def update_config(
             config=config.to_dict(),
         ),
     )
+    runner.document_languages = response.result.document_languages
+
+
+async def remove_project(runner: ExtensionRunnerInfo) -> None:
+    """Ask an ER shared between projects to shut down handlers of the runner's
+    project. The ER keeps running for the other projects."""
+    await runner.client.send_request(
+        method=_internal_client_types.ER_REMOVE_PROJECT,
+        params=_internal_client_types.ErProjectParams(
+            project_path=runner.project_path_param
+        ),
+    )
 
 
 async def update_logging(runner: ExtensionRunnerInfo, forward: bool, forward_level: str) -> None:
@@ -445,10 +545,11 @@ async def notify_document_did_open(
         params=_internal_client_types.DidOpenTextDocumentParams(
             text_document=_internal_client_types.TextDocumentItem(
                 uri=document_info.uri,
-                language_id="",
+                language_id=document_info.language_id,
                 version=int(document_info.version),
                 text=document_info.text,
-            )
+            ),
+            project_path=runner.project_path_param,
         ),
     )
 
@@ -456,25 +557,82 @@ async def notify_document_did_open(
 async def notify_document_did_close(
     runner: ExtensionRunnerInfo, document_uri: str
 ) -> None:
+    # changes of a closed document are not needed anymore
+    runner.pending_document_changes.pop(document_uri, None)
     runner.client.notify(
         method=_internal_client_types.TEXT_DOCUMENT_DID_CLOSE,
         params=_internal_client_types.DidCloseTextDocumentParams(
-            text_document=_internal_client_types.TextDocumentIdentifier(document_uri)
+            text_document=_internal_client_types.TextDocumentIdentifier(document_uri),
+            project_path=runner.project_path_param,
         ),
     )
 
 async def notify_document_did_change(runner: ExtensionRunnerInfo, change_params: _internal_client_types.DidChangeTextDocumentParams) -> None:
     runner.client.notify(
         method=_internal_client_types.TEXT_DOCUMENT_DID_CHANGE,
-        params=change_params,
+        params=dataclasses.replace(
+            change_params, project_path=runner.project_path_param
+        ),
     )
 
 
+def queue_document_change(
+    runner: ExtensionRunnerInfo,
+    change_params: _internal_client_types.DidChangeTextDocumentParams,
+) -> None:
+    """Queue the change to be sent by `flush_document_changes`. Changes of the same
+    document queued before the flush are sent in one notification."""
+    uri = change_params.text_document.uri
+    pending = runner.pending_document_changes.get(uri)
+    content_changes = list(change_params.content_changes)
+    if pending is not None:
+        content_changes = [*pending.content_changes, *content_changes]
+    # changes before the last whole document change are overwritten by it
+    for index in range(len(content_changes) - 1, 0, -1):
+        if isinstance(
+            content_changes[index],
+            _internal_client_types.TextDocumentContentChangeWholeDocument,
+        ):
+            content_changes = content_changes[index:]
+            break
+    runner.pending_document_changes[uri] = dataclasses.replace(
+        change_params, content_changes=content_changes
+    )
+
+
+def flush_document_changes(
+    runner: ExtensionRunnerInfo, document_uri: str | None = None
+) -> None:
+    """Send queued changes of the document, of all documents if `document_uri` is
+    None.
+
+    Synchronous, so that no other notification or request to the runner can be sent
+    between queued changes and the caller's next message.
+    """
+    if document_uri is None:
+        changes = list(runner.pending_document_changes.values())
+        runner.pending_document_changes.clear()
+    else:
+        change_params = runner.pending_document_changes.pop(document_uri, None)
+        changes = [change_params] if change_params is not None else []
+
+    if runner.client is None:
+        return
+    for change_params in changes:
+        runner.client.notify(
+            method=_internal_client_types.TEXT_DOCUMENT_DID_CHANGE,
+            params=dataclasses.replace(
+                change_params, project_path=runner.project_path_param
+            ),
+        )
+
+
 __all__ = [
     "ActionRunFailed",
     "ActionRunStopped",
     "ActionRunCancelled",
     "ExtensionRunnerInfo",
+    "SharedRunnerProcess",
     "RunnerStatus",
     "RunActionRawResult",
     "RunActionResponse",
@@ -487,7 +645,11 @@ __all__ = [
     "resolve_package_path",
     "RunnerConfig",
     "update_config",
+    "remove_project",
     "update_logging",
     "notify_document_did_open",
     "notify_document_did_close",
+    "notify_document_did_change",
+    "queue_document_change",
+    "flush_document_changes",
 ]
@@ -6,6 +6,7 @@ import asyncio
 import collections.abc
 import concurrent.futures
 import dataclasses
+import functools
 import json
 import os
 import shutil
@@ -21,6 +22,7 @@ from finecode.wm_server.runner import (
     runner_client,
     _internal_client_api,
     _internal_client_types,
+    er_zygote,
     finecode_cmd
 )
 import finecode_jsonrpc as jsonrpc_client
@@ -29,6 +31,12 @@ project_changed_callback: (
     typing.Callable[[domain.Project], collections.abc.Coroutine[None, None, None]]
     | None
 ) = None
+# called after the config of a runner of the project was updated, e.g. handler
+# config changed
+project_config_changed_callback: (
+    typing.Callable[[domain.Project], collections.abc.Coroutine[None, None, None]]
+    | None
+) = None
 # get_document: typing.Callable[[], collections.abc.Coroutine] | None = None
 apply_workspace_edit: typing.Callable[[], collections.abc.Coroutine] | None = None
 start_debug_session: typing.Callable[[int], collections.abc.Coroutine] | None = None
@@ -98,6 +106,95 @@ async def _apply_workspace_edit(
     return await apply_workspace_edit(converted_params)
 
 
+def _get_runner_config(
+    runner: runner_client.ExtensionRunnerInfo, ws_context: context.WorkspaceContext
+) -> domain.RunnerConfig:
+    _project = ws_context.ws_projects[runner.working_dir_path]
+    _default_env_config = domain.EnvConfig(runner_config=domain.RunnerConfig(debug=False))
+    # `dev_workspace` runner is started before the project config is fully collected, so
+    # `env_configs` are unavailable here for it; `defaultLevel` is applied later via
+    # `update_runner_config`
+    env_config = (
+        _project.env_configs.get(runner.env_name, _default_env_config)
+        if isinstance(_project, domain.CollectedProject)
+        else _default_env_config
+    )
+    return env_config.runner_config
+
+
+def _create_runner_client(
+    runner: runner_client.ExtensionRunnerInfo,
+) -> jsonrpc_client.JsonRpcClient:
+    return jsonrpc_client.JsonRpcClient(message_types=_internal_client_types.METHOD_TO_TYPES, readable_id=runner.readable_id, tracing=telemetry.JsonRpcTracingHooks())
+
+
+def _get_ready_er_zygote(
+    runner: runner_client.ExtensionRunnerInfo, ws_context: context.WorkspaceContext
+) -> er_zygote.ErZygote | None:
+    venv_dir_path = finecode_cmd.get_venv_dir_path(
+        runner.working_dir_path, runner.env_name
+    )
+    zygote = ws_context.er_zygotes.get(venv_dir_path)
+    if zygote is None:
+        return None
+    if zygote.status == er_zygote.ErZygoteStatus.UNUSABLE:
+        # e.g. the env was reinstalled, a new zygote is started after the runner
+        del ws_context.er_zygotes[venv_dir_path]
+        zygote.stop()
+        return None
+    if zygote.status != er_zygote.ErZygoteStatus.READY:
+        return None
+    return zygote
+
+
+def _prewarm_er_zygote(
+    runner: runner_client.ExtensionRunnerInfo,
+    project: domain.Project,
+    ws_context: context.WorkspaceContext,
+) -> None:
+    """Start a zygote for the env of the runner in background, so that the next
+    runners of the env, e.g. after restart, are forked from it."""
+    if (
+        not ws_context.prewarm_er_zygotes
+        or not er_zygote.is_supported()
+        or runner.cmd_override
+        or ws_context.runner_io_thread is None
+    ):
+        return
+    venv_dir_path = finecode_cmd.get_venv_dir_path(
+        runner.working_dir_path, runner.env_name
+    )
+    if venv_dir_path in ws_context.er_zygotes:
+        return
+    try:
+        python_cmd = finecode_cmd.get_python_cmd(runner.working_dir_path, runner.env_name)
+    except ValueError:
+        return
+
+    preload_modules: set[str] = set()
+    if isinstance(project, domain.CollectedProject):
+        for action in project.actions:
+            for handler in action.handlers:
+                if handler.env == runner.env_name:
+                    preload_modules.add(handler.source.rpartition(".")[0])
+
+    zygote = er_zygote.ErZygote(python_cmd=python_cmd, venv_dir_path=venv_dir_path)
+    ws_context.er_zygotes[venv_dir_path] = zygote
+    start_future = ws_context.runner_io_thread.run_coroutine(
+        zygote.start(
+            working_dir_path=runner.working_dir_path,
+            preload_modules=sorted(module for module in preload_modules if module),
+        )
+    )
+
+    def _log_start_failure(future: concurrent.futures.Future) -> None:
+        exception = future.exception()
+        if exception is not None:
+            logger.warning(f"Failed to prewarm zygote of {runner.readable_id}: {exception}")
+
+    start_future.add_done_callback(_log_start_failure)
+
+
 async def _start_extension_runner_process(
     runner: runner_client.ExtensionRunnerInfo, ws_context: context.WorkspaceContext, debug: bool = False
 ) -> None:
@@ -137,17 +234,7 @@ async def _start_extension_runner_process(
         ws_context.runner_io_thread = _io_thread.AsyncIOThread()
         ws_context.runner_io_thread.start()
 
-    _project = ws_context.ws_projects[runner.working_dir_path]
-    _default_env_config = domain.EnvConfig(runner_config=domain.RunnerConfig(debug=False))
-    # `dev_workspace` runner is started before the project config is fully collected, so
-    # `env_configs` are unavailable here for it; `defaultLevel` is applied later via
-    # `update_runner_config`
-    env_config = (
-        _project.env_configs.get(runner.env_name, _default_env_config)
-        if isinstance(_project, domain.CollectedProject)
-        else _default_env_config
-    )
-    runner_config = env_config.runner_config
+    runner_config = _get_runner_config(runner, ws_context)
 
     log_level = runner_config.logging.default_level
     process_args: list[str] = [
@@ -166,15 +253,42 @@ async def _start_extension_runner_process(
         debug_port_future = None
 
     process_args_str: str = " ".join(process_args)
-    client = jsonrpc_client.JsonRpcClient(message_types=_internal_client_types.METHOD_TO_TYPES, readable_id=runner.readable_id, tracing=telemetry.JsonRpcTracingHooks())
-    
-    try:
-        await client.start(server_cmd=f"{python_cmd} -m finecode_extension_runner.cli start {process_args_str}", working_dir_path=runner.working_dir_path, io_thread=ws_context.runner_io_thread, debug_port_future=debug_port_future, connect=not start_with_debug)
-    except RunnerFailedToStart as exception:
-        logger.error(f"Runner {runner.readable_id} failed to start: {exception.message}")
-        runner.status = runner_client.RunnerStatus.FAILED
-        runner.initialized_event.set()
-        raise exception
+    server_cmd = f"{python_cmd} -m finecode_extension_runner.cli start {process_args_str}"
+
+    client: jsonrpc_client.JsonRpcClient | None = None
+    zygote = None
+    if not start_with_debug and not runner.cmd_override:
+        zygote = _get_ready_er_zygote(runner, ws_context)
+    if zygote is not None:
+        client = _create_runner_client(runner)
+        try:
+            await client.start(
+                server_cmd=server_cmd,
+                working_dir_path=runner.working_dir_path,
+                io_thread=ws_context.runner_io_thread,
+                debug_port_future=None,
+                spawn_server_process=functools.partial(
+                    zygote.spawn, ["start", *process_args], runner.working_dir_path
+                ),
+            )
+            runner.start_mode = "zygote"
+        except RunnerFailedToStart as exception:
+            logger.info(
+                f"Failed to fork runner {runner.readable_id} from zygote, start a new"
+                f" process: {exception.message}"
+            )
+            client = None
+
+    if client is None:
+        client = _create_runner_client(runner)
+        try:
+            await client.start(server_cmd=server_cmd, working_dir_path=runner.working_dir_path, io_thread=ws_context.runner_io_thread, debug_port_future=debug_port_future, connect=not start_with_debug)
+        except RunnerFailedToStart as exception:
+            logger.error(f"Runner {runner.readable_id} failed to start: {exception.message}")
+            runner.status = runner_client.RunnerStatus.FAILED
+            runner.initialized_event.set()
+            raise exception
+        runner.start_mode = "process"
 
     runner.client = client
 
@@ -227,6 +341,25 @@ async def _start_extension_runner_process(
         await notify_project_changed(
             ws_context.ws_projects[runner.working_dir_path]
         )  # TODO: fix
+        if runner.shared_process is not None:
+            _exit_shared_runner_process(runner.shared_process, ws_context)
+            for tenant in runner.shared_process.runners:
+                if tenant is runner:
+                    continue
+                tenant.status = runner_client.RunnerStatus.EXITED
+                # the project didn't stop its runner, let it start a new one on the
+                # next use
+                tenant_runners_by_env = ws_context.ws_projects_extension_runners.get(
+                    tenant.working_dir_path, {}
+                )
+                if tenant_runners_by_env.get(tenant.env_name) is tenant:
+                    del tenant_runners_by_env[tenant.env_name]
+                try:
+                    await notify_project_changed(
+                        ws_context.ws_projects[tenant.working_dir_path]
+                    )
+                except KeyError:
+                    ...
         # TODO: restart if WM is not stopping
 
     runner.client.server_exit_callback = on_exit
@@ -341,6 +474,12 @@ async def _start_extension_runner_process(
         get_workspace_project_paths,
     )
 
+    def _get_request_project_path(params) -> Path:
+        # an ER shared between projects names the project of the request
+        if params.project_path is not None:
+            return Path(params.project_path)
+        return runner.working_dir_path
+
     async def handle_run_action_in_project(
         params: _internal_client_types.RunActionInProjectParams,
     ) -> _internal_client_types.RunActionInProjectResult:
@@ -349,6 +488,7 @@ async def _start_extension_runner_process(
         from finecode.wm_server.runner.runner_client import RunActionTrigger, DevEnv
 
         executor = ProjectExecutor(ws_context)
+        project_path = _get_request_project_path(params)
 
         if params.partial_result_token is not None:
             partial_count = 0
@@ -356,7 +496,7 @@ async def _start_extension_runner_process(
                 async with executor.run_action_with_partial_results(
                     action_source=params.action_source,
                     params=params.payload,
-                    project_path=runner.working_dir_path,
+                    project_path=project_path,
                     partial_result_token=params.partial_result_token,
                     run_trigger=RunActionTrigger(params.meta.trigger),
                     dev_env=DevEnv(params.meta.dev_env),
@@ -398,7 +538,7 @@ async def _start_extension_runner_process(
             result = await executor.run_action(
                 action_source=params.action_source,
                 params=params.payload,
-                project_path=runner.working_dir_path,
+                project_path=project_path,
                 run_trigger=RunActionTrigger(params.meta.trigger),
                 dev_env=DevEnv(params.meta.dev_env),
                 orchestration_depth=params.meta.orchestration_depth,
@@ -429,9 +569,10 @@ async def _start_extension_runner_process(
 
         # Resolve action name from source via the runner's own project actions.
         # Use canonical_source (resolved by ER)
-        project = ws_context.ws_projects.get(runner.working_dir_path)
+        project_path = _get_request_project_path(params)
+        project = ws_context.ws_projects.get(project_path)
         if not isinstance(project, domain.CollectedProject):
-            raise errors.InternalError(f"Project {runner.working_dir_path} has no valid config")
+            raise errors.InternalError(f"Project {project_path} has no valid config")
 
         def _find_action_name() -> str | None:
             return next(
@@ -481,11 +622,11 @@ async def _start_extension_runner_process(
             ]
             logger.info(
                 f"handle_run_action_in_workspace: action_source={params.action_source!r} not found"
-                f" in project {runner.working_dir_path}."
+                f" in project {project_path}."
                 f" Known actions ({len(known)}): {known}"
             )
             raise errors.ActionNotFoundError(
-                f"No action with source '{params.action_source}' found in project {runner.working_dir_path}"
+                f"No action with source '{params.action_source}' found in project {project_path}"
             )
 
         if params.project_paths:
@@ -541,10 +682,11 @@ async def _start_extension_runner_process(
         ``find_subactions_for_parent``/``ensure_action_metadata``, the same
         machinery used elsewhere to resolve action metadata.
         """
-        project = ws_context.ws_projects.get(runner.working_dir_path)
+        project_path = _get_request_project_path(params)
+        project = ws_context.ws_projects.get(project_path)
         if not isinstance(project, domain.CollectedProject):
             raise errors.ConfigurationError(
-                f"Project '{runner.working_dir_path}' has no valid config"
+                f"Project '{project_path}' has no valid config"
             )
 
         from finecode.wm_server.services import run_service
@@ -616,8 +758,36 @@ async def _start_extension_runner_process(
 _STOP_TIMEOUT_SEC: typing.Final = 10
 
 
+def _is_shared_process_tenant(runner: runner_client.ExtensionRunnerInfo) -> bool:
+    return runner.shared_process is not None and runner.shared_process.host is not runner
+
+
+def _detach_from_shared_process(runner: runner_client.ExtensionRunnerInfo) -> None:
+    assert runner.shared_process is not None
+    if runner in runner.shared_process.runners:
+        runner.shared_process.runners.remove(runner)
+    runner.status = runner_client.RunnerStatus.EXITED
+
+
 async def stop_extension_runner(runner: runner_client.ExtensionRunnerInfo) -> None:
     logger.trace(f"Trying to stop extension runner {runner.readable_id}")
+    if _is_shared_process_tenant(runner):
+        # the process keeps running for other projects, only the project of the
+        # runner is removed from it. Stopping the host stops the whole process: its
+        # env can be removed after stop.
+        if runner.status in (
+            runner_client.RunnerStatus.RUNNING,
+            runner_client.RunnerStatus.REPAIRING,
+        ):
+            try:
+                await runner_client.remove_project(runner)
+            except Exception as e:
+                logger.error(f"Failed to remove project of {runner.readable_id}:")
+                logger.exception(e)
+        _detach_from_shared_process(runner)
+        logger.trace(f"Removed extension runner {runner.readable_id} from shared process")
+        return
+
     if runner.status in (
         runner_client.RunnerStatus.RUNNING,
         runner_client.RunnerStatus.REPAIRING,
@@ -653,6 +823,11 @@ async def stop_extension_runner(runner: runner_client.ExtensionRunnerInfo) -> No
 
 def stop_extension_runner_sync(runner: runner_client.ExtensionRunnerInfo) -> None:
     logger.trace(f"Trying to stop extension runner {runner.readable_id}")
+    if _is_shared_process_tenant(runner):
+        # used on WM shutdown, the process is stopped together with its host
+        _detach_from_shared_process(runner)
+        return
+
     if runner.status in (
         runner_client.RunnerStatus.RUNNING,
         runner_client.RunnerStatus.REPAIRING,
@@ -846,8 +1021,14 @@ async def get_or_start_runners_with_presets(
 async def start_runner(
     project_def: domain.Project, env_name: str, handlers_to_initialize: dict[str, list[str]] | None, ws_context: context.WorkspaceContext, debug: bool = False, cmd_override: str | None = None
 ) -> runner_client.ExtensionRunnerInfo:
-    with telemetry.er_startup_metrics(env_name):
-        return await _start_runner(project_def=project_def, env_name=env_name, handlers_to_initialize=handlers_to_initialize, ws_context=ws_context, debug=debug, cmd_override=cmd_override)
+    from finecode.wm_server.runner import runner_pool
+
+    await runner_pool.make_room_for_runner(ws_context)
+    with telemetry.er_startup_metrics(env_name) as startup_metric_attributes:
+        runner = await _start_runner(project_def=project_def, env_name=env_name, handlers_to_initialize=handlers_to_initialize, ws_context=ws_context, debug=debug, cmd_override=cmd_override)
+        if runner.start_mode is not None:
+            startup_metric_attributes["er.start_mode"] = runner.start_mode
+        return runner
 
 
 async def _start_runner(
@@ -863,33 +1044,21 @@ async def _start_runner(
         cmd_override=cmd_override,
     )
     save_runner_in_context(runner=runner, ws_context=ws_context)
-    try:
-        await _start_extension_runner_process(runner=runner, ws_context=ws_context, debug=debug)
-    except asyncio.CancelledError:
-        logger.warning(
-            f"Startup of runner '{runner.readable_id}' was cancelled — marking as FAILED"
-        )
-        runner.status = runner_client.RunnerStatus.FAILED
-        runner.initialized_event.set()
-        raise
-
-    try:
-        await _init_lsp_client(runner=runner, project=project_def)
-    except RunnerFailedToStart as exception:
-        runner.status = runner_client.RunnerStatus.FAILED
-        await notify_project_changed(project_def)
-        runner.initialized_event.set()
-        raise exception
-
-    try:
-        runner_info = await _internal_client_api.get_runner_info(runner.client)
-        if runner_info.log_file_path is not None:
-            runner.log_file_path = Path(runner_info.log_file_path)
-            logger.debug(f"Runner {runner.readable_id} log file: {runner.log_file_path}")
-        else:
-            logger.debug(f"Runner {runner.readable_id} returned no log file path")
-    except Exception as e:
-        logger.warning(f"Failed to get runner info for {runner.readable_id}: {e}")
+    joined_shared_process = await _join_or_host_shared_runner_process(
+        runner=runner, ws_context=ws_context, debug=debug
+    )
+    if not joined_shared_process:
+        try:
+            await _start_runner_process(
+                runner=runner, project_def=project_def, ws_context=ws_context, debug=debug
+            )
+        except BaseException:
+            if runner.shared_process is not None:
+                _exit_shared_runner_process(runner.shared_process, ws_context)
+            raise
+        finally:
+            if runner.shared_process is not None:
+                runner.shared_process.process_started_event.set()
 
     if (
         project_def.dir_path not in ws_context.ws_projects_raw_configs
@@ -920,7 +1089,8 @@ async def _start_runner(
     await _finish_runner_init(runner=runner, project=project_def, ws_context=ws_context)
 
     runner.status = runner_client.RunnerStatus.RUNNING
-    telemetry.er_active_inc(runner.env_name)
+    if not joined_shared_process:
+        telemetry.er_active_inc(runner.env_name)
     await notify_project_changed(project_def)
     runner.initialized_event.set()
 
@@ -929,9 +1099,121 @@ async def _start_runner(
     from finecode.wm_server import wm_server as _wm
     await _wm.push_er_forwarding_to_runner(runner)
 
+    if not joined_shared_process:
+        _prewarm_er_zygote(runner, current_project_def, ws_context)
+
     return runner
 
 
+async def _start_runner_process(
+    runner: runner_client.ExtensionRunnerInfo,
+    project_def: domain.Project,
+    ws_context: context.WorkspaceContext,
+    debug: bool,
+) -> None:
+    try:
+        await _start_extension_runner_process(runner=runner, ws_context=ws_context, debug=debug)
+    except asyncio.CancelledError:
+        logger.warning(
+            f"Startup of runner '{runner.readable_id}' was cancelled — marking as FAILED"
+        )
+        runner.status = runner_client.RunnerStatus.FAILED
+        runner.initialized_event.set()
+        raise
+
+    try:
+        await _init_lsp_client(runner=runner, project=project_def)
+    except RunnerFailedToStart as exception:
+        runner.status = runner_client.RunnerStatus.FAILED
+        await notify_project_changed(project_def)
+        runner.initialized_event.set()
+        raise exception
+
+    try:
+        runner_info = await _internal_client_api.get_runner_info(runner.client)
+        if runner_info.log_file_path is not None:
+            runner.log_file_path = Path(runner_info.log_file_path)
+            logger.debug(f"Runner {runner.readable_id} log file: {runner.log_file_path}")
+        else:
+            logger.debug(f"Runner {runner.readable_id} returned no log file path")
+    except Exception as e:
+        logger.warning(f"Failed to get runner info for {runner.readable_id}: {e}")
+
+
+def _get_shared_runner_process_key(
+    runner: runner_client.ExtensionRunnerInfo,
+    ws_context: context.WorkspaceContext,
+    debug: bool,
+) -> str | None:
+    """Key of the ER process the runner can share with runners of other projects,
+    None if the runner needs its own process."""
+    if not ws_context.share_identical_env_runners or runner.cmd_override:
+        return None
+    runner_config = _get_runner_config(runner, ws_context)
+    if debug or runner_config.debug:
+        # a debug session is attached to the process of one project
+        return None
+    env_fingerprint = finecode_cmd.get_env_fingerprint(
+        runner.working_dir_path, runner.env_name
+    )
+    if env_fingerprint is None:
+        return None
+    # env name and log level are process arguments of the ER
+    return f"{runner.env_name}:{runner_config.logging.default_level}:{env_fingerprint}"
+
+
+async def _join_or_host_shared_runner_process(
+    runner: runner_client.ExtensionRunnerInfo,
+    ws_context: context.WorkspaceContext,
+    debug: bool,
+) -> bool:
+    """Join the ER process of another project with an identical env.
+
+    Returns True if the runner joined a running process. Otherwise the runner starts
+    its own process; if it can be shared, the runner is registered as its host
+    before the start, so that runners started concurrently wait for it instead of
+    starting one more process.
+    """
+    key = _get_shared_runner_process_key(runner, ws_context, debug)
+    if key is None:
+        return False
+
+    while (shared_process := ws_context.shared_runner_processes.get(key)) is not None:
+        await shared_process.process_started_event.wait()
+        # a host that failed to start or exited is removed before the event is set,
+        # then one of the waiting runners becomes the next host
+        if ws_context.shared_runner_processes.get(key) is not shared_process:
+            continue
+
+        host = shared_process.host
+        runner.client = host.client
+        runner.log_file_path = host.log_file_path
+        # both are fed by the notification handlers of the host client
+        runner.partial_results = host.partial_results
+        runner.progress_notifications = host.progress_notifications
+        runner.shared_process = shared_process
+        runner.start_mode = "shared"
+        shared_process.runners.append(runner)
+        logger.debug(f"Runner {runner.readable_id} joined ER of {host.readable_id}")
+        return True
+
+    shared_process = runner_client.SharedRunnerProcess(
+        key=key, host=runner, runners=[runner]
+    )
+    ws_context.shared_runner_processes[key] = shared_process
+    runner.shared_process = shared_process
+    return False
+
+
+def _exit_shared_runner_process(
+    shared_process: runner_client.SharedRunnerProcess,
+    ws_context: context.WorkspaceContext,
+) -> None:
+    # new runners don't join the process anymore
+    if ws_context.shared_runner_processes.get(shared_process.key) is shared_process:
+        del ws_context.shared_runner_processes[shared_process.key]
+
+
 async def _wait_for_runner_ready(
     runner: runner_client.ExtensionRunnerInfo,
     env_name: str,
@@ -985,6 +1267,7 @@ async def get_or_start_runner(
         runners_by_env = ws_context.ws_projects_extension_runners[project_def.dir_path]
         runner = runners_by_env[env_name]
         logger.trace(f"Runner {runner.readable_id} found")
+        runner.mark_used()
     except KeyError:
         logger.trace(
             f"Runner for env {env_name} in {project_def.dir_path} not found, start one"
@@ -1105,6 +1388,14 @@ async def update_runner_config(
             f"Runner failed to update config: {exception.message}"
         ) from exception
 
+    if runner.status == runner_client.RunnerStatus.RUNNING:
+        # the ER drops opened files when its config is updated, and the runner
+        # can be interested in other documents now. On start, opened files are
+        # sent by `_finish_runner_init`
+        await send_opened_files(
+            runner=runner, opened_files=_get_opened_documents(ws_context)
+        )
+
     try:
         action_meta_response = await runner_client.resolve_action_meta(runner)
     except Exception as exc:
@@ -1151,6 +1442,8 @@ async def update_runner_config(
 
     ws_context.ws_action_schemas.pop(project.dir_path, None)
     logger.debug(f"Updated config of runner {runner.readable_id}")
+    if project_config_changed_callback is not None:
+        await project_config_changed_callback(project)
 
 
 async def _finish_runner_init(
@@ -1161,7 +1454,7 @@ async def _finish_runner_init(
     # TODO: save per runner only during initialization. But where to get data from
     #       in case of runner restart?
     await send_opened_files(
-        runner=runner, opened_files=list(ws_context.opened_documents.values())
+        runner=runner, opened_files=_get_opened_documents(ws_context)
     )
 
 
@@ -1175,16 +1468,30 @@ def save_runner_in_context(
     ] = runner
 
 
+def _get_opened_documents(
+    ws_context: context.WorkspaceContext,
+) -> list[domain.TextDocumentInfo]:
+    """Opened documents with the current content of their buffers."""
+    for uri, document_info in ws_context.opened_documents.items():
+        buffer = ws_context.opened_document_buffers.get(uri)
+        if buffer is not None:
+            document_info.text = buffer.text
+    return list(ws_context.opened_documents.values())
+
+
 async def send_opened_files(
     runner: runner_client.ExtensionRunnerInfo,
     opened_files: list[domain.TextDocumentInfo],
 ):
+    # opened files are sent with their current content, which contains the queued
+    # changes
+    runner.pending_document_changes.clear()
     files_for_runner: list[domain.TextDocumentInfo] = []
     for opened_file_info in opened_files:
         file_path = Path(opened_file_info.uri.replace("file://", ""))
         if not file_path.is_relative_to(runner.working_dir_path):
             continue
-        else:
+        elif runner.wants_document(opened_file_info):
             files_for_runner.append(opened_file_info)
 
     try:
@@ -1279,6 +1586,10 @@ async def restart_extension_runner(
         logger.error(f"Cannot find runner for env {env_name} in {runner_working_dir_path}")
         return
 
+    if runner.shared_process is not None:
+        # the restarted runner gets a new process instead of joining the old one,
+        # e.g. to load changed code of editable packages
+        _exit_shared_runner_process(runner.shared_process, ws_context)
     await stop_extension_runner(runner)
 
     project_def = ws_context.ws_projects[runner.working_dir_path]
@@ -0,0 +1,209 @@
+"""
+Pool of live ERs: stops runners which were not used for a while and the least
+recently used runners above the configured maximum of live runners.
+
+A stopped runner is removed from the workspace context, so that the next
+`runner_manager.get_or_start_runner` starts it again transparently. Documents
+opened in the client are sent to the restarted runner on its initialization.
+
+Runners of the `dev_workspace` env are never stopped and not counted: the WM
+resolves presets and project configuration through them.
+"""
+
+import asyncio
+import time
+import typing
+
+from loguru import logger
+
+from finecode import telemetry
+from finecode.wm_server import context
+from finecode.wm_server.runner import runner_client, runner_manager
+
+type EvictionReason = typing.Literal["idle", "lru"]
+
+DEV_WORKSPACE_ENV_NAME: typing.Final = "dev_workspace"
+# a runner is not stopped to make room for another one right after its start or
+# use: a caller can hold it between `get_or_start_runner` and a request
+MIN_IDLE_SEC_FOR_LRU_EVICTION: typing.Final = 5.0
+_MAX_REAP_INTERVAL_SEC: typing.Final = 30.0
+_LIVE_STATUSES: typing.Final = (
+    runner_client.RunnerStatus.INITIALIZING,
+    runner_client.RunnerStatus.RUNNING,
+    runner_client.RunnerStatus.REPAIRING,
+)
+
+
+def is_enabled(ws_context: context.WorkspaceContext) -> bool:
+    return ws_context.max_live_runners > 0 or ws_context.runner_idle_timeout_sec > 0
+
+
+def _owns_process(runner: runner_client.ExtensionRunnerInfo) -> bool:
+    # runners which joined the process of another project don't need own resources
+    return runner.shared_process is None or runner.shared_process.host is runner
+
+
+def _is_pooled(runner: runner_client.ExtensionRunnerInfo) -> bool:
+    return runner.env_name != DEV_WORKSPACE_ENV_NAME
+
+
+def _has_tenants(runner: runner_client.ExtensionRunnerInfo) -> bool:
+    # stopping the host of a shared process would stop the runners of other projects
+    return (
+        runner.shared_process is not None
+        and runner.shared_process.host is runner
+        and any(
+            other is not runner and other.status in _LIVE_STATUSES
+            for other in runner.shared_process.runners
+        )
+    )
+
+
+def _is_evictable(runner: runner_client.ExtensionRunnerInfo) -> bool:
+    return (
+        _is_pooled(runner)
+        and runner.status == runner_client.RunnerStatus.RUNNING
+        and runner.active_request_count == 0
+        and not _has_tenants(runner)
+    )
+
+
+def count_live_runners(runners: typing.Iterable[runner_client.ExtensionRunnerInfo]) -> int:
+    return sum(
+        1
+        for runner in runners
+        if _is_pooled(runner) and _owns_process(runner) and runner.status in _LIVE_STATUSES
+    )
+
+
+def select_runners_to_evict(
+    runners: list[runner_client.ExtensionRunnerInfo],
+    max_live: int,
+    idle_timeout_sec: float,
+    now: float,
+    reserve: int = 0,
+) -> list[tuple[runner_client.ExtensionRunnerInfo, EvictionReason]]:
+    """Select runners to stop, in the order in which they should be stopped.
+
+    First all runners idle for longer than `idle_timeout_sec`, then the least
+    recently used runners until at most `max_live - reserve` runners are live.
+    `reserve` is the number of runners which are about to start. Runners with
+    requests in progress, runners which are not running yet and hosts of shared
+    processes with other runners are never selected, so the number of live runners
+    can stay above the limit.
+    """
+    candidates = sorted(
+        (runner for runner in runners if _is_evictable(runner)),
+        key=lambda runner: runner.last_used_at,
+    )
+    selected: list[tuple[runner_client.ExtensionRunnerInfo, EvictionReason]] = []
+
+    if idle_timeout_sec > 0:
+        for runner in candidates:
+            if now - runner.last_used_at >= idle_timeout_sec:
+                selected.append((runner, "idle"))
+
+    if max_live > 0:
+        selected_runners = [runner for runner, _ in selected]
+        live_count = count_live_runners(
+            runner for runner in runners if runner not in selected_runners
+        )
+        for runner in candidates:
+            if live_count + reserve <= max_live:
+                break
+            if runner in selected_runners or not _owns_process(runner):
+                continue
+            if now - runner.last_used_at < MIN_IDLE_SEC_FOR_LRU_EVICTION:
+                # candidates are sorted by last use, all next ones are newer
+                break
+            selected.append((runner, "lru"))
+            live_count -= 1
+
+    return selected
+
+
+def _all_runners(
+    ws_context: context.WorkspaceContext,
+) -> list[runner_client.ExtensionRunnerInfo]:
+    return [
+        runner
+        for runners_by_env in ws_context.ws_projects_extension_runners.values()
+        for runner in runners_by_env.values()
+    ]
+
+
+async def evict_runner(
+    runner: runner_client.ExtensionRunnerInfo,
+    reason: EvictionReason,
+    ws_context: context.WorkspaceContext,
+) -> None:
+    runners_by_env = ws_context.ws_projects_extension_runners.get(
+        runner.working_dir_path, {}
+    )
+    if runners_by_env.get(runner.env_name) is not runner:
+        # already stopped or replaced, e.g. by a restart
+        return
+
+    # removed before the stop: the next use starts a new runner instead of getting
+    # the stopping one
+    del runners_by_env[runner.env_name]
+    logger.debug(f"Stop {reason} extension runner {runner.readable_id}")
+    telemetry.er_eviction(runner.env_name, reason)
+    try:
+        await runner_manager.stop_extension_runner(runner)
+    except Exception as exception:
+        logger.error(f"Failed to stop extension runner {runner.readable_id}:")
+        logger.exception(exception)
+
+    project = ws_context.ws_projects.get(runner.working_dir_path)
+    if project is not None:
+        await runner_manager.notify_project_changed(project)
+
+
+async def reap_runners(ws_context: context.WorkspaceContext, reserve: int = 0) -> None:
+    """Stop idle runners and least recently used runners above the limit.
+
+    `reserve` is the number of runners which are about to start.
+    """
+    runners_to_evict = select_runners_to_evict(
+        _all_runners(ws_context),
+        max_live=ws_context.max_live_runners,
+        idle_timeout_sec=ws_context.runner_idle_timeout_sec,
+        now=time.monotonic(),
+        reserve=reserve,
+    )
+    for runner, reason in runners_to_evict:
+        await evict_runner(runner, reason, ws_context)
+
+    live_count = count_live_runners(_all_runners(ws_context))
+    if ws_context.max_live_runners > 0 and live_count + reserve > ws_context.max_live_runners:
+        logger.debug(
+            f"Limit of {ws_context.max_live_runners} live extension runners is"
+            f" exceeded, none of {live_count} live runners can be stopped now"
+        )
+    telemetry.er_pool_occupancy(live_count, ws_context.max_live_runners)
+
+
+async def make_room_for_runner(ws_context: context.WorkspaceContext) -> None:
+    if ws_context.max_live_runners > 0:
+        await reap_runners(ws_context, reserve=1)
+
+
+def get_reap_interval(ws_context: context.WorkspaceContext) -> float:
+    if ws_context.runner_idle_timeout_sec > 0:
+        return min(
+            max(ws_context.runner_idle_timeout_sec / 4, 1.0), _MAX_REAP_INTERVAL_SEC
+        )
+    return _MAX_REAP_INTERVAL_SEC
+
+
+async def run_reaper(ws_context: context.WorkspaceContext) -> None:
+    """Reap runners periodically until cancelled."""
+    interval = get_reap_interval(ws_context)
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await reap_runners(ws_context)
+        except Exception as exception:
+            logger.error("Failed to reap extension runners:")
+            logger.exception(exception)
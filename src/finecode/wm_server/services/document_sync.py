@@ -2,17 +2,43 @@
 
 Handles document lifecycle notifications (opened, closed, changed) and forwards
 them to affected extension runners.
+
+A runner gets notifications only about documents of languages it advertised in
+the response to `update_config`, see `ExtensionRunnerInfo.wants_document`.
+Changes are not sent immediately: incremental changes of a document received within
+`CHANGE_DEBOUNCE_SEC` are queued in the runners and sent together, at the latest
+before the next request to the runner.
 """
 
 from __future__ import annotations
 
 import asyncio
 import pathlib
+from typing import TYPE_CHECKING
+
 from loguru import logger
 
+from finecode_extension_api import text_buffer
+
 from finecode.wm_server import context, domain
 from finecode.wm_server.services import text_utils
 
+if TYPE_CHECKING:
+    from finecode.wm_server.runner import runner_client
+
+CHANGE_DEBOUNCE_SEC = 0.05
+
+
+def _find_projects_of_file(
+    file_path: pathlib.Path, ws_context: context.WorkspaceContext
+) -> list[pathlib.Path]:
+    return [
+        project_path
+        for project_path in ws_context.project_path_trie.find_all(file_path)
+        if ws_context.ws_projects[project_path].status
+        == domain.ProjectStatus.CONFIG_VALID
+    ]
+
 
 async def handle_documents_opened(
     params: dict | None, ws_context: context.WorkspaceContext
@@ -30,15 +56,16 @@ async def handle_documents_opened(
         return
 
     file_path = pathlib.Path(uri.replace("file://", ""))
-    projects_paths = [
-        project_path
-        for project_path, project in ws_context.ws_projects.items()
-        if project.status == domain.ProjectStatus.CONFIG_VALID
-        and file_path.is_relative_to(project_path)
-    ]
+    projects_paths = _find_projects_of_file(file_path, ws_context)
 
-    document_info = domain.TextDocumentInfo(uri=uri, version=str(version or ""), text=text)
+    document_info = domain.TextDocumentInfo(
+        uri=uri,
+        version=str(version or ""),
+        text=text,
+        language_id=params.get("languageId", ""),
+    )
     ws_context.opened_documents[uri] = document_info
+    ws_context.opened_document_buffers[uri] = text_buffer.TextBuffer(text)
     try:
         async with asyncio.TaskGroup() as tg:
             for project_path in projects_paths:
@@ -46,7 +73,10 @@ async def handle_documents_opened(
                     project_path, {}
                 )
                 for runner in runners_by_env.values():
-                    if runner.status == runner_client.RunnerStatus.RUNNING:
+                    if (
+                        runner.status == runner_client.RunnerStatus.RUNNING
+                        and runner.wants_document(document_info)
+                    ):
                         tg.create_task(
                             runner_client.notify_document_did_open(
                                 runner=runner, document_info=document_info
@@ -71,15 +101,14 @@ async def handle_documents_closed(
     if not uri:
         return
 
-    ws_context.opened_documents.pop(uri, None)
+    document_info = ws_context.opened_documents.pop(uri, None)
+    ws_context.opened_document_buffers.pop(uri, None)
+    flush_handle = ws_context.document_change_flush_handles.pop(uri, None)
+    if flush_handle is not None:
+        flush_handle.cancel()
 
     file_path = pathlib.Path(uri.replace("file://", ""))
-    projects_paths = [
-        project_path
-        for project_path, project in ws_context.ws_projects.items()
-        if project.status == domain.ProjectStatus.CONFIG_VALID
-        and file_path.is_relative_to(project_path)
-    ]
+    projects_paths = _find_projects_of_file(file_path, ws_context)
 
     try:
         async with asyncio.TaskGroup() as tg:
@@ -93,6 +122,10 @@ async def handle_documents_closed(
                             f"Runner {runner.readable_id} is not running, skip it"
                         )
                         continue
+                    if document_info is not None and not runner.wants_document(
+                        document_info
+                    ):
+                        continue
 
                     tg.create_task(
                         runner_client.notify_document_did_close(
@@ -119,12 +152,7 @@ async def handle_documents_changed(
         return
 
     file_path = pathlib.Path(uri.replace("file://", ""))
-    projects_paths = [
-        project_path
-        for project_path, project in ws_context.ws_projects.items()
-        if project.status == domain.ProjectStatus.CONFIG_VALID
-        and file_path.is_relative_to(project_path)
-    ]
+    projects_paths = _find_projects_of_file(file_path, ws_context)
 
     # Convert camelCase content changes back to snake_case for runner_client
     mapped_changes = []
@@ -162,27 +190,61 @@ async def handle_documents_changed(
 
     # Keep the content cache current so runner restarts get the latest state.
     cached = ws_context.opened_documents.get(uri)
-    if cached is not None:
-        cached.text = text_utils.apply_text_changes(cached.text, mapped_changes)
+    cached_buffer = ws_context.opened_document_buffers.get(uri)
+    if cached is not None and cached_buffer is not None:
+        try:
+            text_utils.apply_text_changes_to_buffer(cached_buffer, mapped_changes)
+        except ValueError as exception:
+            # runners validate the change themselves, keep forwarding it
+            logger.warning(f"Failed to apply change to cached {uri}: {exception}")
         cached.version = str(version)
 
-    try:
-        async with asyncio.TaskGroup() as tg:
-            for project_path in projects_paths:
-                runners_by_env = ws_context.ws_projects_extension_runners.get(
-                    project_path, {}
-                )
-                for runner in runners_by_env.values():
-                    if runner.status != runner_client.RunnerStatus.RUNNING:
-                        logger.trace(
-                            f"Runner {runner.readable_id} is not running, skip it"
-                        )
-                        continue
+    for runner in _runners_of_projects(projects_paths, ws_context):
+        if runner.status != runner_client.RunnerStatus.RUNNING:
+            logger.trace(f"Runner {runner.readable_id} is not running, skip it")
+            continue
+        if cached is not None and not runner.wants_document(cached):
+            continue
+        runner_client.queue_document_change(runner=runner, change_params=change_params)
+
+    if uri not in ws_context.document_change_flush_handles:
+        # the window is not extended by later changes, so that continuous typing
+        # is still sent every `CHANGE_DEBOUNCE_SEC`
+        ws_context.document_change_flush_handles[uri] = (
+            asyncio.get_running_loop().call_later(
+                CHANGE_DEBOUNCE_SEC, flush_document_changes, uri, ws_context
+            )
+        )
 
-                    tg.create_task(
-                        runner_client.notify_document_did_change(
-                            runner=runner, change_params=change_params
-                        )
-                    )
-    except ExceptionGroup as e:
-        logger.error(f"Error while sending changed document: {e}")
+
+def flush_document_changes(uri: str, ws_context: context.WorkspaceContext) -> None:
+    """Send changes of the document queued in runners."""
+    from finecode.wm_server.runner import runner_client
+
+    flush_handle = ws_context.document_change_flush_handles.pop(uri, None)
+    if flush_handle is not None:
+        flush_handle.cancel()
+
+    file_path = pathlib.Path(uri.replace("file://", ""))
+    projects_paths = _find_projects_of_file(file_path, ws_context)
+    for runner in _runners_of_projects(projects_paths, ws_context):
+        try:
+            runner_client.flush_document_changes(runner=runner, document_uri=uri)
+        except Exception as exception:
+            logger.error(
+                f"Error while sending changed document to {runner.readable_id}:"
+                f" {exception}"
+            )
+
+
+def _runners_of_projects(
+    projects_paths: list[pathlib.Path],
+    ws_context: context.WorkspaceContext,
+) -> list[runner_client.ExtensionRunnerInfo]:
+    return [
+        runner
+        for project_path in projects_paths
+        for runner in ws_context.ws_projects_extension_runners.get(
+            project_path, {}
+        ).values()
+    ]
@@ -19,6 +19,9 @@ def on_shutdown(ws_context: context.WorkspaceContext):
     for runner in running_runners:
         runner_manager.stop_extension_runner_sync(runner=runner)
 
+    for zygote in ws_context.er_zygotes.values():
+        zygote.stop()
+
     if ws_context.runner_io_thread is not None:
         logger.trace("Stop IO thread")
         ws_context.runner_io_thread.stop(timeout=5)
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+from finecode_extension_api import text_buffer
+
 from finecode.wm_server.runner import runner_client
 
 
@@ -14,43 +16,34 @@ def apply_text_changes(
 ) -> str:
     """Apply a sequence of LSP content changes to *text* and return the result.
 
-    LSP character offsets are UTF-16 code unit counts.  For files that contain
-    only BMP characters (U+0000–U+FFFF) each character maps to exactly one
-    UTF-16 code unit, so plain string indexing is correct.  Files with
-    characters outside the BMP (e.g. emoji) may see off-by-one errors in the
-    rare case where a range boundary falls inside or immediately after such a
-    character; this is an accepted limitation for now.
+    LSP character offsets are UTF-16 code unit counts and are converted to string
+    indices, so characters outside the BMP (e.g. emoji) are handled correctly.
+    """
+    buffer = text_buffer.TextBuffer(text)
+    apply_text_changes_to_buffer(buffer, changes)
+    return buffer.text
+
+
+def apply_text_changes_to_buffer(
+    buffer: text_buffer.TextBuffer,
+    changes: list[
+        runner_client.TextDocumentContentChangePartial
+        | runner_client.TextDocumentContentChangeWholeDocument
+    ],
+) -> None:
+    """Apply a sequence of LSP content changes to *buffer* in place.
+
+    Unlike :func:`apply_text_changes`, the cost of a partial change depends on the
+    size of the changed lines, not of the whole document.
     """
     for change in changes:
         if isinstance(change, runner_client.TextDocumentContentChangeWholeDocument):
-            text = change.text
+            buffer.set_text(change.text)
         else:
-            text = _apply_partial_change(text, change)
-    return text
-
-
-def _apply_partial_change(
-    text: str, change: runner_client.TextDocumentContentChangePartial
-) -> str:
-    lines = text.split("\n")
-
-    start_line = change.range.start.line
-    start_char = change.range.start.character
-    end_line = change.range.end.line
-    end_char = change.range.end.character
-
-    # Build the prefix: everything before the start position.
-    prefix = "\n".join(lines[:start_line])
-    if start_line > 0:
-        prefix += "\n"
-    if start_line < len(lines):
-        prefix += lines[start_line][:start_char]
-
-    # Build the suffix: everything after the end position.
-    suffix = ""
-    if end_line < len(lines):
-        suffix = lines[end_line][end_char:]
-        if end_line + 1 < len(lines):
-            suffix += "\n" + "\n".join(lines[end_line + 1 :])
-
-    return prefix + change.text + suffix
+            buffer.replace(
+                start_line=change.range.start.line,
+                start_character=change.range.start.character,
+                end_line=change.range.end.line,
+                end_character=change.range.end.character,
+                text=change.text,
+            )
@@ -230,6 +230,7 @@ def make_workspace_context(
     """
     ws_context = context.WorkspaceContext(ws_dirs_paths=[project.dir_path])
     ws_context.ws_projects[project.dir_path] = project
+    ws_context.project_path_trie.add(project.dir_path)
     runners_by_env = {env_name: runner}
     if extra_runners is not None:
         runners_by_env.update(extra_runners)
@@ -208,6 +208,8 @@ class WalConfig:
     dir_path: pathlib.Path | None = None
     max_segment_bytes: int = DEFAULT_MAX_SEGMENT_BYTES
     max_segments: int = DEFAULT_MAX_SEGMENTS
+    durability: shared_wal.WalDurability = shared_wal.WalDurability.FLUSH
+    group_commit_interval_sec: float = shared_wal.DEFAULT_GROUP_COMMIT_INTERVAL_SEC
 
 
 class WalWriter:
@@ -227,6 +229,8 @@ class WalWriter:
                 max_segment_bytes=self.config.max_segment_bytes,
                 max_segments=self.config.max_segments,
                 writer_id_prefix="wm",
+                durability=self.config.durability,
+                group_commit_interval_sec=self.config.group_commit_interval_sec,
             )
         )
 
@@ -33,6 +33,14 @@ def discovery_file_path() -> pathlib.Path:
     return _cache_dir() / "wm_port"
 
 
+def project_discovery_index_dir_path() -> pathlib.Path:
+    return _cache_dir() / "project_discovery"
+
+
+def preset_config_cache_dir_path() -> pathlib.Path:
+    return _cache_dir() / "preset_configs"
+
+
 def startup_stderr_log_path() -> pathlib.Path:
     return _cache_dir() / "wm_startup_stderr.log"
 
@@ -44,6 +44,7 @@ from finecode.wm_server._api_handlers import (
     _handle_get_workspace_editable_packages,
     _handle_remove_dir,
     _handle_run_action,
+    _handle_run_action_for_file,
     _handle_run_action_with_partial_results_task,
     _handle_run_action_with_progress_task,
     _handle_run_batch,
@@ -70,6 +71,8 @@ from finecode.wm_server._jsonrpc import (
     _read_message,
     _write_message,
 )
+from finecode.wm_server import wm_lifecycle
+from finecode.wm_server.config.preset_cache import PresetConfigCache
 from finecode.wm_server.wm_lifecycle import discovery_file_path
 from finecode.wm_server import wal
 
@@ -149,6 +152,7 @@ _METHODS: dict[str, MethodHandler] = {
     "actions/getTree": _handle_get_tree,
     "actions/getPayloadSchemas": _handle_get_payload_schemas,
     "actions/run": _handle_run_action,
+    "actions/runForFile": _handle_run_action_for_file,
     "actions/runBatch": _handle_run_batch,
     "actions/reload": _handle_actions_reload,
     # runners/
@@ -177,10 +181,12 @@ _NOTIFICATIONS: dict[str, NotificationHandler] = {
 _connected_clients: set[asyncio.StreamWriter] = set()
 _auto_stop_task: asyncio.Task | None = None
 _no_client_timeout_task: asyncio.Task | None = None
+_runner_reaper_task: asyncio.Task | None = None
 _server: asyncio.Server | None = None
 _discovery_file: pathlib.Path | None = None
 _had_client: bool = False
-_running_partial_result_tasks: dict[asyncio.StreamWriter, set[asyncio.Task]] = {}
+# client → { request id → task handling the request }
+_running_request_tasks: dict[asyncio.StreamWriter, dict[int | str, asyncio.Task]] = {}
 _client_labels: dict[asyncio.StreamWriter, str] = {}
 _disconnect_timeout: int = DISCONNECT_TIMEOUT_SECONDS
 
@@ -360,6 +366,29 @@ async def _no_client_timeout() -> None:
         stop()
 
 
+def _track_request_task(
+    writer: asyncio.StreamWriter, req_id: int | str, task: asyncio.Task
+) -> None:
+    """Register the task handling a request, so that it can be cancelled by the
+    client with `$/cancelRequest` or when the client disconnects."""
+    tasks = _running_request_tasks.setdefault(writer, {})
+    tasks[req_id] = task
+
+    def _untrack(done_task: asyncio.Task) -> None:
+        client_tasks = _running_request_tasks.get(writer)
+        if client_tasks is not None and client_tasks.get(req_id) is done_task:
+            del client_tasks[req_id]
+
+    task.add_done_callback(_untrack)
+
+
+def _cancel_request_task(writer: asyncio.StreamWriter, params: dict | None) -> None:
+    req_id = (params or {}).get("id")
+    task = _running_request_tasks.get(writer, {}).get(req_id)
+    if task is not None:
+        task.cancel()
+
+
 async def _handle_request_task(
     handler: MethodHandler,
     params: dict | None,
@@ -407,7 +436,16 @@ async def _handle_request_task(
         _write_message(writer, _jsonrpc_error(req_id, -32603, str(exc)))
         await writer.drain()
     except asyncio.CancelledError:
-        pass
+        # cancelled with `$/cancelRequest`, nobody is waiting for the response if
+        # the client has disconnected
+        if writer in _connected_clients:
+            _write_message(
+                writer,
+                _jsonrpc_error(
+                    req_id, finecode_jsonrpc.REQUEST_CANCELLED, "Request cancelled"
+                ),
+            )
+            await writer.drain()
 
 
 async def _handle_client(
@@ -455,6 +493,9 @@ async def _handle_client(
 
             # Notifications (no id) — dispatch and don't respond.
             if is_notification:
+                if method == "$/cancelRequest":
+                    _cancel_request_task(writer, params)
+                    continue
                 notification_handler = _NOTIFICATIONS.get(method)
                 if notification_handler is not None:
                     logger.trace(f"[{label}] Received notification {method}")
@@ -506,10 +547,7 @@ async def _handle_client(
                         params, ws_context, writer, req_id
                     )
                 )
-                if writer not in _running_partial_result_tasks:
-                    _running_partial_result_tasks[writer] = set()
-                _running_partial_result_tasks[writer].add(task)
-                task.add_done_callback(lambda t: _running_partial_result_tasks[writer].discard(t) if writer in _running_partial_result_tasks else None)
+                _track_request_task(writer, req_id, task)
                 continue
 
             if method == "actions/run" and (params or {}).get("progressToken") is not None:
@@ -520,10 +558,7 @@ async def _handle_client(
                         params, ws_context, writer, req_id
                     )
                 )
-                if writer not in _running_partial_result_tasks:
-                    _running_partial_result_tasks[writer] = set()
-                _running_partial_result_tasks[writer].add(task)
-                task.add_done_callback(lambda t: _running_partial_result_tasks[writer].discard(t) if writer in _running_partial_result_tasks else None)
+                _track_request_task(writer, req_id, task)
                 continue
 
             if method == "actions/runBatch" and (params or {}).get("partialResultToken") is not None:
@@ -532,10 +567,7 @@ async def _handle_client(
                         params, ws_context, writer, req_id
                     )
                 )
-                if writer not in _running_partial_result_tasks:
-                    _running_partial_result_tasks[writer] = set()
-                _running_partial_result_tasks[writer].add(task)
-                task.add_done_callback(lambda t: _running_partial_result_tasks[writer].discard(t) if writer in _running_partial_result_tasks else None)
+                _track_request_task(writer, req_id, task)
                 continue
 
             if method == "actions/runBatch" and (params or {}).get("progressToken") is not None:
@@ -544,10 +576,7 @@ async def _handle_client(
                         params, ws_context, writer, req_id
                     )
                 )
-                if writer not in _running_partial_result_tasks:
-                    _running_partial_result_tasks[writer] = set()
-                _running_partial_result_tasks[writer].add(task)
-                task.add_done_callback(lambda t: _running_partial_result_tasks[writer].discard(t) if writer in _running_partial_result_tasks else None)
+                _track_request_task(writer, req_id, task)
                 continue
 
             handler = _METHODS.get(method)
@@ -565,13 +594,7 @@ async def _handle_client(
             task = asyncio.create_task(
                 _handle_request_task(handler, params, ws_context, writer, req_id, label, method)
             )
-            if writer not in _running_partial_result_tasks:
-                _running_partial_result_tasks[writer] = set()
-            _running_partial_result_tasks[writer].add(task)
-            task.add_done_callback(
-                lambda t: _running_partial_result_tasks[writer].discard(t)
-                if writer in _running_partial_result_tasks else None
-            )
+            _track_request_task(writer, req_id, task)
     except (asyncio.IncompleteReadError, ConnectionResetError):
         pass
     finally:
@@ -585,11 +608,9 @@ async def _handle_client(
         _connected_clients.discard(writer)
         _client_labels.pop(writer, None)
 
-        # Cancel any running partial result tasks for this client
-        if writer in _running_partial_result_tasks:
-            for task in _running_partial_result_tasks[writer]:
-                task.cancel()
-            del _running_partial_result_tasks[writer]
+        # Cancel any running request tasks for this client
+        for task in _running_request_tasks.pop(writer, {}).values():
+            task.cancel()
 
         writer.close()
         await writer.wait_closed()
@@ -627,6 +648,7 @@ async def start(
             before shutting down. Defaults to DISCONNECT_TIMEOUT_SECONDS (30).
     """
     global _server, _discovery_file, _no_client_timeout_task, _had_client, _disconnect_timeout
+    global _runner_reaper_task
     _had_client = False
     _disconnect_timeout = disconnect_timeout
     port = _find_free_port()
@@ -652,10 +674,18 @@ async def start(
     # Shut down if no client connects within the timeout.
     _no_client_timeout_task = asyncio.create_task(_no_client_timeout())
 
+    from finecode.wm_server.runner import runner_pool
+
+    if runner_pool.is_enabled(ws_context):
+        _runner_reaper_task = asyncio.create_task(runner_pool.run_reaper(ws_context))
+
     try:
         async with _server:
             await _server.serve_forever()
     finally:
+        if _runner_reaper_task is not None:
+            _runner_reaper_task.cancel()
+            _runner_reaper_task = None
         stop()
         # Clean up workspace resources (runners, IO thread).
         from finecode.wm_server.services import shutdown_service
@@ -695,11 +725,11 @@ def stop() -> None:
             pass
         _discovery_file = None
 
-    # Cancel any running partial result tasks
-    for tasks in _running_partial_result_tasks.values():
-        for task in tasks:
+    # Cancel any running request tasks
+    for tasks in _running_request_tasks.values():
+        for task in tasks.values():
             task.cancel()
-    _running_partial_result_tasks.clear()
+    _running_request_tasks.clear()
 
 
 # ---------------------------------------------------------------------------
@@ -724,6 +754,11 @@ def _register_callbacks() -> None:
             },
         })
 
+    async def on_project_config_changed(project: domain.Project) -> None:
+        _notify_all_clients(
+            "projects/configChanged", {"projectPath": str(project.dir_path)}
+        )
+
     async def on_user_message(message: str, message_type: str) -> None:
         _notify_all_clients("server/userMessage", {
             "message": message,
@@ -731,6 +766,7 @@ def _register_callbacks() -> None:
         })
 
     runner_manager.project_changed_callback = on_project_changed
+    runner_manager.project_config_changed_callback = on_project_config_changed
     user_messages._notification_sender = on_user_message
 
 
@@ -739,6 +775,10 @@ async def start_standalone(
     disconnect_timeout: int = DISCONNECT_TIMEOUT_SECONDS,
     wal_config: wal.WalConfig | None = None,
     otlp_endpoint: str | None = None,
+    share_identical_env_runners: bool = False,
+    prewarm_er_zygotes: bool = False,
+    max_live_runners: int = 0,
+    runner_idle_timeout_sec: float = 0,
 ) -> None:
     """Start the WM server as a standalone process with its own WorkspaceContext.
 
@@ -749,9 +789,24 @@ async def start_standalone(
         disconnect_timeout: Seconds to wait after the last client disconnects
             before shutting down.
         otlp_endpoint: OTLP endpoint for telemetry forwarding to extension runners.
+        share_identical_env_runners: Share one extension runner between projects
+            whose envs have the same interpreter and installed packages.
+        prewarm_er_zygotes: Fork new extension runners from a prewarmed zygote
+            process per env.
+        max_live_runners: Maximum number of live extension runners, 0 for no
+            limit.  Least recently used idle runners are stopped above it.
+        runner_idle_timeout_sec: Stop extension runners which were not used for
+            this number of seconds, 0 to keep them running.
     """
     ws_context = context.WorkspaceContext([])
+    ws_context.preset_config_cache = PresetConfigCache(
+        wm_lifecycle.preset_config_cache_dir_path()
+    )
     ws_context.otlp_endpoint = otlp_endpoint
+    ws_context.share_identical_env_runners = share_identical_env_runners
+    ws_context.prewarm_er_zygotes = prewarm_er_zygotes
+    ws_context.max_live_runners = max_live_runners
+    ws_context.runner_idle_timeout_sec = runner_idle_timeout_sec
     if wal_config is not None and wal_config.enabled:
         ws_context.wal_writer = wal.WalWriter(wal_config)
     _register_callbacks()
@@ -2,7 +2,9 @@ from __future__ import annotations
 
 from typing import Any
 
-from finecode.wm_server.config import collect_actions
+import pytest
+
+from finecode.wm_server.config import collect_actions, config_models
 
 
 def _build_config() -> dict[str, Any]:
@@ -55,3 +57,108 @@ def test_collect_actions_leaves_interpreter_none_for_non_interpreter_env() -> No
     handlers_by_name = {handler.name: handler for handler in actions[0].handlers}
 
     assert handlers_by_name["plain_handler"].interpreter is None
+
+
+def _build_batch_config() -> dict[str, Any]:
+    return {
+        "tool": {
+            "finecode": {
+                "action": {
+                    "format_file": {
+                        "source": "test.actions.FormatFileAction",
+                        "handlers": [
+                            {
+                                "name": "isort",
+                                "source": "test.handlers.IsortFileHandler",
+                                "batch_source": "test.handlers.IsortFilesHandler",
+                                "env": "dev_no_runtime",
+                                "config": {"profile": "black"},
+                            },
+                            {
+                                "name": "disabled",
+                                "source": "test.handlers.DisabledFileHandler",
+                                "enabled": False,
+                            },
+                            {
+                                "name": "ruff",
+                                "source": "test.handlers.RuffFileHandler",
+                                "batch_source": "test.handlers.RuffFilesHandler",
+                                "env": "dev_no_runtime",
+                            },
+                        ],
+                    },
+                    "format_files": {
+                        "source": "test.actions.FormatFilesAction",
+                        "batch_of": "format_file",
+                    },
+                },
+                "action_handler": [
+                    {
+                        "source": "test.handlers.RuffFileHandler",
+                        "config": {"line_length": 100},
+                    }
+                ],
+            }
+        }
+    }
+
+
+def test_batch_action_gets_batch_variants_of_handlers() -> None:
+    config = _build_batch_config()
+
+    actions = collect_actions._collect_actions_in_config(config)
+
+    batch_action = next(action for action in actions if action.name == "format_files")
+    assert [
+        (handler.name, handler.source, handler.env, handler.config)
+        for handler in batch_action.handlers
+    ] == [
+        (
+            "isort",
+            "test.handlers.IsortFilesHandler",
+            "dev_no_runtime",
+            {"profile": "black"},
+        ),
+        ("ruff", "test.handlers.RuffFilesHandler", "dev_no_runtime", {}),
+    ]
+
+
+def test_batch_variant_of_handler_uses_handler_config() -> None:
+    config = _build_batch_config()
+
+    handler_configs = collect_actions._collect_action_handler_configs_in_config(config)
+
+    assert handler_configs["test.handlers.RuffFilesHandler"] == {"line_length": 100}
+
+
+def test_batch_variant_of_handler_keeps_own_config() -> None:
+    config = _build_batch_config()
+    config["tool"]["finecode"]["action_handler"].append(
+        {"source": "test.handlers.RuffFilesHandler", "config": {"line_length": 80}}
+    )
+
+    handler_configs = collect_actions._collect_action_handler_configs_in_config(config)
+
+    assert handler_configs["test.handlers.RuffFilesHandler"] == {"line_length": 80}
+
+
+def test_batch_action_is_skipped_if_handler_has_no_batch_variant() -> None:
+    config = _build_batch_config()
+    format_file_handlers = config["tool"]["finecode"]["action"]["format_file"][
+        "handlers"
+    ]
+    del format_file_handlers[2]["batch_source"]
+
+    actions = collect_actions._collect_actions_in_config(config)
+
+    assert [action.name for action in actions] == ["format_file"]
+
+
+def test_batch_action_with_own_handlers_is_rejected() -> None:
+    config = _build_batch_config()
+    config["tool"]["finecode"]["action"]["format_files"]["handlers"] = [
+        {"name": "own", "source": "test.handlers.OwnHandler"}
+    ]
+
+    with pytest.raises(config_models.ConfigurationError):
+        collect_actions._collect_actions_in_config(config)
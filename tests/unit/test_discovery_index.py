@@ -0,0 +1,140 @@
+import pathlib
+
+import pytest
+
+from finecode.wm_server import context, domain, wm_lifecycle
+from finecode.wm_server.config import discovery_index, read_configs
+
+_FINECODE_PYPROJECT = """
+[project]
+name = "{name}"
+
+[dependency-groups]
+dev_workspace = ["finecode"]
+"""
+
+
+@pytest.fixture
+def index_dir(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> pathlib.Path:
+    index_dir = tmp_path / "index"
+    monkeypatch.setattr(
+        wm_lifecycle, "project_discovery_index_dir_path", lambda: index_dir
+    )
+    # files of the test are written right before the scan, store them anyway
+    monkeypatch.setattr(discovery_index, "_is_racy", lambda stat: False)
+    return index_dir
+
+
+@pytest.fixture
+def read_def_files(monkeypatch: pytest.MonkeyPatch) -> list[pathlib.Path]:
+    read_files: list[pathlib.Path] = []
+    read_def_file_info = read_configs._read_def_file_info
+
+    def _read_def_file_info_spy(def_file, def_file_stat):
+        read_files.append(def_file)
+        return read_def_file_info(def_file, def_file_stat)
+
+    monkeypatch.setattr(read_configs, "_read_def_file_info", _read_def_file_info_spy)
+    return read_files
+
+
+def _write_project(dir_path: pathlib.Path, name: str) -> None:
+    dir_path.mkdir(parents=True, exist_ok=True)
+    (dir_path / "pyproject.toml").write_text(
+        _FINECODE_PYPROJECT.format(name=name), encoding="utf-8"
+    )
+
+
+async def _discover(ws_dir: pathlib.Path) -> dict[pathlib.Path, domain.Project]:
+    ws_context = context.WorkspaceContext([ws_dir])
+    await read_configs.read_projects_in_dir(ws_dir, ws_context)
+    return ws_context.ws_projects
+
+
+async def test_warm_scan_parses_only_changed_definition_files(
+    tmp_path: pathlib.Path, index_dir: pathlib.Path, read_def_files: list[pathlib.Path]
+) -> None:
+    ws_dir = tmp_path / "ws"
+    _write_project(ws_dir / "a", "a")
+    _write_project(ws_dir / "b", "b")
+    await _discover(ws_dir)
+    read_def_files.clear()
+
+    _write_project(ws_dir / "b", "b_renamed")
+    _write_project(ws_dir / "c", "c")
+    projects = await _discover(ws_dir)
+
+    assert sorted(read_def_files) == [
+        ws_dir / "b" / "pyproject.toml",
+        ws_dir / "c" / "pyproject.toml",
+    ]
+    assert {project.name for project in projects.values()} == {"a", "b_renamed", "c"}
+    assert projects[ws_dir / "a"].status == domain.ProjectStatus.CONFIG_VALID
+
+
+async def test_removed_project_is_not_discovered_from_index(
+    tmp_path: pathlib.Path, index_dir: pathlib.Path
+) -> None:
+    ws_dir = tmp_path / "ws"
+    _write_project(ws_dir / "a", "a")
+    _write_project(ws_dir / "b", "b")
+    await _discover(ws_dir)
+
+    (ws_dir / "b" / "pyproject.toml").unlink()
+    (ws_dir / "b").rmdir()
+    projects = await _discover(ws_dir)
+
+    assert list(projects) == [ws_dir / "a"]
+
+
+async def test_ignore_globs_from_workspace_config(
+    tmp_path: pathlib.Path, index_dir: pathlib.Path
+) -> None:
+    ws_dir = tmp_path / "ws"
+    _write_project(ws_dir / "packages" / "a", "a")
+    _write_project(ws_dir / "packages" / "vendored", "vendored")
+    _write_project(ws_dir / "examples" / "b", "b")
+    _write_project(ws_dir / "build" / "c", "c")
+    (ws_dir / "finecode-workspace.toml").write_text(
+        '[workspace.discovery]\nignore = ["examples", "packages/vendor*"]\n',
+        encoding="utf-8",
+    )
+
+    projects = await _discover(ws_dir)
+
+    # `build` is ignored by default
+    assert list(projects) == [ws_dir / "packages" / "a"]
+
+
+async def test_gitignore_is_respected_if_enabled(
+    tmp_path: pathlib.Path, index_dir: pathlib.Path
+) -> None:
+    pytest.importorskip("pathspec")
+    ws_dir = tmp_path / "ws"
+    _write_project(ws_dir / "a", "a")
+    _write_project(ws_dir / "generated" / "b", "b")
+    (ws_dir / ".gitignore").write_text("generated/\n", encoding="utf-8")
+
+    assert len(await _discover(ws_dir)) == 2
+
+    (ws_dir / "finecode-workspace.toml").write_text(
+        "[workspace.discovery]\nrespect_gitignore = true\n", encoding="utf-8"
+    )
+    assert list(await _discover(ws_dir)) == [ws_dir / "a"]
+
+
+async def test_corrupted_index_is_rebuilt(
+    tmp_path: pathlib.Path, index_dir: pathlib.Path
+) -> None:
+    ws_dir = tmp_path / "ws"
+    _write_project(ws_dir / "a", "a")
+    index_dir.mkdir()
+    index_path = index_dir / discovery_index.index_file_name(ws_dir)
+    index_path.write_text("{not json", encoding="utf-8")
+
+    projects = await _discover(ws_dir)
+
+    assert list(projects) == [ws_dir / "a"]
+    assert discovery_index.DiscoveryIndex.load(index_path).get_def_file(
+        "a/pyproject.toml", (ws_dir / "a" / "pyproject.toml").stat()
+    ) is not None
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import asyncio
+import pathlib
+
+import pytest
+
+from finecode.lsp_server import global_state
+from finecode.lsp_server.endpoints import diagnostics
+
+
+class _FakeWmClient:
+    """Answers `actions/run` of InspectCodeAction with one diagnostic per file once
+    `release` is set."""
+
+    def __init__(self) -> None:
+        self.run_count = 0
+        self.cancelled_count = 0
+        self.release = asyncio.Event()
+        self.started = asyncio.Event()
+
+    async def run_action(self, action_source, project, params, options) -> dict:
+        self.run_count += 1
+        self.started.set()
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled_count += 1
+            raise
+        position = {"line": 0, "character": 0}
+        return {
+            "resultByFormat": {
+                "json": {
+                    "messages": {
+                        file_uri: [
+                            {
+                                "range": {"start": position, "end": position},
+                                "message": "problem",
+                            }
+                        ]
+                        for file_uri in params["file_paths"]
+                    }
+                }
+            }
+        }
+
+
+@pytest.fixture
+def wm_client(monkeypatch: pytest.MonkeyPatch) -> _FakeWmClient:
+    client = _FakeWmClient()
+    monkeypatch.setattr(global_state, "wm_client", client)
+    monkeypatch.setattr(global_state, "document_versions", {})
+    monkeypatch.setattr(global_state, "config_generation", 0)
+    monkeypatch.setattr(diagnostics, "_diagnostic_runs", {})
+    monkeypatch.setattr(diagnostics, "_last_reports", {})
+    return client
+
+
+async def test_concurrent_pulls_share_one_run_and_repull_is_unchanged(
+    wm_client: _FakeWmClient, tmp_path: pathlib.Path
+) -> None:
+    file_path = tmp_path / "a.py"
+    uri = file_path.as_uri()
+    global_state.document_versions[uri] = 1
+
+    pulls = [
+        asyncio.create_task(
+            diagnostics.document_diagnostic_with_full_result(file_path, uri)
+        )
+        for _ in range(3)
+    ]
+    await wm_client.started.wait()
+    wm_client.release.set()
+    reports = await asyncio.gather(*pulls)
+
+    assert wm_client.run_count == 1
+    assert reports[0] is reports[1] is reports[2]
+    assert len(reports[0].items) == 1
+
+    unchanged = await diagnostics.document_diagnostic_with_full_result(
+        file_path, uri, previous_result_id=reports[0].result_id
+    )
+    assert unchanged.kind == "unchanged"
+    assert unchanged.result_id == reports[0].result_id
+    assert wm_client.run_count == 1
+
+    global_state.config_generation += 1
+    await diagnostics.document_diagnostic_with_full_result(
+        file_path, uri, previous_result_id=reports[0].result_id
+    )
+    assert wm_client.run_count == 2
+
+
+async def test_run_of_outdated_document_version_is_cancelled(
+    wm_client: _FakeWmClient, tmp_path: pathlib.Path
+) -> None:
+    file_path = tmp_path / "a.py"
+    uri = file_path.as_uri()
+    global_state.document_versions[uri] = 1
+    outdated_pull = asyncio.create_task(
+        diagnostics.document_diagnostic_with_full_result(file_path, uri)
+    )
+    await wm_client.started.wait()
+
+    global_state.document_versions[uri] = 2
+    diagnostics.cancel_outdated_run(uri)
+    with pytest.raises(asyncio.CancelledError):
+        await outdated_pull
+    wm_client.release.set()
+    report = await diagnostics.document_diagnostic_with_full_result(file_path, uri)
+
+    assert wm_client.cancelled_count == 1
+    assert wm_client.run_count == 2
+    assert report.kind == "full"
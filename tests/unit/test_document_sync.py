@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import asyncio
+import pathlib
+
+import pytest
+
+from finecode.wm_server import context, domain
+from finecode.wm_server.runner import runner_client, runner_manager
+from finecode.wm_server.services import document_sync
+
+
+class _FakeClient:
+    def __init__(self) -> None:
+        self.notifications: list[tuple[str, object]] = []
+
+    def notify(self, method: str, params: object | None = None) -> None:
+        self.notifications.append((method, params))
+
+
+@pytest.fixture
+def ws_context(tmp_path: pathlib.Path) -> context.WorkspaceContext:
+    ws_context = context.WorkspaceContext([tmp_path])
+    project = domain.Project(
+        name="project",
+        dir_path=tmp_path,
+        def_path=tmp_path / "pyproject.toml",
+        status=domain.ProjectStatus.CONFIG_VALID,
+    )
+    ws_context.ws_projects[tmp_path] = project
+    ws_context.project_path_trie.add(tmp_path)
+    return ws_context
+
+
+def _add_runner(
+    ws_context: context.WorkspaceContext,
+    env_name: str,
+    document_languages: list[str] | None,
+) -> _FakeClient:
+    client = _FakeClient()
+    project_path = ws_context.ws_dirs_paths[0]
+    ws_context.ws_projects_extension_runners.setdefault(project_path, {})[
+        env_name
+    ] = runner_client.ExtensionRunnerInfo(
+        working_dir_path=project_path,
+        env_name=env_name,
+        status=runner_client.RunnerStatus.RUNNING,
+        client=client,  # type: ignore[arg-type]
+        document_languages=document_languages,
+    )
+    return client
+
+
+def _change(version: int, line: int, text: str) -> dict:
+    position = {"line": line, "character": 0}
+    return {
+        "uri": "",
+        "version": version,
+        "contentChanges": [
+            {"range": {"start": position, "end": position}, "text": text}
+        ],
+    }
+
+
+async def test_documents_are_sent_only_to_runners_of_their_language(
+    ws_context: context.WorkspaceContext, tmp_path: pathlib.Path
+) -> None:
+    python_client = _add_runner(ws_context, "dev_no_runtime", ["python"])
+    toml_client = _add_runner(ws_context, "toml", ["toml"])
+    any_client = _add_runner(ws_context, "dev_workspace", None)
+    uri = f"file://{(tmp_path / 'a.py').as_posix()}"
+
+    await document_sync.handle_documents_opened(
+        {"uri": uri, "version": 1, "text": "", "languageId": "python"}, ws_context
+    )
+    await document_sync.handle_documents_changed(
+        {**_change(2, 0, "x"), "uri": uri}, ws_context
+    )
+    document_sync.flush_document_changes(uri, ws_context)
+    await document_sync.handle_documents_closed({"uri": uri}, ws_context)
+
+    expected_methods = [
+        "textDocument/didOpen",
+        "textDocument/didChange",
+        "textDocument/didClose",
+    ]
+    assert [method for method, _ in python_client.notifications] == expected_methods
+    assert [method for method, _ in any_client.notifications] == expected_methods
+    assert toml_client.notifications == []
+
+
+async def test_changes_within_debounce_window_are_sent_together(
+    ws_context: context.WorkspaceContext,
+    tmp_path: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(document_sync, "CHANGE_DEBOUNCE_SEC", 0.01)
+    client = _add_runner(ws_context, "dev_no_runtime", ["python"])
+    uri = f"file://{(tmp_path / 'a.py').as_posix()}"
+    await document_sync.handle_documents_opened(
+        {"uri": uri, "version": 1, "text": "", "languageId": "python"}, ws_context
+    )
+
+    for version in (2, 3, 4):
+        await document_sync.handle_documents_changed(
+            {**_change(version, 0, str(version)), "uri": uri}, ws_context
+        )
+    assert len(client.notifications) == 1
+    await asyncio.sleep(0.05)
+
+    assert len(client.notifications) == 2
+    method, params = client.notifications[1]
+    assert method == "textDocument/didChange"
+    assert params.text_document.version == 4
+    assert [change.text for change in params.content_changes] == ["2", "3", "4"]
+    assert ws_context.opened_document_buffers[uri].text == "432"
+
+
+async def test_queued_changes_are_sent_before_next_request(
+    ws_context: context.WorkspaceContext, tmp_path: pathlib.Path
+) -> None:
+    client = _add_runner(ws_context, "dev_no_runtime", None)
+    runner = ws_context.ws_projects_extension_runners[tmp_path]["dev_no_runtime"]
+    uri = f"file://{(tmp_path / 'a.py').as_posix()}"
+    await document_sync.handle_documents_changed(
+        {**_change(2, 0, "x"), "uri": uri}, ws_context
+    )
+    assert client.notifications == []
+
+    with runner_client._request_in_progress(runner):
+        assert [method for method, _ in client.notifications] == [
+            "textDocument/didChange"
+        ]
+
+    # the scheduled flush has nothing to send anymore
+    document_sync.flush_document_changes(uri, ws_context)
+    assert len(client.notifications) == 1
+
+
+async def test_restarted_runner_gets_changed_content(
+    ws_context: context.WorkspaceContext, tmp_path: pathlib.Path
+) -> None:
+    client = _add_runner(ws_context, "dev_no_runtime", None)
+    runner = ws_context.ws_projects_extension_runners[tmp_path]["dev_no_runtime"]
+    uri = f"file://{(tmp_path / 'a.py').as_posix()}"
+    await document_sync.handle_documents_opened(
+        {"uri": uri, "version": 1, "text": "b\n"}, ws_context
+    )
+    await document_sync.handle_documents_changed(
+        {**_change(2, 0, "a\n"), "uri": uri}, ws_context
+    )
+    client.notifications.clear()
+
+    await runner_manager.send_opened_files(
+        runner=runner, opened_files=runner_manager._get_opened_documents(ws_context)
+    )
+
+    method, params = client.notifications[0]
+    assert method == "textDocument/didOpen"
+    assert params.text_document.text == "a\nb\n"
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import pathlib
+import sys
+
+import pytest
+
+import finecode_jsonrpc
+from finecode.wm_server.runner import er_zygote
+
+pytestmark = pytest.mark.skipif(
+    not er_zygote.is_supported(), reason="zygote forks runners, POSIX only"
+)
+
+
+@pytest.fixture
+async def zygote(tmp_path: pathlib.Path):
+    zygote = er_zygote.ErZygote(python_cmd=sys.executable, venv_dir_path=tmp_path)
+    yield zygote
+    zygote.stop()
+    await asyncio.wait_for(zygote.wait_exited(), timeout=10)
+
+
+async def test_forked_runner_output_and_exit_code_reach_the_wm(
+    tmp_path: pathlib.Path, zygote: er_zygote.ErZygote
+) -> None:
+    await zygote.start(working_dir_path=tmp_path, preload_modules=[])
+    assert zygote.status == er_zygote.ErZygoteStatus.READY
+
+    process = await zygote.spawn(["version"], cwd=tmp_path)
+    first_line = await asyncio.wait_for(process.stdout.readline(), timeout=10)
+
+    assert first_line.startswith(b"FineCode Extension Runner ")
+    assert await asyncio.wait_for(process.wait(), timeout=10) == 0
+    assert process.pid != os.getpid()
+
+
+async def test_zygote_with_changed_preloaded_module_refuses_to_fork(
+    tmp_path: pathlib.Path,
+    zygote: er_zygote.ErZygote,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    module_path = tmp_path / "zygote_preloaded_handler.py"
+    module_path.write_text("VALUE = 1\n")
+    monkeypatch.setenv("PYTHONPATH", str(tmp_path))
+    await zygote.start(
+        working_dir_path=tmp_path, preload_modules=["zygote_preloaded_handler"]
+    )
+
+    module_path.write_text("VALUE = 2\n")
+    os.utime(module_path, ns=(0, 0))
+
+    with pytest.raises(finecode_jsonrpc.ServerFailedToStart):
+        await zygote.spawn(["version"], cwd=tmp_path)
+    assert zygote.status == er_zygote.ErZygoteStatus.UNUSABLE
+
+
+async def test_failed_fork_keeps_zygote_ready(tmp_path: pathlib.Path) -> None:
+    async def reply_fork_error(
+        reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        await reader.read(4096)
+        writer.write(b'{"error": "fork failed: [Errno 11] Resource unavailable"}\n')
+        await writer.drain()
+        writer.close()
+
+    socket_path = str(tmp_path / "zygote.sock")
+    server = await asyncio.start_unix_server(reply_fork_error, path=socket_path)
+    zygote = er_zygote.ErZygote(python_cmd=sys.executable, venv_dir_path=tmp_path)
+    # the zygote side is replaced by the server above
+    zygote._socket_path = socket_path
+    zygote.status = er_zygote.ErZygoteStatus.READY
+
+    async with server:
+        with pytest.raises(finecode_jsonrpc.ServerFailedToStart, match="fork failed"):
+            await zygote.spawn(["version"], cwd=tmp_path)
+
+    assert zygote.status == er_zygote.ErZygoteStatus.READY
@@ -0,0 +1,104 @@
+import pathlib
+
+import pytest
+
+from finecode.wm_server.config import preset_cache, read_configs
+from finecode.wm_server.runner import finecode_cmd, runner_client
+
+
+@pytest.fixture
+def resolved_presets(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> list[str]:
+    """Preset packages `base` and `strict` (extends `base`), resolved sources are
+    recorded."""
+    packages_dir_path = tmp_path / "site-packages"
+    (packages_dir_path / "base").mkdir(parents=True)
+    (packages_dir_path / "base" / "preset.toml").write_text(
+        '[tool.finecode.action.lint]\nsource = "base.LintAction"\n'
+    )
+    (packages_dir_path / "strict").mkdir(parents=True)
+    (packages_dir_path / "strict" / "preset.toml").write_text(
+        '[[tool.finecode.presets]]\nsource = "base"\n\n'
+        '[tool.finecode.action.format]\nsource = "strict.FormatAction"\n'
+    )
+
+    resolved_sources: list[str] = []
+
+    async def resolve_package_path(runner, package_name: str) -> dict[str, str]:
+        resolved_sources.append(package_name)
+        return {"packagePath": str(packages_dir_path / package_name)}
+
+    monkeypatch.setattr(runner_client, "resolve_package_path", resolve_package_path)
+    monkeypatch.setattr(
+        finecode_cmd, "get_env_fingerprint", lambda project_path, env_name: "fp"
+    )
+    return resolved_sources
+
+
+def _make_runner(project_path: pathlib.Path) -> runner_client.ExtensionRunnerInfo:
+    return runner_client.ExtensionRunnerInfo(
+        working_dir_path=project_path,
+        env_name="dev_workspace",
+        status=runner_client.RunnerStatus.RUNNING,
+    )
+
+
+async def test_warm_start_reads_merged_preset_config_without_er_requests(
+    tmp_path: pathlib.Path, resolved_presets: list[str]
+) -> None:
+    def_path = tmp_path / "project" / "pyproject.toml"
+    runner = _make_runner(def_path.parent)
+    cache_dir_path = tmp_path / "cache"
+
+    cold_config = await read_configs.collect_config_from_py_presets(
+        ["strict"], def_path, runner, cache=preset_cache.PresetConfigCache(cache_dir_path)
+    )
+    assert sorted(resolved_presets) == ["base", "strict"]
+
+    resolved_presets.clear()
+    warm_config = await read_configs.collect_config_from_py_presets(
+        ["strict"], def_path, runner, cache=preset_cache.PresetConfigCache(cache_dir_path)
+    )
+
+    assert resolved_presets == []
+    assert warm_config == cold_config
+    assert set(warm_config["tool"]["finecode"]["action"]) == {"lint", "format"}
+
+
+async def test_changed_preset_file_invalidates_merged_preset_config(
+    tmp_path: pathlib.Path, resolved_presets: list[str]
+) -> None:
+    def_path = tmp_path / "project" / "pyproject.toml"
+    runner = _make_runner(def_path.parent)
+    cache = preset_cache.PresetConfigCache(tmp_path / "cache")
+    await read_configs.collect_config_from_py_presets(
+        ["strict"], def_path, runner, cache=cache
+    )
+
+    (tmp_path / "site-packages" / "base" / "preset.toml").write_text(
+        '[tool.finecode.action.check]\nsource = "base.CheckAction"\n'
+    )
+    config = await read_configs.collect_config_from_py_presets(
+        ["strict"], def_path, runner, cache=cache
+    )
+
+    assert set(config["tool"]["finecode"]["action"]) == {"check", "format"}
+
+
+async def test_projects_with_same_presets_resolve_them_once(
+    tmp_path: pathlib.Path, resolved_presets: list[str]
+) -> None:
+    cache = preset_cache.PresetConfigCache()
+    configs = []
+    for project_name in ("a", "b"):
+        def_path = tmp_path / project_name / "pyproject.toml"
+        # both projects use the env of project `a`, e.g. a shared runner
+        configs.append(
+            await read_configs.collect_config_from_py_presets(
+                ["strict"], def_path, _make_runner(tmp_path / "a"), cache=cache
+            )
+        )
+
+    assert sorted(resolved_presets) == ["base", "strict"]
+    assert configs[0] == configs[1]
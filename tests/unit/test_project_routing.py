@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import pathlib
+
+import pytest
+
+from finecode import wm_client as wm_client_module
+from finecode.lsp_server import global_state
+from finecode.lsp_server.endpoints import _project_routing
+from finecode.wm_server import context, domain
+from finecode.wm_server._api_handlers import _actions
+
+
+class _FakeWmClient:
+    """Records requests; files under `project_dir` belong to the project."""
+
+    def __init__(self, project_dir: pathlib.Path) -> None:
+        self.project_dir = project_dir
+        self.requests: list[tuple[str, str]] = []
+        self.known_projects = {str(project_dir)}
+
+    async def run_action(self, action_source, project, params, options) -> dict:
+        self.requests.append(("actions/run", project))
+        if project not in self.known_projects:
+            raise wm_client_module.ApiServerError(
+                -32602, f"Project '{project}' not found"
+            )
+        return {"resultByFormat": {"json": {}}, "returnCode": 0}
+
+    async def run_action_for_file(
+        self, action_source, file_path, params, options
+    ) -> dict:
+        self.requests.append(("actions/runForFile", file_path))
+        if not pathlib.Path(file_path).is_relative_to(self.project_dir):
+            return {"project": None}
+        return {
+            "project": str(self.project_dir),
+            "resultByFormat": {"json": {}},
+            "returnCode": 0,
+        }
+
+
+@pytest.fixture
+def wm_client(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path
+) -> _FakeWmClient:
+    client = _FakeWmClient(tmp_path / "project")
+    monkeypatch.setattr(global_state, "wm_client", client)
+    monkeypatch.setattr(_project_routing, "_project_dir_by_dir", {})
+    return client
+
+
+async def test_project_of_directory_is_resolved_once_until_cleared(
+    wm_client: _FakeWmClient, tmp_path: pathlib.Path
+) -> None:
+    project_dir = tmp_path / "project"
+
+    for file_name in ("a.py", "b.py"):
+        response = await _project_routing.run_action_for_file(
+            "fine_symbol_info.TextDocumentHoverAction", project_dir / file_name
+        )
+        assert response is not None and response["returnCode"] == 0
+    _project_routing.clear()
+    await _project_routing.run_action_for_file(
+        "fine_symbol_info.TextDocumentHoverAction", project_dir / "a.py"
+    )
+
+    assert wm_client.requests == [
+        ("actions/runForFile", str(project_dir / "a.py")),
+        ("actions/run", str(project_dir)),
+        ("actions/runForFile", str(project_dir / "a.py")),
+    ]
+
+
+async def test_file_outside_of_projects_is_not_requested_again(
+    wm_client: _FakeWmClient, tmp_path: pathlib.Path
+) -> None:
+    file_path = tmp_path / "other" / "a.py"
+
+    assert await _project_routing.run_action_for_file("Action", file_path) is None
+    assert await _project_routing.run_action_for_file("Action", file_path) is None
+
+    assert wm_client.requests == [("actions/runForFile", str(file_path))]
+
+
+async def test_rejected_cached_project_is_resolved_again(
+    wm_client: _FakeWmClient, tmp_path: pathlib.Path
+) -> None:
+    file_path = tmp_path / "project" / "a.py"
+    await _project_routing.run_action_for_file("Action", file_path)
+    # e.g. the project was removed before the tree change notification arrived
+    wm_client.known_projects.clear()
+
+    response = await _project_routing.run_action_for_file("Action", file_path)
+
+    assert response is not None
+    assert wm_client.requests == [
+        ("actions/runForFile", str(file_path)),
+        ("actions/run", str(tmp_path / "project")),
+        ("actions/runForFile", str(file_path)),
+    ]
+
+
+async def test_run_for_file_runs_action_in_nearest_valid_project(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path
+) -> None:
+    ws_context = context.WorkspaceContext([tmp_path])
+    for dir_path, status in (
+        (tmp_path, domain.ProjectStatus.CONFIG_VALID),
+        (tmp_path / "pkg", domain.ProjectStatus.NO_FINECODE),
+    ):
+        ws_context.ws_projects[dir_path] = domain.Project(
+            name=dir_path.name,
+            dir_path=dir_path,
+            def_path=dir_path / "pyproject.toml",
+            status=status,
+        )
+        ws_context.project_path_trie.add(dir_path)
+    run_params: list[dict] = []
+
+    async def handle_run_action(params, ws_context) -> dict:
+        run_params.append(params)
+        return {"resultByFormat": {}, "returnCode": 0}
+
+    monkeypatch.setattr(_actions, "_handle_run_action", handle_run_action)
+
+    result = await _actions._handle_run_action_for_file(
+        {"actionSource": "Action", "filePath": str(tmp_path / "pkg" / "a.py")},
+        ws_context,
+    )
+    outside_result = await _actions._handle_run_action_for_file(
+        {"actionSource": "Action", "filePath": "/outside/a.py"}, ws_context
+    )
+
+    assert result == {"project": str(tmp_path), "resultByFormat": {}, "returnCode": 0}
+    assert run_params == [{"actionSource": "Action", "project": str(tmp_path)}]
+    assert outside_result == {"project": None}
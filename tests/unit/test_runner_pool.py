@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import pathlib
+
+import pytest
+
+from finecode.wm_server import context
+from finecode.wm_server import testing as wm_testing
+from finecode.wm_server.runner import runner_client, runner_manager, runner_pool
+
+
+def _make_runner(
+    project_path: pathlib.Path,
+    env_name: str = "test_env",
+    last_used_at: float = 0.0,
+    status: runner_client.RunnerStatus = runner_client.RunnerStatus.RUNNING,
+) -> runner_client.ExtensionRunnerInfo:
+    return runner_client.ExtensionRunnerInfo(
+        working_dir_path=project_path,
+        env_name=env_name,
+        status=status,
+        client=None,
+        last_used_at=last_used_at,
+    )
+
+
+def test_least_recently_used_idle_runners_are_selected_above_the_limit(
+    tmp_path: pathlib.Path,
+) -> None:
+    oldest = _make_runner(tmp_path / "a", last_used_at=10)
+    busy = _make_runner(tmp_path / "b", last_used_at=0)
+    busy.active_request_count = 1
+    recent = _make_runner(tmp_path / "c", last_used_at=98)
+    older = _make_runner(tmp_path / "d", last_used_at=20)
+    dev_workspace = _make_runner(tmp_path / "a", env_name="dev_workspace")
+
+    selected = runner_pool.select_runners_to_evict(
+        [oldest, busy, recent, older, dev_workspace],
+        max_live=2,
+        idle_timeout_sec=0,
+        now=100,
+        reserve=1,
+    )
+
+    # 4 pooled runners are live, 1 is about to start: 3 have to be stopped, but
+    # the busy one and the recently used one can't
+    assert selected == [(oldest, "lru"), (older, "lru")]
+
+
+def test_runners_idle_longer_than_timeout_are_selected(tmp_path: pathlib.Path) -> None:
+    idle = _make_runner(tmp_path / "a", last_used_at=10)
+    used = _make_runner(tmp_path / "b", last_used_at=80)
+    starting = _make_runner(
+        tmp_path / "c", last_used_at=0, status=runner_client.RunnerStatus.INITIALIZING
+    )
+
+    selected = runner_pool.select_runners_to_evict(
+        [idle, used, starting], max_live=0, idle_timeout_sec=60, now=100
+    )
+
+    assert selected == [(idle, "idle")]
+
+
+def test_host_of_shared_process_with_tenants_is_not_selected(
+    tmp_path: pathlib.Path,
+) -> None:
+    host = _make_runner(tmp_path / "a", last_used_at=0)
+    tenant = _make_runner(tmp_path / "b", last_used_at=0)
+    shared_process = runner_client.SharedRunnerProcess(
+        key="test_env:INFO:fp", host=host, runners=[host, tenant]
+    )
+    host.shared_process = shared_process
+    tenant.shared_process = shared_process
+
+    selected = runner_pool.select_runners_to_evict(
+        [host, tenant], max_live=0, idle_timeout_sec=60, now=100
+    )
+
+    assert selected == [(tenant, "idle")]
+
+
+async def test_evicted_runner_is_removed_from_context_before_stop(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    ws_context = context.WorkspaceContext(ws_dirs_paths=[tmp_path])
+    project = wm_testing.make_single_action_project(
+        dir_path=tmp_path / "a", action_name="lint"
+    )
+    ws_context.ws_projects[project.dir_path] = project
+    ws_context.max_live_runners = 1
+    runner = _make_runner(project.dir_path, last_used_at=0)
+    runner_manager.save_runner_in_context(runner, ws_context)
+
+    runners_in_context_on_stop: list[dict] = []
+
+    async def stop_extension_runner(runner: runner_client.ExtensionRunnerInfo) -> None:
+        runners_in_context_on_stop.append(
+            dict(ws_context.ws_projects_extension_runners[project.dir_path])
+        )
+        runner.status = runner_client.RunnerStatus.EXITED
+
+    async def notify_project_changed(project) -> None: ...
+
+    monkeypatch.setattr(runner_manager, "stop_extension_runner", stop_extension_runner)
+    monkeypatch.setattr(runner_manager, "notify_project_changed", notify_project_changed)
+
+    await runner_pool.make_room_for_runner(ws_context)
+
+    # the next `get_or_start_runner` starts a new runner
+    assert runners_in_context_on_stop == [{}]
+    assert ws_context.ws_projects_extension_runners[project.dir_path] == {}
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import asyncio
+import pathlib
+import sys
+
+import pytest
+
+from finecode.wm_server import context
+from finecode.wm_server import testing as wm_testing
+from finecode.wm_server.runner import (
+    _internal_client_types,
+    finecode_cmd,
+    runner_client,
+    runner_manager,
+)
+
+
+def _make_venv(
+    project_path: pathlib.Path, env_name: str, packages: dict[str, str]
+) -> None:
+    venv_dir_path = finecode_cmd.get_venv_dir_path(project_path, env_name)
+    venv_dir_path.mkdir(parents=True)
+    (venv_dir_path / "pyvenv.cfg").write_text(
+        "home = /usr/bin\n"
+        "version = 3.12.1\n"
+        f"command = /usr/bin/python3 -m venv {venv_dir_path}\n"
+    )
+    site_packages_dir_path = venv_dir_path / "lib" / "python3.12" / "site-packages"
+    for name, version in packages.items():
+        (site_packages_dir_path / f"{name}-{version}.dist-info").mkdir(parents=True)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="test builds a POSIX-style venv layout")
+def test_env_fingerprint_depends_only_on_interpreter_and_packages(
+    tmp_path: pathlib.Path,
+) -> None:
+    _make_venv(tmp_path / "a", "dev", {"finecode": "1.0", "ruff": "0.5"})
+    _make_venv(tmp_path / "b", "dev", {"finecode": "1.0", "ruff": "0.5"})
+    _make_venv(tmp_path / "c", "dev", {"finecode": "1.0", "ruff": "0.6"})
+
+    fingerprint_a = finecode_cmd.get_env_fingerprint(tmp_path / "a", "dev")
+
+    assert fingerprint_a is not None
+    assert finecode_cmd.get_env_fingerprint(tmp_path / "b", "dev") == fingerprint_a
+    assert finecode_cmd.get_env_fingerprint(tmp_path / "c", "dev") != fingerprint_a
+    assert finecode_cmd.get_env_fingerprint(tmp_path / "d", "dev") is None
+
+
+@pytest.fixture
+def ws_context(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> context.WorkspaceContext:
+    monkeypatch.setattr(
+        finecode_cmd, "get_env_fingerprint", lambda project_path, env_name: "fp"
+    )
+    ws_context = context.WorkspaceContext(ws_dirs_paths=[tmp_path])
+    ws_context.share_identical_env_runners = True
+    for project_name in ("a", "b"):
+        project = wm_testing.make_single_action_project(
+            dir_path=tmp_path / project_name, action_name="lint"
+        )
+        ws_context.ws_projects[project.dir_path] = project
+    return ws_context
+
+
+def _make_starting_runner(project_path: pathlib.Path) -> runner_client.ExtensionRunnerInfo:
+    return runner_client.ExtensionRunnerInfo(
+        working_dir_path=project_path,
+        env_name="test_env",
+        status=runner_client.RunnerStatus.INITIALIZING,
+        client=None,
+    )
+
+
+async def test_runner_joins_started_process_of_identical_env(
+    tmp_path: pathlib.Path, ws_context: context.WorkspaceContext
+) -> None:
+    host = _make_starting_runner(tmp_path / "a")
+    tenant = _make_starting_runner(tmp_path / "b")
+
+    assert not await runner_manager._join_or_host_shared_runner_process(
+        host, ws_context, debug=False
+    )
+    join_task = asyncio.create_task(
+        runner_manager._join_or_host_shared_runner_process(
+            tenant, ws_context, debug=False
+        )
+    )
+    await asyncio.sleep(0)
+    assert not join_task.done()
+
+    host.client = wm_testing.FakeErClient()
+    host.shared_process.process_started_event.set()
+
+    assert await join_task
+    assert tenant.client is host.client
+    assert tenant.shared_process is host.shared_process
+    assert host.shared_process.runners == [host, tenant]
+
+
+async def test_runner_hosts_process_if_host_failed_to_start(
+    tmp_path: pathlib.Path, ws_context: context.WorkspaceContext
+) -> None:
+    host = _make_starting_runner(tmp_path / "a")
+    next_runner = _make_starting_runner(tmp_path / "b")
+    await runner_manager._join_or_host_shared_runner_process(host, ws_context, debug=False)
+    join_task = asyncio.create_task(
+        runner_manager._join_or_host_shared_runner_process(
+            next_runner, ws_context, debug=False
+        )
+    )
+    await asyncio.sleep(0)
+
+    runner_manager._exit_shared_runner_process(host.shared_process, ws_context)
+    host.shared_process.process_started_event.set()
+
+    assert not await join_task
+    assert next_runner.shared_process is not host.shared_process
+    assert next_runner.shared_process.host is next_runner
+    assert ws_context.shared_runner_processes["test_env:INFO:fp"] is (
+        next_runner.shared_process
+    )
+
+
+async def test_runners_are_not_shared_if_disabled(
+    tmp_path: pathlib.Path, ws_context: context.WorkspaceContext
+) -> None:
+    ws_context.share_identical_env_runners = False
+    runner = _make_starting_runner(tmp_path / "a")
+
+    assert not await runner_manager._join_or_host_shared_runner_process(
+        runner, ws_context, debug=False
+    )
+    assert runner.shared_process is None
+    assert ws_context.shared_runner_processes == {}
+
+
+async def test_stopping_tenant_keeps_shared_process_running(
+    tmp_path: pathlib.Path,
+) -> None:
+    client = wm_testing.FakeErClient()
+    client.configure_response(None)
+    host = wm_testing.make_running_runner(working_dir_path=tmp_path / "a", client=client)
+    tenant = wm_testing.make_running_runner(working_dir_path=tmp_path / "b", client=client)
+    shared_process = runner_client.SharedRunnerProcess(
+        key="fp", host=host, runners=[host, tenant]
+    )
+    host.shared_process = shared_process
+    tenant.shared_process = shared_process
+
+    await asyncio.wait_for(runner_manager.stop_extension_runner(tenant), timeout=2)
+
+    assert [method for method, _ in client.sent_requests] == [
+        _internal_client_types.ER_REMOVE_PROJECT
+    ]
+    assert client.sent_requests[0][1].project_path == (tmp_path / "b").as_posix()
+    assert tenant.status == runner_client.RunnerStatus.EXITED
+    assert host.status == runner_client.RunnerStatus.RUNNING
+    assert shared_process.runners == [host]
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import asyncio
+
 import finecode_jsonrpc
 import pytest
 
@@ -52,3 +54,38 @@ async def test_action_cancelled_error_becomes_a_real_jsonrpc_cancelled_response(
     assert msg["id"] == 42
     assert msg["error"]["code"] == finecode_jsonrpc.REQUEST_CANCELLED
     assert msg["error"]["message"] == "cancelled by pyrefly"
+
+
+async def test_cancel_request_notification_cancels_the_request_handler(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """``$/cancelRequest`` from a client cancels the task handling the request, and
+    the client still gets a RequestCancelled response for it."""
+    written: list[dict] = []
+    monkeypatch.setattr(
+        wm_server, "_write_message", lambda writer, msg: written.append(msg)
+    )
+    writer = _FakeWriter()
+    monkeypatch.setattr(wm_server, "_connected_clients", {writer})
+    monkeypatch.setattr(wm_server, "_running_request_tasks", {})
+    handler_started = asyncio.Event()
+
+    async def _long_handler(params, ws_context):
+        handler_started.set()
+        await asyncio.sleep(10)
+
+    task = asyncio.create_task(
+        wm_server._handle_request_task(
+            _long_handler, {}, None, writer, 7, "test-client", "actions/run"
+        )
+    )
+    wm_server._track_request_task(writer, 7, task)
+    await handler_started.wait()
+
+    wm_server._cancel_request_task(writer, {"id": 7})
+    await task
+
+    assert [msg["error"]["code"] for msg in written] == [
+        finecode_jsonrpc.REQUEST_CANCELLED
+    ]
+    assert wm_server._running_request_tasks[writer] == {}